@@ -5,9 +5,17 @@ import argparse
 import sys
 from pathlib import Path
 
+from mimi.core.artifacts import DEFAULT_ARTIFACTS_DIR, ArtifactStore
+from mimi.core.batch import BatchRunner, read_inputs
+from mimi.core.checkpoint import DEFAULT_RUNS_DIR, CheckpointStore
+from mimi.core.context import RunContext
 from mimi.core.project import Project
 from mimi.core.runner import ProjectRunner
+from mimi.models.admission import admission_stats, configure_admission
+from mimi.models.metrics import generation_stats, prefix_stats
 from mimi.utils.logger import setup_logger
+from mimi.utils.output_sink import FSYNC_POLICIES, configure_output_sink
+from mimi.utils.tracing import Tracer
 
 
 def parse_args():
@@ -22,8 +30,7 @@ def parse_args():
     
     parser.add_argument(
         "-i", "--input", 
-        required=True,
-        help="Input value for the project"
+        help="Input value for the project (required unless --resume is given)"
     )
     
     parser.add_argument(
@@ -38,11 +45,226 @@ def parse_args():
         help="Path to log file (if not specified, logs to console only)"
     )
     
-    return parser.parse_args()
+    parser.add_argument(
+        "-w", "--max-workers",
+        type=int,
+        default=1,
+        help="Number of independent tasks to run in parallel (default: 1, sequential)"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Resume an earlier run, only running the tasks that did not complete"
+    )
+    
+    parser.add_argument(
+        "--runs-dir",
+        default=str(DEFAULT_RUNS_DIR),
+        help=f"Directory where run checkpoints are stored (default: {DEFAULT_RUNS_DIR})"
+    )
+    
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse stored results of tasks whose input, agent config and upstream tasks are unchanged"
+    )
+    
+    parser.add_argument(
+        "--artifacts-dir",
+        default=str(DEFAULT_ARTIFACTS_DIR),
+        help=f"Directory of the artifact cache used by --incremental (default: {DEFAULT_ARTIFACTS_DIR})"
+    )
+    
+    parser.add_argument(
+        "--model-concurrency",
+        type=int,
+        help="Maximum concurrent requests per model and server for agents without "
+             "max_concurrency in model_settings (default: OLLAMA_NUM_PARALLEL, or unlimited)"
+    )
+    
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="Write a Chrome trace (for Perfetto) of the run to PATH and OTLP JSON next to it"
+    )
+    
+    parser.add_argument(
+        "--fsync",
+        choices=FSYNC_POLICIES,
+        default="never",
+        help="When generated files are fsynced: never, before each rename (data), "
+             "or also their directory after it (full) (default: never)"
+    )
+    
+    args = parser.parse_args()
+    if args.input is None and args.resume is None:
+        parser.error("the following arguments are required: -i/--input")
+        
+    return args
+
+
+def parse_batch_args(argv):
+    """Parse command line arguments of the batch command."""
+    parser = argparse.ArgumentParser(
+        prog="mimi batch",
+        description="Run a MiMi project over every input in a JSONL file",
+    )
+    
+    parser.add_argument(
+        "-c", "--config",
+        required=True,
+        help="Path to the project configuration directory"
+    )
+    
+    parser.add_argument(
+        "--inputs",
+        required=True,
+        help="JSONL file with one input per line: a JSON object of input data or a plain value"
+    )
+    
+    parser.add_argument(
+        "-o", "--output",
+        help="JSONL file for the results (default: <inputs>.results.jsonl)"
+    )
+    
+    parser.add_argument(
+        "-n", "--concurrency",
+        type=int,
+        default=4,
+        help="Number of inputs to run at the same time (default: 4)"
+    )
+    
+    parser.add_argument(
+        "-w", "--max-workers",
+        type=int,
+        default=1,
+        help="Number of independent tasks to run in parallel within each input (default: 1)"
+    )
+    
+    parser.add_argument(
+        "-l", "--log-level",
+        default="WARNING",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        help="Logging level"
+    )
+    
+    parser.add_argument(
+        "--log-file",
+        help="Path to log file (if not specified, logs to console only)"
+    )
+    
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse stored results of unchanged tasks, as for a single run"
+    )
+    
+    parser.add_argument(
+        "--artifacts-dir",
+        default=str(DEFAULT_ARTIFACTS_DIR),
+        help=f"Directory of the artifact cache used by --incremental (default: {DEFAULT_ARTIFACTS_DIR})"
+    )
+    
+    parser.add_argument(
+        "--model-concurrency",
+        type=int,
+        help="Maximum concurrent requests per model and server, as for a single run"
+    )
+    
+    return parser.parse_args(argv)
+
+
+def batch_main(argv):
+    """Run a project over a JSONL file of inputs."""
+    args = parse_batch_args(argv)
+    
+    setup_logger(
+        log_level=args.log_level,
+        log_file=args.log_file,
+    )
+    if args.model_concurrency is not None:
+        configure_admission(max_concurrency=args.model_concurrency)
+        
+    inputs_path = Path(args.inputs)
+    output_path = Path(args.output) if args.output else inputs_path.with_suffix(".results.jsonl")
+    
+    try:
+        project = Project.from_config(args.config)
+        batch = BatchRunner(
+            project,
+            concurrency=args.concurrency,
+            max_workers=args.max_workers,
+            artifacts=ArtifactStore(args.artifacts_dir) if args.incremental else None,
+        )
+        
+        with open(output_path, "w", encoding="utf-8") as output:
+            summary = batch.run(read_inputs(inputs_path), output)
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+        
+    print(f"\nBatch results written to {output_path}")
+    print(f"  Inputs: {summary['inputs']} ({summary['succeeded']} succeeded, {summary['failed']} failed)")
+    print(f"  Wall time: {summary['seconds']:.1f}s")
+    print(f"  Throughput: {summary['throughput_per_minute']:.1f} inputs/minute")
+    print(
+        f"  Latency: p50 {summary['latency_p50']:.1f}s, p95 {summary['latency_p95']:.1f}s, "
+        f"max {summary['latency_max']:.1f}s"
+    )
+    _print_generation_stats()
+    
+    return 0 if summary["failed"] == 0 else 1
+
+
+def _rate_str(rate):
+    """Format a tokens-per-second rate that may be missing."""
+    return f"{rate:.1f} tok/s" if rate is not None else "n/a"
+
+
+def _print_generation_stats():
+    """Print the server-side token and timing totals per model, agent and prompt prefix."""
+    for name, stats in generation_stats("model").items():
+        print(
+            f"  Model {name}: {stats['calls']} calls ({stats['cached_calls']} cached), "
+            f"prefill {stats['prompt_tokens']} tokens at {_rate_str(stats['prefill_tokens_per_second'])}, "
+            f"decode {stats['completion_tokens']} tokens at {_rate_str(stats['tokens_per_second'])}, "
+            f"load {stats['load_seconds']:.1f}s ({stats['load_share']:.0%} of server time)"
+        )
+    prefixes = prefix_stats()
+    for name, stats in generation_stats("agent").items():
+        print(
+            f"  Agent {name}: {stats['calls']} calls, {stats['prompt_tokens']} prompt and "
+            f"{stats['completion_tokens']} generated tokens, {stats['total_seconds']:.1f}s on the server"
+        )
+        for prefix_hash, prefix in prefixes.get(name, {}).items():
+            print(
+                f"    Prompt prefix {prefix_hash}: {prefix['calls']} calls, "
+                f"{prefix['likely_cache_hits']} likely KV cache hits, "
+                f"{prefix['prompt_eval_count']} of ~{prefix['estimated_prompt_tokens']} prompt tokens evaluated"
+            )
+
+
+def _project_directory_str(context):
+    """Get the output directory of a run as a string, if any."""
+    project_dir = context.project_directory
+    return str(project_dir) if project_dir is not None else None
+
+
+def _export_trace(tracer, path):
+    """Write a run's trace as Chrome trace-event JSON and as OTLP JSON."""
+    chrome_path = Path(path)
+    otlp_path = chrome_path.with_name(f"{chrome_path.stem}.otlp.json")
+    tracer.export_chrome_trace(chrome_path)
+    tracer.export_otlp(otlp_path)
+    print(f"Trace written to {chrome_path} (OTLP: {otlp_path})")
 
 
 def main():
     """Run the MiMi framework with command line arguments."""
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        return batch_main(sys.argv[2:])
+        
     args = parse_args()
     
     # Setup logging
@@ -51,15 +273,59 @@ def main():
         log_file=args.log_file,
     )
     
+    if args.model_concurrency is not None:
+        configure_admission(max_concurrency=args.model_concurrency)
+    if args.fsync != "never":
+        configure_output_sink(fsync=args.fsync)
+        
     try:
         # Load the project
         project = Project.from_config(args.config)
         
+        # Start a new checkpointed run or pick up an earlier one
+        if args.resume:
+            checkpoint = CheckpointStore.open(args.resume, runs_dir=args.runs_dir)
+            if checkpoint.metadata.get("project") != project.name:
+                raise ValueError(
+                    f"Run '{args.resume}' belongs to project '{checkpoint.metadata.get('project')}', "
+                    f"not '{project.name}'"
+                )
+            input_data = checkpoint.input_data
+        else:
+            input_data = {"input": args.input}
+            checkpoint = CheckpointStore.create(project.name, input_data, runs_dir=args.runs_dir)
+        print(f"Run ID: {checkpoint.run_id}")
+        
+        # A resumed run keeps writing to the output directory of the first attempt
+        tracer = Tracer() if args.trace else None
+        context = RunContext(
+            run_id=checkpoint.run_id,
+            project_directory=checkpoint.metadata.get("project_directory"),
+            tracer=tracer,
+        )
+        
         # Create a runner
-        runner = ProjectRunner(project)
+        artifacts = ArtifactStore(args.artifacts_dir) if args.incremental else None
+        runner = ProjectRunner(
+            project,
+            max_workers=args.max_workers,
+            checkpoint=checkpoint,
+            artifacts=artifacts,
+            context=context,
+        )
         
-        # Run the project
-        result = runner.run({"input": args.input})
+        # Run the project, recording where output files went so a resumed run
+        # keeps writing to the same directory
+        try:
+            result = runner.run(input_data)
+        except Exception:
+            checkpoint.update(status="failed", project_directory=_project_directory_str(context))
+            print(f"Resume with: --resume {checkpoint.run_id}", file=sys.stderr)
+            raise
+        finally:
+            if tracer is not None:
+                _export_trace(tracer, args.trace)
+        checkpoint.update(status="completed", project_directory=_project_directory_str(context))
         
         # Print the result
         print("\nResults:")
@@ -94,7 +360,17 @@ def main():
             for name, stats in agent_stats.items():
                 print(f"  - {name} ({stats['role']}): {stats['model']}")
             
-            print(f"  Tasks completed: {len(project.get_execution_order())}")
+            print(f"  Tasks completed: {len(project.tasks)}")
+            if artifacts is not None:
+                print(f"  Tasks reused from artifact cache: {artifacts.hits}")
+            if runner.scheduler is not None:
+                print(f"  Model switches: {runner.scheduler.switches}")
+            for name, stats in admission_stats().items():
+                print(
+                    f"  Queueing for {name}: peak depth {stats['max_queue_depth']}, "
+                    f"max wait {stats['max_wait']:.1f}s"
+                )
+            _print_generation_stats()
             print(f"  Workflow completed successfully!")
         else:
             print(f"  Final result: {result}")
@@ -1,5 +1,9 @@
 """Agent implementation for MiMi."""
 
+import abc
+import asyncio
+import contextlib
+import contextvars
 import sys
 from pathlib import Path
 
@@ -8,13 +12,57 @@ vendor_path = Path(__file__).parent.parent / "vendor"
 if vendor_path.exists() and str(vendor_path) not in sys.path:
     sys.path.append(str(vendor_path))
 
-from typing import Any, Dict, List, Optional, Union, Callable
+from typing import Any, Coroutine, Dict, List, Optional, Union, Callable
 
 from pydantic import BaseModel, Field, ConfigDict
 
-from mimi.models.ollama import OllamaClient, get_ollama_client
+from mimi.models.cache import DEFAULT_CACHE_DIR, ResponseCache, get_response_cache
+from mimi.models.metrics import prompt_prefix
+from mimi.models.ollama import (
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_SIZE,
+    OllamaClient,
+    get_async_ollama_client,
+    get_ollama_client,
+)
 from mimi.utils.logger import agent_log, logger
 from mimi.utils.output_manager import create_or_update_agent_log
+from mimi.utils.prompts import PromptPrefix
+
+# Set while run_blocking() drives a coroutine, so model calls made inside it
+# use the blocking client instead of awaiting the event loop
+_blocking_mode: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "mimi_blocking_mode", default=False
+)
+
+
+def run_blocking(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run an agent coroutine to completion on the calling thread.
+    
+    Agent coroutines only suspend inside :meth:`Agent._generate`, which calls
+    the blocking model client while this function is active. That lets the
+    same ``aexecute`` implementation serve both ``execute`` and async callers,
+    without needing an event loop here.
+    
+    Args:
+        coro: The coroutine to run.
+        
+    Returns:
+        The coroutine's return value.
+        
+    Raises:
+        RuntimeError: If the coroutine awaits something that actually suspends.
+    """
+    token = _blocking_mode.set(True)
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        _blocking_mode.reset(token)
+        
+    coro.close()
+    raise RuntimeError("Agent coroutine suspended while running in blocking mode")
 
 
 class Agent(BaseModel):
@@ -38,8 +86,9 @@ class Agent(BaseModel):
         None, description="System prompt for the agent"
     )
 
-    # Model client (populated at runtime)
+    # Model clients (populated at runtime)
     _model_client: Optional[Any] = None
+    _async_model_client: Optional[Any] = None
 
     # Pydantic v2 configuration
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -53,6 +102,10 @@ class Agent(BaseModel):
             base_url = self.model_settings.get("base_url", "http://localhost:11434")
             temperature = self.model_settings.get("temperature", 0.7)
             stream = self.model_settings.get("stream", False)
+            pool_size = self.model_settings.get("pool_size", DEFAULT_POOL_SIZE)
+            max_retries = self.model_settings.get("max_retries", DEFAULT_MAX_RETRIES)
+            seed = self.model_settings.get("seed")
+            cache_nondeterministic = self.model_settings.get("cache_nondeterministic", False)
             
             # Pass suppress_log=True to prevent separate logging in the client
             self._model_client = get_ollama_client(
@@ -60,7 +113,16 @@ class Agent(BaseModel):
                 base_url=base_url,
                 temperature=temperature,
                 suppress_log=True,  # Add parameter to suppress separate logging
-                stream=stream
+                stream=stream,
+                pool_size=pool_size,
+                max_retries=max_retries,
+                seed=seed,
+                num_ctx=self.model_settings.get("num_ctx"),
+                cache=self._get_response_cache(),
+                cache_nondeterministic=cache_nondeterministic,
+                max_concurrency=self.model_settings.get("max_concurrency"),
+                max_queue=self.model_settings.get("max_queue"),
+                queue_timeout=self.model_settings.get("queue_timeout"),
             )
             
             # Combined log message for both agent and model initialization
@@ -82,6 +144,85 @@ class Agent(BaseModel):
             self.initialize()
             
         return self._model_client
+        
+    def get_async_model_client(self) -> Any:
+        """Get the non-blocking model client, creating it if needed.
+        
+        Returns:
+            The async model client.
+        """
+        if self._async_model_client is None:
+            if self.model_provider.lower() != "ollama":
+                raise ValueError(f"Unsupported model provider: {self.model_provider}")
+                
+            self._async_model_client = get_async_ollama_client(
+                model_name=self.model_name,
+                base_url=self.model_settings.get("base_url", "http://localhost:11434"),
+                temperature=self.model_settings.get("temperature", 0.7),
+                suppress_log=True,
+                stream=self.model_settings.get("stream", False),
+                pool_size=self.model_settings.get("pool_size", DEFAULT_POOL_SIZE),
+                max_retries=self.model_settings.get("max_retries", DEFAULT_MAX_RETRIES),
+                seed=self.model_settings.get("seed"),
+                num_ctx=self.model_settings.get("num_ctx"),
+                cache=self._get_response_cache(),
+                cache_nondeterministic=self.model_settings.get("cache_nondeterministic", False),
+                max_concurrency=self.model_settings.get("max_concurrency"),
+                max_queue=self.model_settings.get("max_queue"),
+                queue_timeout=self.model_settings.get("queue_timeout"),
+            )
+            
+        return self._async_model_client
+        
+    def _get_response_cache(self) -> Optional[ResponseCache]:
+        """Get the response cache configured in ``model_settings``, if enabled.
+        
+        Returns:
+            The shared response cache, or None if caching is disabled.
+        """
+        if not self.model_settings.get("cache", False):
+            return None
+            
+        max_mb = self.model_settings.get("cache_max_mb", 512)
+        return get_response_cache(
+            directory=self.model_settings.get("cache_dir", DEFAULT_CACHE_DIR),
+            max_bytes=int(max_mb * 1024 * 1024),
+            ttl=self.model_settings.get("cache_ttl"),
+        )
+        
+    async def _generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        prefix: Optional[PromptPrefix] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Generate a model response from inside an agent coroutine.
+        
+        Uses the blocking client when the coroutine is driven by
+        :func:`run_blocking` and the async client when awaited on an event loop.
+        
+        Args:
+            prompt: The user prompt.
+            system_prompt: Optional system prompt.
+            prefix: Static prefix of a prompt rendered from a template; the
+                call is added to its totals in ``prefix_stats()``.
+            on_token: Optional callable that receives the response while it
+                is generated, e.g. to save code blocks as they are closed.
+                
+        Returns:
+            The generated text.
+        """
+        options = {"on_token": on_token} if on_token is not None else {}
+        with (
+            prompt_prefix(prefix.hash, prefix.tokens, prefix.prompt_tokens)
+            if prefix is not None else contextlib.nullcontext()
+        ):
+            if _blocking_mode.get():
+                return self.get_model_client().generate(prompt, system_prompt=system_prompt, **options)
+                
+            client = self.get_async_model_client()
+            return await client.generate(prompt, system_prompt=system_prompt, **options)
 
     def log_to_agent_file(
         self, 
@@ -102,91 +243,30 @@ class Agent(BaseModel):
             output_summary: The output from the agent (any type).
             details: Optional additional details about the action.
             log_format: Format for logging - "markdown" or "json"
-            async_log: Whether to perform logging asynchronously (requires asyncio)
+            async_log: Kept for compatibility; entries are always written by
+                the background log writer, so logging never waits for the disk.
         """
         try:
-            if async_log:
-                # Import here to avoid circular imports
-                import asyncio
-                
-                # Define async logging function
-                async def _async_log():
-                    try:
-                        # Include agent role and other metadata in details
-                        full_details = details.copy() if details else {}
-                        full_details.update({
-                            "agent_role": self.role,
-                            "model_name": self.model_name,
-                            "model_provider": self.model_provider
-                        })
-                        
-                        # Import here to avoid circular imports
-                        from mimi.utils.output_manager import create_or_update_agent_log
-                        
-                        create_or_update_agent_log(
-                            project_dir=project_dir,
-                            agent_name=self.name,
-                            action_type=action_type,
-                            input_summary=input_summary,
-                            output_summary=output_summary,
-                            details=full_details,
-                            log_format=log_format
-                        )
-                    except Exception as e:
-                        # Don't let logging errors interrupt the agent
-                        from mimi.utils.logger import logger
-                        logger.error(f"Error in async agent logging: {str(e)}")
-                
-                # Schedule the async task
-                if asyncio.iscoroutinefunction(asyncio.get_event_loop):
-                    # Python 3.10+
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            asyncio.create_task(_async_log())
-                        else:
-                            loop.run_until_complete(_async_log())
-                    except RuntimeError:
-                        # Fallback if no event loop
-                        asyncio.run(_async_log())
-                else:
-                    # Python 3.7-3.9
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            asyncio.ensure_future(_async_log())
-                        else:
-                            loop.run_until_complete(_async_log())
-                    except RuntimeError:
-                        # Fallback if no event loop
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        loop.run_until_complete(_async_log())
-            else:
-                # Synchronous logging
-                # Include agent role and other metadata in details
-                full_details = details.copy() if details else {}
-                full_details.update({
-                    "agent_role": self.role,
-                    "model_name": self.model_name,
-                    "model_provider": self.model_provider
-                })
-                
-                # Log to the agent log file
-                from mimi.utils.output_manager import create_or_update_agent_log
-                
-                create_or_update_agent_log(
-                    project_dir=project_dir,
-                    agent_name=self.name,
-                    action_type=action_type,
-                    input_summary=input_summary,
-                    output_summary=output_summary,
-                    details=full_details,
-                    log_format=log_format
-                )
+            # Include agent role and other metadata in details
+            full_details = details.copy() if details else {}
+            full_details.update({
+                "agent_role": self.role,
+                "model_name": self.model_name,
+                "model_provider": self.model_provider
+            })
+            
+            # Queue the entry for the agent log file
+            create_or_update_agent_log(
+                project_dir=project_dir,
+                agent_name=self.name,
+                action_type=action_type,
+                input_summary=input_summary,
+                output_summary=output_summary,
+                details=full_details,
+                log_format=log_format
+            )
         except Exception as e:
             # Don't let logging errors interrupt the agent
-            from mimi.utils.logger import logger
             logger.error(f"Error logging to agent log file: {str(e)}")
 
     def execute(self, task_input: Any) -> Any:
@@ -200,7 +280,7 @@ class Agent(BaseModel):
         Returns:
             The output from the agent.
         """
-        agent_log(self.name, "execute", f"Executing task with input: {task_input}")
+        agent_log(self.name, "execute", "Executing task with input: {}", task_input)
         
         try:
             # Placeholder for actual agent behavior
@@ -221,7 +301,7 @@ class Agent(BaseModel):
                     details={"agent_role": self.role}
                 )
             
-            agent_log(self.name, "execute", f"Execution completed with result: {result}")
+            agent_log(self.name, "execute", "Execution completed with result: {}", result)
             return result
             
         except Exception as e:
@@ -252,12 +332,27 @@ class Agent(BaseModel):
                         }
                     )
                 
-                agent_log(self.name, "execute", f"Recovered from error, completed with result: {recovered_result}")
+                agent_log(self.name, "execute", "Recovered from error, completed with result: {}", recovered_result)
                 return recovered_result
             
             # If no recovery is possible, re-raise the exception with more context
             raise RuntimeError(f"Agent '{self.name}' with role '{self.role}' failed: {error_message}") from e
 
+    async def aexecute(self, task_input: Any) -> Any:
+        """Execute a task with the given input from a coroutine.
+        
+        The default runs :meth:`execute` in a worker thread so agents that only
+        implement the synchronous API still work under an async runner. Agents
+        that call models should subclass :class:`ModelAgent` instead.
+        
+        Args:
+            task_input: The input to the agent.
+            
+        Returns:
+            The output from the agent.
+        """
+        return await asyncio.to_thread(self.execute, task_input)
+        
     def _attempt_error_recovery(self, error: Exception, task_input: Any) -> Optional[Any]:
         """Attempt to recover from common errors.
         
@@ -369,6 +464,38 @@ class Agent(BaseModel):
         return agent
 
 
+class ModelAgent(Agent):
+    """Base class for agents whose work is driven by model calls.
+
+    Subclasses implement :meth:`aexecute` and request generations through
+    :meth:`Agent._generate`. :meth:`execute` runs the same code synchronously.
+    Only the model calls are awaited; the file and manifest I/O an agent does
+    between them still runs on the event loop's thread.
+    """
+
+    def execute(self, task_input: Any) -> Any:
+        """Execute a task with the given input, blocking until it completes.
+        
+        Args:
+            task_input: The input to the agent.
+            
+        Returns:
+            The output from the agent.
+        """
+        return run_blocking(self.aexecute(task_input))
+        
+    @abc.abstractmethod
+    async def aexecute(self, task_input: Any) -> Any:
+        """Execute a task with the given input.
+        
+        Args:
+            task_input: The input to the agent.
+            
+        Returns:
+            The output from the agent.
+        """
+
+
 class NumberAdderAgent(Agent):
     """Agent that adds a specific number to the input."""
     
@@ -387,7 +514,10 @@ class NumberAdderAgent(Agent):
         agent_log(
             self.name, 
             "execute", 
-            f"Adding {self.number_to_add} to input {self.repetitions} times: {str(task_input)}",
+            "Adding {} to input {} times: {}",
+            self.number_to_add,
+            self.repetitions,
+            task_input,
         )
         
         try:
@@ -421,7 +551,11 @@ class NumberAdderAgent(Agent):
             agent_log(
                 self.name,
                 "execute",
-                f"Successfully added {self.number_to_add} to {input_value} {self.repetitions} times, result: {result}",
+                "Successfully added {} to {} {} times, result: {}",
+                self.number_to_add,
+                input_value,
+                self.repetitions,
+                result,
             )
             
             # Return result with calculation steps for verification
@@ -454,7 +588,8 @@ class AnalystAgent(Agent):
         agent_log(
             self.name,
             "execute",
-            f"Analyzing addition: {str(task_input)}",
+            "Analyzing addition: {}",
+            task_input,
         )
         
         try:
@@ -663,7 +798,8 @@ class FeedbackProcessorAgent(Agent):
         agent_log(
             self.name,
             "execute",
-            f"Processing verification results: {str(task_input)}",
+            "Processing verification results: {}",
+            task_input,
         )
         
         try:
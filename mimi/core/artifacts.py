@@ -0,0 +1,258 @@
+"""Fingerprints and artifact cache for incremental project runs in MiMi."""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from mimi.core.context import current_run_context
+from mimi.models.metrics import generation_labels
+from mimi.utils.logger import logger, task_log
+from mimi.utils.output_manager import write_output_file
+
+# Default directory of the artifact cache
+DEFAULT_ARTIFACTS_DIR = Path(".mimi") / "artifacts"
+
+# Model settings that change how a model is reached, not what it produces
+_TRANSPORT_SETTINGS = {
+    "base_url",
+    "stream",
+    "pool_size",
+    "max_retries",
+    "cache",
+    "cache_dir",
+    "cache_max_mb",
+    "cache_ttl",
+    "cache_nondeterministic",
+    "max_concurrency",
+    "max_queue",
+    "queue_timeout",
+}
+
+
+def _digest(data: Any) -> str:
+    """Hash JSON-serializable data in a canonical form."""
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def agent_fingerprint(agent: Any) -> str:
+    """Fingerprint the configuration of an agent that affects its output.
+    
+    Covers the agent type, model, system prompt and every other configured
+    field, including fields added by subclasses. The agent's name and model
+    settings that only affect transport, such as ``base_url`` or caching, are
+    left out.
+    
+    Args:
+        agent: The agent.
+        
+    Returns:
+        A hex SHA-256 digest.
+    """
+    config = agent.model_dump(exclude={"name"})
+    config["model_settings"] = {
+        key: value
+        for key, value in config.get("model_settings", {}).items()
+        if key not in _TRANSPORT_SETTINGS
+    }
+    config["type"] = f"{type(agent).__module__}.{type(agent).__qualname__}"
+    return _digest(config)
+
+
+def task_fingerprint(task: Any, agent: Any, task_input: Any, upstream: List[str]) -> str:
+    """Fingerprint a task execution.
+    
+    Args:
+        task: The task.
+        agent: The agent that executes the task.
+        task_input: The input the agent receives, after ``input_key`` extraction.
+        upstream: Fingerprints of the task's dependencies.
+        
+    Returns:
+        A hex SHA-256 digest.
+    """
+    return _digest(
+        {
+            "task": {
+                "name": task.name,
+                "agent": task.agent,
+                "input_key": task.input_key,
+                "output_key": task.output_key,
+            },
+            "agent": agent_fingerprint(agent),
+            "input": task_input,
+            "upstream": upstream,
+        }
+    )
+
+
+class ArtifactStore:
+    """Content-addressed store of agent results, keyed by task fingerprint."""
+
+    def __init__(self, directory: Union[str, Path] = DEFAULT_ARTIFACTS_DIR) -> None:
+        """Initialize the store.
+        
+        Args:
+            directory: Directory holding the artifacts.
+        """
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Look up the artifact stored for a fingerprint.
+        
+        Args:
+            fingerprint: The task fingerprint.
+            
+        Returns:
+            The artifact, with the agent's ``result``, the ``files`` the task
+            wrote and the ``project_title`` of the run that wrote them, or
+            None if nothing is stored.
+        """
+        record = None
+        try:
+            with open(self._path(fingerprint), "r", encoding="utf-8") as f:
+                record = json.load(f)
+            if not isinstance(record, dict) or "result" not in record:
+                raise ValueError("no stored result")
+        except FileNotFoundError:
+            record = None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable artifact {fingerprint}: {str(e)}")
+            record = None
+            
+        with self._lock:
+            if record is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                
+        return record
+        
+    def put(
+        self,
+        fingerprint: str,
+        task_name: str,
+        result: Any,
+        files: Optional[List[Dict[str, Any]]] = None,
+        project_title: Optional[str] = None,
+    ) -> None:
+        """Store the result of a task execution.
+        
+        Args:
+            fingerprint: The task fingerprint.
+            task_name: Name of the task, stored for inspection.
+            result: The agent's result.
+            files: Files the task wrote, as collected by
+                :func:`~mimi.utils.manifest.capture_files`.
+            project_title: Title the run's project directory was created with.
+        """
+        path = self._path(fingerprint)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "task": task_name,
+            "created": datetime.now().isoformat(),
+            "result": result,
+            "files": files or [],
+            "project_title": project_title,
+        }
+        
+        # Write to a temporary file first so readers never see a partial artifact
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, default=str)
+        os.replace(tmp_path, path)
+        
+    def _path(self, fingerprint: str) -> Path:
+        """Get the file holding an artifact."""
+        return self.directory / fingerprint[:2] / f"{fingerprint}.json"
+
+
+class IncrementalCache:
+    """Per-run view of an :class:`ArtifactStore`.
+
+    Tracks the fingerprint of every task in the run, so each task's
+    fingerprint can include those of its dependencies. A change to one task's
+    input or agent configuration therefore misses the cache for that task and
+    for everything downstream of it, while all other tasks reuse their stored
+    results.
+    """
+
+    def __init__(self, store: ArtifactStore) -> None:
+        """Initialize the cache for one run.
+        
+        Args:
+            store: The artifact store to read from and write to.
+        """
+        self.store = store
+        self.fingerprints: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        
+    def lookup(self, task: Any, agent: Any, task_input: Any) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Fingerprint a task execution and look up its stored artifact.
+        
+        Args:
+            task: The task.
+            agent: The agent that executes the task.
+            task_input: The input the agent receives.
+            
+        Returns:
+            The fingerprint, and the artifact or None.
+        """
+        with self._lock:
+            upstream = [self.fingerprints.get(dep, "") for dep in sorted(task.depends_on)]
+            
+        fingerprint = task_fingerprint(task, agent, task_input, upstream)
+        with self._lock:
+            self.fingerprints[task.name] = fingerprint
+            
+        artifact = self.store.get(fingerprint)
+        if artifact is not None:
+            task_log(
+                task.name,
+                "completed",
+                f"Reusing stored result for unchanged inputs ({fingerprint[:12]})",
+            )
+        return fingerprint, artifact
+        
+    def restore(self, task: Any, agent: Any, artifact: Dict[str, Any]) -> Any:
+        """Write a reused task's files into the current run's project directory.
+        
+        Later tasks find the files in the project's manifest and on disk just
+        as if the agent had run.
+        
+        Args:
+            task: The task.
+            agent: The agent that executes the task.
+            artifact: The artifact returned by :meth:`lookup`.
+            
+        Returns:
+            The stored result of the agent.
+        """
+        files = artifact.get("files") or []
+        if files:
+            context = current_run_context()
+            project_dir = context.get_project_directory(artifact.get("project_title") or task.name)
+            with generation_labels(agent=getattr(agent, "name", None), task=task.name):
+                for file in files:
+                    write_output_file(project_dir / file["path"], file["content"], project_dir, file.get("component"))
+            task_log(task.name, "processing", f"Restored {len(files)} stored files in {project_dir}")
+        return artifact["result"]
+        
+    def record(self, task: Any, fingerprint: str, result: Any, files: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Store the result of a task that was executed.
+        
+        Args:
+            task: The task.
+            fingerprint: The fingerprint returned by :meth:`lookup`.
+            result: The agent's result.
+            files: Files the task wrote while the agent ran.
+        """
+        project_title = current_run_context().project_title if files else None
+        self.store.put(fingerprint, task.name, result, files=files, project_title=project_title)
@@ -0,0 +1,176 @@
+"""Batch execution of a project over many inputs in MiMi."""
+
+import json
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple, Union
+
+from mimi.core.artifacts import ArtifactStore
+from mimi.core.project import Project
+from mimi.core.runner import ProjectRunner
+from mimi.utils.logger import logger, project_log
+
+
+def read_inputs(path: Union[str, Path]) -> Iterator[Tuple[int, Any, Dict[str, Any]]]:
+    """Read project inputs from a JSONL file, one line at a time.
+    
+    Each non-empty line holds one input. A JSON object is used as the
+    project's input data as is, and an optional ``"id"`` key in it labels the
+    input in the output. Any other JSON value, or a line that isn't valid
+    JSON, is passed as ``{"input": value}``.
+    
+    Args:
+        path: Path to the JSONL file.
+        
+    Yields:
+        Tuples of the line's index among the inputs, its id, and the input data.
+    """
+    index = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                value = json.loads(line)
+            except json.JSONDecodeError:
+                value = line
+                
+            if isinstance(value, dict):
+                input_data = {key: item for key, item in value.items() if key != "id"}
+                input_id = value.get("id", index)
+            else:
+                input_data = {"input": value}
+                input_id = index
+            yield index, input_id, input_data
+            index += 1
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Get a percentile of a sorted list by the nearest-rank method."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+class BatchRunner:
+    """Runs one project over many inputs concurrently.
+
+    The project is built once and shared. Every input gets its own
+    :class:`ProjectRunner`, so runs don't share any data with each other.
+    Results are written to a JSONL file as soon as each run finishes, in
+    completion order; each record carries the input's index and id. A
+    failing input is recorded as an error and does not stop the batch.
+    """
+
+    def __init__(
+        self,
+        project: Project,
+        concurrency: int = 4,
+        max_workers: int = 1,
+        artifacts: Optional[ArtifactStore] = None,
+    ) -> None:
+        """Initialize the batch runner.
+        
+        Args:
+            project: The project to run for every input.
+            concurrency: Number of inputs to run at the same time.
+            max_workers: Worker count of each project run, as for ProjectRunner.
+            artifacts: Optional artifact store shared by all runs, as for
+                ProjectRunner.
+        """
+        self.project = project
+        self.concurrency = max(1, int(concurrency))
+        self.max_workers = max_workers
+        self.artifacts = artifacts
+        
+    def run(self, inputs: Iterator[Tuple[int, Any, Dict[str, Any]]], output: TextIO) -> Dict[str, Any]:
+        """Run the project for every input and stream the results.
+        
+        At most ``concurrency`` inputs are read ahead, so the input file may
+        be much larger than memory.
+        
+        Args:
+            inputs: Tuples of index, id and input data, as from :func:`read_inputs`.
+            output: Text stream that receives one JSON record per input.
+            
+        Returns:
+            Summary of the batch: counts, wall time, throughput and latency
+            percentiles in seconds.
+        """
+        project_log(
+            self.project.name,
+            "started",
+            f"Running batch with concurrency {self.concurrency}",
+        )
+        started = time.perf_counter()
+        latencies: List[float] = []
+        succeeded = failed = 0
+        
+        pending = iter(inputs)
+        in_flight: Set[Future] = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="mimi-batch") as pool:
+            exhausted = False
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < self.concurrency:
+                    item = next(pending, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    in_flight.add(pool.submit(self._run_one, *item))
+                    
+                if not in_flight:
+                    break
+                    
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.remove(future)
+                    record = future.result()
+                    latencies.append(record["seconds"])
+                    if record["status"] == "completed":
+                        succeeded += 1
+                    else:
+                        failed += 1
+                    self._write(output, record)
+                    
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        summary = {
+            "inputs": succeeded + failed,
+            "succeeded": succeeded,
+            "failed": failed,
+            "seconds": elapsed,
+            "throughput_per_minute": (succeeded + failed) * 60 / elapsed if elapsed > 0 else 0.0,
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p95": _percentile(latencies, 0.95),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+        project_log(
+            self.project.name,
+            "completed",
+            f"Batch completed: {succeeded} succeeded, {failed} failed in {elapsed:.1f}s",
+            data=summary,
+        )
+        return summary
+        
+    def _run_one(self, index: int, input_id: Any, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the project for one input and build its output record."""
+        started = time.perf_counter()
+        record: Dict[str, Any] = {"index": index, "id": input_id}
+        try:
+            runner = ProjectRunner(self.project, max_workers=self.max_workers, artifacts=self.artifacts)
+            record["result"] = runner.run(input_data)
+            record["status"] = "completed"
+        except Exception as e:
+            logger.error(f"Batch input {input_id} failed: {str(e)}")
+            record["status"] = "failed"
+            record["error"] = f"{type(e).__name__}: {str(e)}"
+        record["seconds"] = time.perf_counter() - started
+        return record
+        
+    def _write(self, output: TextIO, record: Dict[str, Any]) -> None:
+        """Append a record to the output and flush it."""
+        output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        output.flush()
@@ -0,0 +1,126 @@
+"""Copy-on-write shared data store for MiMi project runs."""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+# Number of layers after which a write flattens the chain, bounding lookup cost
+MAX_DEPTH = 16
+
+
+class Blackboard(Mapping):
+    """Immutable, versioned mapping of project data.
+
+    Writing a key returns a new blackboard that adds a single layer on top of
+    the current one instead of copying every entry, so a task that stores its
+    result only pays for its own key. Existing blackboards never change, which
+    gives every reader a consistent snapshot and lets parallel branches write
+    independently of each other. Lookups walk the layers; once a chain reaches
+    ``MAX_DEPTH`` layers the next write flattens it into a single root.
+    """
+
+    __slots__ = ("_writes", "_parent", "_depth", "_version")
+
+    def __init__(self, data: Optional[Mapping] = None) -> None:
+        """Create a root blackboard.
+        
+        Args:
+            data: Optional initial entries.
+        """
+        self._writes: Dict[str, Any] = dict(data) if data is not None else {}
+        self._parent: Optional["Blackboard"] = None
+        self._depth = 0
+        self._version = 0
+        
+    @classmethod
+    def wrap(cls, data: Mapping) -> "Blackboard":
+        """Get a blackboard holding ``data``, reusing it if it already is one.
+        
+        Args:
+            data: A mapping or blackboard.
+            
+        Returns:
+            The blackboard.
+        """
+        return data if isinstance(data, Blackboard) else cls(data)
+        
+    @property
+    def version(self) -> int:
+        """Number of writes since the root blackboard was created."""
+        return self._version
+        
+    def set(self, key: str, value: Any) -> "Blackboard":
+        """Return a new blackboard with ``key`` set to ``value``.
+        
+        Args:
+            key: The key to write.
+            value: The value to store.
+            
+        Returns:
+            The new blackboard; this one is left unchanged.
+        """
+        return self.update({key: value})
+        
+    def update(self, entries: Mapping) -> "Blackboard":
+        """Return a new blackboard with several keys written at once.
+        
+        Args:
+            entries: The entries to write.
+            
+        Returns:
+            The new blackboard; this one is left unchanged.
+        """
+        if self._depth + 1 >= MAX_DEPTH:
+            child = Blackboard(self.to_dict())
+            child._writes.update(entries)
+        else:
+            child = Blackboard.__new__(Blackboard)
+            child._writes = dict(entries)
+            child._parent = self
+            child._depth = self._depth + 1
+        child._version = self._version + 1
+        return child
+        
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the entries as a new plain dict.
+        
+        Keys keep the order a dict would give them if every write had been
+        applied to a single dict.
+        
+        Returns:
+            A dict that the caller may modify freely.
+        """
+        layers = []
+        node: Optional[Blackboard] = self
+        while node is not None:
+            layers.append(node._writes)
+            node = node._parent
+            
+        data: Dict[str, Any] = {}
+        for writes in reversed(layers):
+            data.update(writes)
+        return data
+        
+    def __getitem__(self, key: str) -> Any:
+        node: Optional[Blackboard] = self
+        while node is not None:
+            if key in node._writes:
+                return node._writes[key]
+            node = node._parent
+        raise KeyError(key)
+        
+    def __contains__(self, key: object) -> bool:
+        node: Optional[Blackboard] = self
+        while node is not None:
+            if key in node._writes:
+                return True
+            node = node._parent
+        return False
+        
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+        
+    def __len__(self) -> int:
+        return len(self.to_dict())
+        
+    def __repr__(self) -> str:
+        return f"Blackboard({self.to_dict()!r})"
@@ -0,0 +1,224 @@
+"""Checkpointing of project runs for MiMi."""
+
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from urllib.parse import quote
+
+from mimi.utils.logger import logger, project_log
+
+# Default directory holding one subdirectory per run
+DEFAULT_RUNS_DIR = Path(".mimi") / "runs"
+
+
+class CheckpointError(Exception):
+    """Exception raised when a run cannot be checkpointed or resumed."""
+
+    pass
+
+
+class CheckpointStore:
+    """Persistent store of the task outputs of a single project run.
+
+    Each run lives in ``<runs_dir>/<run_id>/``. ``run.json`` holds the run
+    metadata, including the project input, and every completed task's output
+    is written to ``tasks/<task_name>.json`` as soon as the task finishes, so
+    a failed run can be resumed without repeating finished work.
+    """
+
+    def __init__(self, run_dir: Union[str, Path], metadata: Dict[str, Any]) -> None:
+        """Initialize the store for an existing run directory.
+        
+        Use :meth:`create` or :meth:`open` instead of calling this directly.
+        
+        Args:
+            run_dir: Directory of the run.
+            metadata: The run metadata.
+        """
+        self.run_dir = Path(run_dir)
+        self.metadata = metadata
+        self._lock = threading.Lock()
+        
+    @property
+    def run_id(self) -> str:
+        """The identifier of the run."""
+        return self.metadata["run_id"]
+        
+    @property
+    def input_data(self) -> Any:
+        """The input the run was started with."""
+        return self.metadata.get("input")
+        
+    @classmethod
+    def create(
+        cls,
+        project_name: str,
+        input_data: Any,
+        runs_dir: Union[str, Path] = DEFAULT_RUNS_DIR,
+        run_id: Optional[str] = None,
+    ) -> "CheckpointStore":
+        """Start a new run.
+        
+        Args:
+            project_name: Name of the project being run.
+            input_data: Input data for the project.
+            runs_dir: Directory holding all runs.
+            run_id: Optional identifier; generated from the time if omitted.
+            
+        Returns:
+            The store for the new run.
+            
+        Raises:
+            CheckpointError: If a run with the same identifier already exists.
+        """
+        if run_id is None:
+            run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+            
+        run_dir = Path(runs_dir) / run_id
+        if run_dir.exists():
+            raise CheckpointError(f"Run '{run_id}' already exists in {runs_dir}")
+            
+        (run_dir / "tasks").mkdir(parents=True)
+        store = cls(
+            run_dir,
+            {
+                "run_id": run_id,
+                "project": project_name,
+                "input": input_data,
+                "status": "running",
+                "created": datetime.now().isoformat(),
+            },
+        )
+        store._write_metadata()
+        project_log(project_name, "started", f"Checkpointing run '{run_id}' to {run_dir}")
+        return store
+        
+    @classmethod
+    def open(cls, run_id: str, runs_dir: Union[str, Path] = DEFAULT_RUNS_DIR) -> "CheckpointStore":
+        """Open an existing run to resume it.
+        
+        Args:
+            run_id: Identifier of the run.
+            runs_dir: Directory holding all runs.
+            
+        Returns:
+            The store for the run.
+            
+        Raises:
+            CheckpointError: If the run does not exist or cannot be read.
+        """
+        run_dir = Path(runs_dir) / run_id
+        try:
+            with open(run_dir / "run.json", "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+        except FileNotFoundError:
+            raise CheckpointError(f"Run '{run_id}' not found in {runs_dir}") from None
+        except (OSError, ValueError) as e:
+            raise CheckpointError(f"Could not read run '{run_id}': {str(e)}") from e
+            
+        return cls(run_dir, metadata)
+        
+    def load_outputs(self) -> Dict[str, Any]:
+        """Load the outputs of every task completed so far.
+        
+        A task checkpointed with its ``output_key`` is returned as a dict
+        holding only that key, which the runner merges into the project data.
+        
+        Returns:
+            Mapping of task name to task output.
+        """
+        outputs: Dict[str, Any] = {}
+        for path in sorted((self.run_dir / "tasks").glob("*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+            except (OSError, ValueError) as e:
+                # A checkpoint torn by a crash just means the task runs again
+                logger.warning(f"Ignoring unreadable checkpoint {path}: {str(e)}")
+                continue
+            output_key = record.get("output_key")
+            outputs[record["task"]] = {output_key: record["output"]} if output_key else record["output"]
+            
+        return outputs
+        
+    def load_fingerprints(self) -> Dict[str, str]:
+        """Load the fingerprints recorded for completed tasks.
+        
+        Returns:
+            Mapping of task name to fingerprint, for tasks that have one.
+        """
+        fingerprints: Dict[str, str] = {}
+        for path in sorted((self.run_dir / "tasks").glob("*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if record.get("fingerprint"):
+                fingerprints[record["task"]] = record["fingerprint"]
+                
+        return fingerprints
+        
+    def save_output(
+        self,
+        task_name: str,
+        output: Any,
+        fingerprint: Optional[str] = None,
+        output_key: Optional[str] = None,
+    ) -> None:
+        """Persist the output of a completed task.
+        
+        Args:
+            task_name: Name of the task.
+            output: The task's output; with ``output_key``, only the value the
+                task stored under that key.
+            fingerprint: Optional fingerprint of the task execution, recorded
+                so incremental runs can resume.
+            output_key: The key the task stored its result under, if any.
+            
+        Raises:
+            CheckpointError: If the output cannot be stored as JSON.
+        """
+        record = {
+            "task": task_name,
+            "completed": datetime.now().isoformat(),
+            "fingerprint": fingerprint,
+            "output_key": output_key,
+            "output": output,
+        }
+        with self._lock:
+            self._write_json(self.run_dir / "tasks" / f"{quote(task_name, safe='')}.json", record, indent=None)
+            
+    def update(self, **fields: Any) -> None:
+        """Update the run metadata.
+        
+        Args:
+            **fields: Metadata fields to set.
+        """
+        with self._lock:
+            self.metadata.update(fields)
+            self._write_metadata()
+            
+    def _write_metadata(self) -> None:
+        """Write ``run.json``."""
+        self._write_json(self.run_dir / "run.json", self.metadata)
+        
+    def _write_json(self, path: Path, data: Any, indent: Optional[int] = 2) -> None:
+        """Atomically write JSON so a crash never leaves a partial checkpoint.
+        
+        Raises:
+            CheckpointError: If the data cannot be stored as JSON.
+        """
+        try:
+            content = json.dumps(data, indent=indent)
+        except (TypeError, ValueError) as e:
+            raise CheckpointError(f"Cannot checkpoint {path.name}: {str(e)}") from e
+            
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
@@ -0,0 +1,145 @@
+"""Per-run context for MiMi project runs."""
+
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from mimi.utils.logger import logger
+from mimi.utils.output_manager import DEFAULT_OUTPUT_ROOT, create_output_directory
+from mimi.utils.tracing import Tracer
+
+# The context of the run executing in the current thread or asyncio task
+_current_context: ContextVar[Optional["RunContext"]] = ContextVar("mimi_run_context", default=None)
+
+# Context used by code that runs agents outside of any run, e.g. scripts that
+# call an agent directly
+_default_context: Optional["RunContext"] = None
+_default_lock = threading.Lock()
+
+
+class RunContext:
+    """State that belongs to a single project run.
+
+    Holds the run ID, the directory the run writes generated files to, the
+    sinks that receive the run's events, an optional tracer and a place for
+    per-run caches.
+    Runners activate the context for the duration of a run, so agents reach
+    it through :func:`current_run_context` without any module-level state,
+    and several runs can execute concurrently in one process.
+    """
+
+    def __init__(
+        self,
+        run_id: Optional[str] = None,
+        output_root: Union[str, Path] = DEFAULT_OUTPUT_ROOT,
+        project_directory: Optional[Union[str, Path]] = None,
+        sinks: Optional[List[Callable[[Dict[str, Any]], None]]] = None,
+        tracer: Optional[Tracer] = None,
+    ) -> None:
+        """Initialize the context.
+        
+        Args:
+            run_id: Identifier of the run; generated from the time if omitted.
+            output_root: Directory under which the run's output directory is
+                created.
+            project_directory: Existing output directory to keep writing to,
+                e.g. when resuming a run.
+            sinks: Callables that receive every event emitted for the run.
+            tracer: Tracer that records the run's spans while the context
+                is active.
+        """
+        if run_id is None:
+            run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.run_id = run_id
+        self.output_root = Path(output_root)
+        self.project_directory = Path(project_directory) if project_directory is not None else None
+        self.project_title: Optional[str] = None
+        self.sinks: List[Callable[[Dict[str, Any]], None]] = list(sinks or [])
+        self.tracer = tracer
+        self.caches: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        
+    def get_project_directory(self, project_title: str) -> Path:
+        """Get the run's output directory, creating it on first use.
+        
+        Args:
+            project_title: Title used to name the directory if it is created.
+            
+        Returns:
+            The path to the output directory.
+        """
+        with self._lock:
+            if self.project_directory is None:
+                self.project_directory = create_output_directory(project_title, self.output_root)
+                self.project_title = project_title
+            return self.project_directory
+            
+    def cache(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Get a per-run cache, creating it with ``factory`` on first use.
+        
+        Args:
+            name: Name of the cache.
+            factory: Callable that creates the cache.
+            
+        Returns:
+            The cache.
+        """
+        with self._lock:
+            if name not in self.caches:
+                self.caches[name] = factory()
+            return self.caches[name]
+            
+    def emit(self, event: str, **fields: Any) -> None:
+        """Send an event to the run's sinks.
+        
+        A failing sink is logged and does not affect the run.
+        
+        Args:
+            event: Name of the event.
+            **fields: Event data.
+        """
+        if not self.sinks:
+            return
+        record = {"run_id": self.run_id, "event": event, **fields}
+        for sink in self.sinks:
+            try:
+                sink(record)
+            except Exception as e:
+                logger.warning(f"Run event sink failed for {event}: {str(e)}")
+                
+    @contextmanager
+    def activate(self) -> Iterator["RunContext"]:
+        """Make this the current context, and its tracer active, inside a ``with`` block."""
+        token = _current_context.set(self)
+        try:
+            if self.tracer is not None:
+                with self.tracer.activate():
+                    yield self
+            else:
+                yield self
+        finally:
+            _current_context.reset(token)
+
+
+def current_run_context() -> RunContext:
+    """Get the context of the run executing the caller.
+    
+    Outside of a run this returns a process-wide default context, so agents
+    that are called directly keep working.
+    
+    Returns:
+        The active run context.
+    """
+    context = _current_context.get()
+    if context is not None:
+        return context
+        
+    global _default_context
+    with _default_lock:
+        if _default_context is None:
+            _default_context = RunContext()
+        return _default_context
@@ -0,0 +1,183 @@
+"""Compiled execution plans for MiMi projects."""
+
+import heapq
+from typing import Any, Dict, List, Mapping, Tuple
+
+from mimi.utils.logger import logger
+
+
+class ExecutionPlan:
+    """Dependency graph of a project's tasks, compiled once and reused.
+
+    The plan is built with Kahn's algorithm in O((V + E) log V) time and
+    without recursion, so it handles generated workflows with many thousands
+    of tasks. When several tasks are ready at once, the one declared first
+    comes first in :attr:`order`.
+
+    Attributes:
+        order: Task names in execution order.
+        position: Index of each task in :attr:`order`.
+        dependencies: Distinct dependencies of each task, in execution order.
+        dependents: Reverse adjacency; the tasks that depend on each task, in
+            execution order.
+        levels: Tasks grouped by depth; every task in a level only depends on
+            tasks in earlier levels, so a level can run in parallel.
+        level_of: Index of the level of each task.
+        critical_path: The longest chain of dependent tasks, first to last.
+    """
+
+    def __init__(
+        self,
+        order: List[str],
+        dependencies: Dict[str, Tuple[str, ...]],
+        dependents: Dict[str, List[str]],
+        level_of: Dict[str, int],
+        critical_path: List[str],
+    ) -> None:
+        """Initialize the plan. Use :meth:`compile` to build one from tasks.
+        
+        Args:
+            order: Task names in execution order.
+            dependencies: Distinct dependencies of each task.
+            dependents: Reverse adjacency.
+            level_of: Level index of each task.
+            critical_path: The longest chain of dependent tasks.
+        """
+        self.order = order
+        self.position = {name: index for index, name in enumerate(order)}
+        self.dependencies = dependencies
+        self.dependents = dependents
+        self.level_of = level_of
+        self.critical_path = critical_path
+        
+        self.levels: List[List[str]] = [[] for _ in range(max(level_of.values(), default=-1) + 1)]
+        for name in order:
+            self.levels[level_of[name]].append(name)
+            
+    @property
+    def critical_path_length(self) -> int:
+        """Number of tasks on the critical path."""
+        return len(self.critical_path)
+        
+    def ready_counts(self) -> Dict[str, int]:
+        """Get the number of dependencies each task waits for.
+        
+        Returns:
+            A new dict that a scheduler can count down as tasks complete.
+        """
+        return {name: len(self.dependencies[name]) for name in self.order}
+        
+    def ancestors(self, name: str) -> List[str]:
+        """Get every task that a task depends on, directly or transitively.
+        
+        Args:
+            name: The task name.
+            
+        Returns:
+            The upstream task names, in execution order.
+        """
+        seen = set()
+        stack = list(self.dependencies[name])
+        while stack:
+            dep = stack.pop()
+            if dep not in seen:
+                seen.add(dep)
+                stack.extend(self.dependencies[dep])
+        return sorted(seen, key=self.position.__getitem__)
+        
+    def __len__(self) -> int:
+        return len(self.order)
+        
+    @classmethod
+    def compile(cls, tasks: Mapping[str, Any]) -> "ExecutionPlan":
+        """Build the plan for a set of tasks.
+        
+        Args:
+            tasks: Mapping of task name to task; only ``depends_on`` is used.
+            
+        Returns:
+            The compiled plan.
+            
+        Raises:
+            ValueError: If a task depends on a missing task, or there is a
+                circular dependency.
+        """
+        declared = {name: index for index, name in enumerate(tasks)}
+        dependencies: Dict[str, Tuple[str, ...]] = {}
+        dependents: Dict[str, List[str]] = {name: [] for name in tasks}
+        
+        for name, task in tasks.items():
+            deps = tuple(dict.fromkeys(task.depends_on))
+            missing = [dep for dep in deps if dep not in declared]
+            if missing:
+                raise ValueError(f"Task '{name}' depends on non-existent tasks: {set(missing)}")
+            dependencies[name] = deps
+            for dep in deps:
+                dependents[dep].append(name)
+                
+        # Kahn's algorithm, taking ready tasks in declaration order
+        pending = {name: len(deps) for name, deps in dependencies.items()}
+        ready = [declared[name] for name in tasks if pending[name] == 0]
+        heapq.heapify(ready)
+        names = list(tasks)
+        order: List[str] = []
+        level_of: Dict[str, int] = {}
+        longest_via: Dict[str, str] = {}
+        
+        while ready:
+            name = names[heapq.heappop(ready)]
+            order.append(name)
+            
+            level = 0
+            for dep in dependencies[name]:
+                if level_of[dep] + 1 > level:
+                    level = level_of[dep] + 1
+                    longest_via[name] = dep
+            level_of[name] = level
+            
+            for dependent in dependents[name]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    heapq.heappush(ready, declared[dependent])
+                    
+        if len(order) < len(names):
+            raise ValueError(
+                f"Circular dependency detected involving task '{_find_cycle_member(dependencies, pending)}'"
+            )
+            
+        # Sort each adjacency list by execution order
+        position = {name: index for index, name in enumerate(order)}
+        for name in order:
+            dependents[name].sort(key=position.__getitem__)
+            dependencies[name] = tuple(sorted(dependencies[name], key=position.__getitem__))
+            
+        critical_path: List[str] = []
+        if order:
+            node = max(order, key=lambda n: (level_of[n], -position[n]))
+            while True:
+                critical_path.append(node)
+                if node not in longest_via:
+                    break
+                node = longest_via[node]
+            critical_path.reverse()
+            
+        plan = cls(order, dependencies, dependents, level_of, critical_path)
+        logger.debug(
+            f"Compiled execution plan: {len(order)} tasks, {len(plan.levels)} levels, "
+            f"critical path of {plan.critical_path_length} tasks"
+        )
+        return plan
+
+
+def _find_cycle_member(dependencies: Dict[str, Tuple[str, ...]], pending: Dict[str, int]) -> str:
+    """Find a task that lies on a cycle among the tasks Kahn's algorithm left over.
+    
+    Every leftover task still waits on another leftover task, so following
+    those edges must eventually revisit a task, which is on a cycle.
+    """
+    node = next(name for name, count in pending.items() if count > 0)
+    seen = set()
+    while node not in seen:
+        seen.add(node)
+        node = next(dep for dep in dependencies[node] if pending[dep] > 0)
+    return node
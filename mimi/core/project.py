@@ -3,7 +3,7 @@
 import sys
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Union
+from typing import Any, Dict, List, Optional, Union
 
 # Add vendor directory to path to find pydantic
 vendor_path = Path(__file__).parent.parent / "vendor"
@@ -14,6 +14,7 @@ from pydantic import BaseModel, Field, ConfigDict
 
 from mimi.core.agent import Agent, NumberAdderAgent, AnalystAgent, FeedbackProcessorAgent
 from mimi.core.software_agents import ResearchAnalystAgent, ArchitectAgent, SoftwareEngineerAgent, QAEngineerAgent, ReviewerAgent
+from mimi.core.plan import ExecutionPlan
 from mimi.core.task import Task
 from mimi.utils.config import load_project_config
 from mimi.utils.logger import logger, project_log
@@ -32,6 +33,10 @@ class Project(BaseModel):
     tasks: Dict[str, Task] = Field(
         default_factory=dict, description="Dictionary of task name to task object"
     )
+
+    # Compiled execution plan and the task dependencies it was compiled from
+    _plan: Optional[ExecutionPlan] = None
+    _plan_signature: Optional[tuple] = None
     
     # Pydantic v2 configuration
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -53,48 +58,30 @@ class Project(BaseModel):
         Raises:
             ValueError: If there are missing dependencies or circular dependencies.
         """
-        # Check that all dependencies exist
-        all_task_names = set(self.tasks.keys())
+        self.get_execution_plan()
         
-        for task_name, task in self.tasks.items():
-            missing_deps = set(task.depends_on) - all_task_names
-            if missing_deps:
-                error_msg = f"Task '{task_name}' depends on non-existent tasks: {missing_deps}"
-                project_log(self.name, "error", error_msg)
-                raise ValueError(error_msg)
+    def get_execution_plan(self) -> ExecutionPlan:
+        """Get the compiled execution plan for the project's tasks.
         
-        # Check for circular dependencies
-        visited: Dict[str, bool] = {}
-        temp: Dict[str, bool] = {}
+        The plan is compiled once and reused until a task is added, removed
+        or has its dependencies changed.
         
-        def has_cycle(task_name: str) -> bool:
-            if task_name in temp:
-                # Already in the recursion stack, so we have a cycle
-                return True
-            if task_name in visited:
-                # Already processed this node, no cycle here
-                return False
-                
-            # Mark as being processed
-            temp[task_name] = True
-            
-            # Check all dependencies
-            for dep in self.tasks[task_name].depends_on:
-                if has_cycle(dep):
-                    return True
-                    
-            # Remove from 'being processed'
-            temp.pop(task_name)
-            # Mark as processed
-            visited[task_name] = True
+        Returns:
+            The execution plan.
             
-            return False
-        
-        for task_name in self.tasks:
-            if has_cycle(task_name):
-                error_msg = f"Circular dependency detected involving task '{task_name}'"
-                project_log(self.name, "error", error_msg)
-                raise ValueError(error_msg)
+        Raises:
+            ValueError: If there are missing dependencies or circular dependencies.
+        """
+        signature = tuple((name, tuple(task.depends_on)) for name, task in self.tasks.items())
+        if self._plan is None or self._plan_signature != signature:
+            try:
+                self._plan = ExecutionPlan.compile(self.tasks)
+            except ValueError as e:
+                self._plan = None
+                project_log(self.name, "error", str(e))
+                raise
+            self._plan_signature = signature
+        return self._plan
 
     def get_execution_order(self) -> List[str]:
         """Get an ordered list of task names based on dependencies.
@@ -102,27 +89,7 @@ class Project(BaseModel):
         Returns:
             A list of task names in execution order.
         """
-        self.validate_task_dependencies()
-        
-        # Topological sort
-        visited: Set[str] = set()
-        result: List[str] = []
-        
-        def visit(task_name: str) -> None:
-            if task_name in visited:
-                return
-                
-            visited.add(task_name)
-            
-            for dep in self.tasks[task_name].depends_on:
-                visit(dep)
-                
-            result.append(task_name)
-        
-        for task_name in self.tasks:
-            visit(task_name)
-            
-        return result
+        return list(self.get_execution_plan().order)
 
     @classmethod
     def from_config(cls, config_dir: Union[str, Path]) -> "Project":
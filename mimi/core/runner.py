@@ -1,24 +1,55 @@
 """Runners for executing projects and tasks in MiMi."""
 
+import asyncio
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
+from mimi.core.artifacts import ArtifactStore, IncrementalCache
+from mimi.core.blackboard import Blackboard
+from mimi.core.checkpoint import CheckpointError, CheckpointStore
+from mimi.core.context import RunContext
 from mimi.core.project import Project
+from mimi.core.scheduler import ModelAffinityScheduler, model_key
 from mimi.core.task import Task
 from mimi.utils.logger import logger, project_log, task_log
+from mimi.utils.output_manager import flush_logs, flush_project_files
+from mimi.utils.tracing import span
+
+
+def _to_blackboard(data: Any) -> Any:
+    """Wrap dict data in a blackboard; leave any other data unchanged."""
+    return Blackboard.wrap(data) if isinstance(data, (dict, Blackboard)) else data
+
+
+def _to_plain(data: Any) -> Any:
+    """Materialize a blackboard as a dict; leave any other data unchanged."""
+    return data.to_dict() if isinstance(data, Blackboard) else data
 
 
 class TaskRunner:
     """Runner for executing individual tasks."""
 
-    def __init__(self, task: Task, agent_lookup: Dict[str, Any]) -> None:
+    def __init__(
+        self,
+        task: Task,
+        agent_lookup: Dict[str, Any],
+        incremental: Optional[IncrementalCache] = None,
+        context: Optional[RunContext] = None,
+    ) -> None:
         """Initialize the task runner.
         
         Args:
             task: The task to execute.
             agent_lookup: Dictionary mapping agent names to agent objects.
+            incremental: Optional per-run artifact cache for the task.
+            context: Optional run context the task's agent executes in.
         """
         self.task = task
         self.agent_lookup = agent_lookup
+        self.incremental = incremental
+        self.context = context
         task_log(
             task.name,
             "init",
@@ -41,7 +72,40 @@ class TaskRunner:
             data={"input": input_data},
         )
         
-        result = self.task.execute(self.agent_lookup, input_data)
+        with span("task.run", task=self.task.name, agent=getattr(self.task, "agent", None)):
+            result = self.task.execute(self.agent_lookup, input_data, **self._execute_options())
+        # Files the task wrote are read by the tasks that depend on it
+        flush_project_files(self._output_directory())
+        
+        task_log(
+            self.task.name,
+            "completed",
+            f"Task '{self.task.name}' completed",
+            data={"result": result},
+        )
+        
+        return result
+        
+    async def arun(self, input_data: Any) -> Any:
+        """Execute the task with the provided input on the running event loop.
+        
+        Args:
+            input_data: Input data for the task.
+            
+        Returns:
+            The output from the task execution.
+        """
+        task_log(
+            self.task.name,
+            "run",
+            f"Running task '{self.task.name}'",
+            data={"input": input_data},
+        )
+        
+        with span("task.run", task=self.task.name, agent=getattr(self.task, "agent", None)):
+            result = await self.task.aexecute(self.agent_lookup, input_data, **self._execute_options())
+        # Files the task wrote are read by the tasks that depend on it
+        await asyncio.to_thread(flush_project_files, self._output_directory())
         
         task_log(
             self.task.name,
@@ -51,18 +115,63 @@ class TaskRunner:
         )
         
         return result
+        
+    def _execute_options(self) -> Dict[str, Any]:
+        """Get the optional keyword arguments for executing the task."""
+        options: Dict[str, Any] = {}
+        if self.incremental is not None:
+            options["incremental"] = self.incremental
+        if self.context is not None:
+            options["context"] = self.context
+        return options
+        
+    def _output_directory(self) -> Optional[Path]:
+        """Get the directory the task writes files to, if the run context knows it."""
+        return self.context.project_directory if self.context is not None else None
 
 
 class ProjectRunner:
     """Runner for executing entire projects."""
 
-    def __init__(self, project: Project) -> None:
+    def __init__(
+        self,
+        project: Project,
+        max_workers: int = 1,
+        checkpoint: Optional[CheckpointStore] = None,
+        artifacts: Optional[ArtifactStore] = None,
+        model_affinity: bool = True,
+        context: Optional[RunContext] = None,
+    ) -> None:
         """Initialize the project runner.
         
         Args:
             project: The project to execute.
+            max_workers: Maximum number of tasks to run at the same time. With
+                the default of 1 tasks run one after another in execution order;
+                larger values run every task whose dependencies are satisfied
+                on a bounded worker pool.
+            checkpoint: Optional store that receives each task's output as soon
+                as it completes. Tasks whose output is already in the store are
+                not run again, which resumes an interrupted run.
+            artifacts: Optional artifact store for incremental runs. A task
+                whose input, agent configuration and upstream tasks are
+                unchanged reuses its stored result instead of running again.
+            model_affinity: When several tasks are ready in a parallel run,
+                prefer those whose model is already loaded on its endpoint, to
+                avoid unloading and reloading models.
+            context: Optional run context, e.g. to choose the output directory.
+                By default every call to ``run`` gets a fresh context, so runs
+                never share output directories or caches.
         """
         self.project = project
+        self.max_workers = max(1, int(max_workers))
+        self.checkpoint = checkpoint
+        self.artifacts = artifacts
+        self.model_affinity = model_affinity
+        self.context = context
+        self.run_context: Optional[RunContext] = None
+        self.scheduler: Optional[ModelAffinityScheduler] = None
+        self._incremental: Optional[IncrementalCache] = None
         project_log(
             project.name,
             "init",
@@ -89,17 +198,53 @@ class ProjectRunner:
         
         # Get the execution order
         task_order = self.project.get_execution_order()
+        self._incremental = IncrementalCache(self.artifacts) if self.artifacts else None
         project_log(
             self.project.name,
             "planning",
             f"Task execution order: {task_order}",
         )
         
-        # Execute tasks in order
+        # Thread the data through the tasks as a copy-on-write blackboard, so
+        # each task only adds its own key instead of copying the whole dict
+        data = _to_blackboard(input_data)
+        with self._start_context().activate(), self._run_span(task_order):
+            try:
+                if self.max_workers > 1:
+                    result = _to_plain(self._run_parallel(task_order, data))
+                else:
+                    result = _to_plain(self._run_sequential(task_order, data))
+            finally:
+                self._flush_logs()
+            self.run_context.emit("run_completed", project=self.project.name)
+            
+        project_log(
+            self.project.name,
+            "completed",
+            f"Project '{self.project.name}' completed",
+            data={"final_result": result},
+        )
+        
+        return result
+        
+    def _run_sequential(self, task_order: List[str], input_data: Any) -> Any:
+        """Execute tasks one at a time, threading the data through each task.
+        
+        Args:
+            task_order: Task names in execution order.
+            input_data: Input data for the project.
+            
+        Returns:
+            The result of the last task.
+        """
+        completed = self._restore_outputs(task_order)
         result = input_data
         for task_name in task_order:
-            task = self.project.tasks[task_name]
-            runner = TaskRunner(task, self.project.agents)
+            if task_name in completed:
+                result = self._apply_output(result, task_name, completed[task_name])
+                continue
+                
+            runner = self._task_runner(task_name)
             
             project_log(
                 self.project.name,
@@ -107,7 +252,8 @@ class ProjectRunner:
                 f"Executing task '{task_name}'",
             )
             
-            result = runner.run(result)
+            result = _to_blackboard(runner.run(result))
+            self._save_output(task_name, result)
             
             project_log(
                 self.project.name,
@@ -116,6 +262,343 @@ class ProjectRunner:
                 data={"current_result": result},
             )
         
+        return result
+        
+    def _run_parallel(self, task_order: List[str], input_data: Any) -> Any:
+        """Execute tasks on a worker pool as soon as their dependencies finish.
+        
+        Each task sees the project input plus the outputs of its own upstream
+        tasks, merged in execution order, so its input never depends on which
+        sibling branch happened to finish first. Once every task has completed,
+        the outputs are merged into the shared data by ``output_key`` in
+        execution order, which makes the final result identical between runs.
+        
+        Args:
+            task_order: Task names in execution order.
+            input_data: Input data for the project.
+            
+        Returns:
+            The merged project data.
+        """
+        plan = self.project.get_execution_plan()
+        position, dependents, pending = plan.position, plan.dependents, plan.ready_counts()
+        outputs = self._restore_outputs(task_order, dependents, pending)
+        ready = self._make_scheduler(position)
+        for name in task_order:
+            if pending[name] == 0 and name not in outputs:
+                ready.push(name)
+        in_flight: Dict[Future, str] = {}
+        
+        project_log(
+            self.project.name,
+            "planning",
+            f"Running {len(task_order)} tasks with up to {self.max_workers} workers",
+        )
+        
+        pool = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="mimi-task",
+        )
+        try:
+            while ready or in_flight:
+                # Launch ready tasks, preferring loaded models, until the pool is full
+                while ready and len(in_flight) < self.max_workers:
+                    task_name = ready.pop()
+                    task_input = self._merge_outputs(input_data, plan.ancestors(task_name), outputs)
+                    runner = self._task_runner(task_name)
+                    
+                    project_log(
+                        self.project.name,
+                        "execute_task",
+                        f"Executing task '{task_name}'",
+                    )
+                    
+                    # Copy the caller's context so context variables stay
+                    # visible inside the worker thread
+                    context = contextvars.copy_context()
+                    future = pool.submit(context.run, runner.run, task_input)
+                    in_flight[future] = task_name
+                    
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                
+                # Handle completions in execution order to keep scheduling stable
+                for future in sorted(done, key=lambda f: position[in_flight[f]]):
+                    task_name = in_flight.pop(future)
+                    outputs[task_name] = future.result()
+                    self._save_output(task_name, outputs[task_name])
+                    
+                    project_log(
+                        self.project.name,
+                        "task_completed",
+                        f"Task '{task_name}' completed",
+                        data={"current_result": outputs[task_name]},
+                    )
+                    
+                    for dependent in dependents[task_name]:
+                        pending[dependent] -= 1
+                        if pending[dependent] == 0:
+                            ready.push(dependent)
+        except BaseException:
+            # Don't start anything new; tasks that are already running finish
+            for future in in_flight:
+                future.cancel()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+            
+        return self._merge_outputs(input_data, task_order, outputs)
+        
+    def _restore_outputs(
+        self,
+        task_order: List[str],
+        dependents: Optional[Dict[str, List[str]]] = None,
+        pending: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, Any]:
+        """Load the outputs of tasks completed by an earlier attempt of this run.
+        
+        Args:
+            task_order: Task names in execution order.
+            dependents: Optional reverse adjacency; when given together with
+                ``pending``, the dependents of restored tasks are released.
+            pending: Optional pending dependency counts to update.
+            
+        Returns:
+            Mapping of task name to restored output.
+        """
+        if self.checkpoint is None:
+            return {}
+            
+        saved = self.checkpoint.load_outputs()
+        outputs = {name: saved[name] for name in task_order if name in saved}
+        if self._incremental is not None:
+            fingerprints = self.checkpoint.load_fingerprints()
+            self._incremental.fingerprints.update(
+                {name: fingerprints[name] for name in outputs if name in fingerprints}
+            )
+        if outputs:
+            project_log(
+                self.project.name,
+                "started",
+                f"Resuming run '{self.checkpoint.run_id}', skipping completed tasks: {list(outputs)}",
+            )
+            
+        if dependents is not None and pending is not None:
+            for name in outputs:
+                for dependent in dependents[name]:
+                    pending[dependent] -= 1
+                    
+        return outputs
+        
+    def _start_context(self) -> RunContext:
+        """Get the context for a new run: the given one, or a fresh one."""
+        if self.context is not None:
+            self.run_context = self.context
+        else:
+            run_id = self.checkpoint.run_id if self.checkpoint is not None else None
+            self.run_context = RunContext(run_id=run_id)
+        self.run_context.emit("run_started", project=self.project.name)
+        return self.run_context
+        
+    def _run_span(self, task_order: List[str]) -> Any:
+        """Open the span that covers a whole run."""
+        return span(
+            "project.run",
+            project=self.project.name,
+            run_id=self.run_context.run_id,
+            tasks=len(task_order),
+            max_workers=self.max_workers,
+        )
+        
+    def _flush_logs(self) -> None:
+        """Write the run's buffered project and agent log entries and generated files to disk."""
+        directory = self.run_context.project_directory if self.run_context is not None else None
+        if directory is not None:
+            try:
+                flush_logs(directory)
+                flush_project_files(directory, release=True)
+            except Exception as e:
+                logger.warning(f"Failed to flush output in {directory}: {str(e)}")
+                
+    def _save_output(self, task_name: str, output: Any) -> None:
+        """Checkpoint a task's output if checkpointing is enabled.
+        
+        Only the task's own result is stored: the value under its
+        ``output_key`` when the task wrote one, so each checkpoint stays the
+        size of one task's result. An output that can't be stored as JSON is
+        not checkpointed, and the task runs again on resume.
+        
+        Args:
+            task_name: Name of the completed task.
+            output: The task's output.
+        """
+        if self.run_context is not None:
+            self.run_context.emit("task_completed", task=task_name)
+        if self.checkpoint is not None:
+            fingerprint = None
+            if self._incremental is not None:
+                fingerprint = self._incremental.fingerprints.get(task_name)
+            output_key = self.project.tasks[task_name].output_key
+            if output_key and isinstance(output, (dict, Blackboard)) and output_key in output:
+                output = output[output_key]
+            else:
+                output_key = None
+            try:
+                self.checkpoint.save_output(
+                    task_name, _to_plain(output), fingerprint=fingerprint, output_key=output_key
+                )
+            except CheckpointError as e:
+                logger.warning(f"Not checkpointing task '{task_name}': {str(e)}")
+                
+    def _task_runner(self, task_name: str) -> TaskRunner:
+        """Create the runner for a task.
+        
+        Args:
+            task_name: Name of the task.
+            
+        Returns:
+            The task runner.
+        """
+        task = self.project.tasks[task_name]
+        options: Dict[str, Any] = {}
+        if self._incremental is not None:
+            options["incremental"] = self._incremental
+        if self.run_context is not None:
+            options["context"] = self.run_context
+        return TaskRunner(task, self.project.agents, **options)
+        
+    def _make_scheduler(self, position: Dict[str, int]) -> ModelAffinityScheduler:
+        """Create the ready queue for a dependency-driven run.
+        
+        The scheduler is kept on the runner so its model switch metrics can be
+        inspected after the run.
+        
+        Args:
+            position: Position of each task in the execution order.
+            
+        Returns:
+            The scheduler.
+        """
+        agents = self.project.agents
+        models = {
+            name: model_key(agents.get(task.agent)) for name, task in self.project.tasks.items()
+        }
+        self.scheduler = ModelAffinityScheduler(position, models, affinity=self.model_affinity)
+        return self.scheduler
+        
+    def _merge_outputs(
+        self, input_data: Any, task_names: List[str], outputs: Dict[str, Any]
+    ) -> Any:
+        """Merge task outputs into the project data.
+        
+        Tasks with an ``output_key`` contribute only that key; tasks without one
+        replace the data with their result, as they do in sequential runs. Each
+        merge adds a layer to a blackboard, so the snapshots handed to parallel
+        branches share all unchanged entries.
+        
+        Args:
+            input_data: Input data for the project.
+            task_names: Names of completed tasks, in execution order.
+            outputs: Mapping of task name to the output of its runner.
+            
+        Returns:
+            The merged data.
+        """
+        data = _to_blackboard(input_data)
+        for task_name in task_names:
+            data = self._apply_output(data, task_name, outputs[task_name])
+        return data
+        
+    def _apply_output(self, data: Any, task_name: str, output: Any) -> Any:
+        """Merge one task's output into the project data.
+        
+        Args:
+            data: The project data before the task.
+            task_name: Name of the task.
+            output: The output of the task's runner, or its restored checkpoint.
+            
+        Returns:
+            The project data after the task.
+        """
+        data = _to_blackboard(data)
+        output_key = self.project.tasks[task_name].output_key
+        if (
+            output_key
+            and isinstance(data, Blackboard)
+            and isinstance(output, (dict, Blackboard))
+            and output_key in output
+        ):
+            return data.set(output_key, output[output_key])
+        return _to_blackboard(output)
+
+
+class AsyncProjectRunner(ProjectRunner):
+    """Runner for executing entire projects on an asyncio event loop."""
+
+    def __init__(
+        self,
+        project: Project,
+        max_concurrency: Optional[int] = None,
+        checkpoint: Optional[CheckpointStore] = None,
+        artifacts: Optional[ArtifactStore] = None,
+        model_affinity: bool = True,
+        context: Optional[RunContext] = None,
+    ) -> None:
+        """Initialize the async project runner.
+        
+        Args:
+            project: The project to execute.
+            max_concurrency: Maximum number of tasks to run at the same time.
+                If None, every task whose dependencies are satisfied is started.
+            checkpoint: Optional store for task outputs, as for ProjectRunner.
+            artifacts: Optional artifact store, as for ProjectRunner.
+            model_affinity: Whether to prefer loaded models, as for ProjectRunner.
+            context: Optional run context, as for ProjectRunner.
+        """
+        super().__init__(
+            project,
+            checkpoint=checkpoint,
+            artifacts=artifacts,
+            model_affinity=model_affinity,
+            context=context,
+        )
+        self.max_concurrency = max(1, int(max_concurrency)) if max_concurrency else None
+        
+    async def run(self, input_data: Any) -> Any:
+        """Execute the project with the provided input.
+        
+        Tasks start as soon as their dependencies finish and use the same input
+        and merge rules as :meth:`ProjectRunner._run_parallel`, so the result
+        matches a sequential or threaded run.
+        
+        Args:
+            input_data: Input data for the project.
+            
+        Returns:
+            The merged project data.
+        """
+        project_log(
+            self.project.name,
+            "run",
+            f"Running project '{self.project.name}'",
+            data={"input": input_data},
+        )
+        
+        # Get the execution order
+        task_order = self.project.get_execution_order()
+        self._incremental = IncrementalCache(self.artifacts) if self.artifacts else None
+        project_log(
+            self.project.name,
+            "planning",
+            f"Task execution order: {task_order}",
+        )
+        
+        with self._start_context().activate(), self._run_span(task_order):
+            try:
+                result = _to_plain(await self._run_async(task_order, _to_blackboard(input_data)))
+            finally:
+                self._flush_logs()
+            self.run_context.emit("run_completed", project=self.project.name)
+            
         project_log(
             self.project.name,
             "completed",
@@ -123,4 +606,68 @@ class ProjectRunner:
             data={"final_result": result},
         )
         
-        return result 
\ No newline at end of file
+        return result
+        
+    async def _run_async(self, task_order: List[str], input_data: Any) -> Any:
+        """Execute tasks as asyncio tasks as soon as their dependencies finish.
+        
+        Args:
+            task_order: Task names in execution order.
+            input_data: Input data for the project.
+            
+        Returns:
+            The merged project data.
+        """
+        plan = self.project.get_execution_plan()
+        position, dependents, pending = plan.position, plan.dependents, plan.ready_counts()
+        outputs = self._restore_outputs(task_order, dependents, pending)
+        ready = self._make_scheduler(position)
+        for name in task_order:
+            if pending[name] == 0 and name not in outputs:
+                ready.push(name)
+        in_flight: Dict[asyncio.Task, str] = {}
+        limit = self.max_concurrency or max(1, len(task_order))
+        
+        try:
+            while ready or in_flight:
+                # Start ready tasks, preferring loaded models, until the limit is reached
+                while ready and len(in_flight) < limit:
+                    task_name = ready.pop()
+                    task_input = self._merge_outputs(input_data, plan.ancestors(task_name), outputs)
+                    runner = self._task_runner(task_name)
+                    
+                    project_log(
+                        self.project.name,
+                        "execute_task",
+                        f"Executing task '{task_name}'",
+                    )
+                    
+                    in_flight[asyncio.ensure_future(runner.arun(task_input))] = task_name
+                    
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                
+                # Handle completions in execution order to keep scheduling stable
+                for future in sorted(done, key=lambda f: position[in_flight[f]]):
+                    task_name = in_flight.pop(future)
+                    outputs[task_name] = future.result()
+                    self._save_output(task_name, outputs[task_name])
+                    
+                    project_log(
+                        self.project.name,
+                        "task_completed",
+                        f"Task '{task_name}' completed",
+                        data={"current_result": outputs[task_name]},
+                    )
+                    
+                    for dependent in dependents[task_name]:
+                        pending[dependent] -= 1
+                        if pending[dependent] == 0:
+                            ready.push(dependent)
+        except BaseException:
+            # Cancel the tasks still running and wait for them to unwind
+            for future in in_flight:
+                future.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            raise
+            
+        return self._merge_outputs(input_data, task_order, outputs)
\ No newline at end of file
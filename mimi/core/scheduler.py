@@ -0,0 +1,130 @@
+"""Model-aware scheduling of ready tasks for MiMi project runs."""
+
+import heapq
+from typing import Any, Dict, List, Optional, Tuple
+
+from mimi.utils.logger import logger
+
+
+def model_key(agent: Any) -> Tuple[str, str]:
+    """Get the endpoint and model an agent runs on.
+    
+    Args:
+        agent: The agent, or None for tasks without a known agent.
+        
+    Returns:
+        A tuple of the endpoint, such as an Ollama ``base_url``, and the model
+        as ``provider/name``.
+    """
+    if agent is None:
+        return "", ""
+    provider = str(getattr(agent, "model_provider", "")).lower()
+    settings = getattr(agent, "model_settings", None) or {}
+    if provider == "ollama":
+        endpoint = str(settings.get("base_url", "http://localhost:11434")).rstrip("/")
+    else:
+        endpoint = provider
+    return endpoint, f"{provider}/{getattr(agent, 'model_name', '')}"
+
+
+class ModelAffinityScheduler:
+    """Queue of ready tasks that prefers the model that is already loaded.
+
+    A local model server such as Ollama typically keeps one model in memory,
+    and switching to another model means unloading and loading weights. When
+    several tasks are ready, the scheduler picks one whose model is the last
+    one used on its endpoint; otherwise it picks the task that comes first in
+    execution order. Every change of model on an endpoint is counted as a
+    switch.
+    """
+
+    def __init__(
+        self,
+        position: Dict[str, int],
+        models: Dict[str, Tuple[str, str]],
+        affinity: bool = True,
+    ) -> None:
+        """Initialize the scheduler.
+        
+        Args:
+            position: Position of each task in the execution order.
+            models: Endpoint and model of each task, from :func:`model_key`.
+            affinity: Whether to prefer the loaded model. When False, tasks
+                are taken in execution order but switches are still counted.
+        """
+        self.position = position
+        self.models = models
+        self.affinity = affinity
+        self.hot: Dict[str, str] = {}
+        self.switches = 0
+        self.loads: Dict[str, int] = {}
+        self.launches: Dict[str, int] = {}
+        self._ready: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
+        self._size = 0
+        
+    def push(self, task_name: str) -> None:
+        """Add a task whose dependencies have completed.
+        
+        Args:
+            task_name: The task name.
+        """
+        heap = self._ready.setdefault(self.models[task_name], [])
+        heapq.heappush(heap, (self.position[task_name], task_name))
+        self._size += 1
+        
+    def pop(self) -> str:
+        """Take the next task to run and mark its model as loaded.
+        
+        Returns:
+            The task name.
+            
+        Raises:
+            IndexError: If no task is ready.
+        """
+        best: Optional[Tuple[int, str]] = None
+        best_key: Optional[Tuple[str, str]] = None
+        best_hot = False
+        for key, heap in self._ready.items():
+            if not heap:
+                continue
+            is_hot = self.affinity and self.hot.get(key[0]) == key[1]
+            if best is None or (is_hot, -heap[0][0]) > (best_hot, -best[0]):
+                best, best_key, best_hot = heap[0], key, is_hot
+                
+        if best is None or best_key is None:
+            raise IndexError("pop from an empty scheduler")
+            
+        heapq.heappop(self._ready[best_key])
+        self._size -= 1
+        self._mark_loaded(best_key)
+        return best[1]
+        
+    def stats(self) -> Dict[str, Any]:
+        """Get the scheduling metrics.
+        
+        Returns:
+            The number of model switches, and per model the number of times it
+            was loaded and the number of tasks launched on it.
+        """
+        return {
+            "switches": self.switches,
+            "loads": dict(self.loads),
+            "launches": dict(self.launches),
+        }
+        
+    def _mark_loaded(self, key: Tuple[str, str]) -> None:
+        """Record that a task on ``key`` is starting."""
+        endpoint, model = key
+        self.launches[model] = self.launches.get(model, 0) + 1
+        previous = self.hot.get(endpoint)
+        if previous == model:
+            return
+            
+        self.hot[endpoint] = model
+        self.loads[model] = self.loads.get(model, 0) + 1
+        if previous is not None:
+            self.switches += 1
+            logger.info(f"Model switch on {endpoint or 'default endpoint'}: {previous} -> {model}")
+            
+    def __len__(self) -> int:
+        return self._size
@@ -1,6 +1,6 @@
 """Software Engineer AI Super Agent implementation for MiMi."""
 
-from typing import Any, Dict, List, Optional, Union, Callable
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union, Callable
 import json
 import os
 from datetime import datetime
@@ -9,22 +9,76 @@ import re
 
 from pydantic import BaseModel, Field, ConfigDict
 
-from mimi.core.agent import Agent
+from mimi.core.agent import Agent, ModelAgent
+from mimi.core.context import current_run_context
+from mimi.core.prompt_templates import (
+    ARCHITECTURE,
+    BUG_FIXES,
+    DOCUMENTATION,
+    FINAL_APPROVAL,
+    FIX_CODE_FORMAT,
+    FIX_FORMAT_INSTRUCTIONS,
+    INTEGRATION,
+    PATCH_FORMAT_INSTRUCTIONS,
+    PATCH_SYSTEM_PROMPT,
+    PROJECT_REVIEW,
+    REGENERATE_FILE,
+    REQUIREMENTS_ANALYSIS,
+    REVISION_FORMAT_INSTRUCTIONS,
+    SYSTEM_TEST,
+    TASK_PLAN,
+    specialty_template,
+)
 from mimi.utils.logger import agent_log, logger
 from mimi.utils.output_manager import (
-    create_output_directory,
+    CodeBlockSaver,
     process_implementation_output,
     save_documentation, 
-    save_code_blocks_from_text,
     save_project_metadata,
-    create_or_update_project_log
+    create_or_update_project_log,
+    write_output_file,
+    extract_code_blocks,
+    save_code_file
 )
+from mimi.utils.code_fences import parse_fences
+from mimi.utils.manifest import get_manifest
+from mimi.utils.patches import is_patch
+from mimi.utils.prompts import KEEP, SELECT, PromptBuilder, PromptTemplate
+from mimi.utils.retrieval import retrieve_context
+from mimi.utils.tokens import CHARS_PER_TOKEN
+
+# Default estimated tokens of retrieved project context per prompt section;
+# agents can set "context_token_budget" in model_settings
+DEFAULT_CONTEXT_TOKEN_BUDGET = 4000
+
+# Most characters of existing files included in a patch-mode prompt; the
+# model can only write search text for files it has seen
+MAX_PATCH_CONTEXT_CHARS = 32000
+
+
+def _context_budget(agent: Agent) -> int:
+    """Get the token budget of each retrieved context section of an agent's prompts."""
+    return int(agent.model_settings.get("context_token_budget", DEFAULT_CONTEXT_TOKEN_BUDGET))
+
+
+def _prompt_builder(agent: Agent, template: PromptTemplate, **values: Any) -> PromptBuilder:
+    """Get a builder for a prompt template, sized for an agent's model.
+    
+    Args:
+        agent: The agent.
+        template: The template.
+        **values: Static values of the template.
+        
+    Returns:
+        The builder.
+    """
+    return PromptBuilder.from_settings(
+        agent.model_settings, label=f"{agent.name}: {template.name}", template=template, values=values
+    )
 
-# Add a global variable to track the project directory across agents
-_project_directory: Optional[Path] = None
 
 def get_project_directory(project_title: str) -> Path:
-    """Get the project directory, creating it if it doesn't exist.
+    """Get the current run's project directory, creating it if it doesn't exist.
     
     Args:
         project_title: The title of the project.
@@ -32,16 +86,31 @@ def get_project_directory(project_title: str) -> Path:
     Returns:
         The path to the project directory.
     """
-    global _project_directory
-    if _project_directory is None:
-        _project_directory = create_output_directory(project_title)
-    return _project_directory
+    return current_run_context().get_project_directory(project_title)
+
+
+def current_project_directory() -> Optional[Path]:
+    """Get the current run's project directory if one has been created.
+    
+    Returns:
+        The path to the project directory, or None.
+    """
+    return current_run_context().project_directory
+
 
+def set_project_directory(project_dir: Optional[Path]) -> None:
+    """Set the current run's project directory, e.g. to continue writing to a resumed run's output.
+    
+    Args:
+        project_dir: The path to the project directory, or None to reset it.
+    """
+    current_run_context().project_directory = Path(project_dir) if project_dir is not None else None
 
-class ResearchAnalystAgent(Agent):
+
+class ResearchAnalystAgent(ModelAgent):
     """Agent that analyzes project requirements and prepares specifications."""
     
-    def execute(self, task_input: Any) -> Any:
+    async def aexecute(self, task_input: Any) -> Any:
         """Analyze project requirements and prepare detailed specifications.
         
         Args:
@@ -53,49 +122,23 @@ class ResearchAnalystAgent(Agent):
         agent_log(
             self.name,
             "execute",
-            f"Analyzing project requirements: {task_input.get('input', str(task_input))}"
+            "Analyzing project requirements: {}",
+            task_input.get('input', task_input),
         )
         
         # Extract requirements from input
         requirements = task_input.get("project_requirements", task_input)
         logger.debug(f"Extracted requirements: {str(requirements)[:200]}...")
         
-        # Create system prompt for analyzing requirements
-        system_prompt = """
-        You are an expert Research Analyst for software projects. Your task is to:
-        1. Analyze the given project requirements carefully
-        2. Break down the requirements into functional and non-functional components
-        3. Identify technical challenges and potential solutions
-        4. Prepare a detailed specification document for the architect to use
-        
-        Provide a comprehensive analysis that will help the architect design the system.
-        """
-        
         # Construct the prompt for the model
-        prompt = f"""
-        # Project Requirements
-        {requirements}
-        
-        # Task
-        Analyze these requirements and prepare detailed specifications including:
-        - Project overview and goals
-        - Functional requirements (detailed)
-        - Non-functional requirements (performance, security, scalability, etc.)
-        - Technical challenges and potential approaches
-        - Required technologies and components
-        - Any assumptions or constraints
-        
-        Format your response as a structured specification document.
-        """
-        
-        # Get model client
-        client = self.get_model_client()
-        logger.debug(f"Got model client: {client.__class__.__name__}")
+        builder = _prompt_builder(self, REQUIREMENTS_ANALYSIS)
+        builder.add("requirements", requirements)
+        prompt = builder.render()
         
         try:
             # Generate specifications using the model
             logger.debug("Calling model generate() method...")
-            response = client.generate(prompt, system_prompt=system_prompt)
+            response = await self._generate(prompt, system_prompt=builder.system_prompt, prefix=builder.prefix)
             logger.debug(f"Received response from model, length: {len(response)}")
             
             # Extract project title from the response or use a default
@@ -113,16 +156,13 @@ class ResearchAnalystAgent(Agent):
             
             # Save the specifications to the project directory
             specs_path = project_dir / "docs" / "specifications.md"
-            specs_path.parent.mkdir(exist_ok=True)
             logger.debug(f"Writing specifications to: {specs_path}")
-            with open(specs_path, 'w') as f:
-                f.write(response)
+            write_output_file(specs_path, response, project_dir, "docs")
             
             # Save the original requirements
             req_path = project_dir / "docs" / "requirements.md"
             logger.debug(f"Writing requirements to: {req_path}")
-            with open(req_path, 'w') as f:
-                f.write(str(requirements))
+            write_output_file(req_path, str(requirements), project_dir, "docs")
             
             # Save project metadata
             metadata = {
@@ -208,10 +248,10 @@ class ResearchAnalystAgent(Agent):
             raise
 
 
-class ArchitectAgent(Agent):
+class ArchitectAgent(ModelAgent):
     """Agent that creates architecture plans and divides work into tasks."""
     
-    def execute(self, task_input: Any) -> Any:
+    async def aexecute(self, task_input: Any) -> Any:
         """Create architecture design or divide work into tasks.
         
         Args:
@@ -232,20 +272,20 @@ class ArchitectAgent(Agent):
             
             # Execute the appropriate method based on stage
             if stage == "architecture":
-                result = self._create_architecture(task_input)
+                result = await self._create_architecture(task_input)
             elif stage == "task_planning":
-                result = self._create_task_plan(task_input)
+                result = await self._create_task_plan(task_input)
             else:
                 error_msg = f"Unknown stage: {stage}"
                 agent_log(self.name, "error", error_msg)
                 raise ValueError(error_msg)
         else:
             # Default to architecture creation if no stage specified
-            result = self._create_architecture(task_input)
+            result = await self._create_architecture(task_input)
         
         return result
 
-    def _create_architecture(self, task_input: Dict[str, Any]) -> Dict[str, Any]:
+    async def _create_architecture(self, task_input: Dict[str, Any]) -> Dict[str, Any]:
         """Create a software architecture plan based on specifications."""
         agent_log(
             self.name,
@@ -265,54 +305,18 @@ class ArchitectAgent(Agent):
         # Get the project directory
         project_dir = get_project_directory(project_title)
             
-        # Create system prompt for architecture design
-        system_prompt = """
-        You are an expert Software Architect. Your task is to:
-        1. Analyze the project specifications thoroughly
-        2. Design a comprehensive architecture for the system
-        3. Choose appropriate technologies and frameworks
-        4. Define the major components, their responsibilities, and interactions
-        
-        Provide a well-structured architecture document that will guide the engineering team.
-        
-        IMPORTANT: When recommending components and file structure:
-        - Specify clear, proper filenames following industry conventions
-        - Use consistent naming patterns and appropriate file extensions
-        - Recommend standard directory structures that follow best practices
-        - Be precise about filenames in your architecture so engineers can implement them exactly
-        - If you include example code, ensure filenames are correct and properly referenced
-        """
-        
-        # Construct the prompt for the model
-        prompt = f"""
-        # Project Specifications
-        {specifications}
-        
-        # Task
-        Create a detailed architecture plan including:
-        - System overview and architecture style (e.g., microservices, monolith, serverless)
-        - Component diagram showing major parts of the system
-        - Technology stack selection with justification
-        - Data model and storage approach
-        - API design and communication patterns
-        - Security considerations
-        - Deployment strategy
-        
-        Format your response as a structured architecture document.
-        """
-        
-        # Get model client
-        client = self.get_model_client()
+        # Construct the prompt for the model, cutting long specifications to fit
+        builder = _prompt_builder(self, ARCHITECTURE)
+        builder.add("specifications", specifications)
+        prompt = builder.render()
         
         try:
             # Generate architecture plan using the model
-            response = client.generate(prompt, system_prompt=system_prompt)
+            response = await self._generate(prompt, system_prompt=builder.system_prompt, prefix=builder.prefix)
             
             # Save the architecture plan to the project directory
             arch_path = project_dir / "docs" / "architecture.md"
-            arch_path.parent.mkdir(exist_ok=True)
-            with open(arch_path, 'w') as f:
-                f.write(response)
+            write_output_file(arch_path, response, project_dir, "docs")
             
             # Create project log
             log_details = {
@@ -381,7 +385,7 @@ class ArchitectAgent(Agent):
             
             raise
 
-    def _create_task_plan(self, task_input: Dict[str, Any]) -> Dict[str, Any]:
+    async def _create_task_plan(self, task_input: Dict[str, Any]) -> Dict[str, Any]:
         """Create a task plan based on the architecture.
         
         Args:
@@ -407,45 +411,18 @@ class ArchitectAgent(Agent):
             logger.warning(f"Project directory not provided, creating new one for {project_title}")
             project_dir = get_project_directory(project_title)
         
-        # Create system prompt for task planning
-        system_prompt = """
-        You are an expert Project Manager dividing work into tasks. Your task is to:
-        1. Analyze the architecture plan
-        2. Break down the implementation into specific tasks
-        3. Assign tasks to appropriate engineering roles (backend, frontend, infrastructure)
-        4. Prioritize tasks based on dependencies
-        
-        Provide a detailed task plan that will guide the engineering team's implementation.
-        """
-        
-        # Construct the prompt for the model
-        prompt = f"""
-        # Architecture Plan
-        {architecture_plan}
-        
-        # Task
-        Create a detailed implementation task plan including:
-        - Backend tasks with specific components to implement
-        - Frontend tasks with specific components to implement
-        - Infrastructure tasks with specific components to implement
-        - Priority order and dependencies between tasks
-        - Acceptance criteria for each task
-        
-        Organize tasks by role (backend, frontend, infrastructure).
-        """
-        
-        # Get model client
-        client = self.get_model_client()
+        # Construct the prompt for the model, cutting a long plan to fit
+        builder = _prompt_builder(self, TASK_PLAN)
+        builder.add("architecture_plan", architecture_plan)
+        prompt = builder.render()
         
         try:
             # Generate task plan using the model
-            response = client.generate(prompt, system_prompt=system_prompt)
+            response = await self._generate(prompt, system_prompt=builder.system_prompt, prefix=builder.prefix)
             
             # Save the task plan to the project directory
             tasks_path = project_dir / "docs" / "tasks.md"
-            tasks_path.parent.mkdir(exist_ok=True)
-            with open(tasks_path, 'w') as f:
-                f.write(response)
+            write_output_file(tasks_path, response, project_dir, "docs")
             
             # Create project log
             log_details = {
@@ -591,12 +568,17 @@ class ArchitectAgent(Agent):
         return infra_section if infra_section else task_plan
 
 
-class SoftwareEngineerAgent(Agent):
+class SoftwareEngineerAgent(ModelAgent):
     """Agent that implements software components according to the architecture plan."""
     
     specialty: str = Field("backend", description="Engineer's specialty (backend, frontend, or infrastructure)")
+    revision_mode: Literal["full", "patch"] = Field(
+        "full",
+        description="How revisions and bug fixes change existing files: 'full' regenerates whole files, "
+                    "'patch' asks for search/replace or unified diff patches"
+    )
     
-    def execute(self, task_input: Any) -> Any:
+    async def aexecute(self, task_input: Any) -> Any:
         """Implement software components according to the task plan.
         
         Args:
@@ -629,7 +611,7 @@ class SoftwareEngineerAgent(Agent):
             # If we get a string directly, assume it's a revision plan
             logger.info("SoftwareEngineerAgent received string input, treating as revision plan")
             project_dir_str = get_project_directory(project_title)
-            return self._implement_revisions(task_input, project_dir_str, project_title)
+            return await self._implement_revisions(task_input, project_dir_str, project_title)
         
         if project_dir_str:
             project_dir = Path(project_dir_str)
@@ -656,18 +638,18 @@ class SoftwareEngineerAgent(Agent):
                         tasks = task_input["engineer_tasks"].get(self.specialty, task_input["task_plan"])
                     else:
                         tasks = task_input["task_plan"]
-                    return self._implement_components(tasks, project_dir, project_title)
+                    return await self._implement_components(tasks, project_dir, project_title)
                 elif "revision_plan" in task_input:
                     revision_plan = task_input["revision_plan"]
-                    return self._implement_revisions(revision_plan, project_dir, project_title)
+                    return await self._implement_revisions(revision_plan, project_dir, project_title)
                 elif "revisions" in task_input:
                     # Handle case where revision is under a different key name
                     revisions = task_input["revisions"]
-                    return self._implement_revisions(revisions, project_dir, project_title)
+                    return await self._implement_revisions(revisions, project_dir, project_title)
                 elif "architecture_plan" in task_input:
                     # Special case for when revision_plan is contained in the architecture_plan
                     architecture_plan = task_input["architecture_plan"]
-                    return self._implement_revisions(architecture_plan, project_dir, project_title)
+                    return await self._implement_revisions(architecture_plan, project_dir, project_title)
                 elif "test_results" in task_input:
                     # Get test results, which could be a string or a complex object
                     test_results = task_input["test_results"]
@@ -679,17 +661,17 @@ class SoftwareEngineerAgent(Agent):
                             test_results_str = test_results.get("message", test_results_str)
                     else:
                         test_results_str = str(test_results)
-                    return self._fix_bugs(test_results_str, project_dir, project_title)
+                    return await self._fix_bugs(test_results_str, project_dir, project_title)
                 elif "components" in task_input:
-                    return self._integrate_components(task_input["components"], project_dir, project_title)
+                    return await self._integrate_components(task_input["components"], project_dir, project_title)
                 # Special case for when we just get a testing result directly
                 elif "status" in task_input and task_input.get("status") == "error" and "message" in task_input:
                     test_results_str = task_input.get("message", "Unknown error")
-                    return self._fix_bugs(test_results_str, project_dir, project_title)
+                    return await self._fix_bugs(test_results_str, project_dir, project_title)
                 # Handle case when project_review is passed from the reviewer and contains revision info
                 elif "project_review" in task_input:
                     project_review = task_input["project_review"]
-                    return self._implement_revisions(project_review, project_dir, project_title)
+                    return await self._implement_revisions(project_review, project_dir, project_title)
                 # Check if any key contains revision info as a fallback
                 else:
                     # Look for any key that might contain revision information
@@ -698,43 +680,44 @@ class SoftwareEngineerAgent(Agent):
                             # If we find a reasonably sized string value, check if it looks like a revision plan
                             if "revision" in key.lower() or "review" in key.lower() or "implement" in key.lower():
                                 logger.info(f"Using key '{key}' as revision plan")
-                                return self._implement_revisions(value, project_dir, project_title)
+                                return await self._implement_revisions(value, project_dir, project_title)
                             elif "fix" in key.lower() or "bug" in key.lower() or "test" in key.lower():
                                 logger.info(f"Using key '{key}' as test results")
-                                return self._fix_bugs(value, project_dir, project_title)
+                                return await self._fix_bugs(value, project_dir, project_title)
             
             # If no specific input format is recognized, but we have project information,
             # check for any revision documents in the project directory and use them
             try:
+                # Documents written by earlier tasks are in the project's manifest
+                manifest = get_manifest(project_dir)
+                
                 # Check multiple possible revision document locations
                 revision_files = [
-                    project_dir / "docs" / "project_review.md",
-                    project_dir / "docs" / "revisions.md",
-                    project_dir / "docs" / "review.md",
-                    project_dir / "project_review.md"
+                    "docs/project_review.md",
+                    "docs/revisions.md",
+                    "docs/review.md",
+                    "project_review.md"
                 ]
                 
                 for rev_file in revision_files:
-                    if rev_file.exists():
-                        with open(rev_file, 'r') as f:
-                            project_review = f.read()
-                        logger.info(f"Using {rev_file.name} for revisions")
-                        return self._implement_revisions(project_review, project_dir, project_title)
+                    project_review = manifest.read_text(rev_file)
+                    if project_review is not None:
+                        logger.info(f"Using {Path(rev_file).name} for revisions")
+                        return await self._implement_revisions(project_review, project_dir, project_title)
                 
                 # If we're here, we should check if there's a README or other documentation that might contain revision info
                 potential_docs = [
-                    project_dir / "README.md",
-                    project_dir / "docs" / "README.md"
+                    "README.md",
+                    "docs/README.md"
                 ]
                 
                 for doc_file in potential_docs:
-                    if doc_file.exists():
-                        with open(doc_file, 'r') as f:
-                            doc_content = f.read()
+                    doc_content = manifest.read_text(doc_file)
+                    if doc_content is not None:
                         # Check if this document contains revision-like content
                         if "revision" in doc_content.lower() or "improvements" in doc_content.lower() or "changes" in doc_content.lower():
-                            logger.info(f"Using {doc_file.name} for revisions")
-                            return self._implement_revisions(doc_content, project_dir, project_title)
+                            logger.info(f"Using {Path(doc_file).name} for revisions")
+                            return await self._implement_revisions(doc_content, project_dir, project_title)
             except Exception as doc_error:
                 logger.warning(f"Failed to read project review document: {str(doc_error)}")
             
@@ -768,7 +751,7 @@ class SoftwareEngineerAgent(Agent):
             agent_log(self.name, "error", error_msg)
             raise
 
-    def _implement_components(self, tasks: str, project_dir: Path, project_title: str) -> Dict[str, Any]:
+    async def _implement_components(self, tasks: str, project_dir: Path, project_title: str) -> Dict[str, Any]:
         """Implement components based on the task plan.
         
         Args:
@@ -785,113 +768,31 @@ class SoftwareEngineerAgent(Agent):
             f"Implementing {self.specialty} components based on tasks"
         )
         
-        # Determine the role-specific system prompt
-        if self.specialty == "backend":
-            system_prompt = """
-            You are an expert Backend Engineer implementing server-side components. Your task is to:
-            1. Create robust, maintainable backend code according to the task requirements
-            2. Implement RESTful APIs, database models, and business logic
-            3. Follow best practices for security, error handling, and performance
-            4. Document your code and API endpoints
-            
-            Provide clear, well-structured implementation with proper error handling.
-            
-            IMPORTANT: When referencing URLs, always use the full form with protocol (http:// or https://), 
-            never use //hostname notation as this might be confused with file paths. Example: use 
-            'https://example.com' not '//example.com'.
-            
-            CRITICAL: Always use correct and precise filenames:
-            - Use conventional and standard filenames (e.g., 'index.html', 'server.js', 'app.py')
-            - Be consistent with extensions (.js for JavaScript, .py for Python, etc.)
-            - Avoid special characters, spaces, or unusual prefixes in filenames
-            - Each code block must have a clear, appropriate filename
-            - Use lowercase for filenames unless the language convention requires otherwise
-            - Follow standard naming conventions for the language (e.g., snake_case for Python, camelCase for JavaScript)
-            - Use clear, descriptive names that indicate the file's purpose
-            """
-        elif self.specialty == "frontend":
-            system_prompt = """
-            You are an expert Frontend Engineer implementing client-side components. Your task is to:
-            1. Create clean, maintainable frontend code according to the task requirements
-            2. Implement user interfaces with appropriate HTML, CSS, and JavaScript
-            3. Follow best practices for responsive design, accessibility, and performance
-            4. Ensure consistent styling and user experience
-            
-            Provide clear, well-structured implementation with proper error handling and user feedback.
-            
-            CRITICAL: Always use correct and precise filenames:
-            - Use conventional and standard filenames (e.g., 'index.html', 'styles.css', 'app.js')
-            - Be consistent with extensions (.js for JavaScript, .css for CSS, .html for HTML)
-            - Avoid special characters, spaces, or unusual prefixes in filenames
-            - Each code block must have a clear, appropriate filename
-            - Use lowercase for filenames unless the language convention requires otherwise
-            - Use standard directory structure if creating multiple files (e.g., css/, js/, img/ folders)
-            - Main HTML file should be named 'index.html' for web applications
-            - Component files should follow framework conventions if applicable (e.g., 'Header.jsx' for React)
-            """
-        elif self.specialty == "infrastructure":
-            system_prompt = """
-            You are an expert Infrastructure Engineer implementing DevOps and deployment components. Your task is to:
-            1. Create reliable, maintainable infrastructure code according to the task requirements
-            2. Implement deployment scripts, configuration files, and CI/CD pipelines
-            3. Follow best practices for security, scalability, and reliability
-            4. Document your configuration and deployment processes
-            
-            Provide clear, well-structured implementation with proper error handling and logging.
-            
-            CRITICAL: Always use correct and precise filenames:
-            - Use conventional and standard filenames (e.g., 'Dockerfile', 'docker-compose.yml', 'deploy.sh')
-            - Be consistent with extensions (.yml for YAML, .sh for shell scripts, .tf for Terraform)
-            - Avoid special characters, spaces, or unusual prefixes in filenames
-            - Each code block must have a clear, appropriate filename
-            - Config files should follow tool conventions (e.g., 'nginx.conf', '.github/workflows/deploy.yml')
-            - Use lowercase for filenames unless the tool convention requires otherwise
-            - Script files should include appropriate extensions and permissions
-            """
-        else:
-            system_prompt = """
-            You are an expert Software Engineer implementing components according to the task requirements.
-            Create clean, maintainable, and well-documented code that follows best practices.
-            
-            CRITICAL: Always use correct and precise filenames:
-            - Use conventional and standard filenames for your file type
-            - Be consistent with file extensions appropriate for the language/technology
-            - Avoid special characters, spaces, or unusual prefixes in filenames
-            - Each code block must have a clear, appropriate filename
-            - Use lowercase for filenames unless the convention requires otherwise
-            - Follow naming conventions standard for the language/framework you're using
-            """
-        
-        # Construct the prompt for the model
-        prompt = f"""
-        # {self.specialty.capitalize()} Tasks
-        {tasks}
-        
-        # Project Title
-        {project_title}
-        
-        # Task
-        Implement the {self.specialty} components described in the tasks above. For each component:
-        1. Provide the full implementation code (in Markdown code blocks)
-        2. Include any necessary configuration files
-        3. Add brief comments explaining your implementation decisions
-        4. Provide usage examples for key components
-        
-        Format your code with proper indentation and structure. Include filename at the beginning of each code block.
-        """
-        
-        # Get model client
-        client = self.get_model_client()
+        # Construct the prompt for the model from the role-specific template,
+        # cutting a long task list to fit
+        builder = _prompt_builder(
+            self,
+            specialty_template("implement", self.specialty),
+            specialty=self.specialty,
+            specialty_title=self.specialty.capitalize(),
+        )
+        builder.add("project_title", project_title)
+        builder.add("tasks", tasks)
+        prompt = builder.render()
+        system_prompt = builder.system_prompt
         
         try:
-            # Generate implementation
+            # Generate implementation, saving each file as soon as its code block is complete
             logger.debug(f"Generating {self.specialty} implementation...")
-            response = client.generate(prompt, system_prompt=system_prompt)
+            saver = CodeBlockSaver(project_dir, self.specialty)
+            response = await self._generate(
+                prompt, system_prompt=system_prompt, prefix=builder.prefix, on_token=saver.feed
+            )
             logger.debug(f"Generated implementation, length: {len(response)}")
             
             # Process and save the implementation
             logger.debug(f"Processing implementation output...")
-            result = process_implementation_output(project_dir, self.specialty, response)
+            result = process_implementation_output(project_dir, self.specialty, response, saver=saver)
             logger.debug(f"Saved {len(result.get('saved_files', []))} files")
             
             # Create project log
@@ -969,16 +870,15 @@ class SoftwareEngineerAgent(Agent):
                         # Regenerate implementation with fixed prompt
                         agent_log(self.name, "recovery", f"Retrying with fixed URL format: {fixed_url}")
                         
-                        # Get model client
-                        client = self.get_model_client()
                         
                         # Generate implementation with fixed prompt
                         logger.debug(f"Regenerating {self.specialty} implementation with URL fix...")
-                        response = client.generate(prompt, system_prompt=fixed_system_prompt)
+                        saver = CodeBlockSaver(project_dir, self.specialty)
+                        response = await self._generate(prompt, system_prompt=fixed_system_prompt, on_token=saver.feed)
                         
                         # Process and save the implementation
                         logger.debug(f"Processing regenerated implementation output...")
-                        result = process_implementation_output(project_dir, self.specialty, response)
+                        result = process_implementation_output(project_dir, self.specialty, response, saver=saver)
                         
                         # Log the recovery
                         recovery_details = {
@@ -1064,7 +964,7 @@ class SoftwareEngineerAgent(Agent):
             
             return recovered_implementation
 
-    def _implement_revisions(self, revision_plan: str, project_dir: Path, project_title: str) -> Dict[str, Any]:
+    async def _implement_revisions(self, revision_plan: str, project_dir: Path, project_title: str) -> Dict[str, Any]:
         """Implement revisions based on revision plan.
         
         Args:
@@ -1096,168 +996,66 @@ class SoftwareEngineerAgent(Agent):
                 
         # Gather context from the existing codebase
         logger.info("Gathering context from existing codebase")
+        manifest = get_manifest(project_dir)
         
         # Map to appropriate directory
-        if self.specialty == "backend":
-            component_dir = project_dir / "src" / "server"
-            component_type = "backend"
-        elif self.specialty == "frontend":
-            component_dir = project_dir / "src" / "components" 
-            component_type = "frontend"
-        elif self.specialty == "infrastructure":
-            component_dir = project_dir / "infra"
-            component_type = "infrastructure"
-        else:
-            component_dir = project_dir / "src"
-            component_type = "general"
-            
-        # Create an inventory of existing files to reference
-        existing_files = []
-        try:
-            if component_dir.exists():
-                for file_path in component_dir.glob("**/*"):
-                    if file_path.is_file():
-                        rel_path = file_path.relative_to(project_dir)
-                        existing_files.append(str(rel_path))
-                
-                logger.info(f"Found {len(existing_files)} existing files in {component_type} directory")
-                
-                # Also search for files in related directories if needed
-                if len(existing_files) < 5 and component_type == "backend":
-                    # Look in src directory too for backend files
-                    src_dir = project_dir / "src"
-                    for file_path in src_dir.glob("**/*"):
-                        if file_path.is_file() and file_path.parent != component_dir:
-                            rel_path = file_path.relative_to(project_dir)
-                            existing_files.append(str(rel_path))
-        except Exception as e:
-            logger.warning(f"Error gathering existing files: {str(e)}")
+        component_dir, component_type = self._component_location(project_dir)
+        
+        # Create an inventory of existing files to reference from the manifest
+        component_path = component_dir.relative_to(project_dir).as_posix()
+        existing_files = [entry.path for entry in manifest.files(under=component_path)]
+        logger.info(f"Found {len(existing_files)} existing files in {component_type} directory")
+        
+        # Also search for files in related directories if needed
+        if len(existing_files) < 5 and component_type == "backend":
+            # Look in src directory too for backend files
+            existing_files.extend(
+                entry.path for entry in manifest.files(under="src")
+                if Path(entry.path).parent.as_posix() != component_path
+            )
             
         # Get architecture plan if it exists
-        architecture_plan = ""
-        arch_path = project_dir / "docs" / "architecture.md"
-        if arch_path.exists():
-            try:
-                with open(arch_path, 'r') as f:
-                    architecture_plan = f.read()
-                logger.info("Loaded architecture plan from docs/architecture.md")
-            except Exception as e:
-                logger.warning(f"Error reading architecture plan: {str(e)}")
-        
-        # Create appropriate system prompt for revisions
-        if self.specialty == "backend":
-            system_prompt = """
-            You are an expert Backend Engineer implementing revisions to server-side components. Your task is to:
-            1. Analyze the revision plan carefully
-            2. Update or create backend code to address the required changes
-            3. Ensure changes maintain or improve code quality and performance
-            4. Document what changes you've made and why
-            
-            Provide a comprehensive implementation of the required revisions.
-            
-            CRITICAL: When modifying or creating files:
-            - Use EXACT filenames that already exist in the codebase when modifying existing files
-            - Follow the established project structure and naming conventions for new files
-            - Maintain consistency with existing file extensions and naming patterns
-            - Provide complete file contents when changes are substantial
-            - For minor changes, clearly indicate which parts of the file are being modified
-            """
-        elif self.specialty == "frontend":
-            system_prompt = """
-            You are an expert Frontend Engineer implementing revisions to client-side components. Your task is to:
-            1. Analyze the revision plan carefully
-            2. Update or create frontend code to address the required changes
-            3. Ensure changes maintain or improve UI/UX and performance
-            4. Document what changes you've made and why
-            
-            Provide a comprehensive implementation of the required revisions.
-            
-            CRITICAL: When modifying or creating files:
-            - Use EXACT filenames that already exist in the codebase when modifying existing files
-            - Follow the established project structure and naming conventions for new files
-            - Maintain consistency with existing file extensions and naming patterns
-            - Provide complete file contents when changes are substantial
-            - For minor changes, clearly indicate which parts of the file are being modified
-            - Ensure HTML, CSS, and JavaScript files properly reference each other
-            """
-        elif self.specialty == "infrastructure":
-            system_prompt = """
-            You are an expert Infrastructure Engineer implementing revisions to deployment components. Your task is to:
-            1. Analyze the revision plan carefully
-            2. Update or create infrastructure code to address the required changes
-            3. Ensure changes maintain or improve reliability and security
-            4. Document what changes you've made and why
-            
-            Provide a comprehensive implementation of the required revisions.
-            
-            CRITICAL: When modifying or creating files:
-            - Use EXACT filenames that already exist in the codebase when modifying existing files
-            - Follow the established project structure and naming conventions for new files
-            - Maintain consistency with existing file extensions and naming patterns
-            - Provide complete file contents when changes are substantial
-            - For minor changes, clearly indicate which parts of the file are being modified
-            - Ensure configuration files follow the correct format and syntax
-            """
+        budget = _context_budget(self)
+        architecture_plan = manifest.read_text("docs/architecture.md") or ""
+        if architecture_plan:
+            logger.info("Loaded architecture plan from docs/architecture.md")
+        
+        # In patch mode the model sees the current files and returns only the changed lines
+        patch_mode = self.revision_mode == "patch"
+        if patch_mode:
+            relevant_code = self._patch_context(project_dir, existing_files, revision_plan)
         else:
-            system_prompt = """
-            You are an expert Software Engineer implementing revisions. Your task is to:
-            1. Analyze the revision plan carefully
-            2. Update or create code to address the required changes
-            3. Ensure changes maintain or improve code quality
-            4. Document what changes you've made and why
-            
-            Provide a comprehensive implementation of the required revisions.
-            
-            CRITICAL: When modifying or creating files:
-            - Use EXACT filenames that already exist in the codebase when modifying existing files
-            - Follow the established project structure and naming conventions for new files
-            - Maintain consistency with existing file extensions and naming patterns
-            - Provide complete file contents when changes are substantial
-            - For minor changes, clearly indicate which parts of the file are being modified
-            """
-        
-        # Construct the prompt for the model
-        prompt = f"""
-        # Revision Information
-        {revision_plan}
-        
-        # Architecture Plan
-        {architecture_plan}
-        
-        # Task
-        Implement the necessary revisions to the {self.specialty} components of the project.
-        
-        # Existing Files in the Codebase
-        The following files already exist in the codebase:
-        {chr(10).join("- " + file for file in existing_files)}
-        
-        IMPORTANT: When modifying existing files, make sure to use the EXACT filenames listed above.
-        When creating new files, follow the naming patterns and directory structure seen in the existing files.
-        
-        Please provide your implementation, including:
-        1. A summary of changes made
-        2. Complete file content for any new or significantly modified files
-        3. For minor changes, specify which lines were modified and how
-        
-        Format your code files with triple backticks and include the filename:
-        ```
-        path/to/filename.ext
-        // Code content here
-        ```
-        """
-        
-        # Get model client
-        client = self.get_model_client()
-        
-        # Generate revisions using the model
-        response = client.generate(prompt, system_prompt=system_prompt)
-        
-        # Process and save the revisions output
-        revisions_output = process_implementation_output(
-            project_dir, 
-            f"{self.specialty}/revisions", 
-            response
+            relevant_code = retrieve_context(project_dir, revision_plan, budget, paths=existing_files)
+            if relevant_code:
+                relevant_code = "\n\n# Relevant Existing Code\n" + relevant_code
+                
+        # Construct the prompt for the model from the role-specific template; a
+        # long architecture plan is cut down to the parts relevant to the revisions
+        builder = _prompt_builder(
+            self,
+            specialty_template("revise", self.specialty),
+            specialty=self.specialty,
+            patch_rules="\n\n" + PATCH_SYSTEM_PROMPT if patch_mode else "",
+            format_instructions=PATCH_FORMAT_INSTRUCTIONS if patch_mode else REVISION_FORMAT_INSTRUCTIONS,
         )
+        builder.add("revision_plan", revision_plan)
+        builder.add("architecture_plan", architecture_plan, budget=budget, policy=SELECT, query=revision_plan or self.specialty)
+        builder.add("existing_files", "\n".join("- " + file for file in existing_files))
+        builder.add("relevant_code", relevant_code, policy=SELECT, query=revision_plan or self.specialty)
+        prompt = builder.render()
+        
+        # Generate revisions using the model; whole files are saved while it generates
+        output_type = component_type if patch_mode else f"{self.specialty}/revisions"
+        saver = None if patch_mode else CodeBlockSaver(project_dir, output_type)
+        response = await self._generate(
+            prompt,
+            system_prompt=builder.system_prompt,
+            prefix=builder.prefix,
+            on_token=saver.feed if saver is not None else None,
+        )
+        
+        # Process and save the revisions output; patches change the project tree in place
+        revisions_output = await self._save_revision_output(project_dir, output_type, response, patch_mode, saver)
         
         # Structure the output
         revisions = {
@@ -1270,6 +1068,9 @@ class SoftwareEngineerAgent(Agent):
             "project_dir": str(project_dir),
             "saved_files": revisions_output["saved_files"]
         }
+        if patch_mode:
+            revisions["patched_files"] = revisions_output["patched_files"]
+            revisions["tokens_saved"] = revisions_output["tokens_saved"]
         
         agent_log(
             self.name,
@@ -1279,55 +1080,46 @@ class SoftwareEngineerAgent(Agent):
         
         return revisions
     
-    def _fix_bugs(self, test_results: str, project_dir: Path, project_title: str) -> Dict[str, Any]:
+    async def _fix_bugs(self, test_results: str, project_dir: Path, project_title: str) -> Dict[str, Any]:
         """Fix bugs identified in test results."""
-        system_prompt = f"""
-        You are an expert {self.specialty.capitalize()} Engineer. Your task is to:
-        1. Review the test results and identified bugs
-        2. Fix the issues in the {self.specialty} components
-        3. Document the fixes applied
-        
-        Focus on resolving all identified issues while maintaining code quality.
-        When providing code fixes, include complete file content and use this format:
-        ```language
-        filepath/filename.ext
-        // Fixed code goes here
-        ```
-        """
-        
-        prompt = f"""
-        # Test Results
-        {test_results}
-        
-        # Task
-        Fix the identified bugs by:
-        - Analyzing bugs related to {self.specialty} components
-        - For each bug:
-          * Describe the root cause
-          * Provide the fix with complete file content
-          * Explain how the fix resolves the issue
-        
-        Format your response as a structured bug fix document with complete fixed files.
-        For each code file, use the format:
-        ```language
-        filepath/filename.ext
-        // Fixed code content
-        ```
-        """
-        
-        # Get model client
-        client = self.get_model_client()
-        
-        # Generate bug fixes using the model
-        response = client.generate(prompt, system_prompt=system_prompt)
-        
-        # Process and save the bug fixes output
-        fixes_output = process_implementation_output(
-            project_dir, 
-            f"{self.specialty}/fixes", 
-            response
+        # In patch mode the model sees the current files and returns only the changed lines
+        patch_mode = self.revision_mode == "patch"
+        if patch_mode:
+            component_dir, component_type = self._component_location(project_dir)
+            manifest = get_manifest(project_dir)
+            existing_files = [
+                entry.path for entry in manifest.files(under=component_dir.relative_to(project_dir).as_posix())
+            ]
+            current_files = self._patch_context(project_dir, existing_files, str(test_results))
+        else:
+            component_type = f"{self.specialty}/fixes"
+            current_files = ""
+            
+        builder = _prompt_builder(
+            self,
+            BUG_FIXES,
+            specialty=self.specialty,
+            specialty_title=self.specialty.capitalize(),
+            code_format=PATCH_SYSTEM_PROMPT if patch_mode else FIX_CODE_FORMAT,
+            fix_content="Provide the fix as SEARCH/REPLACE blocks" if patch_mode else "Provide the fix with complete file content",
+            format_instructions=PATCH_FORMAT_INSTRUCTIONS if patch_mode else FIX_FORMAT_INSTRUCTIONS,
+        )
+        builder.add("test_results", test_results)
+        builder.add("current_files", current_files, policy=SELECT, query=str(test_results) or self.specialty)
+        prompt = builder.render()
+        
+        # Generate bug fixes using the model; whole files are saved while it generates
+        saver = None if patch_mode else CodeBlockSaver(project_dir, component_type)
+        response = await self._generate(
+            prompt,
+            system_prompt=builder.system_prompt,
+            prefix=builder.prefix,
+            on_token=saver.feed if saver is not None else None,
         )
         
+        # Process and save the bug fixes output; patches change the project tree in place
+        fixes_output = await self._save_revision_output(project_dir, component_type, response, patch_mode, saver)
+        
         # Structure the output
         fixes = {
             "timestamp": datetime.now().isoformat(),
@@ -1339,6 +1131,9 @@ class SoftwareEngineerAgent(Agent):
             "project_dir": str(project_dir),
             "saved_files": fixes_output["saved_files"]
         }
+        if patch_mode:
+            fixes["patched_files"] = fixes_output["patched_files"]
+            fixes["tokens_saved"] = fixes_output["tokens_saved"]
         
         agent_log(
             self.name,
@@ -1348,68 +1143,149 @@ class SoftwareEngineerAgent(Agent):
         
         return fixes
     
-    def _integrate_components(self, components: Dict[str, Any], project_dir: Path, project_title: str) -> Dict[str, Any]:
-        """Integrate all components into a complete system."""
-        backend_components = components.get("backend_components", "")
-        frontend_components = components.get("frontend_components", "")
-        infrastructure_components = components.get("infrastructure_components", "")
+    def _component_location(self, project_dir: Path) -> Tuple[Path, str]:
+        """Get the directory and component type of the engineer's specialty.
         
-        system_prompt = """
-        You are an expert Software Integration Engineer. Your task is to:
-        1. Review all component implementations (backend, frontend, infrastructure)
-        2. Integrate them into a cohesive system
-        3. Document the integration process and configuration
-        4. Provide instructions for deploying and running the system
-        
-        Focus on ensuring all components work together seamlessly.
-        If you need to create or modify any configuration or connection files, use this format:
-        ```language
-        filepath/filename.ext
-        // Integration code goes here
-        ```
+        Args:
+            project_dir: The project directory.
+            
+        Returns:
+            The component directory and the component type used to save files.
         """
+        if self.specialty == "backend":
+            return project_dir / "src" / "server", "backend"
+        elif self.specialty == "frontend":
+            return project_dir / "src" / "components", "frontend"
+        elif self.specialty == "infrastructure":
+            return project_dir / "infra", "infrastructure"
+        return project_dir / "src", "general"
         
-        prompt = f"""
-        # Component Implementations
+    def _patch_context(self, project_dir: Path, paths: List[str], query: str) -> str:
+        """Get the current content of existing files for a patch-mode prompt.
         
-        ## Backend Components
-        {backend_components}
+        Whole files are shown if they fit in MAX_PATCH_CONTEXT_CHARS;
+        otherwise the chunks most relevant to the query, which still give
+        the model exact lines to search for.
         
-        ## Frontend Components
-        {frontend_components}
+        Args:
+            project_dir: The project directory.
+            paths: Paths of the files, relative to the project directory.
+            query: The revision plan or test results the patches are for.
+            
+        Returns:
+            A prompt section with the files or chunks, or "" if there are none.
+        """
+        manifest = get_manifest(project_dir)
+        contents = [(path, manifest.read_text(path)) for path in paths]
+        sections = [f"{path}:\n```\n{content}\n```" for path, content in contents if content is not None]
+        if sum(len(section) for section in sections) > MAX_PATCH_CONTEXT_CHARS:
+            context = retrieve_context(
+                project_dir, query, MAX_PATCH_CONTEXT_CHARS // CHARS_PER_TOKEN, top_k=20, paths=paths
+            )
+            sections = [context] if context else []
+        if not sections:
+            return ""
+        return "\n\n# Current Content of Existing Files\n" + "\n\n".join(sections)
+        
+    async def _save_revision_output(
+        self,
+        project_dir: Path,
+        component_type: str,
+        response: str,
+        patch_mode: bool,
+        saver: Optional[CodeBlockSaver] = None,
+    ) -> Dict[str, Any]:
+        """Save revised files, applying patches in patch mode.
+        
+        A file whose patch does not apply is regenerated in full.
         
-        ## Infrastructure Components
-        {infrastructure_components}
+        Args:
+            project_dir: The project directory.
+            component_type: Component that new files are saved under.
+            response: The model's response.
+            patch_mode: Whether the response holds patches.
+            saver: Saver that was fed the response while it was generated.
+            
+        Returns:
+            The output of process_implementation_output.
+        """
+        output = process_implementation_output(
+            project_dir, component_type, response, patch_mode=patch_mode, saver=saver
+        )
+        if not patch_mode:
+            return output
+            
+        for failed in output["failed_patches"]:
+            file_path = await self._regenerate_file(project_dir, component_type, failed)
+            if file_path is not None:
+                output["saved_files"].append(str(file_path))
+                
+        agent_log(
+            self.name,
+            "execute",
+            f"Patched {len(output['patched_files'])} files, regenerated {len(output['failed_patches'])} in full, "
+            f"about {output['tokens_saved']} generated tokens saved"
+        )
+        return output
         
-        # Task
-        Integrate all components into a complete system by:
-        - Describing how components interact with each other
-        - Providing configuration for connecting components
-        - Documenting the system startup sequence
-        - Creating deployment instructions
-        - Including a system verification checklist
+    async def _regenerate_file(self, project_dir: Path, component_type: str, failed: Dict[str, str]) -> Optional[Path]:
+        """Ask for the complete content of a file whose patch did not apply.
         
-        Format your response as a structured integration document.
-        For any new or modified integration files, use the format:
-        ```language
-        filepath/filename.ext
-        // Integration code content
-        ```
+        Args:
+            project_dir: The project directory.
+            component_type: Component that the file is saved under if it is new.
+            failed: The failed patch, with its path, error and text.
+            
+        Returns:
+            The path of the saved file, or None if the response had no code.
         """
+        manifest = get_manifest(project_dir)
+        entry = manifest.find(failed["path"])
+        path = entry.path if entry is not None else failed["path"]
+        current = manifest.read_text(path) if entry is not None else None
+        current_content = f"\n\n# Current Content of {path}\n```\n{current}\n```" if current is not None else ""
+        
+        builder = _prompt_builder(self, REGENERATE_FILE)
+        builder.add("path", path, policy=KEEP)
+        builder.add("error", failed["error"], policy=KEEP)
+        builder.add("patch", failed["patch"])
+        builder.add("current_content", current_content)
+        prompt = builder.render()
+        response = await self._generate(prompt, prefix=builder.prefix)
+        
+        blocks = [fence for fence in parse_fences(response) if not is_patch(fence)]
+        if not blocks:
+            logger.warning(f"No complete content of {path} in the response; file left unchanged")
+            return None
+        content = extract_code_blocks(blocks[0].text)[0]["content"]
+        if entry is not None:
+            return write_output_file(project_dir / entry.path, content, project_dir, entry.component or component_type)
+        return save_code_file(project_dir, component_type, path, content)
+        
+    async def _integrate_components(self, components: Dict[str, Any], project_dir: Path, project_title: str) -> Dict[str, Any]:
+        """Integrate all components into a complete system."""
+        backend_components = components.get("backend_components", "")
+        frontend_components = components.get("frontend_components", "")
+        infrastructure_components = components.get("infrastructure_components", "")
         
-        # Get model client
-        client = self.get_model_client()
+        builder = _prompt_builder(self, INTEGRATION)
+        builder.add("backend_components", backend_components)
+        builder.add("frontend_components", frontend_components)
+        builder.add("infrastructure_components", infrastructure_components)
+        prompt = builder.render()
         
-        # Generate integration document using the model
-        response = client.generate(prompt, system_prompt=system_prompt)
+        # Generate integration document using the model, saving code blocks as they are completed
+        saver = CodeBlockSaver(project_dir, "integration")
+        response = await self._generate(
+            prompt, system_prompt=builder.system_prompt, prefix=builder.prefix, on_token=saver.feed
+        )
         
         # Save the integration document
         integration_path = project_dir / "integration.md"
-        with open(integration_path, 'w') as f:
-            f.write(response)
+        write_output_file(integration_path, response, project_dir, "integration")
         
-        # Extract and save any code blocks from the integration document
-        saved_files = save_code_blocks_from_text(project_dir, "integration", response)
+        # Save the code blocks that were not complete yet
+        saved_files = saver.close(response)
         
         # Structure the output
         integrated_system = {
@@ -1434,10 +1310,10 @@ class SoftwareEngineerAgent(Agent):
         return integrated_system
 
 
-class QAEngineerAgent(Agent):
+class QAEngineerAgent(ModelAgent):
     """Agent that tests software components and creates documentation."""
     
-    def execute(self, task_input: Any) -> Any:
+    async def aexecute(self, task_input: Any) -> Any:
         """Test software components or create documentation.
         
         Args:
@@ -1449,7 +1325,8 @@ class QAEngineerAgent(Agent):
         agent_log(
             self.name,
             "execute",
-            f"Testing or documenting system: {task_input}"
+            "Testing or documenting system: {}",
+            task_input,
         )
         
         # Get the project directory from the input
@@ -1473,14 +1350,14 @@ class QAEngineerAgent(Agent):
                 if not integrated_system:
                     # If we still don't have a meaningful value, use the whole thing
                     integrated_system = str(task_input)
-                return self._test_system(integrated_system, task_input, project_dir, project_title)
+                return await self._test_system(integrated_system, task_input, project_dir, project_title)
             elif "fixed_system" in task_input:
                 fixed_system = task_input.get("fixed_system", "")
-                return self._create_documentation(fixed_system, task_input, project_dir, project_title)
+                return await self._create_documentation(fixed_system, task_input, project_dir, project_title)
             # Handle input from engineer-1 during integration task
             elif "implementation" in task_input and task_input.get("specialty", "") == "backend":
                 integrated_system = task_input.get("implementation", "")
-                return self._test_system(integrated_system, task_input, project_dir, project_title)
+                return await self._test_system(integrated_system, task_input, project_dir, project_title)
         
         # Default error case if we get here
         agent_log(self.name, "error", "Unrecognized input format")
@@ -1507,7 +1384,7 @@ class QAEngineerAgent(Agent):
             "project_dir": str(project_dir)
         }
     
-    def _test_system(self, integrated_system: str, full_input: Dict[str, Any], project_dir: Path, project_title: str) -> Dict[str, Any]:
+    async def _test_system(self, integrated_system: str, full_input: Dict[str, Any], project_dir: Path, project_title: str) -> Dict[str, Any]:
         """Test the integrated system for bugs and issues.
         
         Args:
@@ -1525,60 +1402,26 @@ class QAEngineerAgent(Agent):
             f"Testing integrated system for {project_title}"
         )
         
-        # Create system prompt for testing
-        system_prompt = """
-        You are an expert QA Engineer responsible for testing software. Your task is to:
-        1. Analyze the integrated system to identify bugs, errors, and issues
-        2. Test for functionality, performance, edge cases, and user experience
-        3. Document each issue with clear steps to reproduce
-        4. Prioritize issues by severity and impact
-        
-        Provide a thorough test report that will help engineers fix the identified issues.
-        
-        CRITICAL: When writing test files or referencing existing files:
-        - Use precise, correct filenames that match exactly what's in the codebase
-        - Maintain consistent file extensions appropriate for the test type
-        - Follow established naming conventions for test files (e.g., 'test_*.py', '*_test.js')
-        - Ensure test files reference the correct paths to implementation files
-        - Be explicit about which file each test is targeting
-        - Place test files in appropriate test directories matching project structure
-        """
+        # A large system description is cut down to the parts most relevant
+        # to the project's requirements
+        requirements = get_manifest(project_dir).read_text("docs/requirements.md") or project_title
         
-        prompt = f"""
-        # Integrated System
-        {integrated_system}
-        
-        # Task
-        Test the integrated system by:
-        - Creating a comprehensive test plan covering all components
-        - For each component:
-          * Define test cases (including edge cases)
-          * Execute tests (simulated)
-          * Document any issues found
-        - Categorize issues by severity (critical, high, medium, low)
-        - Provide recommendations for fixing each issue
-        
-        Format your response as a structured test report.
-        Include actual test code files where appropriate, using the format:
-        ```language
-        tests/component/filename.ext
-        // Test code content
-        ```
-        """
+        builder = _prompt_builder(self, SYSTEM_TEST)
+        builder.add("system_context", integrated_system, budget=_context_budget(self), policy=SELECT, query=requirements)
+        prompt = builder.render()
         
-        # Get model client
-        client = self.get_model_client()
-        
-        # Generate test results using the model
-        response = client.generate(prompt, system_prompt=system_prompt)
+        # Generate test results using the model, saving test code as each block is completed
+        saver = CodeBlockSaver(project_dir, "tests")
+        response = await self._generate(
+            prompt, system_prompt=builder.system_prompt, prefix=builder.prefix, on_token=saver.feed
+        )
         
         # Save the test results document
         test_results_path = project_dir / "tests" / "test_results.md"
-        with open(test_results_path, 'w') as f:
-            f.write(response)
+        write_output_file(test_results_path, response, project_dir, "tests")
         
-        # Extract and save test code from the response
-        saved_test_files = save_code_blocks_from_text(project_dir, "tests", response)
+        # Save the test code that was not complete yet
+        saved_test_files = saver.close(response)
         
         # Structure the output
         test_results = {
@@ -1600,7 +1443,7 @@ class QAEngineerAgent(Agent):
         
         return test_results
     
-    def _create_documentation(self, fixed_system: str, full_input: Dict[str, Any], project_dir: Path, project_title: str) -> Dict[str, Any]:
+    async def _create_documentation(self, fixed_system: str, full_input: Dict[str, Any], project_dir: Path, project_title: str) -> Dict[str, Any]:
         """Create documentation for the system."""
         # Extract additional context if available
         backend_components = full_input.get("backend_components", "")
@@ -1609,54 +1452,18 @@ class QAEngineerAgent(Agent):
         integrated_system = full_input.get("integrated_system", "")
         test_results = full_input.get("test_results", "")
         
-        system_prompt = """
-        You are an expert Technical Documentation Specialist. Your task is to:
-        1. Review the fixed system and all available information
-        2. Create comprehensive documentation for the system
-        3. Include user guides, API documentation, and deployment instructions
-        4. Ensure the documentation is clear, complete, and well-structured
-        
-        Focus on making the documentation useful for both users and developers.
-        """
-        
-        prompt = f"""
-        # System Information
-        
-        ## Fixed System
-        {fixed_system}
-        
-        ## Backend Components
-        {backend_components}
-        
-        ## Frontend Components
-        {frontend_components}
-        
-        ## Infrastructure Components
-        {infrastructure_components}
-        
-        ## Integrated System
-        {integrated_system}
-        
-        ## Test Results
-        {test_results}
-        
-        # Task
-        Create comprehensive documentation including:
-        - Overview and system architecture
-        - User guide (installation, configuration, usage)
-        - API documentation (endpoints, request/response formats)
-        - Developer guide (codebase structure, contributing guidelines)
-        - Deployment instructions
-        - Troubleshooting guide
-        
-        Format your response as a structured documentation set.
-        """
-        
-        # Get model client
-        client = self.get_model_client()
+        # Long inputs are cut to fit the model's context window
+        builder = _prompt_builder(self, DOCUMENTATION)
+        builder.add("fixed_system", fixed_system)
+        builder.add("backend_components", backend_components)
+        builder.add("frontend_components", frontend_components)
+        builder.add("infrastructure_components", infrastructure_components)
+        builder.add("integrated_system", integrated_system)
+        builder.add("test_results", test_results)
+        prompt = builder.render()
         
         # Generate documentation using the model
-        response = client.generate(prompt, system_prompt=system_prompt)
+        response = await self._generate(prompt, system_prompt=builder.system_prompt, prefix=builder.prefix)
         
         # Split the documentation into separate files for different sections
         sections = [
@@ -1686,14 +1493,12 @@ class QAEngineerAgent(Agent):
         
         # Save the full documentation
         full_doc_path = project_dir / "docs" / "full_documentation.md"
-        with open(full_doc_path, 'w') as f:
-            f.write(response)
+        write_output_file(full_doc_path, response, project_dir, "docs")
         saved_docs.append(str(full_doc_path))
         
         # Save the README
         readme_path = project_dir / "README.md"
-        with open(readme_path, 'w') as f:
-            f.write(readme_content)
+        write_output_file(readme_path, readme_content, project_dir, "docs")
         saved_docs.append(str(readme_path))
         
         # Structure the output
@@ -1717,10 +1522,10 @@ class QAEngineerAgent(Agent):
         return documentation
 
 
-class ReviewerAgent(Agent):
+class ReviewerAgent(ModelAgent):
     """Agent that reviews and evaluates the final project."""
     
-    def execute(self, task_input: Any) -> Any:
+    async def aexecute(self, task_input: Any) -> Any:
         """Review the project against initial requirements.
         
         Args:
@@ -1732,7 +1537,8 @@ class ReviewerAgent(Agent):
         agent_log(
             self.name,
             "execute",
-            f"Reviewing project: {str(task_input)}"
+            "Reviewing project: {}",
+            task_input,
         )
         
         # Get the project directory from the input
@@ -1748,13 +1554,13 @@ class ReviewerAgent(Agent):
         # Determine if this is initial review or final approval
         if "documentation" in task_input:
             documentation = task_input.get("documentation", "")
-            return self._review_project(documentation, task_input, project_dir, project_title)
+            return await self._review_project(documentation, task_input, project_dir, project_title)
         elif "revised_system" in task_input:
             revised_system = task_input.get("revised_system", "")
-            return self._final_approval(revised_system, task_input, project_dir, project_title)
+            return await self._final_approval(revised_system, task_input, project_dir, project_title)
         elif "integrated_fixes" in task_input:
             integrated_fixes = task_input.get("integrated_fixes", "")
-            return self._final_approval(integrated_fixes, task_input, project_dir, project_title)
+            return await self._final_approval(integrated_fixes, task_input, project_dir, project_title)
         else:
             agent_log(self.name, "error", "Unrecognized input format")
             return {
@@ -1763,7 +1569,7 @@ class ReviewerAgent(Agent):
                 "input_keys": list(task_input.keys())
             }
     
-    def _review_project(self, documentation: str, full_input: Dict[str, Any], project_dir: Path, project_title: str) -> Dict[str, Any]:
+    async def _review_project(self, documentation: str, full_input: Dict[str, Any], project_dir: Path, project_title: str) -> Dict[str, Any]:
         """Review the project against initial requirements."""
         # Try to find original requirements from the task chain
         original_requirements = ""
@@ -1772,45 +1578,17 @@ class ReviewerAgent(Agent):
                 original_requirements = full_input[key]
                 break
         
-        system_prompt = """
-        You are an expert Project Reviewer. Your task is to:
-        1. Review the project documentation against the initial requirements
-        2. Evaluate the project's completeness, quality, and adherence to requirements
-        3. Identify any gaps, issues, or areas for improvement
-        4. Provide a detailed assessment of the project
-        
-        Focus on being thorough and critical to ensure the project meets all requirements.
-        """
-        
-        prompt = f"""
-        # Project Documentation
-        {documentation}
-        
-        # Original Requirements
-        {original_requirements}
-        
-        # Task
-        Review the project by:
-        - Assessing how well it meets each original requirement
-        - Evaluating the overall architecture and implementation quality
-        - Identifying any gaps or missing features
-        - Noting any potential issues or concerns
-        - Suggesting improvements or enhancements
-        - Providing an overall assessment (acceptable, needs minor revisions, needs major revisions)
-        
-        Format your response as a structured review document.
-        """
-        
-        # Get model client
-        client = self.get_model_client()
+        builder = _prompt_builder(self, PROJECT_REVIEW)
+        builder.add("original_requirements", original_requirements)
+        builder.add("documentation", documentation)
+        prompt = builder.render()
         
         # Generate review using the model
-        response = client.generate(prompt, system_prompt=system_prompt)
+        response = await self._generate(prompt, system_prompt=builder.system_prompt, prefix=builder.prefix)
         
         # Save the review document
         review_path = project_dir / "docs" / "project_review.md"
-        with open(review_path, 'w') as f:
-            f.write(response)
+        write_output_file(review_path, response, project_dir, "docs")
         
         # Structure the output
         review = {
@@ -1832,7 +1610,7 @@ class ReviewerAgent(Agent):
         
         return review
     
-    def _final_approval(self, revised_system: str, full_input: Dict[str, Any], project_dir: Path, project_title: str) -> Dict[str, Any]:
+    async def _final_approval(self, revised_system: str, full_input: Dict[str, Any], project_dir: Path, project_title: str) -> Dict[str, Any]:
         """Final review of the project after revisions."""
         # Try to find original requirements and previous review
         original_requirements = ""
@@ -1843,47 +1621,18 @@ class ReviewerAgent(Agent):
             elif key == "project_review":
                 project_review = full_input[key]
         
-        system_prompt = """
-        You are an expert Project Reviewer conducting a final assessment. Your task is to:
-        1. Review the revised system against the original project review feedback
-        2. Determine if all issues and gaps have been addressed
-        3. Make a final approval decision on the project
-        4. Provide a detailed assessment of the final state
-        
-        Focus on determining if the project now meets all requirements and is ready for delivery.
-        """
-        
-        prompt = f"""
-        # Revised System
-        {revised_system}
-        
-        # Original Project Review
-        {project_review}
-        
-        # Original Requirements
-        {original_requirements}
-        
-        # Task
-        Conduct a final review by:
-        - Assessing how well the revisions address previous feedback
-        - Verifying that all identified issues have been resolved
-        - Evaluating if the project now meets all requirements
-        - Making a final approval decision (approved, conditionally approved, rejected)
-        - Providing a detailed justification for your decision
-        
-        Format your response as a structured final approval document.
-        """
-        
-        # Get model client
-        client = self.get_model_client()
+        builder = _prompt_builder(self, FINAL_APPROVAL)
+        builder.add("original_requirements", original_requirements)
+        builder.add("project_review", project_review)
+        builder.add("revised_system", revised_system)
+        prompt = builder.render()
         
         # Generate final approval using the model
-        response = client.generate(prompt, system_prompt=system_prompt)
+        response = await self._generate(prompt, system_prompt=builder.system_prompt, prefix=builder.prefix)
         
         # Save the final approval document
         approval_path = project_dir / "docs" / "final_approval.md"
-        with open(approval_path, 'w') as f:
-            f.write(response)
+        write_output_file(approval_path, response, project_dir, "docs")
         
         # Structure the output
         final_approval = {
@@ -1,8 +1,9 @@
 """Task implementation for MiMi."""
 
 import sys
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 # Add vendor directory to path to find pydantic
 vendor_path = Path(__file__).parent.parent / "vendor"
@@ -11,7 +12,26 @@ if vendor_path.exists() and str(vendor_path) not in sys.path:
 
 from pydantic import BaseModel, Field
 
+from mimi.core.artifacts import IncrementalCache
+from mimi.core.blackboard import Blackboard
+from mimi.core.context import RunContext
+from mimi.models.metrics import generation_labels
 from mimi.utils.logger import logger, task_log
+from mimi.utils.manifest import capture_files
+from mimi.utils.tracing import span
+
+
+@contextmanager
+def _agent_scope(agent: Any, task_name: str) -> Iterator[None]:
+    """Trace an agent's execution of a task and attribute its model calls to both."""
+    agent_name = getattr(agent, "name", None)
+    with span(
+        "agent.execute",
+        agent=agent_name,
+        role=getattr(agent, "role", None),
+        model=getattr(agent, "model_name", None),
+    ), generation_labels(agent=agent_name, task=task_name):
+        yield
 
 
 def _clean_verification_results(data: Any) -> Any:
@@ -106,16 +126,105 @@ class Task(BaseModel):
         default_factory=list, description="Names of tasks this task depends on"
     )
 
-    def execute(self, agent_lookup: Dict[str, Any], input_data: Any) -> Any:
+    def execute(
+        self,
+        agent_lookup: Dict[str, Any],
+        input_data: Any,
+        incremental: Optional[IncrementalCache] = None,
+        context: Optional[RunContext] = None,
+    ) -> Any:
         """Execute the task using the specified agent.
         
         Args:
             agent_lookup: Dictionary mapping agent names to agent objects.
             input_data: Input data for the task.
+            incremental: Optional per-run artifact cache; when given, the
+                agent only runs if no result is stored for the task's
+                fingerprint, otherwise the stored result is reused and the
+                files the task wrote are restored.
+            context: Optional run context, made current while the agent
+                runs; by default the agent sees the caller's context.
+            
+        Returns:
+            The output from the task execution.
+            
+        Raises:
+            ValueError: If the specified agent is not found.
+        """
+        agent, input_data, task_input = self._prepare(agent_lookup, input_data)
+        
+        # Reuse the stored result, and the files the task wrote, if nothing
+        # this task depends on has changed
+        fingerprint, artifact = (
+            incremental.lookup(self, agent, task_input) if incremental else (None, None)
+        )
+        with context.activate() if context is not None else nullcontext():
+            if artifact is not None:
+                result = incremental.restore(self, agent, artifact)
+            else:
+                # Execute the task with the agent
+                with _agent_scope(agent, self.name), capture_files() as files:
+                    result = agent.execute(task_input)
+                if incremental:
+                    incremental.record(self, fingerprint, result, files)
+                    
+        return self._finish(agent, input_data, result)
+        
+    async def aexecute(
+        self,
+        agent_lookup: Dict[str, Any],
+        input_data: Any,
+        incremental: Optional[IncrementalCache] = None,
+        context: Optional[RunContext] = None,
+    ) -> Any:
+        """Execute the task using the specified agent on the running event loop.
+        
+        Args:
+            agent_lookup: Dictionary mapping agent names to agent objects.
+            input_data: Input data for the task.
+            incremental: Optional per-run artifact cache; when given, the
+                agent only runs if no result is stored for the task's
+                fingerprint, otherwise the stored result is reused and the
+                files the task wrote are restored.
+            context: Optional run context, made current while the agent
+                runs; by default the agent sees the caller's context.
             
         Returns:
             The output from the task execution.
             
+        Raises:
+            ValueError: If the specified agent is not found.
+        """
+        agent, input_data, task_input = self._prepare(agent_lookup, input_data)
+        
+        # Reuse the stored result, and the files the task wrote, if nothing
+        # this task depends on has changed
+        fingerprint, artifact = (
+            incremental.lookup(self, agent, task_input) if incremental else (None, None)
+        )
+        with context.activate() if context is not None else nullcontext():
+            if artifact is not None:
+                result = incremental.restore(self, agent, artifact)
+            else:
+                # Execute the task with the agent
+                with _agent_scope(agent, self.name), capture_files() as files:
+                    result = await agent.aexecute(task_input)
+                if incremental:
+                    incremental.record(self, fingerprint, result, files)
+                    
+        return self._finish(agent, input_data, result)
+        
+    def _prepare(self, agent_lookup: Dict[str, Any], input_data: Any) -> Tuple[Any, Any, Any]:
+        """Resolve the agent and extract the input it should receive.
+        
+        Args:
+            agent_lookup: Dictionary mapping agent names to agent objects.
+            input_data: Input data for the task.
+            
+        Returns:
+            A tuple of the agent, the (possibly cleaned) input data and the
+            input for the agent.
+            
         Raises:
             ValueError: If the specified agent is not found.
         """
@@ -136,16 +245,13 @@ class Task(BaseModel):
         # For Analyst and FeedbackProcessor agents, clean input data first
         # to prevent them from processing old results
         if agent.__class__.__name__ in ["AnalystAgent", "FeedbackProcessorAgent"]:
-            if isinstance(input_data, dict):
-                task_log(
-                    self.name,
-                    "processing",
-                    "Cleaning input data for verification/feedback agent",
-                )
-                input_data = _clean_verification_results(input_data)
+            if isinstance(input_data, Blackboard):
+                input_data = Blackboard(self._clean_input(input_data.to_dict()))
+            elif isinstance(input_data, dict):
+                input_data = self._clean_input(input_data)
         
         # Extract the specific input if input_key is provided
-        if self.input_key and isinstance(input_data, dict):
+        if self.input_key and isinstance(input_data, (dict, Blackboard)):
             if self.input_key in input_data:
                 task_input = input_data[self.input_key]
                 task_log(
@@ -160,10 +266,40 @@ class Task(BaseModel):
                 task_input = input_data
         else:
             task_input = input_data
+            
+        # Agents get a private dict they can modify; the blackboard stays shared
+        if isinstance(task_input, Blackboard):
+            task_input = task_input.to_dict()
+            
+        return agent, input_data, task_input
         
-        # Execute the task with the agent
-        result = agent.execute(task_input)
+    def _clean_input(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Clean the input of a verification or feedback agent.
         
+        Args:
+            input_data: The input data.
+            
+        Returns:
+            The cleaned input data.
+        """
+        task_log(
+            self.name,
+            "processing",
+            "Cleaning input data for verification/feedback agent",
+        )
+        return _clean_verification_results(input_data)
+        
+    def _finish(self, agent: Any, input_data: Any, result: Any) -> Any:
+        """Clean the agent's result and store it under ``output_key``.
+        
+        Args:
+            agent: The agent that produced the result.
+            input_data: The input data the task was executed with.
+            result: The agent's result.
+            
+        Returns:
+            The output from the task execution.
+        """
         # Apply cleaning based on agent type
         if agent.__class__.__name__ in ["AnalystAgent", "FeedbackProcessorAgent"] and isinstance(result, dict):
             result = _clean_verification_results(result)
@@ -173,10 +309,14 @@ class Task(BaseModel):
                 f"Cleaned {agent.__class__.__name__} results to prevent data accumulation",
             )
         
-        # Store the result under output_key if specified
-        if self.output_key and isinstance(input_data, dict):
-            output_data = input_data.copy()
-            output_data[self.output_key] = result
+        # Store the result under output_key if specified. A blackboard only
+        # gains a layer holding the new key; a plain dict is copied
+        if self.output_key and isinstance(input_data, (dict, Blackboard)):
+            if isinstance(input_data, Blackboard):
+                output_data = input_data.set(self.output_key, result)
+            else:
+                output_data = input_data.copy()
+                output_data[self.output_key] = result
             task_log(
                 self.name,
                 "completed",
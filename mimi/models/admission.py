@@ -0,0 +1,355 @@
+"""Admission control for model calls in MiMi."""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional, Tuple
+
+from mimi.utils.logger import logger
+
+
+class AdmissionError(Exception):
+    """Exception raised when a model call is not admitted."""
+
+    pass
+
+
+def _env_limit() -> Optional[int]:
+    """Read the default concurrency limit from ``OLLAMA_NUM_PARALLEL``."""
+    value = os.environ.get("OLLAMA_NUM_PARALLEL", "")
+    try:
+        return int(value) if int(value) > 0 else None
+    except ValueError:
+        return None
+
+
+# Defaults for limiters without explicit model_settings; see configure_admission
+_defaults: Dict[str, Any] = {
+    "max_concurrency": _env_limit(),
+    "max_queue": None,
+    "queue_timeout": None,
+}
+
+# Limiters keyed by (base URL, model name)
+_limiters: Dict[Tuple[str, str], "ModelLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+
+class _Waiter:
+    """A caller waiting in a limiter's queue."""
+
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+        self.granted = False
+        
+    def wake(self) -> None:
+        """Tell the waiter it holds a slot; called with the limiter lock held."""
+        self.granted = True
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    """Complete a waiter's future unless it was cancelled."""
+    if not future.done():
+        future.set_result(None)
+
+
+class ModelLimiter:
+    """Concurrency limit with a bounded FIFO wait queue for one model endpoint.
+
+    At most ``max_concurrency`` calls hold a slot at a time. Further callers
+    wait in arrival order; when ``max_queue`` callers are already waiting, new
+    callers are rejected right away instead of piling up behind a saturated
+    server. The limiter works from threads and from asyncio code at the same
+    time, so sync and async clients for the same model share one limit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ) -> None:
+        """Initialize the limiter.
+        
+        Args:
+            name: Name used in logs and metrics.
+            max_concurrency: Maximum number of calls in flight.
+            max_queue: Maximum number of waiting callers, or None for no limit.
+            queue_timeout: Maximum seconds to wait for a slot, or None to wait
+                indefinitely.
+        """
+        self.name = name
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+        
+    def configure(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ) -> None:
+        """Change the limits; arguments left as None keep their value.
+        
+        Args:
+            max_concurrency: Maximum number of calls in flight.
+            max_queue: Maximum number of waiting callers.
+            queue_timeout: Maximum seconds to wait for a slot.
+        """
+        with self._lock:
+            if max_concurrency is not None:
+                self.max_concurrency = max(1, int(max_concurrency))
+            if max_queue is not None:
+                self.max_queue = max_queue
+            if queue_timeout is not None:
+                self.queue_timeout = queue_timeout
+            self._wake_waiters()
+            
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers waiting for a slot."""
+        return len(self._waiters)
+        
+    def acquire(self) -> None:
+        """Take a slot, blocking the calling thread until one is free.
+        
+        Raises:
+            AdmissionError: If the queue is full or the wait times out.
+        """
+        started = time.perf_counter()
+        waiter = self._enqueue(None)
+        if waiter is not None and not waiter.event.wait(self.queue_timeout):
+            self._abandon(waiter, started)
+        self._record_admission(started)
+        
+    async def aacquire(self) -> None:
+        """Take a slot, waiting without blocking the event loop.
+        
+        Raises:
+            AdmissionError: If the queue is full or the wait times out.
+        """
+        started = time.perf_counter()
+        waiter = self._enqueue(asyncio.get_running_loop())
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._abandon(waiter, started)
+            except asyncio.CancelledError:
+                with self._lock:
+                    granted = waiter.granted
+                    if not granted:
+                        self._waiters.remove(waiter)
+                if granted:
+                    self.release()
+                raise
+        self._record_admission(started)
+        
+    def release(self) -> None:
+        """Give back a slot, handing it to the longest waiting caller."""
+        with self._lock:
+            self.in_flight -= 1
+            self._wake_waiters()
+            
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot for the duration of a ``with`` block."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+            
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of an ``async with`` block."""
+        await self.aacquire()
+        try:
+            yield
+        finally:
+            self.release()
+            
+    def stats(self) -> Dict[str, Any]:
+        """Get the limiter's metrics.
+        
+        Returns:
+            Limits, current load, and admission and wait time counters.
+        """
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._waiters),
+                "max_queue_depth": self.max_queue_depth,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_wait": self.total_wait / self.admitted if self.admitted else 0.0,
+                "max_wait": self.max_wait,
+            }
+            
+    def _enqueue(self, loop: Optional[asyncio.AbstractEventLoop]) -> Optional[_Waiter]:
+        """Take a free slot, or join the queue.
+        
+        Returns:
+            None if a slot was taken right away, otherwise the queued waiter.
+        """
+        with self._lock:
+            if self.in_flight < self.max_concurrency and not self._waiters:
+                self.in_flight += 1
+                return None
+                
+            if self.max_queue is not None and len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                raise AdmissionError(
+                    f"Too many requests waiting for {self.name} "
+                    f"({len(self._waiters)} queued, {self.in_flight} in flight)"
+                )
+                
+            waiter = _Waiter(loop)
+            self._waiters.append(waiter)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+            return waiter
+            
+    def _abandon(self, waiter: _Waiter, started: float) -> None:
+        """Leave the queue after a timeout, unless a slot arrived meanwhile.
+        
+        Raises:
+            AdmissionError: If the waiter did not get a slot.
+        """
+        with self._lock:
+            if waiter.granted:
+                return
+            self._waiters.remove(waiter)
+            self.timed_out += 1
+            
+        waited = time.perf_counter() - started
+        raise AdmissionError(f"Timed out after {waited:.1f}s waiting for {self.name}")
+        
+    def _record_admission(self, started: float) -> None:
+        """Update the wait time metrics for an admitted call."""
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.admitted += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            
+        if waited >= 1.0:
+            logger.debug(f"Waited {waited:.1f}s for a slot on {self.name}")
+            
+    def _wake_waiters(self) -> None:
+        """Hand free slots to waiters in arrival order; needs the lock held."""
+        while self._waiters and self.in_flight < self.max_concurrency:
+            self.in_flight += 1
+            self._waiters.popleft().wake()
+
+
+def configure_admission(
+    max_concurrency: Optional[int] = None,
+    max_queue: Optional[int] = None,
+    queue_timeout: Optional[float] = None,
+) -> None:
+    """Set the limits for model endpoints without their own ``model_settings``.
+    
+    By default the concurrency limit is read from ``OLLAMA_NUM_PARALLEL`` and
+    calls are not limited when it is unset.
+    
+    Limiters that already exist keep their limits.
+    
+    Args:
+        max_concurrency: Maximum number of calls in flight per model, or None
+            for no limit.
+        max_queue: Maximum number of calls waiting per model, or None for no
+            limit.
+        queue_timeout: Maximum seconds a call waits for a slot, or None to
+            wait indefinitely.
+    """
+    with _limiters_lock:
+        _defaults.update(
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            queue_timeout=queue_timeout,
+        )
+
+
+def get_limiter(
+    base_url: str,
+    model_name: str,
+    max_concurrency: Optional[int] = None,
+    max_queue: Optional[int] = None,
+    queue_timeout: Optional[float] = None,
+) -> Optional[ModelLimiter]:
+    """Get the shared limiter for a model on a server.
+    
+    All clients for the same base URL and model share one limiter. Explicit
+    limits update it; omitted limits fall back to :func:`configure_admission`.
+    
+    Args:
+        base_url: Base URL of the model server.
+        model_name: Name of the model.
+        max_concurrency: Optional maximum number of calls in flight.
+        max_queue: Optional maximum number of waiting calls.
+        queue_timeout: Optional maximum seconds to wait for a slot.
+        
+    Returns:
+        The limiter, or None if the model has no concurrency limit.
+    """
+    key = (base_url.rstrip("/"), model_name)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limit = max_concurrency if max_concurrency is not None else _defaults["max_concurrency"]
+            if not limit:
+                return None
+                
+            limiter = ModelLimiter(
+                f"{model_name} at {key[0]}",
+                limit,
+                max_queue if max_queue is not None else _defaults["max_queue"],
+                queue_timeout if queue_timeout is not None else _defaults["queue_timeout"],
+            )
+            _limiters[key] = limiter
+            logger.debug(f"Limiting {limiter.name} to {limiter.max_concurrency} concurrent calls")
+            return limiter
+            
+    if max_concurrency is not None or max_queue is not None or queue_timeout is not None:
+        limiter.configure(max_concurrency, max_queue, queue_timeout)
+    return limiter
+
+
+def admission_stats() -> Dict[str, Dict[str, Any]]:
+    """Get the metrics of every limiter.
+    
+    Returns:
+        Mapping of ``"<model> at <base_url>"`` to the limiter's metrics.
+    """
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+
+def clear_limiters() -> None:
+    """Forget all limiters; calls already holding a slot release it harmlessly."""
+    with _limiters_lock:
+        _limiters.clear()
@@ -0,0 +1,249 @@
+"""On-disk cache for model responses in MiMi."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from mimi.utils.logger import logger
+
+# Default location of the response cache
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "mimi" / "responses"
+
+# Default size cap of the response cache
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Shared caches keyed by resolved directory
+_caches: Dict[str, "ResponseCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def make_cache_key(
+    model: str,
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    options: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Build the content address of a generate request.
+    
+    Args:
+        model: Name of the model.
+        prompt: The user prompt.
+        system_prompt: Optional system prompt.
+        options: Sampling options that affect the output.
+        
+    Returns:
+        A hex SHA-256 digest identifying the request.
+    """
+    canonical = json.dumps(
+        {
+            "model": model,
+            "system": system_prompt or "",
+            "prompt": prompt,
+            "options": options or {},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Content-addressed store of model responses on disk.
+
+    Each response is written to its own JSON file named after the request's
+    hash. Entries are evicted least recently used first once the total size
+    exceeds ``max_bytes``, and are treated as missing once they are older
+    than ``ttl`` seconds. Last-use times are kept in file modification
+    times, so recency survives across runs.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Initialize the cache.
+        
+        Args:
+            directory: Directory holding the cache entries.
+            max_bytes: Maximum total size of the entries in bytes.
+            ttl: Optional maximum age of an entry in seconds.
+        """
+        self.directory = Path(directory).expanduser()
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, Tuple[int, float]]"] = None
+        self._total_bytes = 0
+        
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached response.
+        
+        Args:
+            key: The request's cache key.
+            
+        Returns:
+            The cached response, or None on a miss.
+        """
+        with self._lock:
+            index = self._load_index()
+            path = self._path(key)
+            entry = None
+            if key in index:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        entry = json.load(f)
+                    response = entry["response"]
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Dropping unreadable cache entry {key}: {str(e)}")
+                    self._remove(key)
+                    entry = None
+                    
+            if entry is not None and self.ttl is not None:
+                if time.time() - float(entry.get("created", 0)) > self.ttl:
+                    self._remove(key)
+                    entry = None
+                    
+            if entry is not None:
+                now = time.time()
+                os.utime(path, (now, now))
+                index[key] = (index[key][0], now)
+                index.move_to_end(key)
+                self.hits += 1
+                logger.debug(f"Response cache hit for {key[:12]}")
+                return response
+                
+            self.misses += 1
+            logger.debug(f"Response cache miss for {key[:12]}")
+            return None
+            
+    def put(self, key: str, response: str, model: Optional[str] = None) -> None:
+        """Store a response.
+        
+        Args:
+            key: The request's cache key.
+            response: The response text.
+            model: Optional model name, stored for inspection.
+        """
+        payload = json.dumps(
+            {"response": response, "model": model, "created": time.time()},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        
+        with self._lock:
+            index = self._load_index()
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Write to a temporary file first so readers never see a partial entry
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            
+            if key in index:
+                self._total_bytes -= index.pop(key)[0]
+            index[key] = (len(payload), time.time())
+            self._total_bytes += len(payload)
+            self._evict()
+            
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            for key in list(self._load_index()):
+                self._remove(key)
+                
+    def stats(self) -> Dict[str, int]:
+        """Get the cache counters.
+        
+        Returns:
+            Hits, misses, evictions, and the current number and size of entries.
+        """
+        with self._lock:
+            index = self._load_index()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(index),
+                "bytes": self._total_bytes,
+            }
+            
+    def _path(self, key: str) -> Path:
+        """Get the file holding an entry."""
+        return self.directory / key[:2] / f"{key}.json"
+        
+    def _load_index(self) -> "OrderedDict[str, Tuple[int, float]]":
+        """Scan the directory once and order the entries by last use."""
+        if self._index is None:
+            entries = []
+            if self.directory.exists():
+                for path in self.directory.glob("*/*.json"):
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, path.stem, stat.st_size))
+            entries.sort()
+            self._index = OrderedDict((key, (size, mtime)) for mtime, key, size in entries)
+            self._total_bytes = sum(size for size, _ in self._index.values())
+            
+        return self._index
+        
+    def _remove(self, key: str) -> None:
+        """Delete an entry from disk and from the index."""
+        entry = self._index.pop(key, None) if self._index is not None else None
+        if entry is not None:
+            self._total_bytes -= entry[0]
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+            
+    def _evict(self) -> None:
+        """Evict least recently used entries until the cache fits its cap."""
+        index = self._load_index()
+        while self._total_bytes > self.max_bytes and len(index) > 1:
+            key = next(iter(index))
+            self._remove(key)
+            self.evictions += 1
+            logger.debug(f"Evicted response cache entry {key[:12]}")
+
+
+def get_response_cache(
+    directory: Union[str, Path] = DEFAULT_CACHE_DIR,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    ttl: Optional[float] = None,
+) -> ResponseCache:
+    """Get the shared response cache for a directory.
+    
+    Agents that point at the same directory share one cache, and therefore
+    one index and one set of counters. Size and TTL are fixed by the first
+    caller for a given directory.
+    
+    Args:
+        directory: Directory holding the cache entries.
+        max_bytes: Maximum total size of the entries in bytes.
+        ttl: Optional maximum age of an entry in seconds.
+        
+    Returns:
+        The shared cache.
+    """
+    key = str(Path(directory).expanduser().resolve())
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = ResponseCache(directory, max_bytes=max_bytes, ttl=ttl)
+            _caches[key] = cache
+            
+        return cache
@@ -0,0 +1,406 @@
+"""Server-side timing and token metrics for model calls in MiMi."""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from mimi.utils.logger import logger
+
+# Dimensions that generation_stats can group by
+STAT_DIMENSIONS = ("model", "agent", "task")
+
+# Label used for calls made outside an agent or task
+UNLABELLED = "-"
+
+# Agent and task that model calls in the current thread or asyncio task belong to
+_labels: ContextVar[Tuple[Optional[str], Optional[str]]] = ContextVar(
+    "mimi_generation_labels", default=(None, None)
+)
+
+# Static prompt prefix of the model calls in the current context: its hash,
+# estimated tokens and the estimated tokens of the whole prompt
+_prefix: ContextVar[Optional[Tuple[str, int, int]]] = ContextVar("mimi_prompt_prefix", default=None)
+
+# Totals keyed by (model, agent, task)
+_stats: Dict[Tuple[str, str, str], "GenerationStats"] = {}
+_stats_lock = threading.Lock()
+
+# Prompt prefix totals keyed by (agent, prefix hash); guarded by _stats_lock
+_prefix_stats: Dict[Tuple[str, str], "PrefixStats"] = {}
+
+
+def _seconds(nanoseconds: int) -> float:
+    """Convert an Ollama duration in nanoseconds to seconds."""
+    return nanoseconds / 1e9
+
+
+def _rate(tokens: int, nanoseconds: int) -> Optional[float]:
+    """Get tokens per second, or None if no time was measured."""
+    return tokens / _seconds(nanoseconds) if nanoseconds > 0 else None
+
+
+class GenerationResult:
+    """The text of a generate call with the timings Ollama reported for it.
+
+    Durations are in nanoseconds, as Ollama reports them. The prompt is
+    processed in the prefill phase (``prompt_eval_*``) and the response is
+    produced in the decode phase (``eval_*``); ``load_duration`` is the time
+    spent loading the model before either. Responses served from the cache
+    have ``cached`` set and no timings. ``complete`` is False for text that
+    did not come from a finished, well-formed response, such as a cancelled
+    stream; it is not cached.
+    """
+
+    __slots__ = (
+        "text", "model", "cached", "complete", "total_duration", "load_duration",
+        "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        model: str,
+        cached: bool = False,
+        total_duration: int = 0,
+        load_duration: int = 0,
+        prompt_eval_count: int = 0,
+        prompt_eval_duration: int = 0,
+        eval_count: int = 0,
+        eval_duration: int = 0,
+        complete: bool = True,
+    ) -> None:
+        """Initialize the result.
+        
+        Args:
+            text: The generated text.
+            model: Name of the model.
+            cached: Whether the text came from the response cache.
+            total_duration: Time the server spent on the request.
+            load_duration: Time spent loading the model.
+            prompt_eval_count: Number of prompt tokens evaluated.
+            prompt_eval_duration: Time spent evaluating the prompt.
+            eval_count: Number of tokens generated.
+            eval_duration: Time spent generating tokens.
+            complete: Whether the text is a whole, well-formed response.
+        """
+        self.text = text
+        self.model = model
+        self.cached = cached
+        self.total_duration = total_duration
+        self.load_duration = load_duration
+        self.prompt_eval_count = prompt_eval_count
+        self.prompt_eval_duration = prompt_eval_duration
+        self.eval_count = eval_count
+        self.eval_duration = eval_duration
+        self.complete = complete
+        
+    @classmethod
+    def from_response(cls, body: Dict[str, Any], model: str, text: Optional[str] = None) -> "GenerationResult":
+        """Build a result from the final object of a generate response.
+        
+        Args:
+            body: The parsed response, or the last chunk of a stream.
+            model: Name of the model.
+            text: The generated text; taken from ``body`` if omitted.
+            
+        Returns:
+            The result; missing timings are zero.
+        """
+        def count(key: str) -> int:
+            value = body.get(key)
+            return int(value) if isinstance(value, (int, float)) else 0
+            
+        return cls(
+            text=body.get("response", "") if text is None else text,
+            model=model,
+            total_duration=count("total_duration"),
+            load_duration=count("load_duration"),
+            prompt_eval_count=count("prompt_eval_count"),
+            prompt_eval_duration=count("prompt_eval_duration"),
+            eval_count=count("eval_count"),
+            eval_duration=count("eval_duration"),
+        )
+        
+    @property
+    def total_seconds(self) -> float:
+        """Time the server spent on the request."""
+        return _seconds(self.total_duration)
+        
+    @property
+    def load_seconds(self) -> float:
+        """Time spent loading the model."""
+        return _seconds(self.load_duration)
+        
+    @property
+    def prefill_seconds(self) -> float:
+        """Time spent evaluating the prompt."""
+        return _seconds(self.prompt_eval_duration)
+        
+    @property
+    def decode_seconds(self) -> float:
+        """Time spent generating tokens."""
+        return _seconds(self.eval_duration)
+        
+    @property
+    def prefill_tokens_per_second(self) -> Optional[float]:
+        """Prompt tokens evaluated per second, or None if not measured."""
+        return _rate(self.prompt_eval_count, self.prompt_eval_duration)
+        
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Tokens generated per second, or None if not measured."""
+        return _rate(self.eval_count, self.eval_duration)
+        
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the metrics of the call, without the text.
+        
+        Returns:
+            Token counts, durations in seconds and derived rates.
+        """
+        return {
+            "model": self.model,
+            "cached": self.cached,
+            "prompt_tokens": self.prompt_eval_count,
+            "completion_tokens": self.eval_count,
+            "total_seconds": self.total_seconds,
+            "load_seconds": self.load_seconds,
+            "prefill_seconds": self.prefill_seconds,
+            "decode_seconds": self.decode_seconds,
+            "prefill_tokens_per_second": self.prefill_tokens_per_second,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+
+class GenerationStats:
+    """Running totals of generate calls."""
+
+    def __init__(self) -> None:
+        """Initialize empty totals."""
+        self.calls = 0
+        self.cached_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_duration = 0
+        self.load_duration = 0
+        self.prompt_eval_duration = 0
+        self.eval_duration = 0
+        
+    def add(self, result: GenerationResult) -> None:
+        """Add a call to the totals.
+        
+        Args:
+            result: The result of the call.
+        """
+        self.calls += 1
+        self.cached_calls += int(result.cached)
+        self.prompt_tokens += result.prompt_eval_count
+        self.completion_tokens += result.eval_count
+        self.total_duration += result.total_duration
+        self.load_duration += result.load_duration
+        self.prompt_eval_duration += result.prompt_eval_duration
+        self.eval_duration += result.eval_duration
+        
+    def merge(self, other: "GenerationStats") -> None:
+        """Add another set of totals to these.
+        
+        Args:
+            other: The totals to add.
+        """
+        for key, value in vars(other).items():
+            setattr(self, key, getattr(self, key) + value)
+            
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the totals with derived rates.
+        
+        Returns:
+            Call and token counts, durations in seconds, prefill and decode
+            tokens per second, and the share of server time spent loading
+            the model.
+        """
+        return {
+            "calls": self.calls,
+            "cached_calls": self.cached_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_seconds": _seconds(self.total_duration),
+            "load_seconds": _seconds(self.load_duration),
+            "prefill_seconds": _seconds(self.prompt_eval_duration),
+            "decode_seconds": _seconds(self.eval_duration),
+            "prefill_tokens_per_second": _rate(self.prompt_tokens, self.prompt_eval_duration),
+            "tokens_per_second": _rate(self.completion_tokens, self.eval_duration),
+            "load_share": self.load_duration / self.total_duration if self.total_duration else 0.0,
+        }
+
+
+class PrefixStats:
+    """Running totals of the model calls that share a static prompt prefix.
+
+    Ollama reports in ``prompt_eval_count`` only the prompt tokens it had to
+    evaluate, so a call whose count is well below the estimated prompt size
+    reused the KV cache of the prefix. Token estimates are approximate, so a
+    call counts as a likely cache hit when at least half of the prefix was
+    not evaluated.
+    """
+
+    def __init__(self, prefix_tokens: int) -> None:
+        """Initialize empty totals.
+        
+        Args:
+            prefix_tokens: Estimated tokens of the prefix.
+        """
+        self.prefix_tokens = prefix_tokens
+        self.calls = 0
+        self.likely_cache_hits = 0
+        self.estimated_prompt_tokens = 0
+        self.prompt_eval_count = 0
+        self.prompt_eval_duration = 0
+        
+    def add(self, result: GenerationResult, prompt_tokens: int) -> None:
+        """Add a call to the totals.
+        
+        Args:
+            result: The result of the call.
+            prompt_tokens: Estimated tokens of the whole prompt.
+        """
+        self.calls += 1
+        self.estimated_prompt_tokens += prompt_tokens
+        self.prompt_eval_count += result.prompt_eval_count
+        self.prompt_eval_duration += result.prompt_eval_duration
+        if result.total_duration and result.prompt_eval_count + self.prefix_tokens // 2 <= prompt_tokens:
+            self.likely_cache_hits += 1
+            
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the totals.
+        
+        Returns:
+            Call counts, estimated and evaluated prompt tokens, and the
+            time spent evaluating prompts.
+        """
+        return {
+            "calls": self.calls,
+            "likely_cache_hits": self.likely_cache_hits,
+            "prefix_tokens": self.prefix_tokens,
+            "estimated_prompt_tokens": self.estimated_prompt_tokens,
+            "prompt_eval_count": self.prompt_eval_count,
+            "prefill_seconds": _seconds(self.prompt_eval_duration),
+        }
+
+
+@contextmanager
+def generation_labels(agent: Optional[str] = None, task: Optional[str] = None) -> Iterator[None]:
+    """Attribute the model calls made inside a ``with`` block to an agent and task.
+    
+    Labels left as None keep the value of an enclosing block.
+    
+    Args:
+        agent: Name of the agent making the calls.
+        task: Name of the task the calls belong to.
+    """
+    outer_agent, outer_task = _labels.get()
+    token = _labels.set((agent or outer_agent, task or outer_task))
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+def current_generation_labels() -> Tuple[Optional[str], Optional[str]]:
+    """Get the agent and task that work in the current context is attributed to.
+    
+    Returns:
+        The agent and task names; either is None outside a labelled block.
+    """
+    return _labels.get()
+
+
+@contextmanager
+def prompt_prefix(prefix_hash: str, prefix_tokens: int, prompt_tokens: int) -> Iterator[None]:
+    """Attribute the model calls made inside a ``with`` block to a static prompt prefix.
+    
+    Args:
+        prefix_hash: Hash of the prompt template's static prefix.
+        prefix_tokens: Estimated tokens of the prefix.
+        prompt_tokens: Estimated tokens of the whole prompt.
+    """
+    token = _prefix.set((prefix_hash, prefix_tokens, prompt_tokens))
+    try:
+        yield
+    finally:
+        _prefix.reset(token)
+
+
+def record_generation(result: GenerationResult) -> None:
+    """Add a generate call to the totals of its model, agent and task.
+    
+    Args:
+        result: The result of the call.
+    """
+    agent, task = _labels.get()
+    key = (result.model, agent or UNLABELLED, task or UNLABELLED)
+    with _stats_lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats[key] = GenerationStats()
+        stats.add(result)
+        
+        prefix = _prefix.get()
+        if prefix is not None and not result.cached:
+            prefix_hash, prefix_tokens, prompt_tokens = prefix
+            prefix_key = (agent or UNLABELLED, prefix_hash)
+            prefix_stats = _prefix_stats.get(prefix_key)
+            if prefix_stats is None:
+                prefix_stats = _prefix_stats[prefix_key] = PrefixStats(prefix_tokens)
+            prefix_stats.add(result, prompt_tokens)
+            
+    if not result.cached:
+        logger.debug(
+            f"Generation by {result.model} for {key[1]}/{key[2]}: "
+            f"{result.prompt_eval_count} prompt tokens in {result.prefill_seconds:.2f}s, "
+            f"{result.eval_count} tokens in {result.decode_seconds:.2f}s, "
+            f"load {result.load_seconds:.2f}s"
+        )
+
+
+def generation_stats(by: str = "model") -> Dict[str, Dict[str, Any]]:
+    """Get the totals of the generate calls so far, grouped by one dimension.
+    
+    Args:
+        by: "model", "agent" or "task".
+        
+    Returns:
+        Mapping of each model, agent or task name to its totals.
+        
+    Raises:
+        ValueError: If the dimension is unknown.
+    """
+    if by not in STAT_DIMENSIONS:
+        raise ValueError(f"Unknown generation stats dimension: {by}")
+    index = STAT_DIMENSIONS.index(by)
+    
+    grouped: Dict[str, GenerationStats] = {}
+    with _stats_lock:
+        for key, stats in _stats.items():
+            grouped.setdefault(key[index], GenerationStats()).merge(stats)
+    return {name: stats.to_dict() for name, stats in sorted(grouped.items())}
+
+
+def prefix_stats() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Get the totals of the generate calls so far by agent and prompt prefix.
+    
+    Returns:
+        Mapping of each agent name to the totals of each of its prompt
+        prefix hashes.
+    """
+    grouped: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    with _stats_lock:
+        for (agent, prefix_hash), stats in sorted(_prefix_stats.items()):
+            grouped.setdefault(agent, {})[prefix_hash] = stats.to_dict()
+    return grouped
+
+
+def clear_generation_stats() -> None:
+    """Forget the totals of all generate calls."""
+    with _stats_lock:
+        _stats.clear()
+        _prefix_stats.clear()
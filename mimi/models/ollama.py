@@ -1,10 +1,42 @@
 """Ollama model integration for MiMi."""
 
+import asyncio
+import contextlib
 import json
+import ssl
+import threading
+import time
+import weakref
 import requests
-from typing import Any, Dict, List, Optional, Union
+from requests.adapters import HTTPAdapter
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
 
+from mimi.models.admission import ModelLimiter, get_limiter
+from mimi.models.cache import ResponseCache, make_cache_key
+from mimi.models.metrics import GenerationResult, record_generation
 from mimi.utils.logger import logger
+from mimi.utils.tracing import span
+
+
+# Default size of the keep-alive connection pool shared per base URL
+DEFAULT_POOL_SIZE = 10
+
+# Default number of times a request is retried after a connection error
+DEFAULT_MAX_RETRIES = 2
+
+# Shared HTTP sessions keyed by base URL
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+# Clients shared by agents, keyed by client class, base URL and settings
+_clients: Dict[Tuple[Any, ...], "OllamaClient"] = {}
+
+# Keep-alive connections of the async clients, per event loop and base URL;
+# asyncio connections can only be used by the loop that opened them
+_async_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncConnectionPool]]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
 class OllamaModelError(Exception):
@@ -13,6 +45,145 @@ class OllamaModelError(Exception):
     pass
 
 
+def get_session(base_url: str, pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """Get the shared HTTP session for an Ollama server.
+    
+    All clients that talk to the same base URL share one session, so their
+    requests reuse keep-alive connections from a single pool instead of
+    opening a new TCP connection per call. The pool size is fixed by the
+    first caller for a given base URL.
+    
+    Args:
+        base_url: Base URL for the Ollama API.
+        pool_size: Maximum number of connections kept open to the server.
+        
+    Returns:
+        The shared session.
+    """
+    key = base_url.rstrip("/")
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=max(1, pool_size),
+                max_retries=0,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+            logger.debug(f"Created HTTP session for {key} with pool size {pool_size}")
+            
+        return session
+
+
+def close_sessions() -> None:
+    """Close all shared HTTP sessions and their pooled connections, and forget the shared clients."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _clients.clear()
+        pools = [pool for loop_pools in _async_pools.values() for pool in loop_pools.values()]
+        _async_pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class AsyncConnectionPool:
+    """Idle keep-alive connections from the async clients to one Ollama server.
+    
+    A request takes an idle connection, or opens a new one, and gives it back
+    once the whole response body has been read. Connections the server has
+    closed in the meantime are dropped on the next request. A pool belongs to
+    one event loop, see :func:`get_async_pool`.
+    """
+
+    def __init__(self, base_url: str, pool_size: int = DEFAULT_POOL_SIZE) -> None:
+        """Initialize an empty pool.
+        
+        Args:
+            base_url: Base URL of the server (http or https).
+            pool_size: Maximum number of idle connections kept open.
+        """
+        url = urlsplit(base_url)
+        self.use_ssl = url.scheme == "https"
+        self.host = url.hostname or "localhost"
+        self.port = url.port or (443 if self.use_ssl else 80)
+        self.pool_size = max(1, pool_size)
+        self.opened = 0
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        
+    async def acquire(self, fresh: bool = False) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Get a connection to the server.
+        
+        Args:
+            fresh: Open a new connection even if an idle one is available.
+            
+        Returns:
+            The connection's reader and writer.
+        """
+        while self._idle and not fresh:
+            reader, writer = self._idle.pop()
+            if not (reader.at_eof() or writer.is_closing()):
+                return reader, writer
+            writer.close()
+            
+        reader, writer = await asyncio.open_connection(
+            self.host, self.port, ssl=ssl.create_default_context() if self.use_ssl else None
+        )
+        self.opened += 1
+        return reader, writer
+        
+    def release(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Give back a connection whose response has been read completely.
+        
+        Args:
+            reader: The connection's reader.
+            writer: The connection's writer.
+        """
+        if reader.at_eof() or writer.is_closing() or len(self._idle) >= self.pool_size:
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+            
+    def close(self) -> None:
+        """Close the idle connections."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            try:
+                writer.close()
+            except RuntimeError:
+                # The connection's event loop is already closed
+                pass
+
+
+def get_async_pool(base_url: str, pool_size: int = DEFAULT_POOL_SIZE) -> AsyncConnectionPool:
+    """Get the keep-alive connection pool of the running event loop for an Ollama server.
+    
+    Like :func:`get_session` for the blocking clients: all async clients that
+    talk to the same base URL on one event loop share the pool, and its size
+    is fixed by the first caller.
+    
+    Args:
+        base_url: Base URL for the Ollama API.
+        pool_size: Maximum number of idle connections kept open to the server.
+        
+    Returns:
+        The shared pool.
+    """
+    key = base_url.rstrip("/")
+    loop = asyncio.get_running_loop()
+    with _sessions_lock:
+        pools = _async_pools.setdefault(loop, {})
+        pool = pools.get(key)
+        if pool is None:
+            pool = pools[key] = AsyncConnectionPool(key, pool_size)
+            logger.debug(f"Created async connection pool for {key} with pool size {pool_size}")
+        return pool
+
+
 class OllamaClient:
     """Client for interacting with Ollama models."""
 
@@ -24,6 +195,15 @@ class OllamaClient:
         timeout: int = 120,
         suppress_log: bool = False,
         stream: bool = False,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        seed: Optional[int] = None,
+        num_ctx: Optional[int] = None,
+        cache: Optional[ResponseCache] = None,
+        cache_nondeterministic: bool = False,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
     ) -> None:
         """Initialize the Ollama client.
         
@@ -34,12 +214,34 @@ class OllamaClient:
             timeout: Timeout in seconds for requests.
             suppress_log: Whether to suppress the initialization log.
             stream: Whether to use streaming mode with the API.
+            pool_size: Size of the connection pool shared per base URL.
+            max_retries: Number of retries after a connection error.
+            seed: Optional sampling seed for reproducible output.
+            num_ctx: Context window size in tokens; the server's default if
+                not set.
+            cache: Optional cache for generated responses.
+            cache_nondeterministic: Whether to cache responses even when the
+                sampling settings are not deterministic.
+            max_concurrency: Maximum number of requests in flight to this
+                model on this server, shared by all clients. Defaults to the
+                global limit from ``configure_admission``.
+            max_queue: Maximum number of requests waiting for a slot.
+            queue_timeout: Maximum seconds a request waits for a slot.
         """
         self.model_name = model_name
         self.base_url = base_url
         self.temperature = temperature
         self.timeout = timeout
         self.stream = stream
+        self.pool_size = pool_size
+        self.max_retries = max(0, max_retries)
+        self.seed = seed
+        self.num_ctx = num_ctx
+        self.cache = cache
+        self.cache_nondeterministic = cache_nondeterministic
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
         
         if not suppress_log:
             logger.info(f"Initialized Ollama client for model: {model_name}")
@@ -49,6 +251,7 @@ class OllamaClient:
         prompt: str, 
         system_prompt: Optional[str] = None,
         max_tokens: Optional[int] = None,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> str:
         """Generate a response from the model.
         
@@ -56,6 +259,8 @@ class OllamaClient:
             prompt: The user prompt.
             system_prompt: Optional system prompt.
             max_tokens: Maximum tokens to generate.
+            on_token: Optional callable that receives the response as it is
+                generated; the request is streamed to call it per token.
             
         Returns:
             The generated text response.
@@ -63,81 +268,963 @@ class OllamaClient:
         Raises:
             OllamaModelError: If the model generation fails.
         """
-        try:
-            logger.debug(f"Sending request to Ollama API for model {self.model_name}")
+        return self.generate_result(prompt, system_prompt, max_tokens, on_token).text
+        
+    def generate_result(
+        self, 
+        prompt: str, 
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> GenerationResult:
+        """Generate a response along with the timings Ollama reported for it.
+        
+        The call is added to the generation metrics of its model, agent and
+        task (see :func:`~mimi.models.metrics.generation_stats`).
+        
+        Args:
+            prompt: The user prompt.
+            system_prompt: Optional system prompt.
+            max_tokens: Maximum tokens to generate.
+            on_token: Optional callable that receives each token as it is
+                generated, or a cached response at once.
+            
+        Returns:
+            The generated text with token counts and prefill/decode timings.
             
-            # Always use the generate endpoint
-            request_url = f"{self.base_url}/api/generate"
+        Raises:
+            OllamaModelError: If the model generation fails.
+        """
+        with self._span(prompt, system_prompt, max_tokens) as generation:
+            cache_key = self._cache_key(prompt, system_prompt, max_tokens)
+            cached = self._cached_result(cache_key, generation)
+            if cached is not None:
+                if on_token is not None:
+                    on_token(cached.text)
+                return cached
                 
-            request_data = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "temperature": self.temperature,
-                "stream": False,  # Always set to false for now to avoid streaming complexity
-            }
+            result = self._generate(prompt, system_prompt, max_tokens, on_token)
+            return self._finish(result, cache_key, generation)
+        
+    def _generate(
+        self, 
+        prompt: str, 
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> GenerationResult:
+        """Generate a response from the model, bypassing the cache.
+        
+        Args:
+            prompt: The user prompt.
+            system_prompt: Optional system prompt.
+            max_tokens: Maximum tokens to generate.
+            on_token: Optional callable that receives each token; the
+                request is streamed even if the client doesn't stream.
+            
+        Returns:
+            The generated text with its metrics.
             
-            if system_prompt:
-                request_data["system"] = system_prompt
+        Raises:
+            OllamaModelError: If the model generation fails.
+        """
+        if self.stream or on_token is not None:
+            with self.generate_stream(prompt, system_prompt, max_tokens) as stream:
+                for token in stream:
+                    if on_token is not None:
+                        on_token(token)
+                return stream.result
+                
+        with self._admit():
+            try:
+                logger.debug(f"Sending request to Ollama API for model {self.model_name}")
+                
+                # Always use the generate endpoint
+                request_url = f"{self.base_url}/api/generate"
+                request_data = self._build_request_data(prompt, system_prompt, max_tokens)
                 
-            if max_tokens:
-                request_data["max_tokens"] = max_tokens
+                logger.debug(f"Ollama request data: {json.dumps(request_data)[:200]}...")
+                logger.debug(f"Using API endpoint: {request_url}")
+                
+                response = self._post(request_url, request_data)
+                
+                if response.status_code != 200:
+                    error_msg = f"Ollama API error: {response.status_code} - {response.text}"
+                    logger.error(error_msg)
+                    raise OllamaModelError(error_msg)
+                
+                return self._parse_response(response.text)
+                
+            except Exception as e:
+                logger.error(f"Error generating from Ollama model {self.model_name}: {str(e)}")
+                raise OllamaModelError(f"Error generating from model: {str(e)}") from e
+
+    def generate_stream(
+        self, 
+        prompt: str, 
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> "OllamaStream":
+        """Start a streaming generation and return an iterator over its tokens.
+        
+        Tokens are yielded as Ollama produces them, so callers can start work
+        before the generation finishes. Call ``cancel()`` on the returned
+        stream, from any thread, to stop the generation early.
+        
+        Args:
+            prompt: The user prompt.
+            system_prompt: Optional system prompt.
+            max_tokens: Maximum tokens to generate.
             
-            logger.debug(f"Ollama request data: {json.dumps(request_data)[:200]}...")
-            logger.debug(f"Using API endpoint: {request_url}")
+        Returns:
+            The token stream.
             
-            response = requests.post(
-                request_url,
-                json=request_data,
-                timeout=self.timeout,
-            )
+        Raises:
+            OllamaModelError: If the request cannot be started.
+        """
+        request_url = f"{self.base_url}/api/generate"
+        request_data = self._build_request_data(prompt, system_prompt, max_tokens)
+        request_data["stream"] = True
+        
+        # The stream holds its admission slot until it is closed
+        limiter = self._limiter()
+        release = _once(limiter.release if limiter is not None else None)
+        if limiter is not None:
+            limiter.acquire()
             
-            if response.status_code != 200:
-                error_msg = f"Ollama API error: {response.status_code} - {response.text}"
-                logger.error(error_msg)
-                raise OllamaModelError(error_msg)
+        logger.debug(f"Sending streaming request to Ollama API for model {self.model_name}")
+        started = time.perf_counter()
+        try:
+            response = self._post(request_url, request_data, stream=True)
+        except Exception as e:
+            release()
+            logger.error(f"Error generating from Ollama model {self.model_name}: {str(e)}")
+            raise OllamaModelError(f"Error generating from model: {str(e)}") from e
+            
+        if response.status_code != 200:
+            error_msg = f"Ollama API error: {response.status_code} - {response.text}"
+            response.close()
+            release()
+            logger.error(error_msg)
+            raise OllamaModelError(error_msg)
+            
+        def close() -> None:
+            response.close()
+            release()
+            
+        return OllamaStream(response.iter_lines(), close, self.model_name, started)
+        
+    def _span(self, prompt: str, system_prompt: Optional[str], max_tokens: Optional[int]) -> Any:
+        """Open the span that covers a generate call."""
+        return span(
+            "ollama.generate",
+            model=self.model_name,
+            base_url=self.base_url,
+            prompt_chars=len(prompt),
+            system_prompt_chars=len(system_prompt) if system_prompt else 0,
+            max_tokens=max_tokens,
+            stream=self.stream,
+        )
+        
+    def _cached_result(self, cache_key: Optional[str], generation: Any) -> Optional[GenerationResult]:
+        """Look up a response in the cache and record the hit, if any."""
+        if cache_key is None:
+            return None
+            
+        cached = self.cache.get(cache_key)
+        generation.set_attribute("cache_hit", cached is not None)
+        if cached is None:
+            return None
             
-            # Debug: Log raw response content length and sample
-            content_length = len(response.text)
-            logger.debug(f"Ollama API response: length={content_length}, sample={response.text[:100]}...")
+        result = GenerationResult(cached, self.model_name, cached=True)
+        generation.set_attribute("response_chars", len(cached))
+        record_generation(result)
+        return result
+        
+    def _finish(self, result: GenerationResult, cache_key: Optional[str], generation: Any) -> GenerationResult:
+        """Cache a complete generated response and record its metrics."""
+        generation.set_attributes(
+            response_chars=len(result.text),
+            prompt_tokens=result.prompt_eval_count,
+            completion_tokens=result.eval_count,
+            load_seconds=result.load_seconds,
+            prefill_seconds=result.prefill_seconds,
+            decode_seconds=result.decode_seconds,
+        )
+        if cache_key is not None and result.complete:
+            self.cache.put(cache_key, result.text, model=self.model_name)
+        elif cache_key is not None:
+            logger.debug(f"Not caching an incomplete response from {self.model_name}")
+            
+        record_generation(result)
+        return result
+        
+    def _limiter(self) -> Optional[ModelLimiter]:
+        """Get the admission limiter for this model and server, if any."""
+        return get_limiter(
+            self.base_url, self.model_name, self.max_concurrency, self.max_queue, self.queue_timeout
+        )
+        
+    def _admit(self) -> Any:
+        """Get a context manager that holds an admission slot, if limited."""
+        limiter = self._limiter()
+        return limiter.slot() if limiter is not None else contextlib.nullcontext()
+        
+    def _post(
+        self, request_url: str, request_data: Dict[str, Any], stream: bool = False
+    ) -> requests.Response:
+        """POST a request through the shared session for this server.
+        
+        Requests that fail with a connection error, such as a pooled
+        connection that the server has already reset, are retried on a fresh
+        connection up to ``max_retries`` times. Timeouts are not retried.
+        
+        Args:
+            request_url: The full request URL.
+            request_data: The JSON request body.
+            stream: Whether to return before the response body is read.
             
-            # Try to parse as single JSON response
+        Returns:
+            The HTTP response.
+        """
+        session = get_session(self.base_url, self.pool_size)
+        attempt = 0
+        while True:
             try:
-                result = response.json()
-                logger.debug("Successfully parsed response as single JSON object")
-                return result.get("response", "")
-            except json.JSONDecodeError as json_err:
-                # Enhanced error logging with detailed response inspection
-                logger.error(f"JSON decode error: {str(json_err)}")
-                logger.error(f"Response content type: {type(response.text)}")
-                logger.error(f"First 100 chars of response: {response.text[:100]}")
-                logger.error(f"Last 100 chars of response: {response.text[-100:] if len(response.text) > 100 else response.text}")
-                
-                # Check if this is a streaming response with multiple JSON objects
-                if '\n' in response.text:
-                    logger.info("Response contains multiple lines, attempting to parse as streaming response")
-                    full_response = ""
-                    json_lines = [line for line in response.text.strip().split('\n') if line.strip()]
+                return session.post(
+                    request_url, json=request_data, timeout=self.timeout, stream=stream
+                )
+            except requests.ConnectionError as e:
+                if attempt >= self.max_retries or isinstance(e, requests.Timeout):
+                    raise
+                attempt += 1
+                logger.warning(
+                    f"Connection error talking to {self.base_url}, "
+                    f"retrying ({attempt}/{self.max_retries}): {str(e)}"
+                )
+                
+    def _build_request_data(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Build the JSON body for a generate request.
+        
+        Args:
+            prompt: The user prompt.
+            system_prompt: Optional system prompt.
+            max_tokens: Maximum tokens to generate.
+            
+        Returns:
+            The request body.
+        """
+        request_data = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "options": {"temperature": self.temperature},
+            "stream": False,  # Always set to false for now to avoid streaming complexity
+        }
+        
+        if self.seed is not None:
+            request_data["options"]["seed"] = self.seed
+            
+        if self.num_ctx is not None:
+            request_data["options"]["num_ctx"] = self.num_ctx
+            
+        if system_prompt:
+            request_data["system"] = system_prompt
+            
+        if max_tokens:
+            request_data["max_tokens"] = max_tokens
+            
+        return request_data
+        
+    @property
+    def deterministic(self) -> bool:
+        """Whether the sampling settings produce reproducible output."""
+        return self.temperature == 0 or self.seed is not None
+        
+    def _cache_key(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Optional[str]:
+        """Get the cache key for a request, if its response may be cached.
+        
+        Args:
+            prompt: The user prompt.
+            system_prompt: Optional system prompt.
+            max_tokens: Maximum tokens to generate.
+            
+        Returns:
+            The cache key, or None if caching is disabled for this request.
+        """
+        if self.cache is None:
+            return None
+            
+        if not (self.deterministic or self.cache_nondeterministic):
+            return None
+            
+        request_data = self._build_request_data(prompt, system_prompt, max_tokens)
+        options = {
+            key: value
+            for key, value in request_data.items()
+            if key not in ("model", "prompt", "system", "stream")
+        }
+        return make_cache_key(self.model_name, prompt, system_prompt, options)
+        
+    def _parse_response(self, text: str) -> GenerationResult:
+        """Extract the generated text and its metrics from a generate response body.
+        
+        Args:
+            text: The raw response body.
+            
+        Returns:
+            The generated text, or the raw body if it cannot be parsed; only
+            a parsed response with its final object is complete.
+        """
+        # Debug: Log raw response content length and sample
+        content_length = len(text)
+        logger.debug(f"Ollama API response: length={content_length}, sample={text[:100]}...")
+        
+        # Try to parse as single JSON response
+        try:
+            result = json.loads(text)
+            logger.debug("Successfully parsed response as single JSON object")
+            return GenerationResult.from_response(result, self.model_name)
+        except json.JSONDecodeError as json_err:
+            # Enhanced error logging with detailed response inspection
+            logger.error(f"JSON decode error: {str(json_err)}")
+            logger.error(f"Response content type: {type(text)}")
+            logger.error(f"First 100 chars of response: {text[:100]}")
+            logger.error(f"Last 100 chars of response: {text[-100:] if len(text) > 100 else text}")
+            
+            # Check if this is a streaming response with multiple JSON objects
+            if '\n' in text:
+                logger.info("Response contains multiple lines, attempting to parse as streaming response")
+                full_response = ""
+                final: Dict[str, Any] = {}
+                json_lines = [line for line in text.strip().split('\n') if line.strip()]
+                
+                for line in json_lines:
+                    try:
+                        line_obj = json.loads(line)
+                        if "response" in line_obj:
+                            full_response += line_obj["response"]
+                        if line_obj.get("done"):
+                            final = line_obj
+                    except:
+                        # Skip failed lines
+                        pass
+                        
+                if full_response:
+                    logger.info("Successfully extracted text from streaming response")
+                    result = GenerationResult.from_response(final, self.model_name, text=full_response)
+                    result.complete = bool(final)
+                    return result
                     
-                    for line in json_lines:
-                        try:
-                            line_obj = json.loads(line)
-                            if "response" in line_obj:
-                                full_response += line_obj["response"]
-                        except:
-                            # Skip failed lines
-                            pass
+            # If all parsing attempts fail, return the raw text as fallback
+            logger.warning("Returning raw text from response as fallback")
+            return GenerationResult(text, self.model_name, complete=False)
+
+
+def _once(func: Optional[Any]) -> Any:
+    """Wrap a callable so that only its first call has an effect."""
+    called = threading.Lock()
+    
+    def wrapper() -> None:
+        if func is not None and called.acquire(blocking=False):
+            func()
+            
+    return wrapper
+
+
+def _parse_stream_line(line: Union[bytes, str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Parse one line of a streaming generate response.
+    
+    Args:
+        line: A single NDJSON line.
+        
+    Returns:
+        The token carried by the line, and the parsed line if it is the final
+        one (it carries the timings of the generation), else None.
+        
+    Raises:
+        OllamaModelError: If the server reported an error mid-stream.
+    """
+    if not line or not line.strip():
+        return "", None
+        
+    try:
+        chunk = json.loads(line)
+    except json.JSONDecodeError:
+        logger.debug(f"Skipping unparseable stream line: {line[:100]!r}")
+        return "", None
+        
+    if "error" in chunk:
+        raise OllamaModelError(f"Ollama API error: {chunk['error']}")
+        
+    return chunk.get("response", ""), chunk if chunk.get("done") else None
+
+
+class OllamaStream:
+    """Iterator over the tokens of a streaming generate request.
+
+    The stream records the time to the first token and the text received so
+    far, and once it is done, the timings in :attr:`result`. ``cancel()`` may be called from any thread; it closes the connection,
+    which also stops the generation on the server, and ends the iteration.
+    """
+
+    def __init__(
+        self,
+        lines: Iterator[bytes],
+        close: Any,
+        model_name: str,
+        started: float,
+    ) -> None:
+        """Initialize the stream.
+        
+        Args:
+            lines: Iterator over the NDJSON lines of the response body.
+            close: Callable that closes the underlying connection.
+            model_name: Name of the model generating the tokens.
+            started: ``time.perf_counter()`` value when the request was sent.
+        """
+        self.model_name = model_name
+        self.time_to_first_token: Optional[float] = None
+        self.done = False
+        self.cancelled = False
+        self._lines = lines
+        self._close = close
+        self._started = started
+        self._tokens: List[str] = []
+        self._final: Dict[str, Any] = {}
+        
+    @property
+    def text(self) -> str:
+        """The text received so far."""
+        return "".join(self._tokens)
+        
+    @property
+    def result(self) -> GenerationResult:
+        """The text received so far with the timings from the final line, if it arrived.
+        
+        The result is only complete once the final line arrived.
+        """
+        result = GenerationResult.from_response(self._final, self.model_name, text=self.text)
+        result.complete = bool(self._final)
+        return result
+        
+    def __iter__(self) -> "OllamaStream":
+        return self
+        
+    def __next__(self) -> str:
+        while not (self.done or self.cancelled):
+            try:
+                line = next(self._lines)
+            except StopIteration:
+                self.done = True
+                break
+            except Exception as e:
+                if self.cancelled:
+                    break
+                self.close()
+                raise OllamaModelError(f"Error reading stream from model: {str(e)}") from e
+                
+            token, final = _parse_stream_line(line)
+            if final is not None:
+                self.done = True
+                self._final = final
+            if token:
+                self._record(token)
+                return token
+                
+        self.close()
+        raise StopIteration
+        
+    def _record(self, token: str) -> None:
+        """Record a received token."""
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self._started
+            logger.debug(
+                f"First token from {self.model_name} after {self.time_to_first_token:.3f}s"
+            )
+        self._tokens.append(token)
+        
+    def cancel(self) -> None:
+        """Stop the generation and end the iteration."""
+        self.cancelled = True
+        self.close()
+        
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self._close()
+        
+    def __enter__(self) -> "OllamaStream":
+        return self
+        
+    def __exit__(self, *exc_info: Any) -> None:
+        if not self.done:
+            self.cancel()
+
+
+class AsyncOllamaClient(OllamaClient):
+    """Non-blocking client for interacting with Ollama models.
+
+    The client speaks HTTP directly over asyncio streams, so a single event
+    loop can keep many generate requests in flight without a thread per call.
+    Connections are kept alive in a pool shared per base URL, and connection
+    errors are retried like in the blocking client; streamed responses close
+    their connection when done. ``generate`` is a coroutine; everything else matches :class:`OllamaClient`.
+    """
+
+    async def generate(
+        self, 
+        prompt: str, 
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Generate a response from the model without blocking the event loop.
+        
+        Args:
+            prompt: The user prompt.
+            system_prompt: Optional system prompt.
+            max_tokens: Maximum tokens to generate.
+            on_token: Optional callable that receives the response as it is
+                generated; the request is streamed to call it per token.
+            
+        Returns:
+            The generated text response.
+            
+        Raises:
+            OllamaModelError: If the model generation fails.
+        """
+        return (await self.generate_result(prompt, system_prompt, max_tokens, on_token)).text
+        
+    async def generate_result(
+        self, 
+        prompt: str, 
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> GenerationResult:
+        """Generate a response along with the timings Ollama reported for it.
+        
+        Args:
+            prompt: The user prompt.
+            system_prompt: Optional system prompt.
+            max_tokens: Maximum tokens to generate.
+            on_token: Optional callable that receives each token as it is
+                generated, or a cached response at once.
+            
+        Returns:
+            The generated text with token counts and prefill/decode timings.
+            
+        Raises:
+            OllamaModelError: If the model generation fails.
+        """
+        with self._span(prompt, system_prompt, max_tokens) as generation:
+            cache_key = self._cache_key(prompt, system_prompt, max_tokens)
+            cached = self._cached_result(cache_key, generation)
+            if cached is not None:
+                if on_token is not None:
+                    on_token(cached.text)
+                return cached
+                
+            result = await self._generate(prompt, system_prompt, max_tokens, on_token)
+            return self._finish(result, cache_key, generation)
+        
+    async def _generate(
+        self, 
+        prompt: str, 
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> GenerationResult:
+        """Generate a response from the model, bypassing the cache.
+        
+        Args:
+            prompt: The user prompt.
+            system_prompt: Optional system prompt.
+            max_tokens: Maximum tokens to generate.
+            on_token: Optional callable that receives each token; the
+                request is streamed even if the client doesn't stream.
+            
+        Returns:
+            The generated text with its metrics.
+            
+        Raises:
+            OllamaModelError: If the model generation fails.
+        """
+        if self.stream or on_token is not None:
+            stream = await self.generate_stream(prompt, system_prompt, max_tokens)
+            try:
+                async for token in stream:
+                    if on_token is not None:
+                        on_token(token)
+                return stream.result
+            finally:
+                if not stream.done:
+                    stream.cancel()
                     
-                    if full_response:
-                        logger.info("Successfully extracted text from streaming response")
-                        return full_response
+        try:
+            logger.debug(f"Sending async request to Ollama API for model {self.model_name}")
+            
+            request_data = self._build_request_data(prompt, system_prompt, max_tokens)
+            async with self._aadmit():
+                status, text = await asyncio.wait_for(
+                    _post_json(
+                        self.base_url, "/api/generate", request_data, self.pool_size, self.max_retries
+                    ),
+                    timeout=self.timeout,
+                )
                 
-                # If all parsing attempts fail, return the raw text as fallback
-                logger.warning("Returning raw text from response as fallback")
-                return response.text
+            if status != 200:
+                error_msg = f"Ollama API error: {status} - {text}"
+                logger.error(error_msg)
+                raise OllamaModelError(error_msg)
                 
+            return self._parse_response(text)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Error generating from Ollama model {self.model_name}: {str(e)}")
             raise OllamaModelError(f"Error generating from model: {str(e)}") from e
+            
+    async def generate_stream(
+        self, 
+        prompt: str, 
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> "AsyncOllamaStream":
+        """Start a streaming generation and return an async iterator over its tokens.
+        
+        Args:
+            prompt: The user prompt.
+            system_prompt: Optional system prompt.
+            max_tokens: Maximum tokens to generate.
+            
+        Returns:
+            The token stream.
+            
+        Raises:
+            OllamaModelError: If the request cannot be started.
+        """
+        request_data = self._build_request_data(prompt, system_prompt, max_tokens)
+        request_data["stream"] = True
+        
+        # The stream holds its admission slot until it is closed
+        limiter = self._limiter()
+        release = _once(limiter.release if limiter is not None else None)
+        if limiter is not None:
+            await limiter.aacquire()
+            
+        logger.debug(f"Sending async streaming request to Ollama API for model {self.model_name}")
+        started = time.perf_counter()
+        try:
+            status, headers, reader, writer = await asyncio.wait_for(
+                _open_request(
+                    self.base_url, "/api/generate", request_data, self.pool_size, self.max_retries
+                ),
+                timeout=self.timeout,
+            )
+        except asyncio.CancelledError:
+            release()
+            raise
+        except Exception as e:
+            release()
+            logger.error(f"Error generating from Ollama model {self.model_name}: {str(e)}")
+            raise OllamaModelError(f"Error generating from model: {str(e)}") from e
+            
+        if status != 200:
+            try:
+                body = b"".join([chunk async for chunk in _iter_body(reader, headers)])
+                await _close_connection(writer)
+            finally:
+                release()
+            error_msg = f"Ollama API error: {status} - {body.decode('utf-8', errors='replace')}"
+            logger.error(error_msg)
+            raise OllamaModelError(error_msg)
+            
+        def close() -> None:
+            writer.close()
+            release()
+            
+        return AsyncOllamaStream(
+            _iter_lines(reader, headers), close, self.model_name, started, self.timeout
+        )
+        
+    def _aadmit(self) -> Any:
+        """Get an async context manager that holds an admission slot, if limited."""
+        limiter = self._limiter()
+        return limiter.aslot() if limiter is not None else contextlib.nullcontext()
+
+
+class AsyncOllamaStream(OllamaStream):
+    """Async iterator over the tokens of a streaming generate request."""
+
+    def __init__(
+        self,
+        lines: AsyncIterator[bytes],
+        close: Any,
+        model_name: str,
+        started: float,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Initialize the stream.
+        
+        Args:
+            lines: Async iterator over the NDJSON lines of the response body.
+            close: Callable that closes the underlying connection.
+            model_name: Name of the model generating the tokens.
+            started: ``time.perf_counter()`` value when the request was sent.
+            timeout: Maximum seconds to wait for each line.
+        """
+        super().__init__(iter(()), close, model_name, started)
+        self._async_lines = lines
+        self._timeout = timeout
+        
+    def __aiter__(self) -> "AsyncOllamaStream":
+        return self
+        
+    async def __anext__(self) -> str:
+        while not (self.done or self.cancelled):
+            try:
+                line = await asyncio.wait_for(self._async_lines.__anext__(), self._timeout)
+            except StopAsyncIteration:
+                self.done = True
+                break
+            except asyncio.CancelledError:
+                self.cancel()
+                raise
+            except Exception as e:
+                if self.cancelled:
+                    break
+                self.close()
+                raise OllamaModelError(f"Error reading stream from model: {str(e)}") from e
+                
+            token, final = _parse_stream_line(line)
+            if final is not None:
+                self.done = True
+                self._final = final
+            if token:
+                self._record(token)
+                return token
+                
+        self.close()
+        raise StopAsyncIteration
+        
+    async def __aenter__(self) -> "AsyncOllamaStream":
+        return self
+        
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if not self.done:
+            self.cancel()
+
+
+async def _post_json(
+    base_url: str,
+    path: str,
+    payload: Dict[str, Any],
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> Tuple[int, str]:
+    """Send a JSON POST request over a pooled asyncio connection.
+    
+    Args:
+        base_url: Base URL of the server (http or https).
+        path: Request path, appended to any path in ``base_url``.
+        payload: JSON-serializable request body.
+        pool_size: Size of the connection pool shared per base URL.
+        max_retries: Number of retries after a connection error.
+        
+    Returns:
+        The response status code and decoded body.
+    """
+    status, headers, reader, writer = await _open_request(base_url, path, payload, pool_size, max_retries)
+    try:
+        raw = b"".join([chunk async for chunk in _iter_body(reader, headers)])
+    except BaseException:
+        await _close_connection(writer)
+        raise
+        
+    # The connection can carry the next request once its body has a known end
+    framed = "content-length" in headers or "chunked" in headers.get("transfer-encoding", "").lower()
+    if framed and headers.get("connection", "").lower() != "close":
+        get_async_pool(base_url, pool_size).release(reader, writer)
+    else:
+        await _close_connection(writer)
+    return status, raw.decode("utf-8", errors="replace")
+
+
+async def _open_request(
+    base_url: str,
+    path: str,
+    payload: Dict[str, Any],
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> Tuple[int, Dict[str, str], asyncio.StreamReader, asyncio.StreamWriter]:
+    """Send a JSON POST request and read the response status and headers.
+    
+    Implements the small subset of HTTP/1.1 the Ollama API needs: keep-alive
+    connections from the shared pool, with ``Content-Length`` or chunked
+    response bodies. Requests that fail with a connection error, such as a
+    pooled connection that the server has already closed, are retried on a
+    fresh connection up to ``max_retries`` times. The caller reads the body
+    with :func:`_iter_body` and either gives the connection back to the pool
+    or closes it with :func:`_close_connection`.
+    
+    Args:
+        base_url: Base URL of the server (http or https).
+        path: Request path, appended to any path in ``base_url``.
+        payload: JSON-serializable request body.
+        pool_size: Size of the connection pool shared per base URL.
+        max_retries: Number of retries after a connection error.
+        
+    Returns:
+        The response status code, the lower-cased headers and the open
+        connection's reader and writer.
+    """
+    url = urlsplit(base_url)
+    request_path = url.path.rstrip("/") + path
+    
+    body = json.dumps(payload).encode("utf-8")
+    head = (
+        f"POST {request_path} HTTP/1.1\r\n"
+        f"Host: {url.netloc}\r\n"
+        "Content-Type: application/json\r\n"
+        "Accept: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: keep-alive\r\n"
+        "\r\n"
+    ).encode("latin-1")
+    
+    pool = get_async_pool(base_url, pool_size)
+    attempt = 0
+    while True:
+        writer = None
+        try:
+            reader, writer = await pool.acquire(fresh=attempt > 0)
+            writer.write(head + body)
+            await writer.drain()
+            
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionResetError("Server closed the connection")
+            parts = status_line.decode("latin-1").split(" ", 2)
+            if len(parts) < 2 or not parts[1].isdigit():
+                raise OllamaModelError(f"Malformed HTTP status line: {status_line!r}")
+            status = int(parts[1])
+            
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+                
+            return status, headers, reader, writer
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            if writer is not None:
+                await _close_connection(writer)
+            if attempt >= max_retries:
+                raise
+            attempt += 1
+            logger.warning(
+                f"Connection error talking to {base_url}, "
+                f"retrying ({attempt}/{max_retries}): {str(e)}"
+            )
+        except BaseException:
+            if writer is not None:
+                await _close_connection(writer)
+            raise
+
+
+async def _iter_body(
+    reader: asyncio.StreamReader, headers: Dict[str, str]
+) -> AsyncIterator[bytes]:
+    """Yield the raw body of a response as it arrives.
+    
+    Args:
+        reader: Reader positioned at the start of the body.
+        headers: The lower-cased response headers.
+        
+    Yields:
+        Chunks of the response body.
+    """
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                # Skip trailers up to the final blank line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            yield await reader.readexactly(size)
+            await reader.readline()
+    elif "content-length" in headers:
+        yield await reader.readexactly(int(headers["content-length"]))
+    else:
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                return
+            yield chunk
+            
+            
+async def _iter_lines(
+    reader: asyncio.StreamReader, headers: Dict[str, str]
+) -> AsyncIterator[bytes]:
+    """Yield the lines of a response body as they arrive.
+    
+    Args:
+        reader: Reader positioned at the start of the body.
+        headers: The lower-cased response headers.
+        
+    Yields:
+        Lines of the body, without line endings.
+    """
+    buffer = b""
+    async for chunk in _iter_body(reader, headers):
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if buffer:
+        yield buffer
+
+
+async def _close_connection(writer: asyncio.StreamWriter) -> None:
+    """Close a connection opened by :func:`_open_request`."""
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except (ConnectionError, ssl.SSLError):
+        pass
+
+
+def _shared_client(cls: Any, suppress_log: bool, **settings: Any) -> Any:
+    """Get the registered client of a class with the given settings, creating it if needed.
+    
+    Args:
+        cls: The client class.
+        suppress_log: Whether to suppress the initialization log of a new client.
+        **settings: Keyword arguments of the client; they all form the key.
+        
+    Returns:
+        The shared client.
+    """
+    key = (cls, *sorted(settings.items(), key=lambda item: item[0]))
+    with _sessions_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = cls(suppress_log=suppress_log, **settings)
+        return client
 
 
 def get_ollama_client(
@@ -146,6 +1233,15 @@ def get_ollama_client(
     temperature: float = 0.7,
     suppress_log: bool = False,
     stream: bool = False,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    seed: Optional[int] = None,
+    num_ctx: Optional[int] = None,
+    cache: Optional[ResponseCache] = None,
+    cache_nondeterministic: bool = False,
+    max_concurrency: Optional[int] = None,
+    max_queue: Optional[int] = None,
+    queue_timeout: Optional[float] = None,
 ) -> OllamaClient:
     """Get an Ollama client for the specified model.
     
@@ -155,14 +1251,96 @@ def get_ollama_client(
         temperature: Sampling temperature (0-1).
         suppress_log: Whether to suppress the initialization log.
         stream: Whether to use streaming mode with the API.
+        pool_size: Size of the connection pool shared per base URL.
+        max_retries: Number of retries after a connection error.
+        seed: Optional sampling seed for reproducible output.
+        num_ctx: Context window size in tokens; the server's default if not set.
+        cache: Optional cache for generated responses.
+        cache_nondeterministic: Whether to cache responses even when the
+            sampling settings are not deterministic.
+        max_concurrency: Maximum number of requests in flight to this model.
+        max_queue: Maximum number of requests waiting for a slot.
+        queue_timeout: Maximum seconds a request waits for a slot.
         
+    Clients are shared: agents that ask for the same model, base URL and
+    settings get the same client, like the session they use.
+    
     Returns:
         An initialized OllamaClient.
     """
-    return OllamaClient(
+    return _shared_client(
+        OllamaClient,
+        suppress_log,
+        model_name=model_name,
+        base_url=base_url.rstrip("/"),
+        temperature=temperature,
+        stream=stream,
+        pool_size=pool_size,
+        max_retries=max_retries,
+        seed=seed,
+        num_ctx=num_ctx,
+        cache=cache,
+        cache_nondeterministic=cache_nondeterministic,
+        max_concurrency=max_concurrency,
+        max_queue=max_queue,
+        queue_timeout=queue_timeout,
+    )
+
+
+def get_async_ollama_client(
+    model_name: str,
+    base_url: str = "http://localhost:11434",
+    temperature: float = 0.7,
+    suppress_log: bool = False,
+    stream: bool = False,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    seed: Optional[int] = None,
+    num_ctx: Optional[int] = None,
+    cache: Optional[ResponseCache] = None,
+    cache_nondeterministic: bool = False,
+    max_concurrency: Optional[int] = None,
+    max_queue: Optional[int] = None,
+    queue_timeout: Optional[float] = None,
+) -> AsyncOllamaClient:
+    """Get a non-blocking Ollama client for the specified model.
+    
+    Args:
+        model_name: Name of the Ollama model.
+        base_url: Base URL for the Ollama API.
+        temperature: Sampling temperature (0-1).
+        suppress_log: Whether to suppress the initialization log.
+        stream: Whether to use streaming mode with the API.
+        pool_size: Size of the connection pool shared per base URL.
+        max_retries: Number of retries after a connection error.
+        seed: Optional sampling seed for reproducible output.
+        num_ctx: Context window size in tokens; the server's default if not set.
+        cache: Optional cache for generated responses.
+        cache_nondeterministic: Whether to cache responses even when the
+            sampling settings are not deterministic.
+        max_concurrency: Maximum number of requests in flight to this model.
+        max_queue: Maximum number of requests waiting for a slot.
+        queue_timeout: Maximum seconds a request waits for a slot.
+        
+    Clients are shared like those of :func:`get_ollama_client`.
+    
+    Returns:
+        An initialized AsyncOllamaClient.
+    """
+    return _shared_client(
+        AsyncOllamaClient,
+        suppress_log,
         model_name=model_name,
-        base_url=base_url,
+        base_url=base_url.rstrip("/"),
         temperature=temperature,
-        suppress_log=suppress_log,
         stream=stream,
-    ) 
\ No newline at end of file
+        pool_size=pool_size,
+        max_retries=max_retries,
+        seed=seed,
+        num_ctx=num_ctx,
+        cache=cache,
+        cache_nondeterministic=cache_nondeterministic,
+        max_concurrency=max_concurrency,
+        max_queue=max_queue,
+        queue_timeout=queue_timeout,
+    )
@@ -0,0 +1,271 @@
+"""Incremental parser for fenced code blocks in Markdown.
+
+:class:`FenceParser` reads Markdown in chunks of any size, for example the
+tokens of a streaming model response, and returns each code block as soon as
+its closing fence arrives. It finds exactly the blocks that the pattern
+``` ```(\\w+)?(?:\\s+([^\\n]+))?\\n(.*?)``` ``` finds with ``re.DOTALL``, which
+``extract_code_blocks`` used to run over the whole response, but reads each
+character once and keeps only the text of the block it is in.
+"""
+
+from typing import List, Optional, Tuple
+
+# Opening and closing code fence
+FENCE = "```"
+
+# Parser states: looking for a fence, reading the language, the whitespace
+# after it, the rest of the opening line, and the body of the block
+_SEARCH, _LANGUAGE, _SPACE, _NAME, _BODY = range(5)
+
+
+class CodeFence:
+    """A fenced code block as written in the text."""
+
+    __slots__ = ("language", "filename", "body", "text")
+
+    def __init__(self, language: str, filename: str, body: str, text: str) -> None:
+        """Initialize the block.
+
+        Args:
+            language: Word following the opening fence, or "".
+            filename: Rest of the opening line after the language, or "".
+            body: Text between the opening line and the closing fence.
+            text: The whole block, fences included.
+        """
+        self.language = language
+        self.filename = filename
+        self.body = body
+        self.text = text
+
+
+def _is_word(char: str) -> bool:
+    """Check whether a character is a regex word character."""
+    return char.isalnum() or char == "_"
+
+
+class FenceParser:
+    """Single-pass state machine that splits Markdown into fenced code blocks.
+
+    Call :meth:`feed` with each chunk of text; it returns the blocks that were
+    completed by that chunk. Call :meth:`close` at the end of the text to get
+    any block that can only be decided once no more text will come.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self._reset()
+
+    def feed(self, chunk: str) -> List[CodeFence]:
+        """Parse the next chunk of text.
+
+        Args:
+            chunk: The text following the previous chunk.
+
+        Returns:
+            The code blocks whose closing fence is in this chunk.
+        """
+        fences = []
+        while True:
+            if self._state == _BODY:
+                fence = self._feed_body(chunk)
+                if fence is None:
+                    return fences
+                fences.append(fence)
+                chunk = ""
+            else:
+                self._buffer += chunk
+                chunk = self._advance()
+                if chunk is None:
+                    return fences
+
+    def close(self) -> List[CodeFence]:
+        """Finish parsing at the end of the text.
+
+        Returns:
+            The remaining code blocks.
+        """
+        text = self._buffer + "".join(self._body) if self._state != _SEARCH else ""
+        self._reset()
+        return parse_fences_at_end(text)
+
+    def _reset(self) -> None:
+        """Start over with no text."""
+        self._state = _SEARCH
+        # Text of the current block up to and including its opening line, or
+        # the last two characters seen while searching for a fence
+        self._buffer = ""
+        self._pos = 0
+        self._language_end = 0
+        self._name_start = 0
+        self._name_end = 0
+        self._body: List[str] = []
+        self._body_chars = 0
+        self._body_tail = ""
+
+    def _advance(self) -> Optional[str]:
+        """Move through the buffer until more text is needed or a body starts.
+
+        Returns:
+            The text after the opening line once the parser is in a block's
+            body, or None if it needs more text.
+        """
+        buffer = self._buffer
+        while True:
+            if self._state == _SEARCH:
+                start = buffer.find(FENCE)
+                if start < 0:
+                    self._buffer = buffer[-(len(FENCE) - 1):]
+                    return None
+                buffer = buffer[start:]
+                self._pos = len(FENCE)
+                self._state = _LANGUAGE
+
+            if self._state == _LANGUAGE:
+                while self._pos < len(buffer) and _is_word(buffer[self._pos]):
+                    self._pos += 1
+                if self._pos == len(buffer):
+                    break
+                self._language_end = self._pos
+                self._state = _SPACE
+
+            if self._state == _SPACE:
+                while self._pos < len(buffer) and buffer[self._pos].isspace():
+                    self._pos += 1
+                if self._pos == len(buffer):
+                    break
+                if self._pos == self._language_end:
+                    # Without whitespace after the language this is not an
+                    # opening fence; look for one from the next character
+                    buffer = buffer[1:]
+                    self._state = _SEARCH
+                    continue
+                self._name_start = self._pos
+                self._state = _NAME
+
+            if self._state == _NAME:
+                end = buffer.find("\n", self._pos)
+                if end < 0:
+                    self._pos = len(buffer)
+                    break
+                self._name_end = end
+                self._buffer = buffer[:end + 1]
+                self._state = _BODY
+                self._body = []
+                self._body_chars = 0
+                self._body_tail = ""
+                return buffer[end + 1:]
+
+        self._buffer = buffer
+        return None
+
+    def _feed_body(self, chunk: str) -> Optional[CodeFence]:
+        """Look for the closing fence of the current block in a chunk.
+
+        Returns:
+            The block if the chunk closes it, else None. The text after the
+            closing fence is kept for the next block.
+        """
+        scan = self._body_tail + chunk
+        found = scan.find(FENCE)
+        if found < 0:
+            self._body.append(chunk)
+            self._body_chars += len(chunk)
+            self._body_tail = scan[-(len(FENCE) - 1):]
+            return None
+
+        body = "".join(self._body) + chunk
+        end = self._body_chars - len(self._body_tail) + found
+        header = self._buffer
+        fence = CodeFence(
+            language=header[len(FENCE):self._language_end],
+            filename=header[self._name_start:self._name_end],
+            body=body[:end],
+            text=header + body[:end + len(FENCE)],
+        )
+
+        self._state = _SEARCH
+        self._buffer = body[end + len(FENCE):]
+        self._body = []
+        return fence
+
+
+def _match_at(text: str, start: int) -> Optional[Tuple[CodeFence, int]]:
+    """Match a code block opening at ``start`` in a complete text.
+
+    Tries the same alternatives, in the same order, as the regex: the longest
+    whitespace after the language followed by a filename, then shorter
+    whitespace, then no filename.
+
+    Returns:
+        The block and the offset after it, or None if no block opens there.
+    """
+    language_end = start + len(FENCE)
+    while language_end < len(text) and _is_word(text[language_end]):
+        language_end += 1
+    space_end = language_end
+    while space_end < len(text) and text[space_end].isspace():
+        space_end += 1
+
+    language = text[start + len(FENCE):language_end]
+    candidates = [(name_start, True) for name_start in range(space_end, language_end, -1)]
+    candidates.append((language_end, False))
+    for name_start, has_name in candidates:
+        if name_start >= len(text):
+            continue
+        if has_name:
+            if text[name_start] == "\n":
+                continue
+            name_end = text.find("\n", name_start)
+            if name_end < 0:
+                continue
+        elif text[name_start] != "\n":
+            continue
+        else:
+            name_end = name_start
+
+        end = text.find(FENCE, name_end + 1)
+        if end >= 0:
+            fence = CodeFence(
+                language=language,
+                filename=text[name_start:name_end],
+                body=text[name_end + 1:end],
+                text=text[start:end + len(FENCE)],
+            )
+            return fence, end + len(FENCE)
+    return None
+
+
+def parse_fences_at_end(text: str) -> List[CodeFence]:
+    """Find the code blocks in a text that will not grow any further.
+
+    Args:
+        text: The complete text.
+
+    Returns:
+        The code blocks in order.
+    """
+    fences = []
+    pos = 0
+    while True:
+        start = text.find(FENCE, pos)
+        if start < 0:
+            return fences
+        match = _match_at(text, start)
+        if match is None:
+            pos = start + 1
+        else:
+            fence, pos = match
+            fences.append(fence)
+
+
+def parse_fences(text: str) -> List[CodeFence]:
+    """Find the code blocks in a complete text.
+
+    Args:
+        text: The text containing Markdown code blocks.
+
+    Returns:
+        The code blocks in order.
+    """
+    parser = FenceParser()
+    return parser.feed(text) + parser.close()
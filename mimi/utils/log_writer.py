@@ -0,0 +1,353 @@
+"""Append-only log writers for the project and agent log files.
+
+Entries are handed to a single background thread through a bounded queue, so
+logging never waits for the disk. The thread drains the queue in batches and
+writes each file's entries from a batch with one call.
+"""
+
+import atexit
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Tuple, Union
+
+from mimi.utils.logger import logger
+
+# Number of entries the queue holds before the overflow policy applies
+DEFAULT_QUEUE_SIZE = 10000
+
+# Maximum number of entries the background thread writes in one batch
+DEFAULT_BATCH_SIZE = 256
+
+# What to do when the queue is full: "drop" the entry and count it, or
+# "block" the caller until there is room
+OVERFLOW_POLICIES = ("drop", "block")
+
+
+class LogQueue:
+    """Bounded queue of log entries drained by a background thread.
+
+    The thread is started on the first entry. It takes all entries that are
+    waiting, up to ``batch_size``, groups them by file and writes each file's
+    entries at once. When the queue is full an entry is either dropped and
+    counted (``overflow="drop"``, the default, so callers never wait) or the
+    caller waits for room (``overflow="block"``). After :meth:`stop`, entries
+    are written on the caller's thread.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_QUEUE_SIZE,
+        overflow: str = "drop",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        """Initialize the queue.
+        
+        Args:
+            max_size: Number of entries the queue holds.
+            overflow: Policy when the queue is full, "drop" or "block".
+            batch_size: Maximum number of entries written in one batch.
+            
+        Raises:
+            ValueError: If the overflow policy is unknown.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown log queue overflow policy: {overflow}")
+        self.max_size = max(1, int(max_size))
+        self.overflow = overflow
+        self.batch_size = max(1, int(batch_size))
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.max_depth = 0
+        self._queue: "queue.Queue[Optional[Tuple[LogWriter, str]]]" = queue.Queue(self.max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._lock = threading.Lock()
+        
+    def submit(self, writer: "LogWriter", entry: str) -> bool:
+        """Queue an entry for a writer.
+        
+        Args:
+            writer: The writer of the entry's file.
+            entry: Text of the entry.
+            
+        Returns:
+            False if the entry was dropped because the queue is full.
+        """
+        with self._lock:
+            self.submitted += 1
+            stopped = self._stopped
+            if not stopped:
+                self._start()
+                
+        if stopped:
+            writer._append([entry])
+            with self._lock:
+                self.written += 1
+            return True
+            
+        try:
+            self._queue.put((writer, entry), block=self.overflow == "block")
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                first_drop = self.dropped == 1
+            if first_drop:
+                logger.warning("Log queue is full; dropping log entries")
+            return False
+            
+        with self._lock:
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+        
+    def flush(self) -> None:
+        """Wait until every queued entry has been written."""
+        self._queue.join()
+        
+    def stop(self) -> None:
+        """Write the remaining entries and stop the background thread."""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            thread = self._thread
+            
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        if self.dropped:
+            logger.warning(f"Dropped {self.dropped} log entries because the log queue was full")
+            
+    def stats(self) -> Dict[str, Any]:
+        """Get the queue's counters.
+        
+        Returns:
+            Submitted, written and dropped entries, the number of batches,
+            and the current and highest queue depth.
+        """
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_depth,
+            }
+            
+    def _start(self) -> None:
+        """Start the background thread; the caller holds the lock."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mimi-log-writer", daemon=True)
+            self._thread.start()
+            
+    def _run(self) -> None:
+        """Write queued entries in batches until stopped."""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+                    
+            stop = None in batch
+            self._write([item for item in batch if item is not None])
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+                
+    def _write(self, batch: List[Tuple["LogWriter", str]]) -> None:
+        """Write a batch, one call per file, keeping each file's entries in order."""
+        by_writer: Dict[LogWriter, List[str]] = {}
+        for writer, entry in batch:
+            by_writer.setdefault(writer, []).append(entry)
+            
+        for writer, entries in by_writer.items():
+            try:
+                writer._append(entries)
+            except Exception as e:
+                logger.error(f"Failed to write {len(entries)} entries to {writer.path}: {str(e)}")
+                
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+
+
+class LogWriter:
+    """Append-only writer for a single log file.
+
+    The file is created, with its header, when the first entry is written
+    and then kept open in append mode. Entries go through a :class:`LogQueue`, so logging
+    an event never reads or rewrites what is already on disk and doesn't wait
+    for the write. If the file is removed while the writer is open, the next
+    write starts a new one.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        header: str = "",
+        log_queue: Optional[LogQueue] = None,
+    ) -> None:
+        """Initialize the writer.
+        
+        Args:
+            path: Path to the log file.
+            header: Text written at the start of the file when it is created.
+            log_queue: Queue that writes the entries; the shared queue if
+                omitted.
+        """
+        self.path = Path(path)
+        self.header = header
+        self.log_queue = log_queue
+        self._file: Optional[TextIO] = None
+        self._lock = threading.Lock()
+        
+    def write(self, entry: str) -> None:
+        """Append an entry to the log.
+        
+        Only queues the entry; the file is opened and written by the queue's
+        background thread.
+        
+        Args:
+            entry: Text of the entry, including its trailing newline.
+        """
+        (self.log_queue or get_log_queue()).submit(self, entry)
+        
+    def flush(self) -> None:
+        """Wait until the queued entries have been written."""
+        (self.log_queue or get_log_queue()).flush()
+        
+    def close(self) -> None:
+        """Write the queued entries and close the file."""
+        self.flush()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                
+    def _append(self, entries: List[str]) -> None:
+        """Write entries to the file."""
+        with self._lock:
+            self._open()
+            self._file.write("".join(entries))
+            self._file.flush()
+            
+    def _open(self) -> None:
+        """Open the file, creating it if needed; the caller holds the lock."""
+        if self._file is not None and not self.path.exists():
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+            if self._file.tell() == 0 and self.header:
+                self._file.write(self.header)
+                self._file.flush()
+
+
+# Queue shared by every writer in the process
+_log_queue = LogQueue()
+
+# One writer per log file, shared by every caller in the process
+_writers: Dict[str, LogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_log_queue() -> LogQueue:
+    """Get the queue shared by the log writers.
+    
+    Returns:
+        The shared log queue.
+    """
+    return _log_queue
+
+
+def configure_log_queue(
+    max_size: int = DEFAULT_QUEUE_SIZE,
+    overflow: str = "drop",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> LogQueue:
+    """Replace the shared log queue, writing out the entries of the old one.
+    
+    Args:
+        max_size: Number of entries the queue holds.
+        overflow: Policy when the queue is full, "drop" or "block".
+        batch_size: Maximum number of entries written in one batch.
+        
+    Returns:
+        The new queue.
+    """
+    global _log_queue
+    new_queue = LogQueue(max_size=max_size, overflow=overflow, batch_size=batch_size)
+    with _writers_lock:
+        old_queue = _log_queue
+        _log_queue = new_queue
+    old_queue.stop()
+    return new_queue
+
+
+def get_log_writer(path: Union[str, Path], header: str = "") -> LogWriter:
+    """Get the shared writer for a log file, creating it on first use.
+    
+    Args:
+        path: Path to the log file.
+        header: Text written at the start of the file when it is created.
+        
+    Returns:
+        The writer for the file.
+    """
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = LogWriter(path, header=header)
+            _writers[key] = writer
+        return writer
+
+
+def flush_log_writers() -> None:
+    """Wait until every queued log entry has been written to disk."""
+    get_log_queue().flush()
+
+
+def close_log_writers() -> None:
+    """Write the queued entries and close all log files."""
+    flush_log_writers()
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+def release_log_writers(directory: Union[str, Path]) -> None:
+    """Write the queued entries and close the log files under a directory.
+    
+    The writers are dropped from memory, so a finished run doesn't keep its
+    files open; writing to the directory again opens new writers.
+    
+    Args:
+        directory: The directory, e.g. a project directory at the end of a run.
+    """
+    prefix = os.path.join(os.path.abspath(directory), "")
+    flush_log_writers()
+    with _writers_lock:
+        keys = [key for key in _writers if key.startswith(prefix)]
+        writers = [_writers.pop(key) for key in keys]
+    for writer in writers:
+        writer.close()
+
+
+def _shutdown() -> None:
+    """Stop the background thread and close all log files at exit."""
+    get_log_queue().stop()
+    close_log_writers()
+
+
+atexit.register(_shutdown)
@@ -9,6 +9,7 @@ vendor_path = Path(__file__).parent.parent / "vendor"
 if vendor_path.exists() and str(vendor_path) not in sys.path:
     sys.path.append(str(vendor_path))
 
+from collections.abc import Mapping
 from typing import Any, Dict, List, Optional, Set, Union
 
 from loguru import logger as _logger
@@ -17,12 +18,19 @@ from loguru import logger as _logger
 # Only logs with these status/action values will be shown
 ALLOWED_LOG_TYPES: Set[str] = {"started", "execute", "completed", "error"}
 
+# Maximum characters of a value rendered into a log message or record
+MAX_PAYLOAD_CHARS = 500
+
+# Maximum characters of a pre-rendered log message
+MAX_MESSAGE_CHARS = 2000
+
 def setup_logger(
     log_level: str = "DEBUG",
     log_file: Optional[str] = None,
     rotation: str = "10 MB",
     retention: str = "1 week",
     allowed_types: Optional[List[str]] = None,
+    max_payload_chars: Optional[int] = None,
 ) -> None:
     """Configure the logger.
 
@@ -32,12 +40,15 @@ def setup_logger(
         rotation: When to rotate the log file.
         retention: How long to keep log files.
         allowed_types: Optional list of status/action types to log. If None, uses ALLOWED_LOG_TYPES.
+        max_payload_chars: Optional size cap for values in log messages. If None, uses MAX_PAYLOAD_CHARS.
     """
-    global ALLOWED_LOG_TYPES
+    global ALLOWED_LOG_TYPES, MAX_PAYLOAD_CHARS
     
     # Update allowed types if provided
     if allowed_types is not None:
         ALLOWED_LOG_TYPES = set(allowed_types)
+    if max_payload_chars is not None:
+        MAX_PAYLOAD_CHARS = max_payload_chars
     
     _logger.remove()  # Remove default handlers
     
@@ -59,77 +70,141 @@ def setup_logger(
         )
 
 
+def summarize(value: Any, max_chars: Optional[int] = None) -> str:
+    """Render a value for a log message, capped at ``max_chars`` characters.
+    
+    Long strings are cut, and dicts and lists are rendered item by item only
+    until the budget is used up, so summarizing a multi-megabyte payload
+    costs about as much as summarizing a small one.
+    
+    Args:
+        value: The value to render.
+        max_chars: Character budget; MAX_PAYLOAD_CHARS if omitted.
+        
+    Returns:
+        The rendered value, followed by its full size if it was cut.
+    """
+    budget = MAX_PAYLOAD_CHARS if max_chars is None else max_chars
+    return _summarize(value, max(budget, 0))
+
+
+def _summarize(value: Any, budget: int, nested: bool = False) -> str:
+    """Render a value within a character budget."""
+    if isinstance(value, str):
+        text = value if len(value) <= budget else f"{value[:budget]}... ({len(value)} chars)"
+        return repr(text) if nested else text
+        
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+        
+    if isinstance(value, Mapping):
+        opening, closing = "{", "}"
+        count = f"{len(value)} keys"
+        entries = ((f"{key!r}: ", item) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        opening, closing = ("[", "]") if isinstance(value, list) else ("(", ")")
+        count = f"{len(value)} items"
+        entries = (("", item) for item in value)
+    else:
+        text = repr(value)
+        if len(text) <= budget:
+            return text
+        return f"{text[:budget]}... ({len(text)} chars)"
+        
+    parts = []
+    used = len(opening) + len(closing)
+    for prefix, item in entries:
+        if used >= budget:
+            parts.append(f"... ({count})")
+            break
+        part = prefix + _summarize(item, budget - used - len(prefix), nested=True)
+        parts.append(part)
+        used += len(part) + 2
+    return opening + ", ".join(parts) + closing
+
+
+def _render(template: str, args: tuple) -> str:
+    """Render a log message template with summarized arguments."""
+    if not args:
+        return summarize(template, MAX_MESSAGE_CHARS)
+    return template.format(*(summarize(arg) for arg in args))
+
+
+def _log_event(
+    scope: str, name: str, key: str, status: str, message: str, args: tuple, data: Optional[Dict[str, Any]]
+) -> None:
+    """Log an event lazily.
+    
+    Nothing is rendered unless the status is allowed and a handler accepts
+    INFO records: loguru only calls the lazy arguments after its level check.
+    Records keep summaries of the data, not the payloads themselves.
+    """
+    if status not in ALLOWED_LOG_TYPES:
+        return
+        
+    _logger.opt(lazy=True, depth=2).info(
+        "{} | {} | {}",
+        lambda: f"{scope} '{name}'",
+        lambda: status,
+        lambda: _render(message, args),
+        **{scope.lower(): lambda: name, key: lambda: status},
+        data=lambda: {field: summarize(value) for field, value in (data or {}).items()},
+    )
+
+
 # Convenience functions for structured logging
 def agent_log(
-    agent_name: str, action: str, message: str, data: Optional[Dict[str, Any]] = None
+    agent_name: str, action: str, message: str, *args: Any, data: Optional[Dict[str, Any]] = None
 ) -> None:
     """Log an agent action with structured data.
     
+    The message is a ``str.format`` template when arguments are given, e.g.
+    ``agent_log(name, "execute", "Executing task with input: {}", task_input)``.
+    The template is only rendered if the event is logged, and every argument
+    and data value is summarized to at most MAX_PAYLOAD_CHARS characters.
+    
     Args:
         agent_name: Name of the agent.
         action: The action being performed.
-        message: Log message.
+        message: Log message, or a template for ``args``.
+        *args: Values to render into the template.
         data: Optional additional data to log.
     """
-    # Skip logging if action is not in allowed types
-    if action not in ALLOWED_LOG_TYPES:
-        return
-    
-    # Escape curly braces in the message to prevent KeyError in string formatting
-    safe_message = str(message).replace("{", "{{").replace("}", "}}")
-    
-    _logger.info(
-        f"Agent '{agent_name}' | {action} | {safe_message}",
-        extra={"agent": agent_name, "action": action, "data": data or {}},
-    )
+    _log_event("Agent", agent_name, "action", action, message, args, data)
 
 
 def task_log(
-    task_name: str, status: str, message: str, data: Optional[Dict[str, Any]] = None
+    task_name: str, status: str, message: str, *args: Any, data: Optional[Dict[str, Any]] = None
 ) -> None:
     """Log a task event with structured data.
     
+    Renders lazily and summarizes payloads as :func:`agent_log` does.
+    
     Args:
         task_name: Name of the task.
         status: The status of the task (e.g., "started", "completed").
-        message: Log message.
+        message: Log message, or a template for ``args``.
+        *args: Values to render into the template.
         data: Optional additional data to log.
     """
-    # Skip logging if status is not in allowed types
-    if status not in ALLOWED_LOG_TYPES:
-        return
-    
-    # Escape curly braces in the message to prevent KeyError in string formatting
-    safe_message = str(message).replace("{", "{{").replace("}", "}}")
-    
-    _logger.info(
-        f"Task '{task_name}' | {status} | {safe_message}",
-        extra={"task": task_name, "status": status, "data": data or {}},
-    )
+    _log_event("Task", task_name, "status", status, message, args, data)
 
 
 def project_log(
-    project_name: str, status: str, message: str, data: Optional[Dict[str, Any]] = None
+    project_name: str, status: str, message: str, *args: Any, data: Optional[Dict[str, Any]] = None
 ) -> None:
     """Log a project event with structured data.
     
+    Renders lazily and summarizes payloads as :func:`agent_log` does.
+    
     Args:
         project_name: Name of the project.
         status: The status of the project (e.g., "started", "completed").
-        message: Log message.
+        message: Log message, or a template for ``args``.
+        *args: Values to render into the template.
         data: Optional additional data to log.
     """
-    # Skip logging if status is not in allowed types
-    if status not in ALLOWED_LOG_TYPES:
-        return
-    
-    # Escape curly braces in the message to prevent KeyError in string formatting
-    safe_message = str(message).replace("{", "{{").replace("}", "}}")
-    
-    _logger.info(
-        f"Project '{project_name}' | {status} | {safe_message}",
-        extra={"project": project_name, "status": status, "data": data or {}},
-    )
+    _log_event("Project", project_name, "status", status, message, args, data)
 
 
 def update_allowed_log_types(types: List[str]) -> None:
@@ -0,0 +1,379 @@
+"""In-memory manifest of the files generated in a project directory.
+
+Every file written through the output manager is recorded with its size,
+content hash, the component it belongs to and the agent that wrote it. Agents
+look files up here instead of walking the directory tree, and recently
+written text is served from memory. The manifest is persisted as
+``manifest.json`` in the project directory, so later runs that continue the
+project start from it.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from mimi.models.metrics import current_generation_labels
+from mimi.utils.logger import logger
+from mimi.utils.output_sink import flush_output, get_output_sink
+
+# Name of the manifest file in the project directory
+MANIFEST_FILE = "manifest.json"
+
+# Version of the manifest file format
+MANIFEST_VERSION = 1
+
+# Files larger than this are read from disk instead of being kept in memory
+MAX_CACHED_CHARS = 1 << 20
+
+# Files that are written next to the generated files but not listed
+_UNLISTED = {MANIFEST_FILE, "project.log.md", "agent.log.md", "agent.log.json", "agent.log.jsonl"}
+
+# Files recorded in the current context, while :func:`capture_files` is active
+_captured: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("mimi_captured_files", default=None)
+
+
+class ManifestEntry:
+    """A generated file as recorded in the manifest."""
+
+    __slots__ = ("path", "size", "sha256", "component", "agent", "text")
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        sha256: str,
+        component: Optional[str] = None,
+        agent: Optional[str] = None,
+        text: Optional[str] = None,
+    ) -> None:
+        """Initialize the entry.
+        
+        Args:
+            path: Path of the file relative to the project directory, with
+                forward slashes.
+            size: Size of the file in bytes.
+            sha256: SHA-256 hex digest of the file's content.
+            component: Component the file belongs to, e.g. "backend" or "docs".
+            agent: Name of the agent that wrote the file.
+            text: Content of the file, if it is kept in memory.
+        """
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.component = component
+        self.agent = agent
+        self.text = text
+        
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the entry as stored in ``manifest.json``, without the text."""
+        return {
+            "size": self.size,
+            "sha256": self.sha256,
+            "component": self.component,
+            "agent": self.agent,
+        }
+
+
+class FileManifest:
+    """Thread-safe record of the files generated in one project directory."""
+
+    def __init__(self, root: Union[str, Path]) -> None:
+        """Initialize an empty manifest.
+        
+        Args:
+            root: The project directory.
+        """
+        self.root = Path(root)
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        
+    @classmethod
+    def load(cls, root: Union[str, Path]) -> "FileManifest":
+        """Load the manifest of a project directory.
+        
+        Uses ``manifest.json`` if the directory has one. Otherwise the
+        directory is scanned once, so projects created before manifests
+        existed can be queried too.
+        
+        Args:
+            root: The project directory.
+            
+        Returns:
+            The manifest.
+        """
+        manifest = cls(root)
+        manifest_path = manifest.root / MANIFEST_FILE
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for path, fields in data.get("files", {}).items():
+                manifest._entries[path] = ManifestEntry(
+                    path=path,
+                    size=fields["size"],
+                    sha256=fields["sha256"],
+                    component=fields.get("component"),
+                    agent=fields.get("agent"),
+                )
+            return manifest
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable manifest {manifest_path}: {str(e)}")
+            manifest._entries.clear()
+            
+        manifest._scan()
+        return manifest
+        
+    def record(self, file_path: Union[str, Path], content: str, component: Optional[str] = None) -> Optional[ManifestEntry]:
+        """Record a file that is being written.
+        
+        The writing agent is taken from the agent the current task runs.
+        
+        Args:
+            file_path: Path of the file.
+            content: Content of the file.
+            component: Component the file belongs to.
+            
+        Returns:
+            The entry, or None if the file is outside the project directory.
+        """
+        path = self._relative(file_path)
+        if path is None or path in _UNLISTED:
+            return None
+        data = content.encode("utf-8")
+        agent, _ = current_generation_labels()
+        entry = ManifestEntry(
+            path=path,
+            size=len(data),
+            sha256=hashlib.sha256(data).hexdigest(),
+            component=component,
+            agent=agent,
+            text=content if len(content) <= MAX_CACHED_CHARS else None,
+        )
+        with self._lock:
+            self._entries[path] = entry
+            self._dirty = True
+        captured = _captured.get()
+        if captured is not None:
+            captured.append({"path": path, "component": component, "content": content})
+        return entry
+        
+    def get(self, file_path: Union[str, Path]) -> Optional[ManifestEntry]:
+        """Look up a file.
+        
+        Args:
+            file_path: Path of the file, absolute or relative to the project
+                directory.
+                
+        Returns:
+            The entry, or None if the file is not in the manifest.
+        """
+        path = self._relative(file_path)
+        with self._lock:
+            return self._entries.get(path) if path is not None else None
+            
+    def find(self, file_path: Union[str, Path]) -> Optional[ManifestEntry]:
+        """Look up a file by its path or by the end of its path.
+        
+        Models often refer to generated files by name alone, e.g. "app.py" for
+        "src/server/app.py".
+        
+        Args:
+            file_path: Path of the file, or its trailing path components.
+            
+        Returns:
+            The entry with that path, else the only entry whose path ends
+            with it, else None.
+        """
+        entry = self.get(file_path)
+        if entry is not None:
+            return entry
+        suffix = "/" + Path(file_path).as_posix().lstrip("/")
+        with self._lock:
+            matches = [entry for path, entry in self._entries.items() if path.endswith(suffix)]
+        return matches[0] if len(matches) == 1 else None
+        
+    def files(self, under: Optional[str] = None, component: Optional[str] = None) -> List[ManifestEntry]:
+        """List files, optionally filtered by directory and component.
+        
+        Args:
+            under: Only files below this directory, relative to the project
+                directory, e.g. "src/server".
+            component: Only files of this component.
+            
+        Returns:
+            The entries, sorted by path.
+        """
+        prefix = under.strip("/") + "/" if under else ""
+        with self._lock:
+            entries = [
+                entry for path, entry in self._entries.items()
+                if path.startswith(prefix) and (component is None or entry.component == component)
+            ]
+        return sorted(entries, key=lambda entry: entry.path)
+        
+    def read_text(self, file_path: Union[str, Path]) -> Optional[str]:
+        """Get the content of a generated file.
+        
+        Text kept in memory is returned without touching the disk; otherwise
+        the file is read once its queued write has finished.
+        
+        Args:
+            file_path: Path of the file, absolute or relative to the project
+                directory.
+                
+        Returns:
+            The content, or None if the file is not in the manifest or has
+            been removed.
+        """
+        entry = self.get(file_path)
+        if entry is None:
+            return None
+        if entry.text is not None:
+            return entry.text
+            
+        full_path = self.root / entry.path
+        try:
+            flush_output(full_path.parent)
+            with open(full_path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+            
+    def save(self) -> bool:
+        """Queue ``manifest.json`` to be written if the manifest has changed.
+        
+        Returns:
+            True if the file was queued.
+        """
+        with self._lock:
+            if not self._dirty:
+                return False
+            data = {
+                "version": MANIFEST_VERSION,
+                "files": {path: self._entries[path].to_dict() for path in sorted(self._entries)},
+            }
+            # Queue the write while holding the lock, so a newer snapshot
+            # always supersedes an older one
+            get_output_sink().write(self.root / MANIFEST_FILE, json.dumps(data, indent=2))
+            self._dirty = False
+        return True
+        
+    def __len__(self) -> int:
+        """Get the number of files in the manifest."""
+        with self._lock:
+            return len(self._entries)
+            
+    def _relative(self, file_path: Union[str, Path]) -> Optional[str]:
+        """Get a path relative to the project directory, with forward slashes."""
+        file_path = Path(file_path)
+        if not file_path.is_absolute() and not str(file_path).startswith(str(self.root)):
+            return file_path.as_posix()
+        relative = os.path.relpath(os.path.abspath(file_path), os.path.abspath(self.root))
+        if relative == os.curdir or relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            return None
+        return Path(relative).as_posix()
+        
+    def _scan(self) -> None:
+        """Record the files already in the project directory."""
+        if not self.root.is_dir():
+            return
+        for file_path in self.root.rglob("*"):
+            path = file_path.relative_to(self.root).as_posix()
+            if path in _UNLISTED or not file_path.is_file():
+                continue
+            try:
+                data = file_path.read_bytes()
+            except OSError:
+                continue
+            self._entries[path] = ManifestEntry(
+                path=path, size=len(data), sha256=hashlib.sha256(data).hexdigest()
+            )
+        self._dirty = bool(self._entries)
+
+
+# Manifests of the project directories in use, by absolute path
+_manifests: Dict[str, FileManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest(project_dir: Union[str, Path]) -> FileManifest:
+    """Get the manifest of a project directory, loading it on first use.
+    
+    Args:
+        project_dir: The project directory.
+        
+    Returns:
+        The shared manifest of the directory.
+    """
+    key = os.path.abspath(project_dir)
+    with _manifests_lock:
+        manifest = _manifests.get(key)
+        if manifest is None:
+            manifest = _manifests[key] = FileManifest.load(project_dir)
+        return manifest
+
+
+def save_manifests(project_dir: Optional[Union[str, Path]] = None) -> None:
+    """Queue ``manifest.json`` of changed manifests to be written.
+    
+    Args:
+        project_dir: Only save the manifest of this directory; all if omitted.
+    """
+    with _manifests_lock:
+        if project_dir is None:
+            manifests = list(_manifests.values())
+        else:
+            manifest = _manifests.get(os.path.abspath(project_dir))
+            manifests = [manifest] if manifest is not None else []
+    for manifest in manifests:
+        manifest.save()
+
+
+def release_manifest(project_dir: Union[str, Path]) -> None:
+    """Save a project directory's manifest and drop it from memory.
+    
+    Args:
+        project_dir: The project directory.
+    """
+    with _manifests_lock:
+        manifest = _manifests.pop(os.path.abspath(project_dir), None)
+    if manifest is not None:
+        manifest.save()
+
+
+@contextmanager
+def capture_files() -> Iterator[List[Dict[str, Any]]]:
+    """Collect the files recorded in any manifest inside a ``with`` block.
+    
+    Yields:
+        A list that receives the path, relative to its project directory,
+        component and content of every file recorded in the block.
+    """
+    files: List[Dict[str, Any]] = []
+    token = _captured.set(files)
+    try:
+        yield files
+    finally:
+        _captured.reset(token)
+
+
+def clear_manifests() -> None:
+    """Drop all manifests from memory without saving them."""
+    with _manifests_lock:
+        _manifests.clear()
+
+
+def _shutdown() -> None:
+    """Save changed manifests at exit, before the output sink finishes its writes."""
+    save_manifests()
+
+
+atexit.register(_shutdown)
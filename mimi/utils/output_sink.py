@@ -0,0 +1,292 @@
+"""Write-behind sink for the files a run generates.
+
+Generated files are written on a small thread pool, each one to a temporary
+file that is renamed over the target, so a crash never leaves a half-written
+file behind. Directories are created once and remembered, and later writes
+to the same path supersede earlier ones that have not started yet.
+"""
+
+import atexit
+import contextvars
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from mimi.utils.logger import logger
+from mimi.utils.tracing import span
+
+# Default number of threads writing files
+DEFAULT_MAX_WORKERS = 4
+
+# When to fsync: "never" (rely on the rename alone), "data" (flush each file
+# to disk before it is renamed into place) or "full" (also flush the directory
+# after the rename, so the rename itself survives a power loss)
+FSYNC_POLICIES = ("never", "data", "full")
+
+# Number of locks that serialize writes to the same path
+_LOCK_STRIPES = 64
+
+
+class OutputSink:
+    """Writes generated files atomically on a background thread pool.
+
+    :meth:`write` returns as soon as the write is queued. Call :meth:`flush`
+    before reading files back; it also raises the first error of a failed
+    write. With ``max_workers=0`` files are written on the caller's thread.
+    After :meth:`close`, writes happen on the caller's thread too.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, fsync: str = "never") -> None:
+        """Initialize the sink.
+        
+        Args:
+            max_workers: Number of threads writing files; 0 writes inline.
+            fsync: When to fsync, one of "never", "data" or "full".
+            
+        Raises:
+            ValueError: If the fsync policy is unknown.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.max_workers = max(0, int(max_workers))
+        self.fsync = fsync
+        self.files_written = 0
+        self.bytes_written = 0
+        self.superseded = 0
+        self.failed = 0
+        self.directories_created = 0
+        self._known_dirs: Set[str] = set()
+        self._latest: Dict[str, int] = {}
+        self._pending: Dict[Future, str] = {}
+        self._errors: List[Tuple[str, BaseException]] = []
+        self._sequence = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._path_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+        
+    def ensure_dir(self, directory: Union[str, Path]) -> Path:
+        """Create a directory and its parents, once per directory.
+        
+        Args:
+            directory: The directory.
+            
+        Returns:
+            The directory as a path.
+        """
+        directory = Path(directory)
+        key = os.path.abspath(directory)
+        if key in self._known_dirs:
+            return directory
+            
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            if key not in self._known_dirs:
+                self._known_dirs.add(key)
+                self.directories_created += 1
+        return directory
+        
+    def write(self, path: Union[str, Path], content: str) -> Future:
+        """Queue a file to be written.
+        
+        Args:
+            path: Path of the file; its directory is created if needed.
+            content: Text of the file.
+            
+        Returns:
+            A future that completes once the file is in place.
+        """
+        path = Path(path)
+        self.ensure_dir(path.parent)
+        key = os.path.abspath(path)
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+            self._latest[key] = sequence
+            executor = self._get_executor()
+            
+        if executor is None:
+            future: Future = Future()
+            try:
+                self._write(path, key, content, sequence)
+                future.set_result(path)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            return future
+            
+        # Copy the caller's context so the write's span nests under the caller's
+        context = contextvars.copy_context()
+        future = executor.submit(context.run, self._write, path, key, content, sequence)
+        with self._lock:
+            self._pending[future] = key
+        future.add_done_callback(self._done)
+        return future
+        
+    def flush(self, directory: Optional[Union[str, Path]] = None) -> None:
+        """Wait until queued writes are on disk.
+        
+        Args:
+            directory: Only wait for files under this directory; all files if
+                omitted.
+                
+        Raises:
+            OSError: The first error of a failed write under the directory
+                since the last flush.
+        """
+        prefix = os.path.join(os.path.abspath(directory), "") if directory is not None else ""
+        with self._lock:
+            futures = [future for future, key in self._pending.items() if key.startswith(prefix)]
+        wait(futures)
+        
+        with self._lock:
+            errors = [error for key, error in self._errors if key.startswith(prefix)]
+            self._errors = [(key, error) for key, error in self._errors if not key.startswith(prefix)]
+        if errors:
+            raise errors[0]
+            
+    def close(self) -> None:
+        """Finish the queued writes and stop the threads."""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+            
+    def stats(self) -> Dict[str, Any]:
+        """Get the sink's counters.
+        
+        Returns:
+            Files and bytes written, superseded and failed writes, directories
+            created, and the number of writes still queued.
+        """
+        with self._lock:
+            return {
+                "files_written": self.files_written,
+                "bytes_written": self.bytes_written,
+                "superseded": self.superseded,
+                "failed": self.failed,
+                "directories_created": self.directories_created,
+                "pending": len(self._pending),
+            }
+            
+    def _get_executor(self) -> Optional[ThreadPoolExecutor]:
+        """Get the thread pool, starting it on first use; the caller holds the lock."""
+        if self.max_workers == 0 or self._closed:
+            return None
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="mimi-output"
+            )
+        return self._executor
+        
+    def _write(self, path: Path, key: str, content: str, sequence: int) -> Path:
+        """Write a file through a temporary file, unless a newer write replaced it."""
+        with self._path_locks[hash(key) % _LOCK_STRIPES]:
+            with self._lock:
+                if self._latest.get(key) != sequence:
+                    self.superseded += 1
+                    return path
+                    
+            with span("file.write", path=str(path), chars=len(content)):
+                data = content.encode("utf-8")
+                tmp_path = path.with_name(f".{path.name}.tmp")
+                try:
+                    with open(tmp_path, "wb") as f:
+                        f.write(data)
+                        if self.fsync != "never":
+                            f.flush()
+                            os.fsync(f.fileno())
+                    os.replace(tmp_path, path)
+                except OSError:
+                    tmp_path.unlink(missing_ok=True)
+                    raise
+                if self.fsync == "full":
+                    _fsync_directory(path.parent)
+                    
+            with self._lock:
+                if self._latest.get(key) == sequence:
+                    del self._latest[key]
+                self.files_written += 1
+                self.bytes_written += len(data)
+        return path
+        
+    def _done(self, future: Future) -> None:
+        """Forget a finished write and keep its error for the next flush."""
+        error = future.exception()
+        with self._lock:
+            key = self._pending.pop(future, None)
+            if error is not None:
+                self.failed += 1
+                self._errors.append((key, error))
+        if error is not None:
+            logger.error(f"Failed to write {key}: {str(error)}")
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Flush a directory entry to disk, where the platform allows it."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# Sink shared by every run in the process
+_output_sink = OutputSink()
+_output_sink_lock = threading.Lock()
+
+
+def get_output_sink() -> OutputSink:
+    """Get the sink that writes generated files.
+    
+    Returns:
+        The shared output sink.
+    """
+    return _output_sink
+
+
+def configure_output_sink(max_workers: int = DEFAULT_MAX_WORKERS, fsync: str = "never") -> OutputSink:
+    """Replace the shared output sink, finishing the writes of the old one.
+    
+    Args:
+        max_workers: Number of threads writing files; 0 writes inline.
+        fsync: When to fsync, one of "never", "data" or "full".
+        
+    Returns:
+        The new sink.
+    """
+    global _output_sink
+    new_sink = OutputSink(max_workers=max_workers, fsync=fsync)
+    with _output_sink_lock:
+        old_sink, _output_sink = _output_sink, new_sink
+    old_sink.close()
+    return new_sink
+
+
+def flush_output(directory: Optional[Union[str, Path]] = None) -> None:
+    """Wait until the generated files queued so far are on disk.
+    
+    Args:
+        directory: Only wait for files under this directory; all files if
+            omitted.
+            
+    Raises:
+        OSError: The first error of a failed write since the last flush.
+    """
+    get_output_sink().flush(directory)
+
+
+def _shutdown() -> None:
+    """Finish the queued writes at exit."""
+    get_output_sink().close()
+
+
+atexit.register(_shutdown)
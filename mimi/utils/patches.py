@@ -0,0 +1,276 @@
+"""Edits to generated files returned by a model as patches.
+
+A model revising a file can return only the changed lines instead of the
+whole file, in one of two formats inside a fenced code block:
+
+Search/replace blocks, with the path on the opening line of the fence or on
+the first line of its body::
+
+    src/server/app.py
+    <<<<<<< SEARCH
+    port = 5000
+    =======
+    port = 8080
+    >>>>>>> REPLACE
+
+Unified diffs, with ``---``/``+++`` headers and ``@@`` hunks. Hunks are
+applied by their content, not their line numbers, since models rarely count
+lines correctly.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from mimi.utils.code_fences import FENCE, CodeFence
+
+# Markers of a search/replace block
+_SEARCH = re.compile(r"^<{5,9} ?SEARCH\s*$")
+_DIVIDER = re.compile(r"^={5,9}\s*$")
+_REPLACE = re.compile(r"^>{5,9} ?REPLACE\s*$")
+
+# Path used in unified diff headers for a missing file
+_DEV_NULL = "/dev/null"
+
+
+class PatchError(Exception):
+    """Exception raised when a patch does not apply to a file."""
+
+    pass
+
+
+class Hunk:
+    """A change to a file: text to find and the text to put in its place."""
+
+    __slots__ = ("search", "replace")
+
+    def __init__(self, search: str, replace: str) -> None:
+        """Initialize the hunk.
+        
+        Args:
+            search: Text the file contains before the change.
+            replace: Text the file contains after the change.
+        """
+        self.search = search
+        self.replace = replace
+
+
+class FilePatch:
+    """The hunks a patch applies to one file."""
+
+    __slots__ = ("path", "hunks", "new_file", "text")
+
+    def __init__(self, path: str, hunks: List[Hunk], new_file: bool = False, text: str = "") -> None:
+        """Initialize the patch.
+        
+        Args:
+            path: Path of the file as written in the patch.
+            hunks: The changes, in order.
+            new_file: Whether the patch creates the file.
+            text: The patch as the model wrote it.
+        """
+        self.path = path
+        self.hunks = hunks
+        self.new_file = new_file
+        self.text = text
+
+
+def is_patch(fence: CodeFence) -> bool:
+    """Check whether a code block holds a patch rather than a whole file.
+    
+    Args:
+        fence: The code block.
+        
+    Returns:
+        True for search/replace blocks and unified diffs.
+    """
+    lines = _fence_body(fence)[1].splitlines()
+    if any(_SEARCH.match(line) for line in lines):
+        return True
+    return (
+        any(line.startswith("--- ") for line in lines)
+        and any(line.startswith("+++ ") for line in lines)
+        and any(line.startswith("@@") for line in lines)
+    )
+
+
+def parse_patch(fence: CodeFence) -> List[FilePatch]:
+    """Read the file patches in a code block.
+    
+    Args:
+        fence: A code block for which :func:`is_patch` is true.
+        
+    Returns:
+        The patch of each file, in order; blocks without a path are skipped.
+    """
+    path, body = _fence_body(fence)
+    if any(_SEARCH.match(line) for line in body.splitlines()):
+        patch = _parse_search_replace(path, body, fence.text)
+        return [patch] if patch is not None else []
+    return _parse_unified_diff(body)
+
+
+def _fence_body(fence: CodeFence) -> Tuple[str, str]:
+    """Split a code block into the path on its opening line and its body.
+    
+    The fence pattern takes the first line of the body as the filename when
+    the opening line has no more than a language, so that line is put back.
+    """
+    after_language = fence.text[len(FENCE) + len(fence.language):]
+    if fence.filename and "\n" in after_language[:after_language.find(fence.filename)]:
+        return "", fence.filename + "\n" + fence.body
+    return fence.filename, fence.body
+
+
+def _parse_search_replace(path: str, body: str, text: str) -> Optional[FilePatch]:
+    """Read the search/replace blocks of a code block."""
+    path = path.strip()
+    hunks = []
+    search: List[str] = []
+    replace: List[str] = []
+    state = None
+    for line in body.splitlines(keepends=True):
+        bare = line.rstrip("\r\n")
+        if state is None:
+            if _SEARCH.match(bare):
+                state, search, replace = "search", [], []
+            elif not path and bare.strip():
+                path = bare.strip()
+        elif state == "search":
+            if _DIVIDER.match(bare):
+                state = "replace"
+            else:
+                search.append(line)
+        elif _REPLACE.match(bare):
+            hunks.append(Hunk("".join(search), "".join(replace)))
+            state = None
+        else:
+            replace.append(line)
+            
+    path = _clean_path(path)
+    if not path or not hunks:
+        return None
+    return FilePatch(path, hunks, text=text)
+
+
+def _parse_unified_diff(body: str) -> List[FilePatch]:
+    """Read the files of a unified diff, turning each hunk into search/replace text."""
+    patches = []
+    old_path = None
+    current: Optional[FilePatch] = None
+    lines: List[str] = []
+    search: List[str] = []
+    replace: List[str] = []
+    
+    def finish_hunk() -> None:
+        if current is not None and (search or replace):
+            current.hunks.append(Hunk("".join(search), "".join(replace)))
+        search.clear()
+        replace.clear()
+        
+    def finish_file() -> None:
+        finish_hunk()
+        if current is not None and current.hunks:
+            current.text = "".join(lines)
+            patches.append(current)
+            
+    body_lines = body.splitlines(keepends=True)
+    for index, line in enumerate(body_lines):
+        next_line = body_lines[index + 1] if index + 1 < len(body_lines) else ""
+        if line.startswith("--- ") and next_line.startswith("+++ "):
+            # Header of the next file; a removed line starting with "-- " is
+            # never followed by a "+++ " line
+            finish_file()
+            current, lines = None, []
+            old_path = _header_path(line)
+        elif line.startswith("+++ ") and current is None and old_path is not None:
+            new_path = _header_path(line)
+            if new_path != _DEV_NULL:
+                current = FilePatch(_clean_path(new_path), [], new_file=old_path == _DEV_NULL)
+        elif line.startswith("@@"):
+            finish_hunk()
+        elif current is not None:
+            if line.startswith("-"):
+                search.append(line[1:])
+            elif line.startswith("+"):
+                replace.append(line[1:])
+            elif line.startswith(" "):
+                search.append(line[1:])
+                replace.append(line[1:])
+            elif line.strip() == "":
+                # A blank context line whose leading space was dropped
+                search.append("\n")
+                replace.append("\n")
+        lines.append(line)
+    finish_file()
+    return patches
+
+
+def _header_path(line: str) -> str:
+    """Get the path of a ``---`` or ``+++`` header line."""
+    return line[4:].rstrip("\r\n").split("\t")[0].strip()
+
+
+def _clean_path(path: str) -> str:
+    """Strip quoting and the ``a/`` or ``b/`` prefix of a patch path."""
+    path = path.strip().strip("`'\"")
+    if path.startswith(("a/", "b/", "./")):
+        path = path[2:]
+    return path
+
+
+def apply_patch(original: str, patch: FilePatch) -> str:
+    """Apply a file patch to the content of the file.
+    
+    Each hunk's search text must occur exactly once, either verbatim or when
+    trailing whitespace is ignored on every line.
+    
+    Args:
+        original: Content of the file; "" for a new file.
+        patch: The patch.
+        
+    Returns:
+        The patched content.
+        
+    Raises:
+        PatchError: If a hunk's search text is missing or ambiguous.
+    """
+    text = original
+    for number, hunk in enumerate(patch.hunks, 1):
+        if not hunk.search:
+            if text and not patch.new_file:
+                raise PatchError(f"Hunk {number} of {patch.path} has no text to search for")
+            text += hunk.replace
+            continue
+            
+        count = text.count(hunk.search)
+        if count == 1:
+            text = text.replace(hunk.search, hunk.replace, 1)
+            continue
+        if count > 1:
+            raise PatchError(f"Hunk {number} of {patch.path} matches {count} places")
+            
+        patched = _replace_lines(text, hunk)
+        if patched is None:
+            raise PatchError(f"Hunk {number} of {patch.path} does not match the file")
+        text = patched
+    return text
+
+
+def _replace_lines(text: str, hunk: Hunk) -> Optional[str]:
+    """Apply a hunk ignoring trailing whitespace, if it matches exactly one place."""
+    lines = text.splitlines(keepends=True)
+    wanted = [line.rstrip() for line in hunk.search.splitlines()]
+    stripped = [line.rstrip() for line in lines]
+    size = len(wanted)
+    starts = [
+        start for start in range(len(lines) - size + 1)
+        if stripped[start:start + size] == wanted
+    ]
+    if len(starts) != 1:
+        return None
+        
+    start = starts[0]
+    replacement = hunk.replace
+    if replacement and not replacement.endswith("\n") and start + size < len(lines):
+        replacement += "\n"
+    return "".join(lines[:start]) + replacement + "".join(lines[start + size:])
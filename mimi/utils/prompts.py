@@ -0,0 +1,496 @@
+"""Token-budget-aware assembly of model prompts.
+
+A prompt is a template whose variable parts are sections: the specifications,
+an architecture plan, test results, retrieved code. The builder estimates the
+tokens of every part, fits the prompt into the model's context window
+(``num_ctx`` in ``model_settings``) minus room for the response, and cuts the
+sections that do not fit according to their policy. Without ``num_ctx`` the
+window is unknown and only section budgets apply:
+
+- ``keep``: never cut, e.g. instructions the response must follow.
+- ``head``: keep the start of the text.
+- ``tail``: keep the end of the text, e.g. the last lines of a log.
+- ``select``: keep the chunks most relevant to a query, in their original
+  order; an extractive summary that needs no extra model call.
+
+Each section can also have its own budget, from the code that adds it or from
+``prompt_budgets`` in ``model_settings``. Once every section is within its
+budget, sections that still do not fit the window are shrunk in proportion to
+their size.
+
+Agent prompts are :class:`PromptTemplate` objects kept in a registry. A
+template puts the static system prompt and task instructions first and the
+variable payload last, so repeated calls by an agent share a prompt prefix
+whose KV cache the model server can reuse.
+"""
+
+import hashlib
+import string
+import textwrap
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from mimi.utils.logger import logger
+from mimi.utils.retrieval import select_relevant
+from mimi.utils.tokens import CHARS_PER_TOKEN, estimate_tokens
+from mimi.utils.tracing import current_span
+
+# Tokens of the context window kept free for the response; agents can set
+# "response_tokens" in model_settings
+DEFAULT_RESPONSE_TOKENS = 1024
+
+# Section policies
+KEEP = "keep"
+HEAD = "head"
+TAIL = "tail"
+SELECT = "select"
+POLICIES = (KEEP, HEAD, TAIL, SELECT)
+
+# Marks the place where a section was cut
+_OMITTED = "\n[... {tokens} tokens omitted ...]\n"
+
+# Tokens a truncation marker takes up
+_MARKER_TOKENS = estimate_tokens(_OMITTED.format(tokens=100000))
+
+# Separates the instructions of a template from its payload
+PAYLOAD_SEPARATOR = "\n\n"
+
+# Literal text followed by the name of a field, or None after the last field
+_Parts = Tuple[Tuple[str, Optional[str]], ...]
+
+
+def _compile(text: str) -> _Parts:
+    """Dedent a template text and split it into literal text and fields."""
+    parts = []
+    for literal, field, spec, conversion in string.Formatter().parse(textwrap.dedent(text).strip()):
+        if field is not None and (spec or conversion or not field.isidentifier()):
+            raise ValueError(f"Prompt template fields must be plain names: {{{field}}}")
+        parts.append((literal, field))
+    return tuple(parts)
+
+
+def _fill(parts: _Parts, values: Mapping[str, Any]) -> str:
+    """Fill in the fields of a compiled template text."""
+    return "".join(literal + (str(values[field]) if field is not None else "") for literal, field in parts)
+
+
+def _fields(parts: _Parts) -> Tuple[str, ...]:
+    """Get the names of the fields of a compiled template text."""
+    return tuple(dict.fromkeys(field for _, field in parts if field is not None))
+
+
+class PromptTemplate:
+    """A prompt laid out for KV-cache reuse: static text first, payload last.
+
+    Ollama and llama.cpp only evaluate the prompt tokens after the longest
+    prefix shared with the previous request, so the system prompt and the
+    instructions, which stay the same for every call of an agent, come before
+    the payload that changes with every call. Fields of the system prompt and
+    instructions are static values such as an engineer's specialty; fields of
+    the payload are the sections added to a :class:`PromptBuilder`. Texts are
+    dedented and parsed once, when the template is created.
+    """
+
+    __slots__ = ("name", "static_fields", "payload_fields", "_system", "_instructions", "_payload", "_hashes")
+
+    def __init__(self, name: str, system: str, instructions: str, payload: str) -> None:
+        """Initialize and compile the template.
+        
+        Args:
+            name: Name of the template in the registry, e.g. "architect.architecture".
+            system: The system prompt.
+            instructions: The task and output format instructions.
+            payload: The variable part of the prompt.
+            
+        Raises:
+            ValueError: If a field is not a plain name.
+        """
+        self.name = name
+        self._system = _compile(system)
+        self._instructions = _compile(instructions)
+        self._payload = _compile(payload)
+        self.static_fields = _fields(self._system + self._instructions)
+        self.payload_fields = _fields(self._payload)
+        self._hashes: Dict[Tuple[Tuple[str, str], ...], str] = {}
+        
+    def system_prompt(self, **values: Any) -> str:
+        """Get the system prompt with its static values filled in."""
+        return _fill(self._system, values)
+        
+    def instructions(self, **values: Any) -> str:
+        """Get the instructions with their static values filled in."""
+        return _fill(self._instructions, values)
+        
+    def render(self, sections: Mapping[str, str], **values: Any) -> str:
+        """Get the prompt: the instructions followed by the payload.
+        
+        Args:
+            sections: Text of the payload fields.
+            **values: Static values; they can also fill payload fields.
+            
+        Returns:
+            The prompt, without the system prompt.
+        """
+        payload = _fill(self._payload, {**values, **sections})
+        return self.instructions(**values) + PAYLOAD_SEPARATOR + payload
+        
+    def prefix_hash(self, **values: Any) -> str:
+        """Get a hash of the static prefix shared by every prompt with these values.
+        
+        Args:
+            **values: Static values; values of payload fields are ignored.
+            
+        Returns:
+            The first 16 hex digits of the SHA-256 of the system prompt and
+            instructions.
+        """
+        key = tuple((field, str(values.get(field, ""))) for field in self.static_fields)
+        prefix_hash = self._hashes.get(key)
+        if prefix_hash is None:
+            prefix = self.system_prompt(**values) + "\0" + self.instructions(**values)
+            prefix_hash = self._hashes[key] = hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+        return prefix_hash
+
+
+class PromptPrefix:
+    """The static prefix of a rendered prompt, used to check KV-cache reuse."""
+
+    __slots__ = ("hash", "tokens", "prompt_tokens")
+
+    def __init__(self, prefix_hash: str, tokens: int, prompt_tokens: int) -> None:
+        """Initialize the prefix.
+        
+        Args:
+            prefix_hash: Hash of the template's system prompt and instructions.
+            tokens: Estimated tokens of the prefix.
+            prompt_tokens: Estimated tokens of the whole prompt, including
+                the system prompt.
+        """
+        self.hash = prefix_hash
+        self.tokens = tokens
+        self.prompt_tokens = prompt_tokens
+
+
+# Registered templates by name
+_templates: Dict[str, PromptTemplate] = {}
+_templates_lock = threading.Lock()
+
+
+def register_template(template: PromptTemplate, replace: bool = False) -> PromptTemplate:
+    """Add a template to the registry.
+    
+    Args:
+        template: The template.
+        replace: Whether to replace a template of the same name.
+        
+    Returns:
+        The template, so it can be registered where it is defined.
+        
+    Raises:
+        ValueError: If a template of the same name is registered and
+            ``replace`` is false.
+    """
+    with _templates_lock:
+        if template.name in _templates and not replace:
+            raise ValueError(f"Prompt template already registered: {template.name}")
+        _templates[template.name] = template
+    return template
+
+
+def get_template(name: str) -> PromptTemplate:
+    """Get a registered template.
+    
+    Args:
+        name: Name of the template.
+        
+    Returns:
+        The template.
+        
+    Raises:
+        KeyError: If no template has that name.
+    """
+    with _templates_lock:
+        template = _templates.get(name)
+    if template is None:
+        raise KeyError(f"Unknown prompt template: {name}")
+    return template
+
+
+def template_names() -> List[str]:
+    """Get the names of the registered templates."""
+    with _templates_lock:
+        return sorted(_templates)
+
+
+class PromptSection:
+    """A variable part of a prompt and how it may be cut."""
+
+    __slots__ = ("name", "text", "budget", "policy", "query")
+
+    def __init__(
+        self,
+        name: str,
+        text: str,
+        budget: Optional[int] = None,
+        policy: str = HEAD,
+        query: Optional[str] = None,
+    ) -> None:
+        """Initialize the section.
+        
+        Args:
+            name: Name of the template field the section fills.
+            text: Text of the section.
+            budget: Largest estimated number of tokens of the section.
+            policy: How the section is cut, one of POLICIES.
+            query: Text the chunks of a ``select`` section are ranked by.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown prompt section policy: {policy}")
+        if policy == SELECT and not query:
+            raise ValueError(f"Section {name} needs a query for the select policy")
+        self.name = name
+        self.text = text
+        self.budget = budget
+        self.policy = policy
+        self.query = query
+
+
+class PromptBuilder:
+    """Fits the sections of a prompt into a model's context window.
+
+    Example::
+
+        builder = PromptBuilder.from_settings(agent.model_settings, system_prompt, "architecture")
+        builder.add("specifications", specifications, budget=2000)
+        prompt = builder.render("# Specifications\\n{specifications}\\n# Task\\n...")
+    """
+
+    def __init__(
+        self,
+        num_ctx: Optional[int] = None,
+        response_tokens: int = DEFAULT_RESPONSE_TOKENS,
+        system_prompt: Optional[str] = None,
+        label: str = "prompt",
+        budgets: Optional[Mapping[str, int]] = None,
+        template: Optional[PromptTemplate] = None,
+        values: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        """Initialize the builder.
+        
+        Args:
+            num_ctx: Context window of the model in tokens; None if it is
+                unknown, so the prompt is not fitted into a window.
+            response_tokens: Tokens kept free for the response.
+            system_prompt: System prompt sent with the prompt; it shares the
+                context window. Defaults to the template's system prompt.
+            label: Name of the prompt in log messages.
+            budgets: Budgets by section name, overriding those passed to
+                :meth:`add`.
+            template: Template rendered by :meth:`render` by default.
+            values: Static values of the template.
+        """
+        self.num_ctx = num_ctx
+        self.response_tokens = response_tokens
+        self.template = template
+        self.values = dict(values or {})
+        if system_prompt is None and template is not None:
+            system_prompt = template.system_prompt(**self.values)
+        self.system_prompt = system_prompt or ""
+        self.label = label
+        self.budgets = dict(budgets or {})
+        self.sections: List[PromptSection] = []
+        self.report: Dict[str, int] = {}
+        self.prefix: Optional[PromptPrefix] = None
+        
+    @classmethod
+    def from_settings(
+        cls,
+        model_settings: Mapping[str, Any],
+        system_prompt: Optional[str] = None,
+        label: Optional[str] = None,
+        template: Optional[PromptTemplate] = None,
+        values: Optional[Mapping[str, Any]] = None,
+    ) -> "PromptBuilder":
+        """Create a builder for the model described by an agent's ``model_settings``.
+        
+        Reads ``num_ctx``, ``response_tokens`` and ``prompt_budgets``. The
+        prompt is only fitted into a context window if ``num_ctx`` is set.
+        
+        Args:
+            model_settings: The agent's model settings.
+            system_prompt: System prompt sent with the prompt; defaults to
+                the template's system prompt.
+            label: Name of the prompt in log messages; defaults to the
+                template's name.
+            template: Template rendered by :meth:`render` by default.
+            values: Static values of the template.
+            
+        Returns:
+            The builder.
+        """
+        if label is None:
+            label = template.name if template is not None else "prompt"
+        num_ctx = model_settings.get("num_ctx")
+        return cls(
+            num_ctx=int(num_ctx) if num_ctx else None,
+            response_tokens=int(model_settings.get("response_tokens", DEFAULT_RESPONSE_TOKENS)),
+            system_prompt=system_prompt,
+            label=label,
+            budgets=model_settings.get("prompt_budgets"),
+            template=template,
+            values=values,
+        )
+        
+    @property
+    def available_tokens(self) -> Optional[int]:
+        """Tokens of the context window left for the prompt and system prompt, or None if unknown."""
+        if self.num_ctx is None:
+            return None
+        return max(0, self.num_ctx - self.response_tokens)
+        
+    def add(
+        self,
+        name: str,
+        text: Any,
+        budget: Optional[int] = None,
+        policy: str = HEAD,
+        query: Optional[str] = None,
+    ) -> "PromptBuilder":
+        """Add a section.
+        
+        Args:
+            name: Name of the template field the section fills.
+            text: Text of the section; other values are converted with str().
+            budget: Largest estimated number of tokens of the section.
+            policy: How the section is cut, one of POLICIES.
+            query: Text the chunks of a ``select`` section are ranked by.
+            
+        Returns:
+            The builder, so calls can be chained.
+        """
+        budget = self.budgets.get(name, budget)
+        self.sections.append(PromptSection(name, "" if text is None else str(text), budget, policy, query))
+        return self
+        
+    def render(self, template: Union[str, PromptTemplate, None] = None, **values: Any) -> str:
+        """Fit the sections into the context window and fill in the template.
+        
+        The number of tokens each part contributed is logged and kept in
+        :attr:`report`. For a :class:`PromptTemplate`, :attr:`prefix` is set
+        to the prompt's static prefix.
+        
+        Args:
+            template: A :class:`PromptTemplate`, or a ``str.format`` template
+                with a field for each section; defaults to the builder's
+                template.
+            **values: Other fields of the template, added to the builder's
+                static values; they are never cut.
+                
+        Returns:
+            The prompt.
+        """
+        template = self.template if template is None else template
+        values = {**self.values, **values}
+        if isinstance(template, PromptTemplate):
+            def fill(texts: Mapping[str, str]) -> str:
+                return template.render(texts, **values)
+        else:
+            def fill(texts: Mapping[str, str]) -> str:
+                return template.format(**values, **texts)
+                
+        fixed = fill({section.name: "" for section in self.sections})
+        report = {
+            "system": estimate_tokens(self.system_prompt),
+            "template": estimate_tokens(fixed),
+        }
+        available = self.available_tokens
+        room = None if available is None else available - report["system"] - report["template"]
+        
+        limits = self._limits(room)
+        texts = {}
+        for section in self.sections:
+            texts[section.name] = _fit(section, limits[section.name])
+            report[section.name] = estimate_tokens(texts[section.name])
+        self.report = report
+        
+        if isinstance(template, PromptTemplate):
+            self.prefix = PromptPrefix(
+                template.prefix_hash(**values),
+                report["system"] + estimate_tokens(template.instructions(**values)),
+                sum(report.values()),
+            )
+        self._log()
+        return fill(texts)
+        
+    def _limits(self, room: Optional[int]) -> Dict[str, int]:
+        """Get the largest number of tokens of each section; ``room`` None means no window."""
+        sizes = {section.name: estimate_tokens(section.text) for section in self.sections}
+        limits = {}
+        for section in self.sections:
+            size = sizes[section.name]
+            if section.policy == KEEP or section.budget is None:
+                limits[section.name] = size
+            else:
+                limits[section.name] = min(size, max(0, section.budget))
+        if room is None:
+            return limits
+            
+        kept = sum(limits[section.name] for section in self.sections if section.policy == KEEP)
+        flexible = [section.name for section in self.sections if section.policy != KEEP]
+        wanted = sum(limits[name] for name in flexible)
+        left = max(0, room - kept)
+        if wanted > left:
+            for name in flexible:
+                limits[name] = limits[name] * left // wanted
+        return limits
+        
+    def _log(self) -> None:
+        """Log the tokens each part of the prompt contributed."""
+        total = sum(self.report.values())
+        parts = []
+        for name, tokens in self.report.items():
+            section = next((s for s in self.sections if s.name == name), None)
+            original = estimate_tokens(section.text) if section is not None else tokens
+            if original > tokens:
+                parts.append(f"{name} {tokens} of {original} ({section.policy})")
+            else:
+                parts.append(f"{name} {tokens}")
+        prefix = f", prefix {self.prefix.hash}" if self.prefix is not None else ""
+        window = f" of {self.available_tokens}" if self.available_tokens is not None else ""
+        logger.info(
+            f"Prompt '{self.label}': {total}{window} tokens ({', '.join(parts)}){prefix}"
+        )
+        
+        attributes = {f"prompt.{name}_tokens": tokens for name, tokens in self.report.items()}
+        if self.prefix is not None:
+            attributes["prompt.prefix_hash"] = self.prefix.hash
+        current_span().set_attributes(**attributes)
+
+
+def _fit(section: PromptSection, limit: int) -> str:
+    """Cut a section's text down to an estimated number of tokens."""
+    text = section.text
+    size = estimate_tokens(text)
+    if section.policy == KEEP or size <= limit:
+        return text
+    if limit <= _MARKER_TOKENS:
+        return ""
+        
+    if section.policy == SELECT:
+        return select_relevant(text, section.query, limit)
+        
+    keep_chars = (limit - _MARKER_TOKENS) * CHARS_PER_TOKEN
+    marker = _OMITTED.format(tokens=size - limit)
+    if section.policy == TAIL:
+        kept = text[len(text) - keep_chars:]
+        # Start at a whole line if one begins close to the cut
+        newline = kept.find("\n")
+        if 0 <= newline < keep_chars // 4:
+            kept = kept[newline + 1:]
+        return marker.lstrip("\n") + kept
+        
+    kept = text[:keep_chars]
+    newline = kept.rfind("\n")
+    if newline > keep_chars * 3 // 4:
+        kept = kept[:newline]
+    return kept + marker.rstrip("\n")
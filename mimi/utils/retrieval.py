@@ -0,0 +1,371 @@
+"""Local BM25 retrieval over the files of a generated project.
+
+Files are split into chunks of a few dozen lines and kept in an inverted
+index, so an agent can put the parts of a project that are relevant to a
+revision or bug report into its prompt instead of whole documents. The index
+of a project follows its file manifest: files are re-indexed only when their
+content hash changes.
+"""
+
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from mimi.utils.manifest import get_manifest
+from mimi.utils.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+# BM25 term frequency saturation and length normalization
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+# Largest number of lines in a chunk; chunks end at a blank line once they
+# have at least half as many
+CHUNK_LINES = 40
+
+# Files larger than this are not indexed
+MAX_INDEXED_CHARS = 512 * 1024
+
+# Identifiers and numbers; identifiers are also split into their words
+_TOKEN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+# Words too common in prose and code to tell chunks apart
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have if in into is it its of on or "
+    "that the this to was were will with self def return none true false var let "
+    "const function".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms.
+    
+    An identifier yields itself and its words, so ``getUserName`` and
+    ``user_name`` both match a query for "user name".
+    
+    Args:
+        text: The text.
+        
+    Returns:
+        The terms, in order, with repeats.
+    """
+    terms = []
+    for match in _TOKEN.finditer(text):
+        token = match.group(0)
+        words = _WORD.findall(token)
+        lower = token.lower()
+        if len(lower) > 1 and lower not in _STOPWORDS:
+            terms.append(lower)
+        if len(words) > 1:
+            terms.extend(
+                word.lower() for word in words
+                if len(word) > 1 and word.lower() not in _STOPWORDS
+            )
+    return terms
+
+
+def split_chunks(text: str, max_lines: int = CHUNK_LINES) -> List[Tuple[int, int, str]]:
+    """Split text into chunks of whole lines.
+    
+    Args:
+        text: The text.
+        max_lines: Largest number of lines in a chunk.
+        
+    Returns:
+        The first and last line number (1-based) and the text of each chunk.
+    """
+    chunks = []
+    lines = text.splitlines(keepends=True)
+    start = 0
+    for index, line in enumerate(lines):
+        size = index - start + 1
+        if size >= max_lines or (size >= max_lines // 2 and not line.strip()):
+            chunks.append((start + 1, index + 1, "".join(lines[start:index + 1])))
+            start = index + 1
+    if start < len(lines):
+        chunks.append((start + 1, len(lines), "".join(lines[start:])))
+    return [chunk for chunk in chunks if chunk[2].strip()]
+
+
+class Chunk:
+    """A range of lines of an indexed document."""
+
+    __slots__ = ("path", "start_line", "end_line", "text", "length", "score")
+
+    def __init__(self, path: str, start_line: int, end_line: int, text: str, length: int) -> None:
+        """Initialize the chunk.
+        
+        Args:
+            path: Path of the document.
+            start_line: First line of the chunk, from 1.
+            end_line: Last line of the chunk.
+            text: Text of the chunk.
+            length: Number of terms in the chunk.
+        """
+        self.path = path
+        self.start_line = start_line
+        self.end_line = end_line
+        self.text = text
+        self.length = length
+        self.score = 0.0
+        
+    def format(self) -> str:
+        """Format the chunk for a prompt, with its path and line range."""
+        return f"{self.path} (lines {self.start_line}-{self.end_line}):\n```\n{self.text.rstrip()}\n```"
+
+
+class BM25Index:
+    """Inverted index of document chunks ranked with Okapi BM25.
+
+    Documents can be added, replaced and removed at any time; only the
+    chunks of the changed document are touched.
+    """
+
+    def __init__(self, k1: float = DEFAULT_K1, b: float = DEFAULT_B) -> None:
+        """Initialize an empty index.
+        
+        Args:
+            k1: Term frequency saturation.
+            b: Strength of the document length normalization.
+        """
+        self.k1 = k1
+        self.b = b
+        self._chunks: Dict[int, Chunk] = {}
+        self._chunk_terms: Dict[int, Tuple[str, ...]] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._documents: Dict[str, List[int]] = {}
+        self._versions: Dict[str, str] = {}
+        self._total_length = 0
+        self._next_id = 0
+        self._lock = threading.Lock()
+        
+    def add_document(self, path: str, text: str, version: Optional[str] = None) -> None:
+        """Index a document, replacing an earlier version of it.
+        
+        Args:
+            path: Path identifying the document.
+            text: Text of the document.
+            version: Content hash or other version of the text, used by
+                :meth:`version` to tell whether it needs re-indexing.
+        """
+        chunks = []
+        for start_line, end_line, chunk_text in split_chunks(text):
+            terms = Counter(tokenize(chunk_text))
+            chunks.append((Chunk(path, start_line, end_line, chunk_text, sum(terms.values())), terms))
+            
+        with self._lock:
+            self._remove(path)
+            ids = []
+            for chunk, terms in chunks:
+                chunk_id = self._next_id
+                self._next_id += 1
+                self._chunks[chunk_id] = chunk
+                self._chunk_terms[chunk_id] = tuple(terms)
+                self._total_length += chunk.length
+                for term, count in terms.items():
+                    self._postings.setdefault(term, {})[chunk_id] = count
+                ids.append(chunk_id)
+            self._documents[path] = ids
+            if version is not None:
+                self._versions[path] = version
+                
+    def remove_document(self, path: str) -> None:
+        """Remove a document from the index.
+        
+        Args:
+            path: Path identifying the document.
+        """
+        with self._lock:
+            self._remove(path)
+            
+    def version(self, path: str) -> Optional[str]:
+        """Get the version a document was indexed at, or None if it is not indexed."""
+        with self._lock:
+            return self._versions.get(path)
+            
+    def paths(self) -> List[str]:
+        """Get the paths of the indexed documents."""
+        with self._lock:
+            return list(self._documents)
+            
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        token_budget: Optional[int] = None,
+        paths: Optional[Iterable[str]] = None,
+    ) -> List[Chunk]:
+        """Find the chunks most relevant to a query.
+        
+        Args:
+            query: The query text; a whole bug report or revision plan works.
+            top_k: Largest number of chunks to return.
+            token_budget: Largest estimated number of tokens of the returned
+                chunks; chunks that do not fit are skipped.
+            paths: Only search these documents.
+            
+        Returns:
+            Copies of the best chunks with their ``score`` set, best first.
+        """
+        query_terms = set(tokenize(query))
+        allowed = set(paths) if paths is not None else None
+        
+        with self._lock:
+            if not self._chunks:
+                return []
+            count = len(self._chunks)
+            average_length = self._total_length / count or 1.0
+            scores: Dict[int, float] = {}
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, frequency in postings.items():
+                    length = self._chunks[chunk_id].length
+                    norm = frequency + self.k1 * (1 - self.b + self.b * length / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (self.k1 + 1) / norm
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            candidates = [(self._chunks[chunk_id], score) for chunk_id, score in ranked]
+            
+        results = []
+        used = 0
+        for chunk, score in candidates:
+            if len(results) >= top_k:
+                break
+            if allowed is not None and chunk.path not in allowed:
+                continue
+            size = estimate_tokens(chunk.text)
+            if token_budget is not None and used + size > token_budget:
+                continue
+            used += size
+            result = Chunk(chunk.path, chunk.start_line, chunk.end_line, chunk.text, chunk.length)
+            result.score = score
+            results.append(result)
+        return results
+        
+    def __len__(self) -> int:
+        """Get the number of indexed chunks."""
+        with self._lock:
+            return len(self._chunks)
+            
+    def _remove(self, path: str) -> None:
+        """Remove a document's chunks; the caller holds the lock."""
+        for chunk_id in self._documents.pop(path, []):
+            chunk = self._chunks.pop(chunk_id)
+            self._total_length -= chunk.length
+            for term in self._chunk_terms.pop(chunk_id):
+                postings = self._postings[term]
+                del postings[chunk_id]
+                if not postings:
+                    del self._postings[term]
+        self._versions.pop(path, None)
+
+
+# Indexes of the project directories in use, by absolute path
+_indexes: Dict[str, BM25Index] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_project_index(project_dir: Union[str, Path]) -> BM25Index:
+    """Get the index of a project directory, brought up to date with its manifest.
+    
+    Files written since the last call are indexed, changed files are
+    re-indexed and removed files are dropped.
+    
+    Args:
+        project_dir: The project directory.
+        
+    Returns:
+        The shared index of the directory.
+    """
+    key = os.path.abspath(project_dir)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = BM25Index()
+            
+    manifest = get_manifest(project_dir)
+    entries = {entry.path: entry for entry in manifest.files()}
+    for path in index.paths():
+        if path not in entries:
+            index.remove_document(path)
+    for path, entry in entries.items():
+        if entry.size > MAX_INDEXED_CHARS or index.version(path) == entry.sha256:
+            continue
+        text = manifest.read_text(path)
+        if text is not None:
+            index.add_document(path, text, version=entry.sha256)
+    return index
+
+
+def retrieve_context(
+    project_dir: Union[str, Path],
+    query: str,
+    token_budget: int,
+    top_k: int = 8,
+    paths: Optional[Iterable[str]] = None,
+) -> str:
+    """Get the parts of a project most relevant to a query, formatted for a prompt.
+    
+    Args:
+        project_dir: The project directory.
+        query: The query text, e.g. a revision plan or bug report.
+        token_budget: Largest estimated number of tokens of the chunks.
+        top_k: Largest number of chunks.
+        paths: Only search these files, relative to the project directory.
+        
+    Returns:
+        The chunks with their paths and line ranges, or "" if none match.
+    """
+    chunks = get_project_index(project_dir).search(query, top_k=top_k, token_budget=token_budget, paths=paths)
+    return "\n\n".join(chunk.format() for chunk in chunks)
+
+
+def select_relevant(text: str, query: str, token_budget: int, top_k: int = 20) -> str:
+    """Shorten a text to the chunks most relevant to a query.
+    
+    The text is returned unchanged if it fits the budget. Otherwise its
+    best chunks are kept in their original order.
+    
+    Args:
+        text: The text to shorten.
+        query: The query the chunks are ranked by.
+        token_budget: Largest estimated number of tokens of the result.
+        top_k: Largest number of chunks.
+        
+    Returns:
+        The text or its selected chunks, separated by "...".
+    """
+    if estimate_tokens(text) <= token_budget:
+        return text
+    index = BM25Index()
+    index.add_document("text", text)
+    chunks = index.search(query, top_k=top_k, token_budget=token_budget)
+    if not chunks:
+        # No chunk fits the budget, or none matches the query; keep the start
+        # of the best chunk, or else of the text
+        best = index.search(query, top_k=1)
+        return (best[0].text if best else text)[:token_budget * CHARS_PER_TOKEN]
+    chunks.sort(key=lambda chunk: chunk.start_line)
+    return "\n...\n".join(chunk.text.rstrip() for chunk in chunks)
+
+
+def release_index(project_dir: Union[str, Path]) -> None:
+    """Drop the index of a project directory from memory.
+    
+    Args:
+        project_dir: The project directory.
+    """
+    with _indexes_lock:
+        _indexes.pop(os.path.abspath(project_dir), None)
+
+
+def clear_indexes() -> None:
+    """Drop all project indexes from memory."""
+    with _indexes_lock:
+        _indexes.clear()
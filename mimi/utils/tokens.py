@@ -0,0 +1,19 @@
+"""Token count estimates for prompts and generated text."""
+
+# Average number of characters per token of the models MiMi runs; close
+# enough for English text and code to compare sizes and budgets
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text.
+    
+    Args:
+        text: The text.
+        
+    Returns:
+        The estimated token count, at least 1 for non-empty text.
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
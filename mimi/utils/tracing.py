@@ -0,0 +1,337 @@
+"""Span-based tracing for MiMi runs.
+
+A :class:`Tracer` records timed, nested spans around project runs, tasks,
+agent calls, model calls and file writes, and exports them as Chrome
+trace-event JSON (for Perfetto or ``chrome://tracing``) or as OTLP JSON. Spans
+are only recorded while a tracer is active; otherwise :func:`span` returns a
+shared no-op span, so instrumented code costs next to nothing.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+# Maximum number of spans a tracer keeps
+DEFAULT_MAX_SPANS = 100000
+
+# The tracer recording spans for the current thread or asyncio task
+_current_tracer: ContextVar[Optional["Tracer"]] = ContextVar("mimi_tracer", default=None)
+
+# The innermost open span of the current thread or asyncio task
+_current_span: ContextVar[Optional["Span"]] = ContextVar("mimi_span", default=None)
+
+
+class Span:
+    """A timed operation, used as a context manager.
+
+    Entering the span starts its clock and makes it the parent of spans
+    opened inside it; leaving it records it with its tracer. An exception
+    raised inside the span marks it as failed and is re-raised.
+    """
+
+    __slots__ = (
+        "tracer", "name", "span_id", "parent_id", "attributes", "start_ns", "end_ns",
+        "error", "lane", "lane_name", "_started", "_token",
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]) -> None:
+        """Initialize the span.
+        
+        Args:
+            tracer: The tracer that records the span.
+            name: Name of the operation.
+            attributes: Initial attributes; ``None`` values are ignored.
+        """
+        self.tracer = tracer
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id: Optional[str] = None
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self.lane: int = 0
+        self.lane_name = ""
+        self._started = 0
+        self._token: Any = None
+        
+    @property
+    def duration_ns(self) -> int:
+        """Duration of the span in nanoseconds."""
+        return self.end_ns - self.start_ns
+        
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute of the span.
+        
+        Args:
+            key: Attribute name.
+            value: Attribute value; ``None`` values are ignored.
+        """
+        if value is not None:
+            self.attributes[key] = value
+            
+    def set_attributes(self, **attributes: Any) -> None:
+        """Set several attributes of the span; ``None`` values are ignored."""
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+            
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.lane, self.lane_name = _current_lane()
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        return self
+        
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.end_ns = self.start_ns + time.perf_counter_ns() - self._started
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.tracer._record(self)
+
+
+class _NoopSpan:
+    """Span returned while no tracer is active."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Ignore the attribute."""
+        
+    def set_attributes(self, **attributes: Any) -> None:
+        """Ignore the attributes."""
+        
+    def __enter__(self) -> "_NoopSpan":
+        return self
+        
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _current_lane() -> Tuple[int, str]:
+    """Identify the asyncio task or thread a span runs on."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return id(task), task.get_name()
+    thread = threading.current_thread()
+    return thread.ident or 0, thread.name
+
+
+class Tracer:
+    """Collects the spans of one or more runs.
+
+    Activate the tracer, or pass it to a :class:`~mimi.core.context.RunContext`,
+    to record spans opened with :func:`span` in the same thread or asyncio
+    task and in the workers that runners start from it.
+    """
+
+    def __init__(self, service_name: str = "mimi", max_spans: int = DEFAULT_MAX_SPANS) -> None:
+        """Initialize the tracer.
+        
+        Args:
+            service_name: Service name reported in OTLP exports.
+            max_spans: Maximum number of spans kept; later spans are counted
+                as dropped.
+        """
+        self.service_name = service_name
+        self.max_spans = max_spans
+        self.trace_id = uuid.uuid4().hex
+        self.dropped = 0
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+        
+    @property
+    def spans(self) -> List[Span]:
+        """The recorded spans, in the order they finished."""
+        with self._lock:
+            return list(self._spans)
+            
+    def span(self, name: str, **attributes: Any) -> Span:
+        """Create a span recorded by this tracer.
+        
+        Args:
+            name: Name of the operation.
+            **attributes: Initial attributes of the span.
+            
+        Returns:
+            The span, to be used as a context manager.
+        """
+        return Span(self, name, attributes)
+        
+    @contextmanager
+    def activate(self) -> Iterator["Tracer"]:
+        """Record spans with this tracer inside a ``with`` block."""
+        token = _current_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _current_tracer.reset(token)
+            
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Render the spans as Chrome trace-event JSON.
+        
+        Each thread and asyncio task becomes a track, so concurrent tasks
+        appear side by side.
+        
+        Returns:
+            The trace as a dict with a ``traceEvents`` list.
+        """
+        spans = sorted(self.spans, key=lambda s: (s.start_ns, -s.end_ns))
+        pid = os.getpid()
+        tids: Dict[int, int] = {}
+        events: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.service_name}},
+        ]
+        for recorded in spans:
+            if recorded.lane not in tids:
+                tids[recorded.lane] = len(tids) + 1
+                events.append({
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tids[recorded.lane],
+                    "args": {"name": recorded.lane_name},
+                })
+            args = {key: _plain(value) for key, value in recorded.attributes.items()}
+            if recorded.error is not None:
+                args["error"] = recorded.error
+            events.append({
+                "name": recorded.name,
+                "cat": recorded.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": recorded.start_ns / 1000,
+                "dur": recorded.duration_ns / 1000,
+                "pid": pid,
+                "tid": tids[recorded.lane],
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+        
+    def to_otlp(self) -> Dict[str, Any]:
+        """Render the spans in the OTLP JSON encoding.
+        
+        Returns:
+            An ``ExportTraceServiceRequest`` as a dict with ``resourceSpans``.
+        """
+        otlp_spans = []
+        for recorded in self.spans:
+            otlp_span: Dict[str, Any] = {
+                "traceId": self.trace_id,
+                "spanId": recorded.span_id,
+                "name": recorded.name,
+                "kind": 1,
+                "startTimeUnixNano": str(recorded.start_ns),
+                "endTimeUnixNano": str(recorded.end_ns),
+                "attributes": [
+                    {"key": key, "value": _otlp_value(value)} for key, value in recorded.attributes.items()
+                ],
+                "status": {"code": 2, "message": recorded.error} if recorded.error is not None else {"code": 1},
+            }
+            if recorded.parent_id is not None:
+                otlp_span["parentSpanId"] = recorded.parent_id
+            otlp_spans.append(otlp_span)
+            
+        return {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}],
+                },
+                "scopeSpans": [{"scope": {"name": "mimi"}, "spans": otlp_spans}],
+            }],
+        }
+        
+    def export_chrome_trace(self, path: Union[str, Path]) -> Path:
+        """Write the Chrome trace-event JSON to a file.
+        
+        Args:
+            path: Path of the trace file.
+            
+        Returns:
+            The path written.
+        """
+        return _write_json(Path(path), self.to_chrome_trace())
+        
+    def export_otlp(self, path: Union[str, Path]) -> Path:
+        """Write the OTLP JSON to a file.
+        
+        Args:
+            path: Path of the trace file.
+            
+        Returns:
+            The path written.
+        """
+        return _write_json(Path(path), self.to_otlp())
+        
+    def _record(self, span: Span) -> None:
+        """Keep a finished span, unless the tracer is full."""
+        with self._lock:
+            if len(self._spans) < self.max_spans:
+                self._spans.append(span)
+            else:
+                self.dropped += 1
+
+
+def span(name: str, **attributes: Any) -> Union[Span, _NoopSpan]:
+    """Open a span with the active tracer.
+    
+    Use as ``with span("ollama.generate", model=name) as s: ...``. Without an
+    active tracer this returns a no-op span.
+    
+    Args:
+        name: Name of the operation, e.g. ``"task.run"``.
+        **attributes: Initial attributes of the span.
+        
+    Returns:
+        The span, to be used as a context manager.
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return _NOOP_SPAN
+    return Span(tracer, name, attributes)
+
+
+def current_span() -> Union[Span, _NoopSpan]:
+    """Get the innermost open span, or a no-op span if there is none."""
+    current = _current_span.get()
+    return current if current is not None else _NOOP_SPAN
+
+
+def _plain(value: Any) -> Any:
+    """Convert an attribute value to a JSON-compatible value."""
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Convert an attribute value to an OTLP ``AnyValue``."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> Path:
+    """Write JSON to a file atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+    return path
@@ -9,7 +9,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from mimi.core.agent import Agent
 from mimi.utils.logger import setup_logger
-from mimi.utils.output_manager import create_output_directory, create_or_update_agent_log, create_or_update_project_log
+from mimi.utils.output_manager import create_output_directory, create_or_update_agent_log, create_or_update_project_log, flush_logs
 
 
 def main():
@@ -85,6 +85,9 @@ def main():
         details={"test_type": "complex data"}
     )
     
+    # Write the buffered log entries
+    flush_logs(project_dir)
+    
     # Log final status
     project_log_path = project_dir / "project.log.md"
     agent_log_path = project_dir / "agent.log.md"
@@ -0,0 +1,180 @@
+"""Tests for model call admission control."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+
+from mimi.models import admission
+from mimi.models.admission import AdmissionError, ModelLimiter, admission_stats, get_limiter
+from mimi.models.ollama import OllamaClient
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters(monkeypatch):
+    """Start every test without limiters or global limits."""
+    monkeypatch.setattr(
+        admission, "_defaults", {"max_concurrency": None, "max_queue": None, "queue_timeout": None}
+    )
+    admission.clear_limiters()
+    yield
+    admission.clear_limiters()
+
+
+class TestModelLimiter:
+    """Tests for the ModelLimiter class."""
+
+    def test_limits_concurrent_threads(self) -> None:
+        """Test that no more than max_concurrency threads hold a slot."""
+        limiter = ModelLimiter("m", max_concurrency=2)
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+        
+        def call() -> None:
+            nonlocal active, peak
+            with limiter.slot():
+                with lock:
+                    active += 1
+                    peak = max(peak, active)
+                time.sleep(0.02)
+                with lock:
+                    active -= 1
+                    
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+            
+        stats = limiter.stats()
+        assert peak == 2
+        assert stats["admitted"] == 6
+        assert stats["in_flight"] == 0
+        assert stats["max_queue_depth"] >= 1
+        assert stats["max_wait"] > 0
+        
+    def test_full_queue_rejects(self) -> None:
+        """Test that callers are rejected once the queue is full."""
+        limiter = ModelLimiter("m", max_concurrency=1, max_queue=0)
+        limiter.acquire()
+        
+        with pytest.raises(AdmissionError, match="Too many requests"):
+            limiter.acquire()
+        limiter.release()
+        
+        assert limiter.stats()["rejected"] == 1
+        assert limiter.stats()["in_flight"] == 0
+        
+    def test_queue_timeout(self) -> None:
+        """Test that a caller gives up after queue_timeout."""
+        limiter = ModelLimiter("m", max_concurrency=1, queue_timeout=0.01)
+        limiter.acquire()
+        
+        with pytest.raises(AdmissionError, match="Timed out"):
+            limiter.acquire()
+            
+        assert limiter.queue_depth == 0
+        assert limiter.stats()["timed_out"] == 1
+        
+    def test_async_waiters(self) -> None:
+        """Test that coroutines wait for slots without blocking the loop."""
+        limiter = ModelLimiter("m", max_concurrency=1)
+        order = []
+        
+        async def call(index: int) -> None:
+            async with limiter.aslot():
+                order.append(index)
+                await asyncio.sleep(0.01)
+                
+        async def main() -> None:
+            await asyncio.gather(*(call(index) for index in range(3)))
+            
+        asyncio.run(main())
+        
+        assert order == [0, 1, 2]
+        assert limiter.stats()["admitted"] == 3
+        
+    def test_cancelled_waiter_leaves_queue(self) -> None:
+        """Test that cancelling a waiting coroutine frees its queue place."""
+        limiter = ModelLimiter("m", max_concurrency=1)
+        
+        async def main() -> None:
+            await limiter.aacquire()
+            waiting = asyncio.ensure_future(limiter.aacquire())
+            await asyncio.sleep(0)
+            assert limiter.queue_depth == 1
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+            limiter.release()
+            
+        asyncio.run(main())
+        
+        assert limiter.queue_depth == 0
+        assert limiter.stats()["in_flight"] == 0
+
+
+class TestGetLimiter:
+    """Tests for the limiter registry."""
+
+    def test_unlimited_by_default(self) -> None:
+        """Test that models without a limit get no limiter."""
+        assert get_limiter("http://localhost:11434", "m") is None
+        
+    def test_shared_per_base_url_and_model(self) -> None:
+        """Test that clients of the same model and server share a limiter."""
+        first = get_limiter("http://localhost:11434/", "m", max_concurrency=2)
+        
+        assert get_limiter("http://localhost:11434", "m") is first
+        assert get_limiter("http://localhost:11434", "other", max_concurrency=2) is not first
+        assert set(admission_stats()) == {"m at http://localhost:11434", "other at http://localhost:11434"}
+        
+    def test_global_limit(self) -> None:
+        """Test that configure_admission applies to models without settings."""
+        admission.configure_admission(max_concurrency=3, max_queue=5)
+        
+        limiter = get_limiter("http://localhost:11434", "m")
+        
+        assert limiter.max_concurrency == 3
+        assert limiter.max_queue == 5
+
+
+class TestClientAdmission:
+    """Tests for admission control in OllamaClient."""
+
+    def test_generate_holds_a_slot(self) -> None:
+        """Test that a request is sent while holding a slot."""
+        client = OllamaClient("m", suppress_log=True, max_concurrency=1)
+        seen = []
+        
+        def post(*args, **kwargs):
+            seen.append(client._limiter().in_flight)
+            response = MagicMock()
+            response.status_code = 200
+            response.text = '{"response": "hi"}'
+            return response
+            
+        with patch.object(requests.Session, "post", side_effect=post):
+            assert client.generate("hello") == "hi"
+            
+        assert seen == [1]
+        assert client._limiter().in_flight == 0
+        
+    def test_stream_releases_slot_when_closed(self) -> None:
+        """Test that a stream keeps its slot until it is closed."""
+        client = OllamaClient("m", suppress_log=True, max_concurrency=1)
+        response = MagicMock()
+        response.status_code = 200
+        response.iter_lines.return_value = iter([b'{"response": "a", "done": true}'])
+        
+        with patch.object(requests.Session, "post", return_value=response):
+            stream = client.generate_stream("hello")
+            assert client._limiter().in_flight == 1
+            assert list(stream) == ["a"]
+            
+        stream.close()
+        assert client._limiter().in_flight == 0
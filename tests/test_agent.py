@@ -1,9 +1,11 @@
 """Tests for the Agent class."""
 
+import asyncio
+
 import pytest
 from unittest.mock import MagicMock, patch
 
-from mimi.core.agent import Agent, NumberAdderAgent
+from mimi.core.agent import Agent, ModelAgent, NumberAdderAgent
 
 
 class TestAgent:
@@ -133,4 +135,57 @@ class TestNumberAdderAgent:
         )
         
         with pytest.raises(ValueError):
-            agent.execute("not a number") 
\ No newline at end of file
+            agent.execute("not a number") 
+
+
+class EchoModelAgent(ModelAgent):
+    """Model agent that returns the model's response to its input."""
+
+    async def aexecute(self, task_input):
+        """Ask the model to echo the input."""
+        return await self._generate(str(task_input), system_prompt="echo")
+
+
+class TestModelAgent:
+    """Tests for the ModelAgent base class."""
+
+    def _make_agent(self) -> EchoModelAgent:
+        """Create an echo agent."""
+        return EchoModelAgent(
+            name="echo",
+            role="echo",
+            description="Echoes its input",
+            model_name="test-model",
+        )
+        
+    def test_aexecute_is_abstract(self) -> None:
+        """Test that a model agent without aexecute() cannot be created."""
+        with pytest.raises(TypeError):
+            ModelAgent(name="bare", role="bare", description="No aexecute", model_name="test-model")
+            
+    @patch("mimi.core.agent.get_ollama_client")
+    def test_execute_uses_blocking_client(self, mock_get_ollama: MagicMock) -> None:
+        """Test that execute() drives aexecute() with the blocking client."""
+        mock_client = MagicMock()
+        mock_client.generate.return_value = "hello"
+        mock_get_ollama.return_value = mock_client
+        
+        result = self._make_agent().execute("hi")
+        
+        assert result == "hello"
+        mock_client.generate.assert_called_once_with("hi", system_prompt="echo")
+        
+    @patch("mimi.core.agent.get_async_ollama_client")
+    def test_aexecute_uses_async_client(self, mock_get_async: MagicMock) -> None:
+        """Test that awaiting aexecute() uses the async client."""
+        async def generate(prompt, system_prompt=None):
+            await asyncio.sleep(0)
+            return f"async:{prompt}"
+            
+        mock_client = MagicMock()
+        mock_client.generate.side_effect = generate
+        mock_get_async.return_value = mock_client
+        
+        result = asyncio.run(self._make_agent().aexecute("hi"))
+        
+        assert result == "async:hi"
\ No newline at end of file
@@ -11,7 +11,8 @@ from unittest.mock import MagicMock, patch
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from mimi.core.agent import Agent
-from mimi.utils.output_manager import create_or_update_agent_log
+from mimi.utils.log_writer import close_log_writers
+from mimi.utils.output_manager import create_or_update_agent_log, flush_logs
 
 
 class TestAgentLogging(unittest.TestCase):
@@ -25,7 +26,8 @@ class TestAgentLogging(unittest.TestCase):
     
     def tearDown(self):
         """Clean up test environment."""
-        # Remove the temporary test directory
+        # Close the log files and remove the temporary test directory
+        close_log_writers()
         if self.test_dir.exists():
             shutil.rmtree(self.test_dir)
     
@@ -41,7 +43,8 @@ class TestAgentLogging(unittest.TestCase):
             details={"test_key": "test_value"}
         )
         
-        # Check that the log file was created
+        # Write the buffered entries and check that the log file was created
+        flush_logs(self.test_dir)
         self.assertTrue(log_path.exists())
         
         # Read the content of the log file
@@ -76,7 +79,8 @@ class TestAgentLogging(unittest.TestCase):
             output_summary="Test output 2"
         )
         
-        # Read the content of the log file
+        # Write the buffered entries and read the content of the log file
+        flush_logs(self.test_dir)
         with open(log_path, 'r') as f:
             content = f.read()
         
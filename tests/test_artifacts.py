@@ -0,0 +1,138 @@
+"""Tests for fingerprints and incremental project runs."""
+
+import pytest
+
+from mimi.core.agent import Agent
+from mimi.core.artifacts import ArtifactStore, agent_fingerprint
+from mimi.core.context import RunContext, current_run_context
+from mimi.core.project import Project
+from mimi.core.runner import ProjectRunner
+from mimi.core.task import Task
+from mimi.utils.manifest import get_manifest
+from mimi.utils.output_manager import write_output_file
+
+
+class CountingAgent(Agent):
+    """Agent that appends its label to the input and counts its calls."""
+
+    label: str = "value"
+    calls: int = 0
+
+    def execute(self, task_input):
+        """Return the label joined with the input."""
+        self.calls += 1
+        return f"{self.label}:{task_input}"
+
+
+class WritingAgent(CountingAgent):
+    """Agent that also saves its output as a file in the project directory."""
+
+    def execute(self, task_input):
+        """Return the labelled input and write it to ``<label>.txt``."""
+        result = super().execute(task_input)
+        project_dir = current_run_context().get_project_directory("Chain")
+        write_output_file(project_dir / "src" / f"{self.label}.txt", result, project_dir, "backend")
+        return result
+
+
+def _make_project() -> Project:
+    """Create a three-task chain: a -> b -> c."""
+    agents = {
+        name: CountingAgent(
+            name=name,
+            role="labeler",
+            description="Labels its input",
+            model_name="test-model",
+            label=name,
+        )
+        for name in ["a", "b", "c"]
+    }
+    tasks = {
+        "a": Task(name="a", description="A", agent="a", input_key="input", output_key="out_a"),
+        "b": Task(name="b", description="B", agent="b", input_key="out_a", output_key="out_b", depends_on=["a"]),
+        "c": Task(name="c", description="C", agent="c", input_key="out_b", output_key="out_c", depends_on=["b"]),
+    }
+    return Project(name="chain", description="Chain project", agents=agents, tasks=tasks)
+
+
+def _calls(project: Project) -> dict:
+    """Get the number of calls per agent."""
+    return {name: agent.calls for name, agent in project.agents.items()}
+
+
+class TestAgentFingerprint:
+    """Tests for agent fingerprints."""
+
+    def test_fingerprint_tracks_output_affecting_config(self) -> None:
+        """Test that model, settings and prompts change the fingerprint."""
+        agent = CountingAgent(name="a", role="r", description="d", model_name="m")
+        base = agent_fingerprint(agent)
+        
+        assert agent_fingerprint(agent.model_copy(update={"name": "renamed"})) == base
+        assert agent_fingerprint(agent.model_copy(update={"model_name": "other"})) != base
+        assert agent_fingerprint(agent.model_copy(update={"system_prompt": "be brief"})) != base
+        assert agent_fingerprint(agent.model_copy(update={"label": "other"})) != base
+        assert agent_fingerprint(agent.model_copy(update={"model_settings": {"temperature": 0}})) != base
+        
+    def test_fingerprint_ignores_transport_settings(self) -> None:
+        """Test that settings which don't affect output are ignored."""
+        agent = CountingAgent(name="a", role="r", description="d", model_name="m")
+        moved = agent.model_copy(update={"model_settings": {"base_url": "http://gpu:11434", "pool_size": 4}})
+        
+        assert agent_fingerprint(moved) == agent_fingerprint(agent)
+
+
+class TestIncrementalRun:
+    """Tests for incremental runs with ProjectRunner."""
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_unchanged_run_reuses_everything(self, tmp_path, max_workers: int) -> None:
+        """Test that a repeated run executes no agents."""
+        store = ArtifactStore(tmp_path)
+        first = ProjectRunner(_make_project(), max_workers=max_workers, artifacts=store).run({"input": 1})
+        
+        project = _make_project()
+        second = ProjectRunner(project, max_workers=max_workers, artifacts=store).run({"input": 1})
+        
+        assert second == first
+        assert _calls(project) == {"a": 0, "b": 0, "c": 0}
+        
+    def test_changed_agent_reruns_suffix(self, tmp_path) -> None:
+        """Test that changing one agent re-runs only that task and its dependents."""
+        store = ArtifactStore(tmp_path)
+        ProjectRunner(_make_project(), artifacts=store).run({"input": 1})
+        
+        project = _make_project()
+        project.agents["b"].model_name = "other-model"
+        result = ProjectRunner(project, artifacts=store).run({"input": 1})
+        
+        assert _calls(project) == {"a": 0, "b": 1, "c": 1}
+        assert result["out_c"] == "c:b:a:1"
+        
+    def test_changed_input_reruns_everything(self, tmp_path) -> None:
+        """Test that new project input misses the cache."""
+        store = ArtifactStore(tmp_path)
+        ProjectRunner(_make_project(), artifacts=store).run({"input": 1})
+        
+        project = _make_project()
+        result = ProjectRunner(project, artifacts=store).run({"input": 2})
+        
+        assert _calls(project) == {"a": 1, "b": 1, "c": 1}
+        assert result["out_c"] == "c:b:a:2"
+        
+    def test_reused_task_restores_its_files(self, tmp_path) -> None:
+        """Test that a reused task's files are written to the new run's directory."""
+        store = ArtifactStore(tmp_path / "artifacts")
+        first = _make_project()
+        first.agents["a"] = WritingAgent(name="a", role="r", description="d", model_name="m", label="a")
+        ProjectRunner(first, artifacts=store, context=RunContext(output_root=tmp_path / "one")).run({"input": 1})
+        
+        project = _make_project()
+        project.agents["a"] = WritingAgent(name="a", role="r", description="d", model_name="m", label="a")
+        context = RunContext(output_root=tmp_path / "two")
+        ProjectRunner(project, artifacts=store, context=context).run({"input": 1})
+        
+        assert project.agents["a"].calls == 0
+        assert context.project_directory.parent == tmp_path / "two"
+        assert (context.project_directory / "src" / "a.txt").read_text() == "a:1"
+        assert get_manifest(context.project_directory).get("src/a.txt").component == "backend"
@@ -0,0 +1,79 @@
+"""Tests for batch runs."""
+
+import io
+import json
+import threading
+
+from mimi.core.agent import Agent
+from mimi.core.batch import BatchRunner, read_inputs
+from mimi.core.project import Project
+from mimi.core.task import Task
+
+
+class UpperAgent(Agent):
+    """Agent that upper-cases its input, failing on the input "bad"."""
+
+    def execute(self, task_input):
+        """Return the upper-cased input."""
+        if task_input == "bad":
+            raise ValueError("bad input")
+        return str(task_input).upper()
+
+
+def _make_project() -> Project:
+    """Create a single-task project."""
+    agents = {"upper": UpperAgent(name="upper", role="r", description="d", model_name="m")}
+    tasks = {"t": Task(name="t", description="T", agent="upper", input_key="input", output_key="out")}
+    return Project(name="batch", description="Batch project", agents=agents, tasks=tasks)
+
+
+class TestReadInputs:
+    """Tests for read_inputs."""
+
+    def test_objects_values_and_text(self, tmp_path) -> None:
+        """Test the supported line formats."""
+        path = tmp_path / "inputs.jsonl"
+        path.write_text('{"id": "doc-1", "input": "a", "extra": 1}\n\n"b"\nplain text\n', encoding="utf-8")
+        
+        assert list(read_inputs(path)) == [
+            (0, "doc-1", {"input": "a", "extra": 1}),
+            (1, 1, {"input": "b"}),
+            (2, 2, {"input": "plain text"}),
+        ]
+
+
+class TestBatchRunner:
+    """Tests for the BatchRunner class."""
+
+    def test_streams_results_and_summary(self) -> None:
+        """Test that every input gets a record and failures don't stop the batch."""
+        inputs = [(0, "x", {"input": "one"}), (1, "y", {"input": "bad"}), (2, "z", {"input": "two"})]
+        output = io.StringIO()
+        
+        summary = BatchRunner(_make_project(), concurrency=2).run(iter(inputs), output)
+        
+        records = sorted((json.loads(line) for line in output.getvalue().splitlines()), key=lambda r: r["index"])
+        assert [record["status"] for record in records] == ["completed", "failed", "completed"]
+        assert records[0]["result"] == {"input": "one", "out": "ONE"}
+        assert records[1]["error"] == "ValueError: bad input"
+        assert summary["inputs"] == 3
+        assert summary["succeeded"] == 2
+        assert summary["failed"] == 1
+        assert summary["latency_max"] >= summary["latency_p50"]
+        
+    def test_runs_inputs_concurrently(self) -> None:
+        """Test that inputs run at the same time."""
+        barrier = threading.Barrier(3, timeout=5)
+        
+        class WaitingAgent(UpperAgent):
+            def execute(self, task_input):
+                barrier.wait()
+                return super().execute(task_input)
+                
+        project = _make_project()
+        project.agents["upper"] = WaitingAgent(name="upper", role="r", description="d", model_name="m")
+        inputs = [(index, index, {"input": str(index)}) for index in range(3)]
+        
+        summary = BatchRunner(project, concurrency=3).run(iter(inputs), io.StringIO())
+        
+        assert summary["succeeded"] == 3
@@ -0,0 +1,92 @@
+"""Tests for the copy-on-write blackboard."""
+
+import pytest
+
+from mimi.core import blackboard
+from mimi.core.agent import Agent
+from mimi.core.blackboard import Blackboard
+from mimi.core.task import Task
+
+
+class EchoAgent(Agent):
+    """Agent that returns its input unchanged."""
+
+    def execute(self, task_input):
+        """Return the input."""
+        return task_input
+
+
+class TestBlackboard:
+    """Tests for the Blackboard class."""
+
+    def test_writes_do_not_change_snapshots(self) -> None:
+        """Test that writing returns a new version and leaves the old one intact."""
+        base = Blackboard({"input": 1})
+        left = base.set("left", "L")
+        right = base.set("right", "R")
+        
+        assert dict(base) == {"input": 1}
+        assert dict(left) == {"input": 1, "left": "L"}
+        assert dict(right) == {"input": 1, "right": "R"}
+        assert left.version == right.version == base.version + 1
+        
+    def test_layers_share_values(self) -> None:
+        """Test that values are shared between versions rather than copied."""
+        big = "x" * 10_000
+        base = Blackboard({"implementation": big})
+        child = base.set("review", "ok")
+        
+        assert child["implementation"] is big
+        assert child._writes == {"review": "ok"}
+        
+    def test_overwrite_keeps_key_order(self) -> None:
+        """Test that to_dict matches applying the writes to a single dict."""
+        data = Blackboard({"a": 1, "b": 2}).set("c", 3).set("a", 10)
+        
+        assert list(data.to_dict().items()) == [("a", 10), ("b", 2), ("c", 3)]
+        
+    def test_long_chains_are_flattened(self, monkeypatch) -> None:
+        """Test that lookup depth stays bounded."""
+        monkeypatch.setattr(blackboard, "MAX_DEPTH", 4)
+        data = Blackboard()
+        for index in range(10):
+            data = data.set(f"k{index}", index)
+            
+        assert data._depth < 4
+        assert data.to_dict() == {f"k{index}": index for index in range(10)}
+        assert data.version == 10
+        
+    def test_missing_key(self) -> None:
+        """Test mapping behaviour for missing keys."""
+        data = Blackboard({"a": 1})
+        
+        assert "b" not in data
+        assert data.get("b") is None
+        with pytest.raises(KeyError):
+            data["b"]
+
+
+class TestTaskWithBlackboard:
+    """Tests for Task.execute with blackboard input."""
+
+    def test_output_key_adds_layer(self) -> None:
+        """Test that a task writes only its output key."""
+        agents = {"echo": EchoAgent(name="echo", role="r", description="d", model_name="m")}
+        task = Task(name="t", description="T", agent="echo", input_key="input", output_key="out")
+        data = Blackboard({"input": 5, "other": "kept"})
+        
+        result = task.execute(agents, data)
+        
+        assert isinstance(result, Blackboard)
+        assert result.to_dict() == {"input": 5, "other": "kept", "out": 5}
+        assert dict(data) == {"input": 5, "other": "kept"}
+        
+    def test_agent_receives_private_dict(self) -> None:
+        """Test that an agent given the full data gets a plain dict."""
+        agents = {"echo": EchoAgent(name="echo", role="r", description="d", model_name="m")}
+        task = Task(name="t", description="T", agent="echo")
+        
+        result = task.execute(agents, Blackboard({"input": 5}))
+        
+        assert type(result) is dict
+        assert result == {"input": 5}
@@ -0,0 +1,145 @@
+"""Tests for the model response cache."""
+
+import json
+import time
+
+import requests
+from unittest.mock import MagicMock, patch
+
+from mimi.models.cache import ResponseCache, make_cache_key
+from mimi.models.ollama import OllamaClient
+
+
+def _ok_response(text: str = '{"response": "fresh"}') -> MagicMock:
+    """Create a successful mock HTTP response."""
+    response = MagicMock()
+    response.status_code = 200
+    response.text = text
+    return response
+
+
+class TestResponseCache:
+    """Tests for the ResponseCache class."""
+
+    def test_key_depends_on_every_input(self) -> None:
+        """Test that each part of the request changes the key."""
+        base = make_cache_key("m", "p", "s", {"temperature": 0})
+        
+        assert base == make_cache_key("m", "p", "s", {"temperature": 0})
+        assert base != make_cache_key("other", "p", "s", {"temperature": 0})
+        assert base != make_cache_key("m", "other", "s", {"temperature": 0})
+        assert base != make_cache_key("m", "p", "other", {"temperature": 0})
+        assert base != make_cache_key("m", "p", "s", {"temperature": 0, "seed": 1})
+        
+    def test_hit_and_miss_counters(self, tmp_path) -> None:
+        """Test storing, reading and counting entries."""
+        cache = ResponseCache(tmp_path)
+        
+        assert cache.get("a" * 64) is None
+        cache.put("a" * 64, "hello")
+        assert cache.get("a" * 64) == "hello"
+        
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+        
+    def test_entries_persist_across_instances(self, tmp_path) -> None:
+        """Test that a new cache over the same directory sees old entries."""
+        ResponseCache(tmp_path).put("b" * 64, "saved")
+        
+        assert ResponseCache(tmp_path).get("b" * 64) == "saved"
+        
+    def test_lru_eviction(self, tmp_path) -> None:
+        """Test that the least recently used entry is evicted first."""
+        cache = ResponseCache(tmp_path)
+        cache.put("a" * 64, "x" * 100)
+        entry_size = cache.stats()["bytes"]
+        # Room for two entries but not three; sizes vary slightly with the timestamp
+        cache.max_bytes = entry_size * 2 + entry_size // 2
+        
+        cache.put("b" * 64, "x" * 100)
+        cache.get("a" * 64)
+        cache.put("c" * 64, "x" * 100)
+        
+        assert cache.get("b" * 64) is None
+        assert cache.get("a" * 64) is not None
+        assert cache.get("c" * 64) is not None
+        assert cache.stats()["evictions"] == 1
+        
+    def test_ttl_expiry(self, tmp_path) -> None:
+        """Test that entries older than the TTL are treated as misses."""
+        cache = ResponseCache(tmp_path, ttl=60)
+        cache.put("d" * 64, "old")
+        
+        with patch("mimi.models.cache.time.time", return_value=time.time() + 120):
+            assert cache.get("d" * 64) is None
+            
+        assert cache.stats()["entries"] == 0
+
+
+class TestClientCaching:
+    """Tests for caching in OllamaClient."""
+
+    def test_deterministic_requests_are_cached(self, tmp_path) -> None:
+        """Test that a repeated deterministic request is served from the cache."""
+        client = OllamaClient("test-model", temperature=0, suppress_log=True, cache=ResponseCache(tmp_path))
+        
+        with patch.object(requests.Session, "post", return_value=_ok_response()) as mock_post:
+            assert client.generate("hi", system_prompt="sys") == "fresh"
+            assert client.generate("hi", system_prompt="sys") == "fresh"
+            
+        assert mock_post.call_count == 1
+        assert client.cache.stats()["hits"] == 1
+        
+    def test_nondeterministic_requests_bypass_cache(self, tmp_path) -> None:
+        """Test that sampling without a seed is not cached unless opted in."""
+        client = OllamaClient("test-model", temperature=0.7, suppress_log=True, cache=ResponseCache(tmp_path))
+        
+        with patch.object(requests.Session, "post", return_value=_ok_response()) as mock_post:
+            client.generate("hi")
+            client.generate("hi")
+            
+        assert mock_post.call_count == 2
+        
+        client.cache_nondeterministic = True
+        with patch.object(requests.Session, "post", return_value=_ok_response()) as mock_post:
+            client.generate("hi")
+            client.generate("hi")
+            
+        assert mock_post.call_count == 1
+        
+    def test_seed_makes_requests_cacheable(self, tmp_path) -> None:
+        """Test that a fixed seed is sent to the server and enables caching."""
+        client = OllamaClient("test-model", temperature=0.7, seed=42, suppress_log=True, cache=ResponseCache(tmp_path))
+        
+        with patch.object(requests.Session, "post", return_value=_ok_response()) as mock_post:
+            client.generate("hi")
+            client.generate("hi")
+            
+        assert mock_post.call_count == 1
+        assert mock_post.call_args.kwargs["json"]["options"] == {"temperature": 0.7, "seed": 42}
+        
+    def test_incomplete_responses_are_not_cached(self, tmp_path) -> None:
+        """Test that a cancelled stream or an unparseable body is not cached."""
+        client = OllamaClient("test-model", temperature=0, suppress_log=True, cache=ResponseCache(tmp_path))
+        lines = [json.dumps({"response": token, "done": False}).encode() for token in "abc"]
+        lines.append(json.dumps({"response": "", "done": True}).encode())
+        response = MagicMock()
+        response.status_code = 200
+        response.iter_lines.return_value = iter(lines)
+        streams = []
+        start_stream = client.generate_stream
+        
+        def generate_stream(*args):
+            streams.append(start_stream(*args))
+            return streams[-1]
+            
+        with patch.object(requests.Session, "post", return_value=response), \
+                patch.object(client, "generate_stream", side_effect=generate_stream):
+            assert client.generate("hi", on_token=lambda token: streams[0].cancel()) == "a"
+            
+        with patch.object(requests.Session, "post", return_value=_ok_response("not json")):
+            assert client.generate("hi") == "not json"
+            
+        assert client.cache.stats()["entries"] == 0
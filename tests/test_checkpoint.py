@@ -0,0 +1,130 @@
+"""Tests for checkpointing and resuming project runs."""
+
+import json
+
+import pytest
+from unittest.mock import patch
+
+from mimi.core.agent import Agent
+from mimi.core.checkpoint import CheckpointError, CheckpointStore
+from mimi.core.project import Project
+from mimi.core.runner import ProjectRunner
+from mimi.core.task import Task
+
+
+class CountingAgent(Agent):
+    """Agent that appends its label to the input and counts its calls."""
+
+    label: str = "value"
+    calls: int = 0
+
+    def execute(self, task_input):
+        """Return the label joined with the input."""
+        self.calls += 1
+        return f"{self.label}:{task_input}"
+
+
+def _make_project() -> Project:
+    """Create a three-task chain: a -> b -> c."""
+    agents = {
+        name: CountingAgent(
+            name=name,
+            role="labeler",
+            description="Labels its input",
+            model_name="test-model",
+            label=name,
+        )
+        for name in ["a", "b", "c"]
+    }
+    tasks = {
+        "a": Task(name="a", description="A", agent="a", input_key="input", output_key="out_a"),
+        "b": Task(name="b", description="B", agent="b", input_key="out_a", output_key="out_b", depends_on=["a"]),
+        "c": Task(name="c", description="C", agent="c", input_key="out_b", output_key="out_c", depends_on=["b"]),
+    }
+    return Project(name="chain", description="Chain project", agents=agents, tasks=tasks)
+
+
+class TestCheckpointStore:
+    """Tests for the CheckpointStore class."""
+
+    def test_create_and_open(self, tmp_path) -> None:
+        """Test that a run can be reopened with its input and outputs."""
+        store = CheckpointStore.create("chain", {"input": 1}, runs_dir=tmp_path)
+        store.save_output("a", {"input": 1, "out_a": "a:1"})
+        
+        reopened = CheckpointStore.open(store.run_id, runs_dir=tmp_path)
+        
+        assert reopened.input_data == {"input": 1}
+        assert reopened.metadata["project"] == "chain"
+        assert reopened.load_outputs() == {"a": {"input": 1, "out_a": "a:1"}}
+        
+    def test_keyed_output_and_non_json(self, tmp_path) -> None:
+        """Test that a keyed output loads as its key and non-JSON output is rejected."""
+        store = CheckpointStore.create("chain", {"input": 1}, runs_dir=tmp_path)
+        store.save_output("a", "a:1", output_key="out_a")
+        
+        with pytest.raises(CheckpointError, match="Cannot checkpoint"):
+            store.save_output("b", object())
+            
+        assert store.load_outputs() == {"a": {"out_a": "a:1"}}
+        
+    def test_open_missing_run(self, tmp_path) -> None:
+        """Test that opening an unknown run raises a CheckpointError."""
+        with pytest.raises(CheckpointError, match="not found"):
+            CheckpointStore.open("missing", runs_dir=tmp_path)
+            
+    def test_duplicate_run_id(self, tmp_path) -> None:
+        """Test that a run identifier cannot be reused."""
+        CheckpointStore.create("chain", {}, runs_dir=tmp_path, run_id="run-1")
+        
+        with pytest.raises(CheckpointError, match="already exists"):
+            CheckpointStore.create("chain", {}, runs_dir=tmp_path, run_id="run-1")
+
+
+class TestResume:
+    """Tests for resuming runs with ProjectRunner."""
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_resume_skips_completed_tasks(self, tmp_path, max_workers: int) -> None:
+        """Test that a resumed run only executes the tasks that did not complete."""
+        project = _make_project()
+        store = CheckpointStore.create(project.name, {"input": 1}, runs_dir=tmp_path)
+        expected = ProjectRunner(_make_project()).run({"input": 1})
+        
+        # Fail the last task on the first attempt
+        original = CountingAgent.execute
+        
+        def failing_execute(agent, task_input):
+            if agent.name == "c":
+                raise RuntimeError("boom")
+            return original(agent, task_input)
+            
+        with patch.object(CountingAgent, "execute", failing_execute):
+            with pytest.raises(RuntimeError, match="boom"):
+                ProjectRunner(project, max_workers=max_workers, checkpoint=store).run({"input": 1})
+                
+        assert set(store.load_outputs()) == {"a", "b"}
+        
+        resumed = CheckpointStore.open(store.run_id, runs_dir=tmp_path)
+        result = ProjectRunner(project, max_workers=max_workers, checkpoint=resumed).run(resumed.input_data)
+        
+        assert result == expected
+        assert project.agents["a"].calls == 1
+        assert project.agents["b"].calls == 1
+        assert project.agents["c"].calls == 1
+        
+    def test_checkpoints_only_own_result(self, tmp_path) -> None:
+        """Test that a sequential run checkpoints each task's result, not the whole data."""
+        store = CheckpointStore.create("chain", {"input": 1}, runs_dir=tmp_path)
+        ProjectRunner(_make_project(), checkpoint=store).run({"input": 1})
+        
+        records = {
+            path.stem: json.loads(path.read_text()) for path in (store.run_dir / "tasks").glob("*.json")
+        }
+        
+        assert {name: record["output"] for name, record in records.items()} == {
+            "a": "a:1",
+            "b": "b:a:1",
+            "c": "c:b:a:1",
+        }
+        assert records["c"]["output_key"] == "out_c"
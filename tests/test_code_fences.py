@@ -0,0 +1,141 @@
+"""Tests for the incremental code fence parser."""
+
+import asyncio
+import random
+import re
+
+import pytest
+from unittest.mock import patch
+
+from mimi.core.software_agents import SoftwareEngineerAgent
+from mimi.utils.code_fences import FenceParser, parse_fences
+from mimi.utils.output_manager import CodeBlockSaver, save_code_blocks_from_text
+from mimi.utils.output_sink import flush_output
+
+# The pattern extract_code_blocks used before the streaming parser
+REFERENCE_PATTERN = re.compile(r'```(?:(\w+))?(?:\s+([^\n]+))?\n(.*?)```', re.DOTALL)
+
+# Responses in the shapes the implementation agents produce
+CORPUS = [
+    "Here is the backend.\n\n```python app.py\nfrom flask import Flask\n\napp = Flask(__name__)\n```\n\n"
+    "And its tests:\n\n```python tests/test_app.py\ndef test_app():\n    assert True\n```\n",
+    "```javascript\n// File: src/game.js\nfunction start() {\n  return 1;\n}\n```",
+    "```css\n.bird {\n  width: 20px;\n}\n```\n```html\n<!DOCTYPE html>\n<html><title>Flappy Bird</title></html>\n```",
+    "```\nplain block\nwith two lines\n```",
+    "```python\nprint(1)\n```",
+    "Text with an inline ``` fence and a block:\n```yaml config.yaml\nkey: value\n```\nTrailing prose.",
+    "```bash   deploy.sh  \r\nset -e\necho done\n```",
+    "````markdown\nnested ``` fence\n````",
+    "```python\n<<<<<<< SEARCH\nold = 1\n=======\nnew = 2\n>>>>>>> REPLACE\n```",
+    "```c++\nint main() {}\n```\n```go main.go\npackage main\n```",
+    "```python main.py\nprint('never closed')\n",
+    "```\n```js\nconst a = () => 1;\n```",
+    "No code here at all.",
+]
+
+
+def _reference(text):
+    """Parse a text with the reference pattern."""
+    return [
+        (match.group(1) or "", match.group(2) or "", match.group(3), match.group(0))
+        for match in REFERENCE_PATTERN.finditer(text)
+    ]
+
+
+def _fields(fences):
+    """Turn parsed fences into tuples comparable with the reference."""
+    return [(fence.language, fence.filename, fence.body, fence.text) for fence in fences]
+
+
+def _feed_in_chunks(text, sizes):
+    """Feed a text to a parser in chunks of the given sizes."""
+    parser = FenceParser()
+    fences = []
+    pos = 0
+    while pos < len(text):
+        size = next(sizes)
+        fences.extend(parser.feed(text[pos:pos + size]))
+        pos += size
+    return fences + parser.close()
+
+
+class TestFenceParser:
+    """Tests for FenceParser."""
+
+    @pytest.mark.parametrize("text", CORPUS)
+    def test_matches_reference_on_corpus(self, text) -> None:
+        """Test that whole and chunked parsing match the reference pattern."""
+        expected = _reference(text)
+        
+        assert _fields(parse_fences(text)) == expected
+        for size in (1, 2, 3, 7):
+            assert _fields(_feed_in_chunks(text, iter(lambda size=size: size, None))) == expected
+            
+    def test_matches_reference_on_random_text(self) -> None:
+        """Test edge cases of the pattern with random fence-heavy text."""
+        rng = random.Random(7)
+        pieces = ["`", "```", "````", "py", " ", "\t", "\n", "x.js", "\r", "+"]
+        for _ in range(3000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+            sizes = iter(lambda: rng.randint(1, 4), None)
+            
+            assert _fields(_feed_in_chunks(text, sizes)) == _reference(text), repr(text)
+            
+    def test_block_is_emitted_when_its_fence_closes(self) -> None:
+        """Test that a block is returned by the chunk that closes it."""
+        parser = FenceParser()
+        
+        assert parser.feed("Intro\n```python a.py\nx = 1\n") == []
+        assert parser.feed("``") == []
+        fences = parser.feed("`\n```js b.js\nlet b;")
+        
+        assert [fence.filename for fence in fences] == ["a.py"]
+        assert fences[0].body == "x = 1\n"
+        assert parser.close() == []
+
+
+class TestStreamingSave:
+    """Tests for saving code blocks from a stream."""
+
+    def test_files_are_written_while_streaming(self, tmp_path) -> None:
+        """Test that each file exists before the rest of the response arrives."""
+        def tokens():
+            yield "```python app.py\nprint('hello world')\n"
+            yield "```\n\n```python worker.py\n"
+            flush_output(tmp_path)
+            assert (tmp_path / "src" / "server" / "app.py").exists()
+            assert not (tmp_path / "src" / "server" / "worker.py").exists()
+            yield "print('working hard')\n```"
+            
+        saved = save_code_blocks_from_text(tmp_path, "backend", tokens())
+        
+        flush_output(tmp_path)
+        assert [path.name for path in saved] == ["app.py", "worker.py"]
+        assert "print('working hard')" in (tmp_path / "src" / "server" / "worker.py").read_text()
+        
+    def test_saver_parses_text_it_was_not_fed(self, tmp_path) -> None:
+        """Test that closing with the full response saves blocks that were never streamed."""
+        saver = CodeBlockSaver(tmp_path, "backend")
+        saver.feed(CORPUS[0][:CORPUS[0].index("And its tests")])
+        
+        saved = saver.close(CORPUS[0])
+        
+        flush_output(tmp_path)
+        assert len(saved) == 2
+        assert "assert True" in saved[1].read_text()
+        
+    def test_agent_saves_files_while_generating(self, tmp_path) -> None:
+        """Test that the engineer writes each file before the model has finished."""
+        agent = SoftwareEngineerAgent(name="engineer-1", role="Backend", description="d", model_name="m")
+        
+        async def generate(prompt, system_prompt=None, prefix=None, on_token=None):
+            on_token("```python app.py\nprint('hello world')\n```\n")
+            flush_output(tmp_path)
+            assert (tmp_path / "src" / "server" / "app.py").exists()
+            on_token("Done.")
+            return "```python app.py\nprint('hello world')\n```\nDone."
+            
+        with patch.object(SoftwareEngineerAgent, "_generate", side_effect=generate):
+            result = asyncio.run(agent._implement_components("Build it", tmp_path, "Demo"))
+            
+        assert [path.rsplit("/", 1)[-1] for path in result["files"]] == ["app.py"]
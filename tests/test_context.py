@@ -0,0 +1,136 @@
+"""Tests for run contexts."""
+
+import asyncio
+import threading
+
+import pytest
+
+from mimi.core.agent import Agent
+from mimi.core.context import RunContext, current_run_context
+from mimi.core.project import Project
+from mimi.core.runner import AsyncProjectRunner, ProjectRunner
+from mimi.core.software_agents import get_project_directory
+from mimi.core.task import Task
+
+
+class DirectoryAgent(Agent):
+    """Agent that reports the run it executes in and its output directory."""
+
+    def execute(self, task_input):
+        """Return the run ID and output directory."""
+        context = current_run_context()
+        return {"run_id": context.run_id, "directory": str(get_project_directory(f"title-{task_input}"))}
+
+
+def _make_project(fan_out: bool = False) -> Project:
+    """Create a project whose tasks record their run context."""
+    agents = {"dir": DirectoryAgent(name="dir", role="r", description="d", model_name="m")}
+    tasks = {
+        "first": Task(name="first", description="F", agent="dir", input_key="input", output_key="first"),
+        "second": Task(
+            name="second",
+            description="S",
+            agent="dir",
+            input_key="input",
+            output_key="second",
+            depends_on=[] if fan_out else ["first"],
+        ),
+    }
+    return Project(name="context", description="Context project", agents=agents, tasks=tasks)
+
+
+class TestRunContext:
+    """Tests for the RunContext class."""
+
+    def test_activate_and_default(self) -> None:
+        """Test that activation is scoped and a default exists outside runs."""
+        context = RunContext(run_id="r1")
+        default = current_run_context()
+        
+        with context.activate():
+            assert current_run_context() is context
+            
+        assert current_run_context() is default
+        assert default is not context
+        
+    def test_output_directory_is_created_once(self, tmp_path) -> None:
+        """Test that the output directory is created on first use and reused."""
+        context = RunContext(output_root=tmp_path)
+        
+        first = context.get_project_directory("My App")
+        
+        assert context.get_project_directory("Other") == first
+        assert first.parent == tmp_path
+        assert (first / "docs").is_dir()
+        
+    def test_same_title_gets_distinct_directories(self, tmp_path) -> None:
+        """Test that runs starting together don't share a directory."""
+        first = RunContext(output_root=tmp_path).get_project_directory("App")
+        second = RunContext(output_root=tmp_path).get_project_directory("App")
+        
+        assert first != second
+        
+    def test_failing_sink_is_ignored(self) -> None:
+        """Test that events reach sinks and sink errors don't propagate."""
+        events = []
+        
+        def broken(record):
+            raise RuntimeError("sink down")
+            
+        context = RunContext(run_id="r1", sinks=[broken, events.append])
+        context.emit("task_completed", task="t")
+        
+        assert events == [{"run_id": "r1", "event": "task_completed", "task": "t"}]
+
+
+class TestRunnerContext:
+    """Tests for run contexts in the runners."""
+
+    @pytest.fixture(autouse=True)
+    def output_in_tmp(self, tmp_path, monkeypatch):
+        """Write generated output under a temporary directory."""
+        monkeypatch.chdir(tmp_path)
+        
+    def test_runs_get_separate_directories(self) -> None:
+        """Test that two runs of one project don't share an output directory."""
+        project = _make_project()
+        runner = ProjectRunner(project)
+        
+        first = runner.run({"input": 1})
+        second = runner.run({"input": 2})
+        
+        assert first["first"]["directory"] == first["second"]["directory"]
+        assert first["first"]["directory"] != second["first"]["directory"]
+        assert first["first"]["run_id"] != second["first"]["run_id"]
+        
+    def test_concurrent_runs_are_isolated(self) -> None:
+        """Test that runs in parallel threads each see their own context."""
+        project = _make_project()
+        results = {}
+        
+        def run(index: int) -> None:
+            context = RunContext(run_id=f"run-{index}")
+            results[index] = ProjectRunner(project, context=context).run({"input": index})
+            
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+            
+        for index, result in results.items():
+            assert result["first"]["run_id"] == result["second"]["run_id"] == f"run-{index}"
+        assert len({result["first"]["directory"] for result in results.values()}) == 4
+        
+    def test_parallel_and_async_runs_propagate_context(self) -> None:
+        """Test that worker threads and asyncio tasks see the run's context."""
+        project = _make_project(fan_out=True)
+        events = []
+        context = RunContext(run_id="shared", sinks=[events.append])
+        
+        threaded = ProjectRunner(project, max_workers=2, context=context).run({"input": 1})
+        awaited = asyncio.run(AsyncProjectRunner(project, context=context).run({"input": 1}))
+        
+        for result in (threaded, awaited):
+            assert result["first"]["run_id"] == result["second"]["run_id"] == "shared"
+        assert [event["event"] for event in events].count("task_completed") == 4
@@ -0,0 +1,196 @@
+"""Tests for the append-only log writers."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from mimi.utils.log_writer import LogQueue, LogWriter, _writers, close_log_writers
+from mimi.utils.output_manager import (
+    compact_agent_log,
+    create_or_update_agent_log,
+    create_or_update_project_log,
+    flush_logs,
+    flush_project_files,
+)
+
+
+@pytest.fixture(autouse=True)
+def closed_writers():
+    """Close the shared log writers after every test."""
+    yield
+    close_log_writers()
+
+
+class BlockingWriter(LogWriter):
+    """Writer whose writes wait until released, recording each batch."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.release = threading.Event()
+        self.batches = []
+        
+    def _append(self, entries):
+        self.release.wait(5)
+        self.batches.append(list(entries))
+        super()._append(entries)
+
+
+class TestLogWriter:
+    """Tests for the LogWriter and LogQueue classes."""
+
+    def test_writes_in_background_in_order(self, tmp_path) -> None:
+        """Test that entries are written in order and the header only once."""
+        path = tmp_path / "log.txt"
+        log_queue = LogQueue()
+        writer = LogWriter(path, header="header\n", log_queue=log_queue)
+        
+        for index in range(100):
+            writer.write(f"{index}\n")
+        writer.flush()
+        
+        assert path.read_text() == "header\n" + "".join(f"{index}\n" for index in range(100))
+        assert log_queue.stats()["written"] == 100
+        log_queue.stop()
+        
+    def test_first_write_does_not_touch_disk(self, tmp_path) -> None:
+        """Test that the file is created by the background thread, not the caller."""
+        path = tmp_path / "logs" / "log.txt"
+        log_queue = LogQueue()
+        writer = BlockingWriter(path, header="header\n", log_queue=log_queue)
+        
+        writer.write("entry\n")
+        assert not path.parent.exists()
+        
+        writer.release.set()
+        writer.flush()
+        assert path.read_text() == "header\nentry\n"
+        log_queue.stop()
+        
+    def test_appends_to_existing_file(self, tmp_path) -> None:
+        """Test that the header is only written to a new file."""
+        path = tmp_path / "log.txt"
+        path.write_text("header\nold\n")
+        writer = LogWriter(path, header="header\n")
+        
+        writer.write("new\n")
+        writer.close()
+        
+        assert path.read_text() == "header\nold\nnew\n"
+        
+    def test_recreates_removed_file(self, tmp_path) -> None:
+        """Test that a removed log file is started again on the next write."""
+        path = tmp_path / "log.txt"
+        writer = LogWriter(path, header="header\n")
+        writer.write("first\n")
+        writer.flush()
+        path.unlink()
+        
+        writer.write("second\n")
+        writer.flush()
+        
+        assert path.read_text() == "header\nsecond\n"
+        writer.close()
+        
+    def test_full_queue_drops_and_coalesces(self, tmp_path) -> None:
+        """Test that a full queue drops entries and waiting entries share a write."""
+        log_queue = LogQueue(max_size=2)
+        writer = BlockingWriter(tmp_path / "log.txt", log_queue=log_queue)
+        
+        writer.write("0\n")
+        while log_queue.stats()["queue_depth"]:
+            time.sleep(0.001)
+        results = [log_queue.submit(writer, f"{index}\n") for index in range(1, 4)]
+        writer.release.set()
+        log_queue.flush()
+        
+        assert results == [True, True, False]
+        assert writer.batches == [["0\n"], ["1\n", "2\n"]]
+        assert log_queue.stats()["dropped"] == 1
+        log_queue.stop()
+        
+    def test_full_queue_blocks(self, tmp_path) -> None:
+        """Test that the block policy makes callers wait for room."""
+        log_queue = LogQueue(max_size=1, overflow="block")
+        writer = BlockingWriter(tmp_path / "log.txt", log_queue=log_queue)
+        writer.write("0\n")
+        while log_queue.stats()["queue_depth"]:
+            time.sleep(0.001)
+        writer.write("1\n")
+        
+        blocked = threading.Thread(target=writer.write, args=("2\n",))
+        blocked.start()
+        blocked.join(0.05)
+        assert blocked.is_alive()
+        
+        writer.release.set()
+        blocked.join(5)
+        log_queue.flush()
+        
+        assert (tmp_path / "log.txt").read_text() == "0\n1\n2\n"
+        assert log_queue.stats()["dropped"] == 0
+        log_queue.stop()
+        
+    def test_stopped_queue_writes_inline(self, tmp_path) -> None:
+        """Test that entries are still written after the queue is stopped."""
+        log_queue = LogQueue()
+        writer = LogWriter(tmp_path / "log.txt", log_queue=log_queue)
+        writer.write("0\n")
+        log_queue.stop()
+        
+        writer.write("1\n")
+        
+        assert (tmp_path / "log.txt").read_text() == "0\n1\n"
+
+
+class TestLogFiles:
+    """Tests for the project and agent log files."""
+
+    def test_project_log_rows(self, tmp_path) -> None:
+        """Test that project log events are appended as table rows."""
+        for index in range(3):
+            create_or_update_project_log(tmp_path, "event", "agent", f"step {index}")
+        flush_logs(tmp_path)
+        
+        lines = (tmp_path / "project.log.md").read_text().splitlines()
+        
+        assert lines[0] == "# Project Log"
+        assert [line.split(" | ")[3] for line in lines[-3:]] == ["step 0", "step 1", "step 2"]
+        
+    def test_release_closes_project_writers(self, tmp_path) -> None:
+        """Test that releasing a project closes only its own log files."""
+        project = tmp_path / "project"
+        other = tmp_path / "project-2"
+        create_or_update_project_log(project, "event", "agent", "done")
+        create_or_update_project_log(other, "event", "agent", "running")
+        
+        flush_project_files(project, release=True)
+        
+        assert list(_writers) == [str(other / "project.log.md")]
+        assert "done" in (project / "project.log.md").read_text()
+        
+    def test_json_agent_log_stream_and_compaction(self, tmp_path) -> None:
+        """Test that JSON records are streamed and compacted into views."""
+        for index in range(2):
+            path = create_or_update_agent_log(
+                tmp_path, "agent", f"action-{index}", {"n": index}, "ok", log_format="json"
+            )
+            
+        assert path == tmp_path / "agent.log.jsonl"
+        
+        flush_logs(tmp_path)
+        view = json.loads((tmp_path / "agent.log.json").read_text())
+        markdown = compact_agent_log(tmp_path, "markdown").read_text()
+        
+        assert [entry["action"] for entry in view["logs"]] == ["action-0", "action-1"]
+        assert view["logs"][1]["input"] == {"n": 1}
+        assert "| agent | action-1 | {'n': 1} | ok |" in markdown
+        
+    def test_compaction_skips_partial_lines(self, tmp_path) -> None:
+        """Test that a truncated record left by a crash is ignored."""
+        (tmp_path / "agent.log.jsonl").write_text('{"action": "a"}\n{"action": "b', encoding="utf-8")
+        
+        view = json.loads(compact_agent_log(tmp_path).read_text())
+        
+        assert view == {"logs": [{"action": "a"}]}
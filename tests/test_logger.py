@@ -0,0 +1,76 @@
+"""Tests for the structured logging helpers."""
+
+import pytest
+
+from mimi.utils import logger as logger_module
+from mimi.utils.logger import agent_log, logger, summarize, task_log
+
+
+class Expensive:
+    """Value that counts how often it is rendered."""
+
+    def __init__(self):
+        self.renders = 0
+        
+    def __repr__(self):
+        self.renders += 1
+        return "expensive"
+
+
+@pytest.fixture
+def records():
+    """Capture log records at INFO level."""
+    captured = []
+    handler_id = logger.add(captured.append, level="INFO", format="{message}")
+    yield captured
+    logger.remove(handler_id)
+
+
+class TestSummarize:
+    """Tests for summarize."""
+
+    def test_short_values_are_unchanged(self) -> None:
+        """Test that values within the budget are rendered in full."""
+        assert summarize("text") == "text"
+        assert summarize({"a": [1, "b"]}) == "{'a': [1, 'b']}"
+        
+    def test_long_values_are_capped(self) -> None:
+        """Test that large strings and containers are cut with their size."""
+        text = summarize("x" * 10_000_000, 20)
+        items = summarize(list(range(1_000_000)), 30)
+        
+        assert text == "x" * 20 + "... (10000000 chars)"
+        assert items.endswith("... (1000000 items)]")
+        assert len(items) < 60
+
+
+class TestLazyLogging:
+    """Tests for lazy rendering in the log helpers."""
+
+    def test_template_is_rendered_with_summaries(self, records) -> None:
+        """Test that template arguments and data are summarized."""
+        agent_log("a", "execute", "Input: {}", "y" * 5000, data={"payload": "z" * 5000})
+        
+        record = records[0].record
+        assert record["message"].startswith("Agent 'a' | execute | Input: yyy")
+        assert "(5000 chars)" in record["message"]
+        assert len(record["extra"]["data"]["payload"]) < 600
+        
+    def test_filtered_events_are_not_rendered(self) -> None:
+        """Test that disallowed statuses and levels render nothing."""
+        value = Expensive()
+        logger.remove()
+        logger.add(lambda message: None, level="WARNING")
+        try:
+            task_log("t", "planning", "Value: {}", value, data={"value": value})
+            agent_log("a", "execute", "Value: {}", value, data={"value": value})
+        finally:
+            logger_module.setup_logger()
+            
+        assert value.renders == 0
+        
+    def test_literal_message_keeps_braces(self, records) -> None:
+        """Test that a message without arguments is not formatted."""
+        agent_log("a", "execute", "Result: {'a': 1}")
+        
+        assert records[0].record["message"] == "Agent 'a' | execute | Result: {'a': 1}"
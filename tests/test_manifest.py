@@ -0,0 +1,77 @@
+"""Tests for the project file manifest."""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mimi.models.metrics import generation_labels
+from mimi.utils.manifest import FileManifest, clear_manifests, get_manifest
+from mimi.utils.output_manager import flush_project_files, save_code_file, save_documentation
+
+
+@pytest.fixture(autouse=True)
+def fresh_manifests():
+    """Start and finish every test without cached manifests."""
+    clear_manifests()
+    yield
+    clear_manifests()
+
+
+class TestFileManifest:
+    """Tests for FileManifest."""
+
+    def test_saved_files_are_recorded(self, tmp_path) -> None:
+        """Test that the output manager records size, hash, component and agent."""
+        with generation_labels(agent="engineer-1"):
+            path = save_code_file(tmp_path, "backend", "app.py", "print('hi')\n", add_header=False)
+        save_documentation(tmp_path, "api", "# API\n")
+        
+        manifest = get_manifest(tmp_path)
+        entry = manifest.get(path)
+        
+        assert entry.path == "src/server/app.py"
+        assert entry.size == len("print('hi')\n")
+        assert entry.component == "backend"
+        assert entry.agent == "engineer-1"
+        assert manifest.get("docs/api.md").agent is None
+        assert [e.path for e in manifest.files(under="src")] == ["src/server/app.py"]
+        assert [e.path for e in manifest.files(component="docs")] == ["docs/api.md"]
+        assert manifest.read_text("docs/api.md") == "# API\n"
+        
+    def test_manifest_is_persisted_and_reloaded(self, tmp_path) -> None:
+        """Test that manifest.json round-trips and files are then read from disk."""
+        save_documentation(tmp_path, "guide", "Read me")
+        flush_project_files(tmp_path, release=True)
+        
+        data = json.loads((tmp_path / "manifest.json").read_text())
+        assert data["files"]["docs/guide.md"]["component"] == "docs"
+        
+        reloaded = get_manifest(tmp_path)
+        assert reloaded.get("docs/guide.md").text is None
+        assert reloaded.read_text("docs/guide.md") == "Read me"
+        
+    def test_directory_without_manifest_is_scanned(self, tmp_path) -> None:
+        """Test that existing files are found once when there is no manifest.json."""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "main.js").write_text("let a;")
+        (tmp_path / "agent.log.md").write_text("log")
+        
+        manifest = FileManifest.load(tmp_path)
+        
+        assert [entry.path for entry in manifest.files()] == ["src/main.js"]
+        assert manifest.get(tmp_path / "outside" / ".." / ".." / "x") is None
+        
+    def test_parallel_writers(self, tmp_path) -> None:
+        """Test that concurrent writes are all recorded and the last save wins."""
+        def write(i):
+            save_code_file(tmp_path, "frontend", f"part{i}.js", f"export const n = {i};", add_header=False)
+            get_manifest(tmp_path).save()
+            
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(write, range(40)))
+        flush_project_files(tmp_path)
+        
+        data = json.loads((tmp_path / "manifest.json").read_text())
+        assert len(get_manifest(tmp_path)) == 40
+        assert len(data["files"]) == 40
@@ -0,0 +1,132 @@
+"""Tests for generation metrics."""
+
+import json
+
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+
+from mimi.models.cache import ResponseCache
+from mimi.models.metrics import (
+    GenerationResult,
+    clear_generation_stats,
+    generation_labels,
+    generation_stats,
+    prefix_stats,
+    prompt_prefix,
+)
+from mimi.models.ollama import OllamaClient
+
+# Final object of a generate response with Ollama's timings in nanoseconds
+TIMED_BODY = {
+    "response": "done",
+    "done": True,
+    "total_duration": 4_000_000_000,
+    "load_duration": 1_000_000_000,
+    "prompt_eval_count": 200,
+    "prompt_eval_duration": 500_000_000,
+    "eval_count": 50,
+    "eval_duration": 2_000_000_000,
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    """Start and finish every test with empty generation totals."""
+    clear_generation_stats()
+    yield
+    clear_generation_stats()
+
+
+def _response(body: dict) -> MagicMock:
+    """Create a successful mock HTTP response."""
+    response = MagicMock()
+    response.status_code = 200
+    response.text = json.dumps(body)
+    return response
+
+
+class TestGenerationResult:
+    """Tests for GenerationResult."""
+
+    def test_derived_metrics(self) -> None:
+        """Test the prefill/decode split and token rates."""
+        result = GenerationResult.from_response(TIMED_BODY, "m")
+        
+        assert result.text == "done"
+        assert result.load_seconds == 1.0
+        assert result.prefill_seconds == 0.5
+        assert result.decode_seconds == 2.0
+        assert result.prefill_tokens_per_second == 400.0
+        assert result.tokens_per_second == 25.0
+        
+    def test_missing_timings(self) -> None:
+        """Test that a response without timings has no rates."""
+        result = GenerationResult.from_response({"response": "x"}, "m")
+        
+        assert result.eval_count == 0
+        assert result.tokens_per_second is None
+        assert result.to_dict()["prefill_tokens_per_second"] is None
+
+
+class TestGenerationStats:
+    """Tests for the generation metrics registry."""
+
+    def test_calls_are_grouped_by_model_agent_and_task(self, tmp_path) -> None:
+        """Test that totals are kept per model, agent and task, with cache hits."""
+        client = OllamaClient("m", suppress_log=True, temperature=0, cache=ResponseCache(tmp_path))
+        
+        with patch.object(requests.Session, "post", return_value=_response(TIMED_BODY)):
+            with generation_labels(agent="coder"), generation_labels(task="implement"):
+                result = client.generate_result("hi")
+                assert client.generate("hi") == "done"
+            client.generate("other")
+            
+        assert result.tokens_per_second == 25.0
+        by_model = generation_stats("model")["m"]
+        assert by_model["calls"] == 3
+        assert by_model["cached_calls"] == 1
+        assert by_model["completion_tokens"] == 100
+        assert by_model["tokens_per_second"] == 25.0
+        assert by_model["load_share"] == 0.25
+        assert generation_stats("agent")["coder"]["calls"] == 2
+        assert generation_stats("agent")["-"]["calls"] == 1
+        assert generation_stats("task")["implement"]["prompt_tokens"] == 200
+        
+        with pytest.raises(ValueError):
+            generation_stats("host")
+            
+    def test_streamed_generation_keeps_timings(self) -> None:
+        """Test that the final line of a stream provides the metrics."""
+        client = OllamaClient("m", suppress_log=True, stream=True)
+        lines = [
+            json.dumps({"response": "do", "done": False}).encode(),
+            json.dumps({**TIMED_BODY, "response": "ne"}).encode(),
+        ]
+        response = MagicMock()
+        response.status_code = 200
+        response.iter_lines.return_value = iter(lines)
+        
+        with patch.object(requests.Session, "post", return_value=response):
+            result = client.generate_result("hi")
+            
+        assert result.text == "done"
+        assert result.eval_count == 50
+        assert generation_stats()["m"]["decode_seconds"] == 2.0
+
+    def test_prefix_cache_hits(self) -> None:
+        """Test that calls whose prompt_eval_count skips the prefix count as cache hits."""
+        client = OllamaClient("m", suppress_log=True)
+        cold = _response({**TIMED_BODY, "prompt_eval_count": 1000})
+        warm = _response(TIMED_BODY)
+        
+        with patch.object(requests.Session, "post", side_effect=[cold, warm]):
+            with generation_labels(agent="coder"), prompt_prefix("abc123", 800, 1000):
+                client.generate("first")
+                client.generate("second")
+                
+        stats = prefix_stats()["coder"]["abc123"]
+        assert stats["calls"] == 2
+        assert stats["likely_cache_hits"] == 1
+        assert stats["prompt_eval_count"] == 1200
+        assert stats["estimated_prompt_tokens"] == 2000
@@ -0,0 +1,294 @@
+"""Tests for the Ollama client."""
+
+import asyncio
+import json
+
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+
+from mimi.models.ollama import (
+    AsyncOllamaClient,
+    OllamaClient,
+    OllamaModelError,
+    close_sessions,
+    get_async_ollama_client,
+    get_ollama_client,
+    get_session,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_sessions():
+    """Start and finish every test with an empty session registry."""
+    close_sessions()
+    yield
+    close_sessions()
+
+
+def _ok_response(text: str = '{"response": "hi"}') -> MagicMock:
+    """Create a successful mock HTTP response."""
+    response = MagicMock()
+    response.status_code = 200
+    response.text = text
+    return response
+
+
+def _stream_lines(*tokens: str) -> list:
+    """Build the NDJSON lines of a streaming generate response."""
+    lines = [json.dumps({"response": token, "done": False}).encode() for token in tokens]
+    lines.append(json.dumps({"response": "", "done": True}).encode())
+    return lines
+
+
+def _stream_response(lines: list) -> MagicMock:
+    """Create a successful mock streaming HTTP response."""
+    response = MagicMock()
+    response.status_code = 200
+    response.iter_lines.return_value = iter(lines)
+    return response
+
+
+class TestSessionRegistry:
+    """Tests for the shared session registry."""
+
+    def test_clients_share_session_per_base_url(self) -> None:
+        """Test that clients for the same server reuse one session."""
+        first = get_ollama_client("model-a", suppress_log=True)
+        second = get_ollama_client("model-b", base_url="http://localhost:11434/", suppress_log=True)
+        
+        with patch.object(requests.Session, "post", return_value=_ok_response()) as mock_post:
+            first.generate("one")
+            second.generate("two")
+            
+        assert mock_post.call_count == 2
+        assert get_session("http://localhost:11434") is get_session("http://localhost:11434/")
+        assert get_session("http://localhost:11434") is not get_session("http://other:11434")
+        
+    def test_clients_are_shared_per_settings(self) -> None:
+        """Test that the factories return one client per model, base URL and settings."""
+        client = get_ollama_client("model-a", suppress_log=True)
+        
+        assert get_ollama_client("model-a", base_url="http://localhost:11434/", suppress_log=True) is client
+        assert get_ollama_client("model-a", temperature=0, suppress_log=True) is not client
+        assert get_ollama_client("model-b", suppress_log=True) is not client
+        assert get_async_ollama_client("model-a", suppress_log=True) is not client
+        
+        close_sessions()
+        assert get_ollama_client("model-a", suppress_log=True) is not client
+        
+    def test_pool_size_is_applied(self) -> None:
+        """Test that the pool size configures the mounted adapter."""
+        session = get_session("http://localhost:11434", pool_size=3)
+        
+        assert session.get_adapter("http://localhost:11434")._pool_maxsize == 3
+        
+    def test_num_ctx_is_sent(self) -> None:
+        """Test that the context window size is passed in the request options."""
+        client = get_ollama_client("model-a", suppress_log=True, num_ctx=8192)
+        
+        with patch.object(requests.Session, "post", return_value=_ok_response()) as mock_post:
+            client.generate("hi")
+            
+        assert mock_post.call_args.kwargs["json"]["options"]["num_ctx"] == 8192
+
+
+class TestRetries:
+    """Tests for retrying failed connections."""
+
+    def test_retries_connection_errors(self) -> None:
+        """Test that a reset connection is retried."""
+        client = OllamaClient("test-model", suppress_log=True, max_retries=2)
+        side_effect = [requests.ConnectionError("reset"), _ok_response()]
+        
+        with patch.object(requests.Session, "post", side_effect=side_effect) as mock_post:
+            assert client.generate("hello") == "hi"
+            
+        assert mock_post.call_count == 2
+        
+    def test_gives_up_after_max_retries(self) -> None:
+        """Test that the error surfaces once retries are exhausted."""
+        client = OllamaClient("test-model", suppress_log=True, max_retries=1)
+        
+        with patch.object(requests.Session, "post", side_effect=requests.ConnectionError("reset")) as mock_post:
+            with pytest.raises(OllamaModelError):
+                client.generate("hello")
+                
+        assert mock_post.call_count == 2
+        
+    def test_does_not_retry_timeouts(self) -> None:
+        """Test that timeouts are not retried."""
+        client = OllamaClient("test-model", suppress_log=True, max_retries=3)
+        
+        with patch.object(requests.Session, "post", side_effect=requests.ConnectTimeout("slow")) as mock_post:
+            with pytest.raises(OllamaModelError):
+                client.generate("hello")
+                
+        assert mock_post.call_count == 1
+
+
+class TestStreaming:
+    """Tests for token streaming."""
+
+    def test_generate_stream_yields_tokens(self) -> None:
+        """Test that tokens are yielded one by one and timed."""
+        client = OllamaClient("test-model", suppress_log=True)
+        response = _stream_response(_stream_lines("Hel", "lo", "!"))
+        
+        with patch.object(requests.Session, "post", return_value=response) as mock_post:
+            stream = client.generate_stream("hi")
+            tokens = list(stream)
+            
+        assert tokens == ["Hel", "lo", "!"]
+        assert stream.text == "Hello!"
+        assert stream.done
+        assert stream.time_to_first_token is not None
+        assert mock_post.call_args.kwargs["stream"] is True
+        assert mock_post.call_args.kwargs["json"]["stream"] is True
+        response.close.assert_called()
+        
+    def test_generate_stream_cancel(self) -> None:
+        """Test that cancelling a stream stops the iteration and closes the connection."""
+        client = OllamaClient("test-model", suppress_log=True)
+        response = _stream_response(_stream_lines("a", "b", "c"))
+        
+        with patch.object(requests.Session, "post", return_value=response):
+            stream = client.generate_stream("hi")
+            assert next(stream) == "a"
+            stream.cancel()
+            
+        assert list(stream) == []
+        assert stream.cancelled
+        assert stream.text == "a"
+        response.close.assert_called()
+        
+    def test_generate_stream_reports_errors(self) -> None:
+        """Test that an error sent mid-stream is raised."""
+        client = OllamaClient("test-model", suppress_log=True)
+        response = _stream_response([b'{"response": "a"}', b'{"error": "model crashed"}'])
+        
+        with patch.object(requests.Session, "post", return_value=response):
+            with pytest.raises(OllamaModelError, match="model crashed"):
+                list(client.generate_stream("hi"))
+                
+    def test_generate_uses_stream_flag(self) -> None:
+        """Test that generate() streams when the client was created with stream=True."""
+        client = OllamaClient("test-model", suppress_log=True, stream=True)
+        response = _stream_response(_stream_lines("a", "b"))
+        
+        with patch.object(requests.Session, "post", return_value=response):
+            assert client.generate("hi") == "ab"
+            
+    def test_generate_streams_to_on_token(self) -> None:
+        """Test that generate() streams to an on_token callback without the stream flag."""
+        client = OllamaClient("test-model", suppress_log=True)
+        response = _stream_response(_stream_lines("a", "b"))
+        tokens = []
+        
+        with patch.object(requests.Session, "post", return_value=response) as post:
+            assert client.generate("hi", on_token=tokens.append) == "ab"
+            
+        assert tokens == ["a", "b"]
+        assert post.call_args.kwargs["json"]["stream"] is True
+        
+    def test_async_generate_stream(self) -> None:
+        """Test streaming from a real chunked HTTP response."""
+        async def handle(reader, writer):
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass
+            writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n")
+            for line in _stream_lines("x", "y"):
+                chunk = line + b"\n"
+                writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                await writer.drain()
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+            writer.close()
+            
+        async def main():
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            client = AsyncOllamaClient(
+                "test-model", base_url=f"http://127.0.0.1:{port}", suppress_log=True
+            )
+            async with server:
+                stream = await client.generate_stream("hi")
+                tokens = [token async for token in stream]
+            return stream, tokens
+            
+        stream, tokens = asyncio.run(main())
+        
+        assert tokens == ["x", "y"]
+        assert stream.done
+        assert stream.time_to_first_token is not None        
+    def _json_server(self, connections: list, drop_first: bool = False):
+        """Build a handler that answers each request with a Content-Length body."""
+        async def handle(reader, writer):
+            connections.append(writer)
+            while True:
+                length = 0
+                line = await reader.readline()
+                if not line:
+                    break
+                while line not in (b"\r\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                    line = await reader.readline()
+                await reader.readexactly(length)
+                if drop_first and len(connections) == 1:
+                    break
+                body = b'{"response": "hi", "done": true}'
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+            writer.close()
+            
+        return handle
+        
+    def test_async_client_reuses_connections(self) -> None:
+        """Test that sequential async requests share one keep-alive connection."""
+        connections = []
+        
+        async def main():
+            server = await asyncio.start_server(self._json_server(connections), "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            client = AsyncOllamaClient(
+                "test-model", base_url=f"http://127.0.0.1:{port}", suppress_log=True
+            )
+            async with server:
+                results = [await client.generate("a"), await client.generate("b")]
+                close_sessions()
+            return results
+            
+        assert asyncio.run(main()) == ["hi", "hi"]
+        assert len(connections) == 1
+        
+    def test_async_client_retries_connection_errors(self) -> None:
+        """Test that a request the server drops is retried on a new connection."""
+        connections = []
+        
+        async def main(max_retries):
+            server = await asyncio.start_server(
+                self._json_server(connections, drop_first=True), "127.0.0.1", 0
+            )
+            port = server.sockets[0].getsockname()[1]
+            client = AsyncOllamaClient(
+                "test-model",
+                base_url=f"http://127.0.0.1:{port}",
+                suppress_log=True,
+                max_retries=max_retries,
+            )
+            async with server:
+                try:
+                    return await client.generate("a")
+                finally:
+                    close_sessions()
+                    
+        assert asyncio.run(main(1)) == "hi"
+        assert len(connections) == 2
+        
+        connections.clear()
+        close_sessions()
+        with pytest.raises(OllamaModelError):
+            asyncio.run(main(0))
+        assert len(connections) == 1
@@ -0,0 +1,87 @@
+"""Tests for the write-behind output sink."""
+
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from mimi.utils.output_sink import OutputSink
+
+
+@pytest.fixture
+def sink():
+    """Create a sink and finish its writes after the test."""
+    sink = OutputSink(max_workers=2)
+    yield sink
+    sink.close()
+
+
+class TestOutputSink:
+    """Tests for OutputSink."""
+
+    def test_write_is_atomic_and_creates_directories(self, sink, tmp_path) -> None:
+        """Test that a file lands in a new directory without a leftover temp file."""
+        path = tmp_path / "src" / "server" / "app.py"
+        
+        sink.write(path, "print('hello')\n")
+        sink.flush(tmp_path)
+        
+        assert path.read_text() == "print('hello')\n"
+        assert sorted(p.name for p in path.parent.iterdir()) == ["app.py"]
+        assert sink.stats()["files_written"] == 1
+        assert sink.stats()["pending"] == 0
+        
+    def test_directories_are_created_once(self, sink, tmp_path) -> None:
+        """Test that known directories are not created again."""
+        with patch("pathlib.Path.mkdir") as mkdir:
+            for _ in range(3):
+                sink.ensure_dir(tmp_path / "docs")
+                
+        assert mkdir.call_count == 1
+        assert sink.stats()["directories_created"] == 1
+        
+    def test_last_write_wins(self, tmp_path) -> None:
+        """Test that queued writes to a path are superseded by later ones."""
+        sink = OutputSink(max_workers=1)
+        gate = threading.Event()
+        try:
+            # Occupy the only worker so the writes below stay queued
+            sink._get_executor().submit(gate.wait)
+            for i in range(5):
+                sink.write(tmp_path / "out.md", f"version {i}")
+            gate.set()
+            sink.flush()
+        finally:
+            sink.close()
+            
+        assert (tmp_path / "out.md").read_text() == "version 4"
+        assert sink.stats()["files_written"] == 1
+        assert sink.stats()["superseded"] == 4
+        
+    def test_flush_raises_write_errors(self, sink, tmp_path) -> None:
+        """Test that a failed write is reported by the next flush under its directory."""
+        (tmp_path / "taken").mkdir()
+        
+        sink.write(tmp_path / "taken", "not a directory")
+        sink.write(tmp_path / "other" / "ok.md", "fine")
+        sink.flush(tmp_path / "other")
+        
+        with pytest.raises(OSError):
+            sink.flush(tmp_path)
+        sink.flush(tmp_path)
+        assert sink.stats()["failed"] == 1
+        assert not (tmp_path / ".taken.tmp").exists()
+        
+    def test_inline_writes(self, tmp_path) -> None:
+        """Test that a sink without workers writes on the caller's thread."""
+        sink = OutputSink(max_workers=0, fsync="full")
+        
+        future = sink.write(tmp_path / "now.md", "written")
+        
+        assert future.done()
+        assert (tmp_path / "now.md").read_text() == "written"
+        
+    def test_unknown_fsync_policy(self) -> None:
+        """Test that an unknown fsync policy is rejected."""
+        with pytest.raises(ValueError):
+            OutputSink(fsync="sometimes")
@@ -0,0 +1,141 @@
+"""Tests for patch-based revisions."""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from mimi.core.software_agents import SoftwareEngineerAgent
+from mimi.utils.code_fences import parse_fences
+from mimi.utils.manifest import clear_manifests, get_manifest
+from mimi.utils.output_manager import apply_patches_from_text, save_code_file
+from mimi.utils.patches import FilePatch, Hunk, PatchError, apply_patch, is_patch, parse_patch
+
+APP = "import os\n\nPORT = 5000\n\n\ndef run():\n    print(PORT)\n"
+
+SEARCH_REPLACE = """```python
+src/server/app.py
+<<<<<<< SEARCH
+PORT = 5000
+=======
+PORT = 8080
+>>>>>>> REPLACE
+```"""
+
+UNIFIED_DIFF = """```diff
+--- a/src/server/app.py
++++ b/src/server/app.py
+@@ -5,3 +5,3 @@
+ def run():
+-    print(PORT)
++    print("port", PORT)
+--- /dev/null
++++ b/src/server/config.py
+@@ -0,0 +1 @@
++DEBUG = False
+```"""
+
+
+@pytest.fixture(autouse=True)
+def fresh_manifests():
+    """Start and finish every test without cached manifests."""
+    clear_manifests()
+    yield
+    clear_manifests()
+
+
+class TestPatches:
+    """Tests for parsing and applying patches."""
+
+    def test_parse_search_replace(self) -> None:
+        """Test that the path is read from the first line of the block."""
+        fence = parse_fences(SEARCH_REPLACE)[0]
+        patches = parse_patch(fence)
+        
+        assert is_patch(fence)
+        assert [p.path for p in patches] == ["src/server/app.py"]
+        assert apply_patch(APP, patches[0]) == APP.replace("5000", "8080")
+        
+    def test_parse_unified_diff(self) -> None:
+        """Test that a diff of several files becomes one patch per file."""
+        patches = parse_patch(parse_fences(UNIFIED_DIFF)[0])
+        
+        assert [(p.path, p.new_file) for p in patches] == [("src/server/app.py", False), ("src/server/config.py", True)]
+        assert apply_patch(APP, patches[0]).endswith('print("port", PORT)\n')
+        assert apply_patch("", patches[1]) == "DEBUG = False\n"
+        
+    def test_whole_files_are_not_patches(self) -> None:
+        """Test that ordinary code blocks are saved as files."""
+        assert not is_patch(parse_fences("```python app.py\nx = '--- a'\n```")[0])
+        
+    def test_trailing_whitespace_is_ignored(self) -> None:
+        """Test that a hunk matches lines that differ only in trailing spaces."""
+        file_patch = FilePatch("a.py", [Hunk("x = 1\ny = 2\n", "x = 1\ny = 3\n")])
+        
+        assert apply_patch("x = 1   \ny = 2\nz = 3\n", file_patch) == "x = 1\ny = 3\nz = 3\n"
+        
+    def test_missing_or_ambiguous_hunk(self) -> None:
+        """Test that a hunk must match exactly one place."""
+        with pytest.raises(PatchError):
+            apply_patch("a\n", FilePatch("a.py", [Hunk("b\n", "c\n")]))
+        with pytest.raises(PatchError):
+            apply_patch("a\na\n", FilePatch("a.py", [Hunk("a\n", "c\n")]))
+
+
+class TestApplyPatches:
+    """Tests for applying patches to a project."""
+
+    def test_patches_update_files_and_report_tokens_saved(self, tmp_path) -> None:
+        """Test that patched files are rewritten and new files are created."""
+        save_code_file(tmp_path, "backend", "app.py", "# padding\n" * 200 + APP, add_header=False)
+        
+        output = apply_patches_from_text(tmp_path, "backend", SEARCH_REPLACE + "\n" + UNIFIED_DIFF)
+        
+        manifest = get_manifest(tmp_path)
+        content = manifest.read_text("src/server/app.py")
+        assert "PORT = 8080" in content
+        assert manifest.read_text("src/server/config.py") == "DEBUG = False\n"
+        assert output["failed_patches"] == []
+        assert len(output["patched_files"]) == 3
+        assert output["tokens_saved"] > 0
+        
+    def test_failed_patch_leaves_file_unchanged(self, tmp_path) -> None:
+        """Test that a patch that does not apply is reported."""
+        save_code_file(tmp_path, "backend", "app.py", "PORT = 1\n", add_header=False)
+        
+        output = apply_patches_from_text(tmp_path, "backend", SEARCH_REPLACE)
+        
+        assert output["patched_files"] == []
+        assert output["failed_patches"][0]["path"] == "src/server/app.py"
+        assert get_manifest(tmp_path).read_text("src/server/app.py") == "PORT = 1\n"
+        
+    def test_new_file_diff_replaces_known_file(self, tmp_path) -> None:
+        """Test that a /dev/null diff for an existing file rewrites it instead of appending."""
+        save_code_file(tmp_path, "backend", "app.py", APP, add_header=False)
+        diff = """```diff
+--- /dev/null
++++ b/src/server/app.py
+@@ -0,0 +1 @@
++PORT = 8080
+```"""
+        
+        output = apply_patches_from_text(tmp_path, "backend", diff)
+        
+        assert output["failed_patches"] == []
+        assert get_manifest(tmp_path).read_text("src/server/app.py") == "PORT = 8080\n"
+        
+    def test_agent_regenerates_file_when_patch_fails(self, tmp_path) -> None:
+        """Test the fallback to full-file mode for a file whose patch fails."""
+        save_code_file(tmp_path, "backend", "app.py", "PORT = 1\n", add_header=False)
+        agent = SoftwareEngineerAgent(
+            name="engineer-1", role="Backend", description="d", model_name="m", revision_mode="patch"
+        )
+        responses = [SEARCH_REPLACE, "```python\nsrc/server/app.py\nPORT = 8080\n```"]
+        
+        with patch.object(SoftwareEngineerAgent, "_generate", AsyncMock(side_effect=responses)) as generate:
+            fixes = asyncio.run(agent._fix_bugs("port is wrong", tmp_path, "Demo"))
+            
+        assert "PORT = 1" in generate.call_args_list[0].args[0]
+        assert "could not be applied" in generate.call_args_list[1].args[0]
+        assert fixes["patched_files"] == []
+        assert get_manifest(tmp_path).read_text("src/server/app.py") == "PORT = 8080"
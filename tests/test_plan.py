@@ -0,0 +1,102 @@
+"""Tests for compiled execution plans."""
+
+import pytest
+
+from mimi.core.plan import ExecutionPlan
+from mimi.core.project import Project
+from mimi.core.task import Task
+
+
+def _task(name: str, *depends_on: str) -> Task:
+    """Create a task with the given dependencies."""
+    return Task(name=name, description=name, agent="agent", depends_on=list(depends_on))
+
+
+def _tasks(*tasks: Task) -> dict:
+    """Key tasks by name."""
+    return {task.name: task for task in tasks}
+
+
+class TestExecutionPlan:
+    """Tests for the ExecutionPlan class."""
+
+    def test_diamond(self) -> None:
+        """Test order, levels, adjacency and ready counts of a diamond."""
+        plan = ExecutionPlan.compile(
+            _tasks(_task("a"), _task("b", "a"), _task("c", "a"), _task("d", "c", "b"))
+        )
+        
+        assert plan.order == ["a", "b", "c", "d"]
+        assert plan.levels == [["a"], ["b", "c"], ["d"]]
+        assert plan.dependents == {"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": []}
+        assert plan.dependencies["d"] == ("b", "c")
+        assert plan.ready_counts() == {"a": 0, "b": 1, "c": 1, "d": 2}
+        assert plan.ancestors("d") == ["a", "b", "c"]
+        
+    def test_critical_path(self) -> None:
+        """Test that the critical path follows the longest chain."""
+        plan = ExecutionPlan.compile(
+            _tasks(_task("a"), _task("b", "a"), _task("c", "b"), _task("x"), _task("y", "x", "c"))
+        )
+        
+        assert plan.critical_path == ["a", "b", "c", "y"]
+        assert plan.critical_path_length == 4
+        
+    def test_dependencies_declared_later(self) -> None:
+        """Test that a task may be declared before its dependencies."""
+        plan = ExecutionPlan.compile(_tasks(_task("report", "data"), _task("data")))
+        
+        assert plan.order == ["data", "report"]
+        
+    def test_duplicate_dependencies_count_once(self) -> None:
+        """Test that a repeated dependency is only waited for once."""
+        plan = ExecutionPlan.compile(_tasks(_task("a"), _task("b", "a", "a")))
+        
+        assert plan.ready_counts()["b"] == 1
+        assert plan.dependents["a"] == ["b"]
+        
+    def test_missing_dependency(self) -> None:
+        """Test that a missing dependency is reported."""
+        with pytest.raises(ValueError, match="depends on non-existent tasks"):
+            ExecutionPlan.compile(_tasks(_task("a", "ghost")))
+            
+    def test_cycle_names_a_task_on_the_cycle(self) -> None:
+        """Test that the reported task is part of the cycle."""
+        tasks = _tasks(_task("start"), _task("x", "start", "z"), _task("y", "x"), _task("z", "y"))
+        
+        with pytest.raises(ValueError, match="Circular dependency") as excinfo:
+            ExecutionPlan.compile(tasks)
+        assert "'start'" not in str(excinfo.value)
+        
+    def test_large_chain(self) -> None:
+        """Test that deep graphs compile without recursion."""
+        count = 20_000
+        tasks = _tasks(_task("t0"), *(_task(f"t{i}", f"t{i - 1}") for i in range(1, count)))
+        
+        plan = ExecutionPlan.compile(tasks)
+        
+        assert len(plan) == count
+        assert plan.order[-1] == f"t{count - 1}"
+        assert plan.critical_path_length == count
+
+
+class TestProjectPlanCache:
+    """Tests for caching the plan on a project."""
+
+    def test_plan_is_reused_until_tasks_change(self) -> None:
+        """Test that the plan is recompiled only when dependencies change."""
+        project = Project(
+            name="p",
+            description="d",
+            tasks=_tasks(_task("a"), _task("b", "a")),
+        )
+        
+        plan = project.get_execution_plan()
+        assert project.get_execution_plan() is plan
+        
+        project.tasks["c"] = _task("c", "b")
+        assert project.get_execution_order() == ["a", "b", "c"]
+        
+        project.tasks["a"].depends_on.append("c")
+        with pytest.raises(ValueError, match="Circular dependency"):
+            project.get_execution_plan()
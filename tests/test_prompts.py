@@ -0,0 +1,174 @@
+"""Tests for token-budget-aware prompt assembly."""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from mimi.core.software_agents import SoftwareEngineerAgent
+from mimi.utils.manifest import clear_manifests
+
+from mimi.utils.prompts import (
+    HEAD,
+    KEEP,
+    SELECT,
+    TAIL,
+    PromptBuilder,
+    PromptTemplate,
+    get_template,
+    register_template,
+)
+from mimi.utils.tokens import estimate_tokens
+
+LOG = "".join(f"step {i} ok\n" for i in range(500))
+CODE = "function drawBird(canvas) {\n  canvas.fillRect(birdX, birdY, 20, 20);\n}\n\n" * 60
+LOGIN = "def check_password(user, password):\n    return hash(password) == user.password_hash\n"
+
+
+class TestPromptBuilder:
+    """Tests for PromptBuilder."""
+
+    def test_short_prompt_is_unchanged(self) -> None:
+        """Test that sections that fit are filled in as they are."""
+        builder = PromptBuilder(system_prompt="Be brief.")
+        builder.add("plan", "Add a login page")
+        
+        prompt = builder.render("# Plan\n{plan}\n# Task\nImplement {component}", component="backend")
+        
+        assert prompt == "# Plan\nAdd a login page\n# Task\nImplement backend"
+        assert builder.report == {"system": 3, "template": 8, "plan": 4}
+        
+    def test_section_budget(self) -> None:
+        """Test that head and tail sections keep their start and end."""
+        builder = PromptBuilder()
+        builder.add("first", LOG, budget=100, policy=HEAD)
+        builder.add("last", LOG, budget=100, policy=TAIL)
+        
+        prompt = builder.render("{first}\n---\n{last}")
+        first, last = prompt.split("\n---\n")
+        
+        assert first.startswith("step 0 ok") and "step 499" not in first
+        assert last.endswith("step 499 ok\n") and "step 0 ok" not in last
+        assert "tokens omitted" in first and "tokens omitted" in last
+        assert builder.report["first"] <= 100 and builder.report["last"] <= 100
+        
+    def test_prompt_fits_context_window(self) -> None:
+        """Test that sections are shrunk to fit num_ctx minus the response tokens."""
+        builder = PromptBuilder(num_ctx=2048, response_tokens=512, system_prompt="x" * 400)
+        builder.add("a", LOG)
+        builder.add("b", LOG * 2)
+        builder.add("rules", "Reply with code only.", policy=KEEP)
+        
+        prompt = builder.render("{a}{b}{rules}")
+        
+        assert prompt.endswith("Reply with code only.")
+        assert sum(builder.report.values()) <= 1536
+        assert builder.report["b"] > builder.report["a"]
+        
+    def test_select_keeps_relevant_chunks(self) -> None:
+        """Test that a select section keeps the chunks matching its query."""
+        builder = PromptBuilder()
+        builder.add("code", CODE + LOGIN + CODE, budget=200, policy=SELECT, query="password check fails")
+        
+        prompt = builder.render("{code}")
+        
+        assert "check_password" in prompt
+        assert estimate_tokens(prompt) < 250
+        
+    def test_budgets_from_model_settings(self) -> None:
+        """Test that num_ctx and per-section budgets are read from model_settings."""
+        builder = PromptBuilder.from_settings({"num_ctx": 8192, "prompt_budgets": {"log": 50}})
+        builder.add("log", LOG, budget=1000)
+        builder.render("{log}")
+        
+        assert builder.available_tokens == 8192 - 1024
+        assert builder.report["log"] <= 50
+        
+    def test_no_window_without_num_ctx(self) -> None:
+        """Test that prompts are not cut to a window the settings do not give."""
+        builder = PromptBuilder.from_settings({})
+        builder.add("log", LOG * 10)
+        
+        prompt = builder.render("{log}")
+        
+        assert builder.available_tokens is None
+        assert prompt == LOG * 10
+        
+    def test_select_needs_query(self) -> None:
+        """Test that invalid sections are rejected."""
+        with pytest.raises(ValueError):
+            PromptBuilder().add("code", CODE, policy=SELECT)
+        with pytest.raises(ValueError):
+            PromptBuilder().add("code", CODE, policy="summarize")
+
+
+TEMPLATE = PromptTemplate(
+    "test.review",
+    system="""
+    You review {language} code.
+    """,
+    instructions="""
+    # Task
+    Review the code below.
+    """,
+    payload="""
+    # Code
+    {code}
+    """,
+)
+
+
+class TestPromptTemplate:
+    """Tests for PromptTemplate and the template registry."""
+
+    def test_static_text_comes_first(self) -> None:
+        """Test that the instructions precede the payload and the text is dedented."""
+        builder = PromptBuilder(template=TEMPLATE, values={"language": "Python"})
+        builder.add("code", LOGIN)
+        
+        prompt = builder.render()
+        
+        assert builder.system_prompt == "You review Python code."
+        assert prompt == "# Task\nReview the code below.\n\n# Code\n" + LOGIN
+        assert TEMPLATE.static_fields == ("language",)
+        assert TEMPLATE.payload_fields == ("code",)
+        
+    def test_prefix_hash_depends_only_on_static_text(self) -> None:
+        """Test that prompts with different payloads share a prefix hash."""
+        prefixes = []
+        for code in (LOGIN, CODE):
+            builder = PromptBuilder(template=TEMPLATE, values={"language": "Python"})
+            builder.add("code", code)
+            builder.render()
+            prefixes.append(builder.prefix)
+            
+        assert prefixes[0].hash == prefixes[1].hash == TEMPLATE.prefix_hash(language="Python")
+        assert prefixes[0].tokens < prefixes[0].prompt_tokens < prefixes[1].prompt_tokens
+        assert TEMPLATE.prefix_hash(language="Go") != prefixes[0].hash
+        
+    def test_registry(self) -> None:
+        """Test that agent templates are registered at import and names are unique."""
+        import mimi.core.prompt_templates  # noqa: F401
+        
+        assert get_template("engineer.implement.backend").static_fields == ("specialty",)
+        with pytest.raises(ValueError):
+            register_template(PromptTemplate("architect.architecture", "", "", ""))
+        with pytest.raises(KeyError):
+            get_template("missing")
+        with pytest.raises(ValueError):
+            PromptTemplate("bad", "", "{value!r}", "")
+            
+    def test_agent_calls_share_prefix(self, tmp_path) -> None:
+        """Test that an engineer's prompts start with the same static prefix."""
+        agent = SoftwareEngineerAgent(name="engineer-1", role="Backend", description="d", model_name="m")
+        
+        with patch.object(SoftwareEngineerAgent, "_generate", AsyncMock(return_value="No code.")) as generate:
+            for tasks in ("Build the login API", "Build the game loop"):
+                asyncio.run(agent._implement_components(tasks, tmp_path, "Demo"))
+        clear_manifests()
+        
+        first, second = generate.call_args_list
+        assert first.kwargs["prefix"].hash == second.kwargs["prefix"].hash
+        assert first.kwargs["system_prompt"] == second.kwargs["system_prompt"]
+        assert first.args[0].startswith("# Task\nImplement the backend components")
+        assert first.args[0].endswith("Build the login API")
@@ -0,0 +1,108 @@
+"""Tests for BM25 retrieval over generated projects."""
+
+import pytest
+
+from mimi.utils.manifest import clear_manifests
+from mimi.utils.output_manager import save_code_file, save_documentation
+from mimi.utils.retrieval import (
+    BM25Index,
+    clear_indexes,
+    get_project_index,
+    retrieve_context,
+    select_relevant,
+    split_chunks,
+    tokenize,
+)
+from mimi.utils.tokens import estimate_tokens
+
+LOGIN = "def check_password(user, password):\n    return hash(password) == user.password_hash\n"
+RENDER = "function drawBird(canvas) {\n  canvas.fillRect(birdX, birdY, 20, 20);\n}\n"
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes():
+    """Start and finish every test without cached manifests or indexes."""
+    clear_manifests()
+    clear_indexes()
+    yield
+    clear_manifests()
+    clear_indexes()
+
+
+class TestBM25Index:
+    """Tests for BM25Index."""
+
+    def test_tokenize_splits_identifiers(self) -> None:
+        """Test that identifiers match the words they are made of."""
+        assert tokenize("getUserName(user_name)") == [
+            "getusername", "get", "user", "name", "user_name", "user", "name"
+        ]
+        
+    def test_split_chunks_covers_every_line(self) -> None:
+        """Test that chunks are bounded and keep line numbers."""
+        text = "".join(f"line {i}\n" for i in range(1, 101))
+        chunks = split_chunks(text, max_lines=40)
+        
+        assert [(start, end) for start, end, _ in chunks] == [(1, 40), (41, 80), (81, 100)]
+        assert "".join(chunk for _, _, chunk in chunks) == text
+        
+    def test_search_ranks_relevant_chunks(self) -> None:
+        """Test that the chunk sharing rare query terms ranks first."""
+        index = BM25Index()
+        index.add_document("auth.py", LOGIN)
+        index.add_document("game.js", RENDER)
+        
+        results = index.search("Login fails: password hash is wrong")
+        
+        assert [chunk.path for chunk in results] == ["auth.py"]
+        assert results[0].score > 0
+        
+    def test_documents_are_replaced_and_removed(self) -> None:
+        """Test that updating a document drops its old chunks."""
+        index = BM25Index()
+        index.add_document("auth.py", LOGIN)
+        index.add_document("auth.py", RENDER)
+        
+        assert [chunk.path for chunk in index.search("bird canvas")] == ["auth.py"]
+        assert index.search("password") == []
+        
+        index.remove_document("auth.py")
+        assert len(index) == 0
+        
+    def test_token_budget(self) -> None:
+        """Test that results never exceed the token budget."""
+        index = BM25Index()
+        for i in range(10):
+            index.add_document(f"f{i}.py", LOGIN * (i + 1))
+            
+        results = index.search("password", top_k=10, token_budget=100)
+        
+        assert results
+        assert sum(estimate_tokens(chunk.text) for chunk in results) <= 100
+
+
+class TestProjectRetrieval:
+    """Tests for retrieval over a project's files."""
+
+    def test_index_follows_saved_files(self, tmp_path) -> None:
+        """Test that new and changed files are indexed on the next query."""
+        save_code_file(tmp_path, "backend", "auth.py", LOGIN, add_header=False)
+        
+        assert "src/server/auth.py" in retrieve_context(tmp_path, "password check", 500)
+        
+        save_code_file(tmp_path, "backend", "auth.py", RENDER, add_header=False)
+        save_documentation(tmp_path, "api", "POST /login checks the password")
+        
+        index = get_project_index(tmp_path)
+        assert sorted(index.paths()) == ["docs/api.md", "src/server/auth.py"]
+        assert [chunk.path for chunk in index.search("password")] == ["docs/api.md"]
+        
+    def test_select_relevant_keeps_short_text(self) -> None:
+        """Test that text within the budget is unchanged and long text is cut."""
+        assert select_relevant(LOGIN, "anything", 1000) == LOGIN
+        
+        long_text = RENDER * 100 + "\n" + LOGIN + "\n" + RENDER * 100
+        selected = select_relevant(long_text, "password", 200)
+        
+        assert "check_password" in selected
+        assert estimate_tokens(selected) <= 220
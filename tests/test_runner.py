@@ -1,11 +1,14 @@
 """Tests for the ProjectRunner and TaskRunner classes."""
 
+import asyncio
+import threading
+
 import pytest
 from unittest.mock import MagicMock, patch
 
 from mimi.core.agent import Agent
 from mimi.core.project import Project
-from mimi.core.runner import ProjectRunner, TaskRunner
+from mimi.core.runner import AsyncProjectRunner, ProjectRunner, TaskRunner
 from mimi.core.task import Task
 
 
@@ -130,6 +133,137 @@ class TestProjectRunner:
         result = runner.run({"input": 10})
         
         # Verify TaskRunner was created and used
-        mock_task_runner_class.assert_called_once_with(mock_task, mock_project.agents)
+        mock_task_runner_class.assert_called_once_with(
+            mock_task, mock_project.agents, context=runner.run_context
+        )
         mock_task_runner.run.assert_called_once_with({"input": 10})
-        assert result == {"input": 10, "result": 42} 
\ No newline at end of file
+        assert result == {"input": 10, "result": 42} 
+
+
+class LabelAgent(Agent):
+    """Agent that prefixes its input with its own label."""
+
+    label: str = "value"
+
+    def execute(self, task_input):
+        """Return the label joined with the input."""
+        return f"{self.label}:{task_input}"
+
+
+class TestParallelProjectRunner:
+    """Tests for ProjectRunner with max_workers > 1."""
+
+    def _make_project(self) -> Project:
+        """Create a diamond-shaped project: a -> (b, c) -> d."""
+        agents = {
+            name: LabelAgent(
+                name=name,
+                role="labeler",
+                description="Labels its input",
+                model_name="test-model",
+                label=name,
+            )
+            for name in ["a", "b", "c", "d"]
+        }
+        tasks = {
+            "a": Task(name="a", description="A", agent="a", input_key="input", output_key="out_a"),
+            "b": Task(name="b", description="B", agent="b", input_key="out_a", output_key="out_b", depends_on=["a"]),
+            "c": Task(name="c", description="C", agent="c", input_key="out_a", output_key="out_c", depends_on=["a"]),
+            "d": Task(name="d", description="D", agent="d", input_key="out_b", output_key="out_d", depends_on=["b", "c"]),
+        }
+        return Project(name="diamond", description="Diamond project", agents=agents, tasks=tasks)
+        
+    def test_parallel_matches_sequential(self) -> None:
+        """Test that a parallel run produces the same data as a sequential run."""
+        project = self._make_project()
+        
+        sequential = ProjectRunner(project).run({"input": 1})
+        parallel = ProjectRunner(project, max_workers=4).run({"input": 1})
+        
+        assert parallel == sequential
+        assert parallel["out_d"] == "d:b:a:1"
+        
+    def test_parallel_runs_independent_tasks_concurrently(self) -> None:
+        """Test that tasks with satisfied dependencies run at the same time."""
+        project = self._make_project()
+        project.tasks["d"].depends_on = ["a"]
+        project.tasks["d"].input_key = "out_a"
+        
+        # b, c and d only depend on a, so all three must be in flight together
+        # to get past the barrier; a sequential run would time out here
+        fan_out = threading.Barrier(3, timeout=5)
+        
+        def execute(agent, task_input):
+            if agent.name != "a":
+                fan_out.wait()
+            return f"{agent.label}:{task_input}"
+            
+        with patch.object(LabelAgent, "execute", execute):
+            result = ProjectRunner(project, max_workers=3).run({"input": 1})
+            
+        assert result["out_b"] == "b:a:1"
+        assert result["out_c"] == "c:a:1"
+        assert result["out_d"] == "d:a:1"
+        
+    def test_parallel_propagates_task_errors(self) -> None:
+        """Test that a failing task stops the run and re-raises the error."""
+        project = self._make_project()
+        
+        def execute(agent, task_input):
+            if agent.name == "b":
+                raise RuntimeError("boom")
+            return f"{agent.label}:{task_input}"
+            
+        with patch.object(LabelAgent, "execute", execute):
+            with pytest.raises(RuntimeError, match="boom"):
+                ProjectRunner(project, max_workers=2).run({"input": 1})
+
+
+class TestAsyncProjectRunner:
+    """Tests for the AsyncProjectRunner class."""
+
+    def test_async_matches_sequential(self) -> None:
+        """Test that an async run produces the same data as a sequential run."""
+        project = TestParallelProjectRunner()._make_project()
+        
+        sequential = ProjectRunner(project).run({"input": 1})
+        result = asyncio.run(AsyncProjectRunner(project).run({"input": 1}))
+        
+        assert result == sequential
+        
+    def test_async_runs_independent_tasks_concurrently(self) -> None:
+        """Test that independent tasks are awaited at the same time."""
+        project = TestParallelProjectRunner()._make_project()
+        running = []
+        peak = []
+        
+        async def aexecute(agent, task_input):
+            running.append(agent.name)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(agent.name)
+            return f"{agent.label}:{task_input}"
+            
+        with patch.object(LabelAgent, "aexecute", aexecute):
+            result = asyncio.run(AsyncProjectRunner(project).run({"input": 1}))
+            
+        assert max(peak) == 2
+        assert result["out_d"] == "d:b:a:1"
+        
+    def test_async_respects_max_concurrency(self) -> None:
+        """Test that max_concurrency limits the number of running tasks."""
+        project = TestParallelProjectRunner()._make_project()
+        running = []
+        peak = []
+        
+        async def aexecute(agent, task_input):
+            running.append(agent.name)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(agent.name)
+            return f"{agent.label}:{task_input}"
+            
+        with patch.object(LabelAgent, "aexecute", aexecute):
+            asyncio.run(AsyncProjectRunner(project, max_concurrency=1).run({"input": 1}))
+            
+        assert max(peak) == 1
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""Tests for model-aware scheduling."""
+
+import pytest
+
+from mimi.core.agent import Agent
+from mimi.core.project import Project
+from mimi.core.runner import ProjectRunner
+from mimi.core.scheduler import ModelAffinityScheduler, model_key
+from mimi.core.task import Task
+
+
+class LabelAgent(Agent):
+    """Agent that prefixes its input with its own name."""
+
+    def execute(self, task_input):
+        """Return the name joined with the input."""
+        return f"{self.name}:{task_input}"
+
+
+def _make_project() -> Project:
+    """Create a fan-out project whose branches alternate between two models."""
+    models = {"a": "qwen3", "b": "deepseek-r1", "c": "qwen3", "d": "deepseek-r1"}
+    agents = {
+        name: LabelAgent(name=name, role="labeler", description="Labels its input", model_name=model)
+        for name, model in models.items()
+    }
+    tasks = {
+        name: Task(
+            name=name,
+            description=name,
+            agent=name,
+            input_key="out_a" if name != "a" else "input",
+            output_key=f"out_{name}",
+            depends_on=["a"] if name != "a" else [],
+        )
+        for name in models
+    }
+    return Project(name="fan-out", description="Fan-out project", agents=agents, tasks=tasks)
+
+
+class TestModelKey:
+    """Tests for model_key."""
+
+    def test_ollama_agents_key_by_base_url(self) -> None:
+        """Test that Ollama agents are keyed by endpoint and model."""
+        agent = LabelAgent(
+            name="a",
+            role="r",
+            description="d",
+            model_name="qwen3",
+            model_settings={"base_url": "http://gpu:11434/"},
+        )
+        
+        assert model_key(agent) == ("http://gpu:11434", "ollama/qwen3")
+        assert model_key(None) == ("", "")
+
+
+class TestModelAffinityScheduler:
+    """Tests for the ModelAffinityScheduler class."""
+
+    def test_prefers_loaded_model(self) -> None:
+        """Test that ready tasks on the loaded model go first."""
+        position = {"a": 0, "b": 1, "c": 2, "d": 3}
+        models = {"a": ("h", "m1"), "b": ("h", "m2"), "c": ("h", "m1"), "d": ("h", "m2")}
+        scheduler = ModelAffinityScheduler(position, models)
+        for name in position:
+            scheduler.push(name)
+            
+        assert [scheduler.pop() for _ in range(4)] == ["a", "c", "b", "d"]
+        assert scheduler.stats() == {
+            "switches": 1,
+            "loads": {"m1": 1, "m2": 1},
+            "launches": {"m1": 2, "m2": 2},
+        }
+        
+    def test_without_affinity_keeps_execution_order(self) -> None:
+        """Test that disabling affinity takes tasks in order but still counts switches."""
+        position = {"a": 0, "b": 1, "c": 2}
+        models = {"a": ("h", "m1"), "b": ("h", "m2"), "c": ("h", "m1")}
+        scheduler = ModelAffinityScheduler(position, models, affinity=False)
+        for name in position:
+            scheduler.push(name)
+            
+        assert [scheduler.pop() for _ in range(3)] == ["a", "b", "c"]
+        assert scheduler.switches == 2
+        
+    def test_endpoints_are_independent(self) -> None:
+        """Test that models on different endpoints don't count as switches."""
+        models = {"a": ("h1", "m1"), "b": ("h2", "m2")}
+        scheduler = ModelAffinityScheduler({"a": 0, "b": 1}, models)
+        scheduler.push("a")
+        scheduler.push("b")
+        
+        scheduler.pop()
+        scheduler.pop()
+        
+        assert scheduler.switches == 0
+        assert len(scheduler) == 0
+        with pytest.raises(IndexError):
+            scheduler.pop()
+
+
+class TestRunnerModelAffinity:
+    """Tests for model affinity in ProjectRunner."""
+
+    @pytest.mark.parametrize("model_affinity, switches", [(True, 1), (False, 3)])
+    def test_parallel_run_groups_models(self, model_affinity: bool, switches: int) -> None:
+        """Test that affinity reduces switches without changing the result."""
+        project = _make_project()
+        
+        runner = ProjectRunner(project, max_workers=2, model_affinity=model_affinity)
+        result = runner.run({"input": 1})
+        
+        assert result == ProjectRunner(project).run({"input": 1})
+        assert runner.scheduler.switches == switches
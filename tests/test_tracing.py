@@ -0,0 +1,153 @@
+"""Tests for span tracing."""
+
+import asyncio
+import json
+
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+
+from mimi.core.agent import Agent
+from mimi.core.context import RunContext
+from mimi.core.project import Project
+from mimi.core.runner import AsyncProjectRunner, ProjectRunner
+from mimi.core.task import Task
+from mimi.models.ollama import OllamaClient
+from mimi.utils.tracing import Tracer, current_span, span
+
+
+class EchoAgent(Agent):
+    """Agent that returns its input."""
+
+    def execute(self, task_input):
+        """Return the input."""
+        return task_input
+        
+    async def aexecute(self, task_input):
+        """Return the input after yielding to the event loop."""
+        await asyncio.sleep(0.01)
+        return task_input
+
+
+def _make_project() -> Project:
+    """Create a project with two independent tasks."""
+    agents = {"echo": EchoAgent(name="echo", role="r", description="d", model_name="m")}
+    tasks = {
+        name: Task(name=name, description=name, agent="echo", input_key="input", output_key=name)
+        for name in ("a", "b")
+    }
+    return Project(name="traced", description="Traced project", agents=agents, tasks=tasks)
+
+
+def _by_name(tracer: Tracer):
+    """Group a tracer's spans by name."""
+    spans = {}
+    for recorded in tracer.spans:
+        spans.setdefault(recorded.name, []).append(recorded)
+    return spans
+
+
+class TestTracer:
+    """Tests for the Tracer class."""
+
+    def test_inactive_spans_are_noops(self) -> None:
+        """Test that nothing is recorded without an active tracer."""
+        tracer = Tracer()
+        
+        with span("outside", size=1) as outside:
+            outside.set_attribute("more", 2)
+            assert current_span() is outside
+            
+        assert tracer.spans == []
+        
+    def test_nesting_attributes_and_errors(self) -> None:
+        """Test parent links, attributes and error status."""
+        tracer = Tracer()
+        
+        with tracer.activate():
+            with span("outer", skipped=None) as outer:
+                with pytest.raises(ValueError):
+                    with span("inner") as inner:
+                        current_span().set_attributes(tokens=3)
+                        raise ValueError("boom")
+                        
+        assert [recorded.name for recorded in tracer.spans] == ["inner", "outer"]
+        assert inner.parent_id == outer.span_id
+        assert outer.parent_id is None
+        assert inner.attributes == {"tokens": 3}
+        assert inner.error == "ValueError: boom"
+        assert outer.attributes == {}
+        assert outer.start_ns <= inner.start_ns and inner.end_ns <= outer.end_ns
+        
+    def test_exports(self, tmp_path) -> None:
+        """Test the Chrome trace and OTLP exports."""
+        tracer = Tracer()
+        with tracer.activate():
+            with span("project.run", project="p"):
+                with span("ollama.generate", prompt_tokens=5, cached=False, ratio=0.5):
+                    pass
+                    
+        chrome = json.loads(tracer.export_chrome_trace(tmp_path / "trace.json").read_text())
+        otlp = json.loads(tracer.export_otlp(tmp_path / "trace.otlp.json").read_text())
+        
+        slices = [event for event in chrome["traceEvents"] if event["ph"] == "X"]
+        assert [event["name"] for event in slices] == ["project.run", "ollama.generate"]
+        assert slices[1]["cat"] == "ollama"
+        assert slices[1]["args"] == {"prompt_tokens": 5, "cached": False, "ratio": 0.5}
+        assert slices[0]["ts"] <= slices[1]["ts"]
+        assert any(event["name"] == "thread_name" for event in chrome["traceEvents"])
+        
+        spans = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        generate = next(item for item in spans if item["name"] == "ollama.generate")
+        run = next(item for item in spans if item["name"] == "project.run")
+        assert generate["parentSpanId"] == run["spanId"]
+        assert "parentSpanId" not in run
+        assert {"key": "prompt_tokens", "value": {"intValue": "5"}} in generate["attributes"]
+        assert generate["traceId"] == tracer.trace_id
+
+
+class TestRunTracing:
+    """Tests for spans recorded by the runners and clients."""
+
+    def test_parallel_run_spans(self) -> None:
+        """Test that worker threads record spans under the run span."""
+        tracer = Tracer()
+        
+        ProjectRunner(_make_project(), max_workers=2, context=RunContext(tracer=tracer)).run({"input": 1})
+        
+        spans = _by_name(tracer)
+        run = spans["project.run"][0]
+        assert run.attributes["tasks"] == 2
+        assert {task.attributes["task"] for task in spans["task.run"]} == {"a", "b"}
+        assert all(task.parent_id == run.span_id for task in spans["task.run"])
+        task_ids = {task.span_id for task in spans["task.run"]}
+        assert {agent.parent_id for agent in spans["agent.execute"]} == task_ids
+        assert spans["agent.execute"][0].attributes["model"] == "m"
+        
+    def test_async_tasks_get_their_own_tracks(self) -> None:
+        """Test that concurrent asyncio tasks are exported as separate tracks."""
+        tracer = Tracer()
+        
+        asyncio.run(AsyncProjectRunner(_make_project(), context=RunContext(tracer=tracer)).run({"input": 1}))
+        
+        tasks = _by_name(tracer)["task.run"]
+        assert len({task.lane for task in tasks}) == 2
+        
+    def test_generate_span_has_token_counts(self) -> None:
+        """Test that a model call records its size and token counts."""
+        tracer = Tracer()
+        client = OllamaClient("m", suppress_log=True)
+        response = MagicMock()
+        response.status_code = 200
+        response.text = json.dumps({"response": "hello", "prompt_eval_count": 7, "eval_count": 2})
+        
+        with tracer.activate(), patch.object(requests.Session, "post", return_value=response):
+            assert client.generate("hi there", system_prompt="sys") == "hello"
+            
+        generate = _by_name(tracer)["ollama.generate"][0]
+        assert generate.attributes["model"] == "m"
+        assert generate.attributes["prompt_chars"] == 8
+        assert generate.attributes["system_prompt_chars"] == 3
+        assert generate.attributes["response_chars"] == 5
+        assert generate.attributes["prompt_tokens"] == 7
+        assert generate.attributes["completion_tokens"] == 2